@@ -5,6 +5,7 @@ Endpoints:
 - GET /monitoring/system - System stats (Celery, Redis, MongoDB)
 - GET /monitoring/audit-logs - Feature extraction audit logs
 - GET /monitoring/queues - Celery queue details
+- GET /monitoring/feature-latency - Per-node feature extraction latency
 """
 
 import logging
@@ -123,3 +124,38 @@ def get_log_metrics(
     """
     service = MonitoringService(db)
     return service.get_log_metrics(hours=hours, bucket_minutes=bucket_minutes)
+
+
+@router.get("/feature-latency")
+def get_feature_latency(
+    hours: int = Query(24, ge=1, le=720, description="Hours to look back (max 30 days)"),
+    raw_repo_id: Optional[str] = Query(None, description="Filter by repository"),
+    node: Optional[str] = Query(None, description="Filter by DAG node name"),
+    group_by_repo: bool = Query(False, description="Report each node per repository"),
+    compare_previous: bool = Query(
+        False, description="Include stats of the preceding window of the same length"
+    ),
+    sort_by: str = Query(
+        "total_ms",
+        pattern="^(total_ms|p50_ms|p95_ms|p99_ms|avg_ms|max_ms|count|failure_rate)$",
+    ),
+    limit: int = Query(50, ge=1, le=500),
+    db: Database = Depends(get_db),
+    _admin: dict = Depends(RequirePermission(Permission.ADMIN_FULL)),
+):
+    """
+    Get latency stats per feature DAG node.
+
+    Returns call counts, failure rates and p50/p95/p99 latencies, sorted
+    to show which extractors dominate extraction time.
+    """
+    service = MonitoringService(db)
+    return service.get_feature_latency(
+        hours=hours,
+        raw_repo_id=raw_repo_id,
+        node_name=node,
+        group_by_repo=group_by_repo,
+        compare_previous=compare_previous,
+        sort_by=sort_by,
+        limit=limit,
+    )
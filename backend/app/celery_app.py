@@ -2,13 +2,17 @@
 
 from __future__ import annotations
 
+import logging
+
 from celery import Celery
 from celery.schedules import crontab
-from celery.signals import worker_process_init, worker_ready
+from celery.signals import worker_process_init, worker_process_shutdown, worker_ready
 from kombu import Exchange, Queue
 
 from app.config import settings
 
+logger = logging.getLogger(__name__)
+
 celery_app = Celery(
     "buildguard",
     broker=settings.CELERY_BROKER_URL,
@@ -21,6 +25,7 @@ celery_app = Celery(
         "app.tasks.training_processing",
         "app.tasks.training_scan_helpers",
         "app.tasks.export",
+        "app.tasks.feature_refresh",
         "app.tasks.sonar",
         "app.tasks.trivy",
         "app.tasks.shared.ingestion_tasks",
@@ -118,12 +123,28 @@ celery_app.conf.update(
 # Reset MongoDB client after fork to ensure fork-safety
 @worker_process_init.connect
 def on_worker_process_init(**kwargs):
-    """Reset MongoDB client after fork to avoid fork-safety warnings."""
+    """Reset MongoDB client after fork and compile the feature pipeline."""
     from app.database import mongo
 
     # Reset the global client so each forked worker creates its own connection
     mongo._client = None
 
+    # Compile the Hamilton driver and feature registry once per worker process
+    try:
+        from app.tasks.pipeline.hamilton_runner import warm_up_pipeline
+
+        warm_up_pipeline()
+    except Exception as e:
+        logger.warning(f"Failed to warm up Hamilton pipeline: {e}")
+
+
+@worker_process_shutdown.connect
+def on_worker_process_shutdown(**kwargs):
+    """Close persistent git cat-file processes owned by this worker."""
+    from app.tasks.pipeline.utils.git_object_reader import close_all_object_readers
+
+    close_all_object_readers()
+
 
 # Setup structured logging when worker starts
 
@@ -78,6 +78,15 @@ class Settings(BaseSettings):
 
     # --- Processing Phase (feature extraction) ---
     PROCESSING_BUILDS_PER_BATCH: int = 20  # Builds processed per enrichment batch
+    PROCESSING_TWO_PHASE_ENABLED: bool = (
+        True  # Extract non-temporal features in parallel, then temporal ones in order
+    )
+    PROCESSING_TEMPORAL_BUILDS_PER_TASK: int = 500  # Builds per ordered temporal task
+    PROCESSING_MAX_PARALLEL_REPOS: int = 8  # Repos processed concurrently per two-phase scenario
+    PROCESSING_REUSE_FEATURE_RESULTS: bool = (
+        True  # Reuse features stored for a build by other model configs/scenarios
+    )
+    FEATURE_RESULTS_TTL_DAYS: int = 30  # Stored feature results expire after this (0 = never)
 
     # --- Prediction Phase (risk prediction) ---
     PREDICTION_BUILDS_PER_BATCH: int = 10  # Builds predicted per batch
@@ -89,7 +98,13 @@ class Settings(BaseSettings):
 
     # --- Git/Log Constraints ---
     GIT_MAX_LOG_SIZE_MB: int = 10  # Skip logs larger than this
+    CI_LOG_COMPRESSION: str = "gzip"  # Downloaded job logs on disk: "gzip" or "none"
+    CI_LOG_COMPRESSION_LEVEL: int = 6  # Gzip level (1 = fastest, 9 = smallest)
     GIT_COMMIT_REPLAY_MAX_DEPTH: int = 100  # Max depth for fork commit replay
+    GIT_OBJECT_READER_IDLE_SECONDS: int = 300  # Close idle cat-file processes after this
+    GIT_MAINTENANCE_ENABLED: bool = True  # commit-graph/bitmaps after clone/fetch
+    GIT_MAINTENANCE_MAX_PACKS: int = 20  # Full repack when a repo has more packs
+    GIT_MAINTENANCE_TIMEOUT_SECONDS: int = 300  # Per git maintenance step
 
     # --- Scanning Phase (Trivy, SonarQube) ---
     SCAN_BUILDS_PER_QUERY: int = 200  # Builds fetched per paginated query
@@ -114,6 +129,21 @@ class Settings(BaseSettings):
     # --- Hamilton Pipeline Caching ---
     HAMILTON_CACHE_ENABLED: bool = True  # Enable/disable DAG result caching
     HAMILTON_CACHE_TYPE: str = "file"  # "file" (persistent) or "memory" (dev only)
+    HAMILTON_CACHE_MAX_BYTES: int = 20 * 1024**3  # File cache size budget (0 = unbounded)
+    HAMILTON_CACHE_TTL_SECONDS: int = 14 * 24 * 3600  # Drop results idle this long (0 = never)
+    HAMILTON_CACHE_EVICT_INTERVAL_SECONDS: int = 300  # Min delay between evictions per worker
+
+    # --- Feature Node Latency Profiling ---
+    NODE_LATENCY_BUCKET_MINUTES: int = 60  # Time bucket of node latency histograms
+    NODE_LATENCY_RETENTION_DAYS: int = 30  # Latency histograms kept this long
+
+    # --- Hamilton Parallel Execution (opt-in, disables the DAG result cache) ---
+    HAMILTON_PARALLEL_ENABLED: bool = False  # Run independent nodes on a thread pool
+    HAMILTON_PARALLEL_MAX_WORKERS: int = 8  # Node threads per worker process
+    HAMILTON_PARALLEL_GIT_CONCURRENCY: int = 4  # Concurrent git nodes (0 = unbounded)
+    HAMILTON_PARALLEL_GITHUB_CONCURRENCY: int = 2  # Concurrent GitHub API nodes
+    HAMILTON_PARALLEL_LOGS_CONCURRENCY: int = 2  # Concurrent log parsing nodes
+    HAMILTON_PARALLEL_MONGO_CONCURRENCY: int = 4  # Concurrent history query nodes
 
     DATA_DIR: str = "../repo-data/data"
 
@@ -0,0 +1,205 @@
+"""
+External Call Accounting - Attributes subprocess and API calls to DAG nodes.
+
+ExecutionTracker.pre_node_execute opens a NodeCallScope for the running
+Hamilton node in a contextvar; git/docker subprocesses and GitHub requests made
+while it is active are recorded against that node:
+
+- per node and build: NodeCallScope.calls, saved with the node results of the
+  feature audit log (NodeExecutionResult.external_calls)
+- per process: Prometheus counters of calls, wall time and output bytes by
+  kind, command and node (app/utils/prometheus_metrics.py)
+
+Calls made outside of a node (ingestion, input preparation) only reach the
+Prometheus counters, with an empty node label.
+
+Warnings and errors logged under app.tasks.pipeline while a node runs are
+counted on its scope too (install_node_log_handler), so results of nodes
+that swallowed an error can be told apart from genuine values.
+
+Usage:
+    result = call_accounting.run(["git", "log", "-1"], cwd=repo, capture_output=True)
+
+    with call_accounting.track_call("git", "diff-tree") as call:
+        for line in proc.stdout:
+            call.add_output(len(line))
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import subprocess
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, Optional, Sequence, Tuple
+
+# Global git options taking a value (skipped when resolving the subcommand)
+_GIT_OPTIONS_WITH_VALUE = {"-C", "-c", "--git-dir", "--work-tree", "--namespace"}
+
+
+@dataclass
+class CallStats:
+    """Accumulated external calls of one kind:command."""
+
+    count: int = 0
+    duration_ms: float = 0.0
+    output_bytes: int = 0
+
+    def as_dict(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "duration_ms": round(self.duration_ms, 2),
+            "output_bytes": self.output_bytes,
+        }
+
+
+class NodeCallScope:
+    """External calls made while one Hamilton node was running."""
+
+    def __init__(self, node_name: str):
+        self.node_name = node_name
+        self.calls: Dict[str, CallStats] = {}
+        # Warning/error records logged while the node ran
+        self.logged_errors = 0
+        self._lock = threading.Lock()
+
+    def add(self, key: str, duration_ms: float, output_bytes: int) -> None:
+        with self._lock:
+            stats = self.calls.setdefault(key, CallStats())
+            stats.count += 1
+            stats.duration_ms += duration_ms
+            stats.output_bytes += output_bytes
+
+    def as_dict(self) -> Dict[str, Dict[str, float]]:
+        """Calls keyed by "kind:command" (e.g. "git:log", "github:GET")."""
+        with self._lock:
+            return {key: stats.as_dict() for key, stats in sorted(self.calls.items())}
+
+
+_active_node: ContextVar[Optional[NodeCallScope]] = ContextVar("active_node", default=None)
+
+
+def enter_node(node_name: str) -> Tuple[NodeCallScope, Token]:
+    """Make node_name the node external calls are attributed to (until exit_node)."""
+    scope = NodeCallScope(node_name)
+    return scope, _active_node.set(scope)
+
+
+def exit_node(token: Optional[Token]) -> None:
+    """Restore the node active before the matching enter_node."""
+    if token is None:
+        _active_node.set(None)
+        return
+    try:
+        _active_node.reset(token)
+    except ValueError:
+        # Token created in another context (hook called from another thread)
+        _active_node.set(None)
+
+
+def get_active_node() -> Optional[str]:
+    """Name of the node external calls are currently attributed to."""
+    scope = _active_node.get()
+    return scope.node_name if scope else None
+
+
+def record_call(kind: str, command: str, duration_s: float, output_bytes: int = 0) -> None:
+    """Record one external call against the active node and the Prometheus counters."""
+    from app.utils.prometheus_metrics import record_external_call
+
+    scope = _active_node.get()
+    if scope is not None:
+        scope.add(f"{kind}:{command}", duration_s * 1000, output_bytes)
+    record_external_call(
+        kind, command, scope.node_name if scope else "", duration_s, output_bytes
+    )
+
+
+class _NodeLogHandler(logging.Handler):
+    """Counts warning/error records against the active node."""
+
+    def emit(self, record: logging.LogRecord) -> None:
+        scope = _active_node.get()
+        if scope is not None:
+            with scope._lock:
+                scope.logged_errors += 1
+
+
+_log_handler_lock = threading.Lock()
+_log_handler: Optional[_NodeLogHandler] = None
+
+
+def install_node_log_handler(logger_name: str = "app.tasks.pipeline") -> None:
+    """Count warnings/errors of logger_name (and its children) on the active node, once."""
+    global _log_handler
+    with _log_handler_lock:
+        if _log_handler is not None:
+            return
+        _log_handler = _NodeLogHandler(level=logging.WARNING)
+        logging.getLogger(logger_name).addHandler(_log_handler)
+
+
+class _TrackedCall:
+    def __init__(self) -> None:
+        self.output_bytes = 0
+
+    def add_output(self, size: int) -> None:
+        self.output_bytes += size
+
+
+@contextmanager
+def track_call(kind: str, command: str) -> Iterator[_TrackedCall]:
+    """
+    Record the wall time of a block as one external call.
+
+    For streamed calls (Popen, persistent processes) the block reports the
+    output it consumed with call.add_output().
+    """
+    call = _TrackedCall()
+    start = time.perf_counter()
+    try:
+        yield call
+    finally:
+        record_call(kind, command, time.perf_counter() - start, call.output_bytes)
+
+
+def command_of(args: Sequence[Any]) -> Tuple[str, str]:
+    """(kind, command) of a subprocess argv, e.g. ("git", "log") or ("docker", "run")."""
+    if not args:
+        return "subprocess", ""
+    kind = os.path.basename(str(args[0]))
+    skip_value = False
+    for arg in args[1:]:
+        arg = str(arg)
+        if skip_value:
+            skip_value = False
+        elif arg in _GIT_OPTIONS_WITH_VALUE:
+            skip_value = True
+        elif not arg.startswith("-"):
+            return kind, arg
+    return kind, ""
+
+
+def _output_size(output: Any) -> int:
+    # Text-mode output is counted in characters
+    return len(output) if output else 0
+
+
+def run(args: Sequence[Any], **kwargs: Any) -> subprocess.CompletedProcess:
+    """subprocess.run() recording the call (count, wall time, stdout size)."""
+    kind, command = command_of(args)
+    start = time.perf_counter()
+    output_bytes = 0
+    try:
+        result = subprocess.run(args, **kwargs)
+        output_bytes = _output_size(result.stdout)
+        return result
+    except subprocess.CalledProcessError as e:
+        output_bytes = _output_size(e.stdout)
+        raise
+    finally:
+        record_call(kind, command, time.perf_counter() - start, output_bytes)
@@ -39,6 +39,7 @@ from .feature_audit_log import (
 from .model_import_build import ModelImportBuild, ModelImportBuildStatus
 from .model_repo_config import ModelImportStatus, ModelRepoConfig
 from .model_training_build import ModelTrainingBuild
+from .node_latency_stats import NodeLatencyStats
 from .notification import Notification, NotificationType
 
 # Other entities
@@ -121,6 +122,7 @@ __all__ = [
     "AuditLogCategory",
     "NodeExecutionResult",
     "NodeExecutionStatus",
+    "NodeLatencyStats",
     "ExportJob",
     "ExportStatus",
     "ExportFormat",
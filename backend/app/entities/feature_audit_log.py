@@ -50,6 +50,11 @@ class NodeExecutionResult(BaseEntity):
         default_factory=list,
         description="Resources used for extraction (git_worktree, github_api, etc.)",
     )
+    external_calls: Dict[str, Dict[str, float]] = Field(
+        default_factory=dict,
+        description="Subprocess/API calls made by the node, keyed by 'kind:command' "
+        "(count, duration_ms, output_bytes)",
+    )
 
     error: Optional[str] = None
     warning: Optional[str] = None
@@ -137,6 +142,9 @@ class FeatureAuditLog(BaseEntity):
     # Retry tracking
     total_retries: int = 0
 
+    # Subprocess/API calls of all nodes, keyed by 'kind:command'
+    external_calls: Dict[str, Dict[str, float]] = Field(default_factory=dict)
+
     def mark_started(self) -> "FeatureAuditLog":
         """Mark audit log as started."""
         self.started_at = datetime.now(timezone.utc)
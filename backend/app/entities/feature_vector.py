@@ -57,6 +57,11 @@ class FeatureVector(BaseEntity):
         default="1.0",
         description="Version of Hamilton DAG used for feature extraction",
     )
+    node_versions: Dict[str, int] = Field(
+        default_factory=dict,
+        description="Versions of the DAG nodes not at the default version (@node_version) "
+        "when features were computed",
+    )
     computed_at: datetime = Field(
         default_factory=datetime.utcnow,
         description="When features were computed",
@@ -0,0 +1,65 @@
+"""
+NodeLatencyStats Entity - Time-bucketed latency histograms of feature DAG nodes.
+
+One document per (raw_repo_id, node_name, bucket_start) accumulates the
+executions of a Hamilton node for a repository during one time bucket
+(NODE_LATENCY_BUCKET_MINUTES). Durations are counted in fixed log-spaced bins
+(LATENCY_BINS_MS), so documents of any repos and time range can be merged and
+percentiles estimated from the merged counts. Documents expire after
+NODE_LATENCY_RETENTION_DAYS.
+"""
+
+import bisect
+from datetime import datetime
+from typing import Dict
+
+from pydantic import Field
+
+from .base import BaseEntity, PyObjectId
+
+# Upper bounds (inclusive) of the histogram bins; durations above the last
+# bound fall in an overflow bin with index len(LATENCY_BINS_MS)
+LATENCY_BINS_MS = (
+    1,
+    2,
+    5,
+    10,
+    20,
+    50,
+    100,
+    200,
+    500,
+    1_000,
+    2_000,
+    5_000,
+    10_000,
+    30_000,
+    60_000,
+    120_000,
+    300_000,
+)
+
+
+def latency_bin(duration_ms: float) -> int:
+    """Index of the histogram bin of a duration."""
+    return bisect.bisect_left(LATENCY_BINS_MS, duration_ms)
+
+
+class NodeLatencyStats(BaseEntity):
+    """Executions of one DAG node for one repository during one time bucket."""
+
+    class Config:
+        collection = "node_latency_stats"
+
+    raw_repo_id: PyObjectId = Field(..., description="Reference to raw_repositories")
+    node_name: str = Field(..., description="Hamilton node name")
+    bucket_start: datetime = Field(..., description="Start of the time bucket (UTC)")
+
+    count: int = Field(default=0, description="Number of executions")
+    failures: int = Field(default=0, description="Number of failed executions")
+    total_ms: float = Field(default=0.0, description="Sum of execution durations")
+    max_ms: float = Field(default=0.0, description="Longest execution duration")
+    histogram: Dict[str, int] = Field(
+        default_factory=dict,
+        description="Execution counts keyed by LATENCY_BINS_MS bin index",
+    )
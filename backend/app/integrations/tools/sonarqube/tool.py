@@ -13,6 +13,7 @@ from typing import Any, Dict, List, Optional
 import requests
 
 from app.config import settings
+from app.core import call_accounting
 from app.integrations.base import (
     IntegrationTool,
     MetricCategory,
@@ -107,7 +108,7 @@ class SonarQubeTool(IntegrationTool):
             return False
 
         try:
-            result = subprocess.run(
+            result = call_accounting.run(
                 ["docker", "--version"],
                 capture_output=True,
                 timeout=10,
@@ -237,7 +238,7 @@ class SonarQubeTool(IntegrationTool):
             cmd = self._build_scan_command(component_key, worktree, config_file_path)
             logger.info(f"Scanning {component_key}...")
 
-            subprocess.run(cmd, cwd=worktree, check=True, capture_output=True, text=True)
+            call_accounting.run(cmd, cwd=worktree, check=True, capture_output=True, text=True)
 
             return component_key
 
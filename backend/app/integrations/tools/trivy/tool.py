@@ -13,6 +13,7 @@ from pathlib import Path
 from typing import Any, Dict, List, Optional
 
 from app.config import settings
+from app.core import call_accounting
 from app.integrations.base import (
     IntegrationTool,
     MetricDefinition,
@@ -204,7 +205,7 @@ class TrivyTool(IntegrationTool):
             )
             logger.debug(f"Command: {' '.join(cmd)}")
 
-            result = subprocess.run(
+            result = call_accounting.run(
                 cmd,
                 capture_output=True,
                 text=True,
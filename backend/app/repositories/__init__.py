@@ -13,6 +13,7 @@ from .feature_audit_log import FeatureAuditLogRepository
 # Model training flow repositories
 from .model_repo_config import ModelRepoConfigRepository
 from .model_training_build import ModelTrainingBuildRepository
+from .node_latency_stats import NodeLatencyStatsRepository
 from .notification import NotificationRepository
 
 # Other repositories
@@ -54,6 +55,7 @@ __all__ = [
     "UserRepository",
     "DatasetTemplateRepository",
     "FeatureAuditLogRepository",
+    "NodeLatencyStatsRepository",
     "NotificationRepository",
     # Data Quality
     "DataQualityRepository",
@@ -54,14 +54,19 @@ class FeatureVectorRepository(BaseRepository[FeatureVector]):
         self,
         raw_repo_id: ObjectId,
         raw_build_run_id: ObjectId,
+        scope: Optional[str] = None,
+        config_id: Optional[ObjectId] = None,
     ) -> Optional[FeatureVector]:
-        """Find feature vector by repo and build run (the unique key)."""
-        doc = self.collection.find_one(
-            {
-                "raw_repo_id": raw_repo_id,
-                "raw_build_run_id": raw_build_run_id,
-            }
-        )
+        """Find feature vector by repo and build run (optionally scope/config)."""
+        query: Dict[str, Any] = {
+            "raw_repo_id": raw_repo_id,
+            "raw_build_run_id": raw_build_run_id,
+        }
+        if scope:
+            query["scope"] = scope
+        if config_id:
+            query["config_id"] = config_id
+        doc = self.collection.find_one(query)
         return FeatureVector(**doc) if doc else None
 
     def upsert_features(
@@ -74,6 +79,7 @@ class FeatureVectorRepository(BaseRepository[FeatureVector]):
         extraction_status: ExtractionStatus = ExtractionStatus.COMPLETED,
         extraction_error: Optional[str] = None,
         dag_version: str = "1.0",
+        node_versions: Optional[Dict[str, int]] = None,
         tr_prev_build: Optional[str] = None,
         is_missing_commit: bool = False,
         missing_resources: Optional[List[str]] = None,
@@ -106,6 +112,7 @@ class FeatureVectorRepository(BaseRepository[FeatureVector]):
             "extraction_status": status_value,
             "extraction_error": extraction_error,
             "dag_version": dag_version,
+            "node_versions": node_versions or {},
             "tr_prev_build": tr_prev_build,
             "is_missing_commit": is_missing_commit,
             "missing_resources": missing_resources or [],
@@ -151,6 +158,38 @@ class FeatureVectorRepository(BaseRepository[FeatureVector]):
         cursor = self.collection.find({"raw_build_run_id": {"$in": raw_build_run_ids}})
         return {str(doc["raw_build_run_id"]): FeatureVector(**doc) for doc in cursor}
 
+    def find_stale(
+        self,
+        dag_version: str,
+        raw_repo_id: Optional[ObjectId] = None,
+    ) -> List[FeatureVector]:
+        """
+        Find extracted feature vectors computed with another DAG version.
+
+        Used by the feature refresh job (app/tasks/feature_refresh.py).
+        """
+        query: Dict[str, Any] = {
+            "dag_version": {"$ne": dag_version},
+            "extraction_status": {
+                "$in": [ExtractionStatus.COMPLETED.value, ExtractionStatus.PARTIAL.value]
+            },
+        }
+        if raw_repo_id:
+            query["raw_repo_id"] = raw_repo_id
+        return [FeatureVector(**doc) for doc in self.collection.find(query)]
+
+    def find_repo_ids_with_stale(self, dag_version: str) -> List[ObjectId]:
+        """Distinct raw_repo_ids having feature vectors to refresh (see find_stale)."""
+        return self.collection.distinct(
+            "raw_repo_id",
+            {
+                "dag_version": {"$ne": dag_version},
+                "extraction_status": {
+                    "$in": [ExtractionStatus.COMPLETED.value, ExtractionStatus.PARTIAL.value]
+                },
+            },
+        )
+
     def walk_temporal_chain(
         self,
         raw_repo_id: ObjectId,
@@ -242,6 +281,60 @@ class FeatureVectorRepository(BaseRepository[FeatureVector]):
         )
         return FeatureVector(**doc) if doc else None
 
+    def merge_features(
+        self,
+        feature_vector_id: ObjectId,
+        features: Dict[str, Any],
+        extraction_status: Optional[ExtractionStatus] = None,
+        extraction_error: Optional[str] = None,
+        dag_version: Optional[str] = None,
+        node_versions: Optional[Dict[str, int]] = None,
+    ) -> Optional[FeatureVector]:
+        """
+        Add or overwrite features of an existing feature vector.
+
+        Used by the temporal pass of two-phase extraction, which computes
+        features on top of the ones stored by the first pass, and by the
+        refresh of features affected by node version changes.
+
+        Args:
+            feature_vector_id: The FeatureVector ObjectId
+            features: Formatted feature values to merge in
+            extraction_status: New extraction status (unchanged if None)
+            extraction_error: New extraction error (unchanged if None)
+            dag_version: New DAG version (unchanged if None)
+            node_versions: New node versions (unchanged if None)
+
+        Returns:
+            Updated FeatureVector or None if not found
+        """
+        updates: Dict[str, Any] = {
+            "features": {"$mergeObjects": ["$features", {"$literal": features}]},
+            "updated_at": datetime.utcnow(),
+        }
+        if extraction_status is not None:
+            updates["extraction_status"] = (
+                extraction_status.value
+                if hasattr(extraction_status, "value")
+                else extraction_status
+            )
+        if extraction_error is not None:
+            updates["extraction_error"] = {"$literal": extraction_error}
+        if dag_version is not None:
+            updates["dag_version"] = {"$literal": dag_version}
+        if node_versions is not None:
+            updates["node_versions"] = {"$literal": node_versions}
+
+        doc = self.collection.find_one_and_update(
+            {"_id": feature_vector_id},
+            [
+                {"$set": updates},
+                {"$set": {"feature_count": {"$size": {"$objectToArray": "$features"}}}},
+            ],
+            return_document=ReturnDocument.AFTER,
+        )
+        return FeatureVector(**doc) if doc else None
+
     def delete_by_ids(
         self,
         feature_vector_ids: List[ObjectId],
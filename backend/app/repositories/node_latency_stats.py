@@ -0,0 +1,185 @@
+"""Repository for NodeLatencyStats entities (per-node latency histograms)."""
+
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from bson import ObjectId
+from pymongo import ASCENDING, IndexModel, UpdateOne
+
+from app.config import settings
+from app.entities.node_latency_stats import NodeLatencyStats, latency_bin
+
+from .base import BaseRepository
+
+# (node_name, duration_ms, success)
+NodeTiming = Tuple[str, float, bool]
+
+
+class NodeLatencyStatsRepository(BaseRepository[NodeLatencyStats]):
+    """Repository for time-bucketed node latency histograms."""
+
+    def __init__(self, db) -> None:
+        super().__init__(db, "node_latency_stats", NodeLatencyStats)
+        self._ensure_indexes()
+
+    def _ensure_indexes(self) -> None:
+        """Create the bucket key and retention (TTL) indexes."""
+        indexes = [
+            IndexModel(
+                [
+                    ("raw_repo_id", ASCENDING),
+                    ("node_name", ASCENDING),
+                    ("bucket_start", ASCENDING),
+                ],
+                unique=True,
+                name="unique_node_latency_bucket",
+            ),
+            IndexModel(
+                [("bucket_start", ASCENDING)],
+                expireAfterSeconds=settings.NODE_LATENCY_RETENTION_DAYS * 86400,
+                name="node_latency_retention",
+            ),
+        ]
+        try:
+            self.collection.create_indexes(indexes)
+        except Exception:
+            # Indexes may already exist with different options
+            pass
+
+    @staticmethod
+    def bucket_start(at: datetime) -> datetime:
+        """Start of the time bucket containing `at`."""
+        if at.tzinfo is None:
+            at = at.replace(tzinfo=timezone.utc)
+        bucket_seconds = settings.NODE_LATENCY_BUCKET_MINUTES * 60
+        timestamp = int(at.timestamp()) // bucket_seconds * bucket_seconds
+        return datetime.fromtimestamp(timestamp, tz=timezone.utc)
+
+    def record(
+        self,
+        raw_repo_id: ObjectId,
+        timings: Iterable[NodeTiming],
+        executed_at: Optional[datetime] = None,
+    ) -> int:
+        """
+        Add node executions of one pipeline run to their time bucket.
+
+        Returns:
+            Number of node buckets updated
+        """
+        bucket_start = self.bucket_start(executed_at or datetime.now(timezone.utc))
+
+        per_node: Dict[str, Dict[str, Any]] = {}
+        for node_name, duration_ms, success in timings:
+            stats = per_node.setdefault(
+                node_name,
+                {
+                    "count": 0,
+                    "failures": 0,
+                    "total_ms": 0.0,
+                    "max_ms": 0.0,
+                    "bins": defaultdict(int),
+                },
+            )
+            stats["count"] += 1
+            stats["failures"] += 0 if success else 1
+            stats["total_ms"] += duration_ms
+            stats["max_ms"] = max(stats["max_ms"], duration_ms)
+            stats["bins"][latency_bin(duration_ms)] += 1
+
+        operations = [
+            UpdateOne(
+                {"raw_repo_id": raw_repo_id, "node_name": node_name, "bucket_start": bucket_start},
+                {
+                    "$inc": {
+                        "count": stats["count"],
+                        "failures": stats["failures"],
+                        "total_ms": stats["total_ms"],
+                        **{f"histogram.{b}": n for b, n in stats["bins"].items()},
+                    },
+                    "$max": {"max_ms": stats["max_ms"]},
+                },
+                upsert=True,
+            )
+            for node_name, stats in per_node.items()
+        ]
+        if operations:
+            self.collection.bulk_write(operations, ordered=False)
+        return len(operations)
+
+    def aggregate_stats(
+        self,
+        since: datetime,
+        until: Optional[datetime] = None,
+        raw_repo_id: Optional[ObjectId] = None,
+        node_name: Optional[str] = None,
+        group_by_repo: bool = False,
+    ) -> List[Dict[str, Any]]:
+        """
+        Merge the buckets of a time range per node (and per repo if group_by_repo).
+
+        Returns:
+            One dict per group with node_name, raw_repo_id (None unless
+            group_by_repo), count, failures, total_ms, max_ms and histogram
+            (bin index -> count)
+        """
+        match: Dict[str, Any] = {"bucket_start": {"$gte": self.bucket_start(since)}}
+        if until:
+            match["bucket_start"]["$lt"] = self.bucket_start(until)
+        if raw_repo_id:
+            match["raw_repo_id"] = raw_repo_id
+        if node_name:
+            match["node_name"] = node_name
+
+        group_key: Dict[str, Any] = {"node_name": "$node_name"}
+        if group_by_repo:
+            group_key["raw_repo_id"] = "$raw_repo_id"
+
+        totals = self.aggregate(
+            [
+                {"$match": match},
+                {
+                    "$group": {
+                        "_id": group_key,
+                        "count": {"$sum": "$count"},
+                        "failures": {"$sum": "$failures"},
+                        "total_ms": {"$sum": "$total_ms"},
+                        "max_ms": {"$max": "$max_ms"},
+                    }
+                },
+            ]
+        )
+        bins = self.aggregate(
+            [
+                {"$match": match},
+                {"$project": {**group_key, "bins": {"$objectToArray": "$histogram"}}},
+                {"$unwind": "$bins"},
+                {
+                    "$group": {
+                        "_id": {**{k: f"${k}" for k in group_key}, "bin": "$bins.k"},
+                        "n": {"$sum": "$bins.v"},
+                    }
+                },
+            ]
+        )
+
+        def key(group: Dict[str, Any]) -> Tuple[str, Optional[ObjectId]]:
+            return group["node_name"], group.get("raw_repo_id")
+
+        histograms: Dict[Tuple[str, Optional[ObjectId]], Dict[int, int]] = defaultdict(dict)
+        for row in bins:
+            histograms[key(row["_id"])][int(row["_id"]["bin"])] = row["n"]
+
+        return [
+            {
+                "node_name": row["_id"]["node_name"],
+                "raw_repo_id": row["_id"].get("raw_repo_id"),
+                "count": row["count"],
+                "failures": row["failures"],
+                "total_ms": row["total_ms"],
+                "max_ms": row["max_ms"],
+                "histogram": histograms.get(key(row["_id"]), {}),
+            }
+            for row in totals
+        ]
@@ -10,6 +10,7 @@ from bson import ObjectId
 from pymongo.database import Database
 
 from app.config import settings
+from app.core import call_accounting
 from app.services.github.exceptions import (
     GithubAllRateLimitError,
     GithubConfigurationError,
@@ -36,6 +37,16 @@ API_PREVIEW_HEADERS = {
 logger = logging.getLogger(__name__)
 
 
+class _AccountedTransport(httpx.HTTPTransport):
+    """HTTP transport recording each GitHub request as an external call."""
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        with call_accounting.track_call("github", request.method) as call:
+            response = super().handle_request(request)
+            call.add_output(len(response.read()))
+        return response
+
+
 class GitHubClient:
     def __init__(
         self,
@@ -61,7 +72,7 @@ class GitHubClient:
             raise GithubConfigurationError("GitHub token is required to call the API")
 
         self._api_url = (api_url or settings.GITHUB_API_URL).rstrip("/")
-        transport = httpx.HTTPTransport(retries=3)
+        transport = _AccountedTransport(retries=3)
         self._rest = httpx.Client(base_url=self._api_url, timeout=120, transport=transport)
 
     def _headers(self) -> Dict[str, str]:
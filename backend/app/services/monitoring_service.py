@@ -4,19 +4,40 @@ Monitoring Service - Gathers system stats from Celery, Redis, MongoDB.
 
 import logging
 from datetime import datetime, timezone
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 import redis
+from bson import ObjectId
 from pymongo.database import Database
 
 from app.celery_app import celery_app
 from app.config import settings
+from app.entities.node_latency_stats import LATENCY_BINS_MS
+from app.repositories.node_latency_stats import NodeLatencyStatsRepository
 from app.repositories.raw_build_run import RawBuildRunRepository
 from app.repositories.raw_repository import RawRepositoryRepository
 from app.repositories.system_log import SystemLogRepository
 
 logger = logging.getLogger(__name__)
 
+# Percentiles reported for feature node latencies
+LATENCY_PERCENTILES = (("p50_ms", 0.50), ("p95_ms", 0.95), ("p99_ms", 0.99))
+
+
+def _estimate_percentile(histogram: Dict[int, int], count: int, q: float, max_ms: float) -> float:
+    """Estimate a latency percentile by interpolating within LATENCY_BINS_MS bins."""
+    target = q * count
+    cumulative = 0
+    for index in sorted(histogram):
+        n = histogram[index]
+        if n and cumulative + n >= target:
+            lower = LATENCY_BINS_MS[index - 1] if index > 0 else 0
+            upper = LATENCY_BINS_MS[index] if index < len(LATENCY_BINS_MS) else max_ms
+            value = lower + (upper - lower) * (target - cumulative) / n
+            return round(min(value, max_ms), 2)
+        cumulative += n
+    return round(max_ms, 2)
+
 
 class MonitoringService:
     """Service to gather system monitoring stats."""
@@ -27,6 +48,7 @@ class MonitoringService:
         self._raw_build_run_repo = RawBuildRunRepository(db)
         self._raw_repo_repo = RawRepositoryRepository(db)
         self._system_log_repo = SystemLogRepository(db)
+        self._node_latency_repo = NodeLatencyStatsRepository(db)
 
     @property
     def redis_client(self) -> redis.Redis:
@@ -366,3 +388,110 @@ class MonitoringService:
             "hours": hours,
             "bucket_minutes": bucket_minutes,
         }
+
+    def get_feature_latency(
+        self,
+        hours: int = 24,
+        raw_repo_id: Optional[str] = None,
+        node_name: Optional[str] = None,
+        group_by_repo: bool = False,
+        compare_previous: bool = False,
+        sort_by: str = "total_ms",
+        limit: int = 50,
+    ) -> Dict[str, Any]:
+        """
+        Get per-node latency stats of the feature DAG over a time window.
+
+        Stats are merged from the time-bucketed node_latency_stats collection;
+        percentiles are estimated from the merged histograms.
+
+        Args:
+            hours: Number of hours to look back
+            raw_repo_id: Only include this repository
+            node_name: Only include this node
+            group_by_repo: Report each (node, repository) pair separately
+            compare_previous: Add the stats of the preceding window of the
+                same length (e.g. to spot a regression after a deploy)
+            sort_by: Field to sort nodes by, descending (total_ms, p95_ms, ...)
+            limit: Max nodes to return
+
+        Returns:
+            Dict with nodes array and window info
+        """
+        from datetime import timedelta
+
+        now = datetime.now(timezone.utc)
+        start_time = now - timedelta(hours=hours)
+        repo_oid = ObjectId(raw_repo_id) if raw_repo_id else None
+
+        def collect(since: datetime, until: Optional[datetime]) -> Dict[Tuple, Dict[str, Any]]:
+            rows = self._node_latency_repo.aggregate_stats(
+                since,
+                until=until,
+                raw_repo_id=repo_oid,
+                node_name=node_name,
+                group_by_repo=group_by_repo,
+            )
+            return {
+                (row["node_name"], row["raw_repo_id"]): self._latency_summary(row) for row in rows
+            }
+
+        current = collect(start_time, None)
+        previous = (
+            collect(start_time - timedelta(hours=hours), start_time) if compare_previous else {}
+        )
+
+        total_ms = sum(stats["total_ms"] for stats in current.values()) or 1.0
+        repo_names: Dict[Any, str] = {}
+        if group_by_repo:
+            repo_ids = list({repo_id for _, repo_id in current if repo_id})
+            repo_names = {
+                repo.id: repo.full_name for repo in self._raw_repo_repo.find_by_ids(repo_ids)
+            }
+
+        nodes: List[Dict[str, Any]] = []
+        for (name, repo_id), stats in current.items():
+            entry = {
+                "node_name": name,
+                **stats,
+                "share_of_total": round(stats["total_ms"] / total_ms, 4),
+            }
+            if group_by_repo:
+                entry["raw_repo_id"] = str(repo_id)
+                entry["repo_name"] = repo_names.get(repo_id)
+            if compare_previous:
+                before = previous.get((name, repo_id))
+                entry["previous"] = before
+                entry["p95_change"] = (
+                    round(stats["p95_ms"] / before["p95_ms"] - 1, 4)
+                    if before and before["p95_ms"]
+                    else None
+                )
+            nodes.append(entry)
+
+        nodes.sort(key=lambda n: n.get(sort_by) or 0, reverse=True)
+
+        return {
+            "nodes": nodes[:limit],
+            "total_nodes": len(nodes),
+            "hours": hours,
+            "bucket_minutes": settings.NODE_LATENCY_BUCKET_MINUTES,
+            "from": start_time.isoformat(),
+            "to": now.isoformat(),
+        }
+
+    @staticmethod
+    def _latency_summary(row: Dict[str, Any]) -> Dict[str, Any]:
+        """Count, failure rate, mean and percentile latencies of merged buckets."""
+        count = row["count"]
+        summary = {
+            "count": count,
+            "failures": row["failures"],
+            "failure_rate": round(row["failures"] / count, 4) if count else 0.0,
+            "total_ms": round(row["total_ms"], 2),
+            "avg_ms": round(row["total_ms"] / count, 2) if count else 0.0,
+            "max_ms": round(row["max_ms"], 2),
+        }
+        for field_name, q in LATENCY_PERCENTILES:
+            summary[field_name] = _estimate_percentile(row["histogram"], count, q, row["max_ms"])
+        return summary
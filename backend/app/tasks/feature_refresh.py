@@ -0,0 +1,146 @@
+"""
+Feature Refresh Celery Tasks - Recompute stored features after extractor changes.
+
+Hamilton nodes carry a version (@node_version in feature_dag/_metadata.py)
+and every FeatureVector records the versions it was computed with. When an
+extractor is bumped, these tasks recompute only the changed nodes and the
+features downstream of them, reusing the stored values of everything else:
+
+    refresh_stale_features
+        └── group(refresh_repo_features per raw repository)
+
+Builds of a repository are refreshed oldest first, as temporal features
+read the (refreshed) features of earlier builds.
+"""
+
+import logging
+from typing import Any, Dict, Optional
+
+from bson import ObjectId
+from celery import group
+
+from app.celery_app import celery_app
+from app.entities.enums import FeatureVectorScope
+from app.repositories.feature_vector import FeatureVectorRepository
+from app.repositories.model_repo_config import ModelRepoConfigRepository
+from app.repositories.raw_build_run import RawBuildRunRepository
+from app.repositories.raw_repository import RawRepositoryRepository
+from app.tasks.base import PipelineTask
+from app.tasks.pipeline.feature_dag._metadata import get_dag_version
+from app.tasks.shared import refresh_features_for_build
+
+logger = logging.getLogger(__name__)
+
+
+@celery_app.task(
+    bind=True,
+    base=PipelineTask,
+    name="app.tasks.feature_refresh.refresh_stale_features",
+    queue="processing",
+    soft_time_limit=60,
+    time_limit=120,
+)
+def refresh_stale_features(
+    self: PipelineTask,
+    raw_repo_id: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Dispatch a refresh of the feature vectors computed with another DAG version.
+
+    Args:
+        raw_repo_id: Only refresh this repository (all repositories if None)
+    """
+    dag_version = get_dag_version()
+    feature_vector_repo = FeatureVectorRepository(self.db)
+
+    if raw_repo_id:
+        repo_ids = [ObjectId(raw_repo_id)]
+    else:
+        repo_ids = feature_vector_repo.find_repo_ids_with_stale(dag_version)
+
+    if not repo_ids:
+        logger.info(f"No feature vectors to refresh (dag_version={dag_version})")
+        return {"status": "completed", "repos": 0, "dag_version": dag_version}
+
+    group(refresh_repo_features.si(raw_repo_id=str(repo_id)) for repo_id in repo_ids).apply_async()
+
+    logger.info(f"Dispatched feature refresh for {len(repo_ids)} repos (dag_version={dag_version})")
+    return {"status": "dispatched", "repos": len(repo_ids), "dag_version": dag_version}
+
+
+@celery_app.task(
+    bind=True,
+    base=PipelineTask,
+    name="app.tasks.feature_refresh.refresh_repo_features",
+    queue="processing",
+    soft_time_limit=3600,
+    time_limit=3700,
+)
+def refresh_repo_features(self: PipelineTask, raw_repo_id: str) -> Dict[str, Any]:
+    """
+    Refresh the stale feature vectors of one repository in build order.
+
+    Model-scoped vectors are recomputed with the feature config of their
+    ModelRepoConfig, scenario-scoped ones with the empty config used by
+    training scenarios. A failed build does not stop the refresh; it stays
+    stale and is picked up again by the next refresh.
+    """
+    feature_vector_repo = FeatureVectorRepository(self.db)
+    raw_build_run_repo = RawBuildRunRepository(self.db)
+    repo_config_repo = ModelRepoConfigRepository(self.db)
+
+    raw_repo = RawRepositoryRepository(self.db).find_by_id(raw_repo_id)
+    if not raw_repo:
+        return {"status": "error", "message": "RawRepository not found"}
+
+    dag_version = get_dag_version()
+    feature_vectors = feature_vector_repo.find_stale(dag_version, raw_repo_id=raw_repo.id)
+    if not feature_vectors:
+        return {"status": "completed", "raw_repo_id": raw_repo_id, "refreshed": 0}
+
+    raw_build_runs = {
+        build.id: build
+        for build in raw_build_run_repo.find_by_ids(
+            list({fv.raw_build_run_id for fv in feature_vectors})
+        )
+    }
+    # Oldest build first; vectors of a build without its RawBuildRun are skipped
+    feature_vectors = sorted(
+        (fv for fv in feature_vectors if fv.raw_build_run_id in raw_build_runs),
+        key=lambda fv: (
+            raw_build_runs[fv.raw_build_run_id].run_created_at is None,
+            raw_build_runs[fv.raw_build_run_id].run_created_at,
+            fv.raw_build_run_id,
+        ),
+    )
+
+    feature_configs: Dict[ObjectId, Dict[str, Any]] = {}
+    counts = {"refreshed": 0, "partial": 0, "current": 0, "failed": 0, "skipped": 0}
+    for feature_vector in feature_vectors:
+        if feature_vector.scope == FeatureVectorScope.MODEL.value:
+            if feature_vector.config_id not in feature_configs:
+                repo_config = repo_config_repo.find_by_id(feature_vector.config_id)
+                feature_configs[feature_vector.config_id] = (
+                    repo_config.feature_configs if repo_config else None
+                )
+            feature_config = feature_configs[feature_vector.config_id]
+            if feature_config is None:
+                counts["skipped"] += 1
+                continue
+        else:
+            feature_config = {}
+
+        result = refresh_features_for_build(
+            db=self.db,
+            raw_repo=raw_repo,
+            feature_config=feature_config,
+            raw_build_run=raw_build_runs[feature_vector.raw_build_run_id],
+            feature_vector=feature_vector,
+        )
+        counts[result["status"]] += 1
+
+    logger.info(
+        f"Feature refresh for {raw_repo.full_name}: {len(feature_vectors)} vectors, "
+        + ", ".join(f"{count} {status}" for status, count in counts.items())
+    )
+    return {"status": "completed", "raw_repo_id": raw_repo_id, **counts}
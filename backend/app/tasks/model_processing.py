@@ -4,6 +4,7 @@ from datetime import datetime
 from typing import Any, Dict, List
 
 from bson import ObjectId
+from celery.exceptions import Retry
 
 from app.celery_app import celery_app
 from app.config import settings
@@ -17,8 +18,22 @@ from app.repositories.model_repo_config import ModelRepoConfigRepository
 from app.repositories.model_training_build import ModelTrainingBuildRepository
 from app.repositories.raw_build_run import RawBuildRunRepository
 from app.repositories.raw_repository import RawRepositoryRepository
-from app.tasks.base import PipelineTask, SafeTask, TaskState
-from app.tasks.shared import extract_features_for_build
+from app.tasks.base import (
+    MissingResourceError,
+    PermanentError,
+    PipelineTask,
+    SafeTask,
+    TaskState,
+)
+from app.tasks.pipeline.constants import ExtractionPhase
+from app.tasks.pipeline.utils.build_history_rollups import invalidate_lineage_rollups
+from app.tasks.pipeline.utils.feature_results import invalidate_feature_results
+from app.tasks.shared import (
+    build_processing_workflow,
+    extract_features_for_build,
+    extract_features_for_builds,
+    extract_temporal_features_for_build,
+)
 from app.tasks.shared.events import publish_build_status as publish_build_update
 from app.tasks.shared.events import publish_repo_status as publish_status
 
@@ -170,10 +185,10 @@ def dispatch_build_processing(
 
     Flow:
     1. Create ModelTrainingBuild for each raw_build_run (with PENDING status)
-    2. Dispatch process_workflow_run tasks in batches
+    2. Dispatch process_workflow_runs tasks (PROCESSING_BUILDS_PER_BATCH
+       builds each): sequentially, or in parallel followed by ordered
+       process_temporal_features tasks (two-phase)
     """
-    from celery import chain
-
     from app.entities.enums import ExtractionStatus
     from app.entities.model_repo_config import ModelImportStatus
     from app.repositories.model_repo_config import ModelRepoConfigRepository
@@ -280,7 +295,7 @@ def dispatch_build_processing(
         },
     )
 
-    # Step 2: Sequential processing using chain (oldest → newest)
+    # Step 2: Process builds oldest → newest
     # This ensures tr_prev_build is populated correctly for temporal features
     model_build_id_strs = [str(bid) for bid in model_build_ids]
     total_builds = len(model_build_id_strs)
@@ -294,25 +309,35 @@ def dispatch_build_processing(
         publish_status(repo_config_id, "processed", "No pending builds to process")
         return {"repo_config_id": repo_config_id, "dispatched": 0}
 
-    # Create sequential tasks - process builds one by one
-    sequential_tasks = [
-        process_workflow_run.si(
+    two_phase = settings.PROCESSING_TWO_PHASE_ENABLED
+    extraction_phase = ExtractionPhase.NON_TEMPORAL if two_phase else ExtractionPhase.ALL
+
+    batch_size = settings.PROCESSING_BUILDS_PER_BATCH
+    extraction_tasks = [
+        process_workflow_runs.si(
             repo_config_id=repo_config_id,
-            model_build_id=build_id,
-            is_reprocess=False,
+            model_build_ids=model_build_id_strs[i : i + batch_size],
             correlation_id=correlation_id,
+            phase=extraction_phase.value,
         )
-        for build_id in model_build_id_strs
+        for i in range(0, len(model_build_id_strs), batch_size)
     ]
+    temporal_tasks = (
+        _build_temporal_tasks(repo_config_id, model_build_id_strs, correlation_id)
+        if two_phase
+        else None
+    )
 
     logger.info(
-        f"{corr_prefix} Dispatching {total_builds} builds for sequential processing"
+        f"{corr_prefix} Dispatching {total_builds} builds for "
+        f"{'two-phase' if two_phase else 'sequential'} processing"
     )
 
-    # Chain: B1 → B2 → B3 → ... → finalize
-    # Each build processes after the previous one completes
-    workflow = chain(
-        *sequential_tasks,
+    # Sequential: B(1..k) → B(k+1..2k) → ... → finalize
+    # Two-phase:  [B(1..k) | B(k+1..2k) | ...] → temporal(B1..Bn, in order) → finalize
+    workflow = build_processing_workflow(
+        [extraction_tasks],
+        [temporal_tasks] if temporal_tasks is not None else None,
         finalize_model_processing.si(
             repo_config_id=repo_config_id,
             created_count=created_count,
@@ -331,7 +356,11 @@ def dispatch_build_processing(
     publish_status(
         repo_config_id,
         "processing",
-        f"Processing {total_builds} builds sequentially (oldest → newest)...",
+        (
+            f"Processing {total_builds} builds in parallel, then temporal features in order..."
+            if two_phase
+            else f"Processing {total_builds} builds sequentially (oldest → newest)..."
+        ),
     )
 
     return {
@@ -593,6 +622,47 @@ def finalize_prediction(
     }
 
 
+def _save_extraction_result(
+    model_build_repo: ModelTrainingBuildRepository,
+    repo_config_repo: ModelRepoConfigRepository,
+    repo_config_id: str,
+    build_id: str,
+    result: Dict[str, Any],
+    is_reprocess: bool,
+) -> Dict[str, Any]:
+    """Update a ModelTrainingBuild with its extraction result."""
+    updates = {"feature_vector_id": result.get("feature_vector_id")}
+
+    if result["status"] == "completed":
+        updates["extraction_status"] = ExtractionStatus.COMPLETED.value
+        updates["extracted_at"] = datetime.utcnow()
+    elif result["status"] == "partial":
+        updates["extraction_status"] = ExtractionStatus.PARTIAL.value
+        updates["extracted_at"] = datetime.utcnow()
+    else:
+        updates["extraction_status"] = ExtractionStatus.FAILED.value
+
+    if result.get("errors"):
+        updates["extraction_error"] = "; ".join(result["errors"])
+    elif result.get("warnings"):
+        updates["extraction_error"] = "Warning: " + "; ".join(result["warnings"])
+
+    model_build_repo.update_one(build_id, updates)
+
+    # Update stats
+    if not is_reprocess and updates["extraction_status"] == ExtractionStatus.FAILED.value:
+        repo_config_repo.increment_builds_processing_failed(ObjectId(repo_config_id))
+
+    publish_build_update(repo_config_id, build_id, updates["extraction_status"])
+
+    return {
+        "status": result["status"],
+        "build_id": build_id,
+        "feature_count": result.get("feature_count", 0),
+        "errors": result.get("errors", []),
+    }
+
+
 # Task 4: Process a single build
 @celery_app.task(
     bind=True,
@@ -609,10 +679,14 @@ def process_workflow_run(
     model_build_id: str,
     is_reprocess: bool = False,
     correlation_id: str = "",
+    phase: str = ExtractionPhase.ALL.value,
 ) -> Dict[str, Any]:
     """
     Process a single build for feature extraction.
 
+    With phase="non_temporal" (two-phase processing) temporal features are
+    left to process_temporal_features.
+
     Uses SafeTask.run_safe() for:
     - SoftTimeLimitExceeded → checkpoint + retry
     - Proper error handling and status updates
@@ -701,56 +775,306 @@ def process_workflow_run(
                 category=AuditLogCategory.MODEL_TRAINING,
                 model_repo_config_id=repo_config_id,
                 output_build_id=build_id,
+                phase=ExtractionPhase(phase),
             )
             state.meta["result"] = result
             state.phase = "DONE"
 
         # Update build status
         result = state.meta.get("result", {"status": "failed"})
-        updates = {"feature_vector_id": result.get("feature_vector_id")}
+        return _save_extraction_result(
+            model_build_repo, repo_config_repo, repo_config_id, build_id, result, is_reprocess
+        )
 
-        if result["status"] == "completed":
-            updates["extraction_status"] = ExtractionStatus.COMPLETED.value
-            updates["extracted_at"] = datetime.utcnow()
-        elif result["status"] == "partial":
-            updates["extraction_status"] = ExtractionStatus.PARTIAL.value
-            updates["extracted_at"] = datetime.utcnow()
-        else:
-            updates["extraction_status"] = ExtractionStatus.FAILED.value
+    try:
+        return self.run_safe(
+            job_id=f"{repo_config_id}:{model_build_id}",
+            work=_work,
+            mark_failed_fn=_mark_failed,
+            cleanup_fn=None,  # No cleanup needed - DB updates are idempotent
+            fail_on_unknown=False,  # Treat unknown errors as transient for retry
+        )
+    except Retry:
+        raise
+    except Exception as e:
+        if phase != ExtractionPhase.NON_TEMPORAL.value:
+            raise
+        # Header of the two-phase chord (retries exhausted): a raise would keep the
+        # temporal pass and finalize from running for every other build
+        logger.error(f"{corr_prefix} Extraction failed for build {build_id}: {e}")
+        # run_safe already marked permanent errors (mark_missing_fn is not set)
+        if not isinstance(e, PermanentError) or isinstance(e, MissingResourceError):
+            _mark_failed(e)
+        return {"status": "failed", "build_id": build_id, "errors": [str(e)]}
 
-        if result.get("errors"):
-            updates["extraction_error"] = "; ".join(result["errors"])
-        elif result.get("warnings"):
-            updates["extraction_error"] = "Warning: " + "; ".join(result["warnings"])
 
-        model_build_repo.update_one(build_id, updates)
+@celery_app.task(
+    bind=True,
+    base=SafeTask,
+    name="app.tasks.model_processing.process_workflow_runs",
+    queue="model_processing",
+    soft_time_limit=1800,
+    time_limit=1900,
+    max_retries=3,
+)
+def process_workflow_runs(
+    self: SafeTask,
+    repo_config_id: str,
+    model_build_ids: List[str],
+    correlation_id: str = "",
+    phase: str = ExtractionPhase.ALL.value,
+) -> Dict[str, Any]:
+    """
+    Process a chunk of builds (oldest first) for feature extraction.
 
-        # Update stats
-        if (
-            not is_reprocess
-            and updates["extraction_status"] == ExtractionStatus.FAILED.value
-        ):
-            repo_config_repo.increment_builds_processing_failed(
-                ObjectId(repo_config_id)
+    Like process_workflow_run for each build, but the chunk shares one
+    pipeline and GitHub client, and commit/repo scoped features are
+    computed once (extract_features_for_builds). A retry re-extracts the
+    builds the interrupted attempt left IN_PROGRESS.
+    """
+    corr_prefix = f"[corr={correlation_id[:8]}]" if correlation_id else ""
+
+    model_build_repo = ModelTrainingBuildRepository(self.db)
+    repo_config_repo = ModelRepoConfigRepository(self.db)
+    raw_build_run_repo = RawBuildRunRepository(self.db)
+    raw_repo_repo = RawRepositoryRepository(self.db)
+
+    repo_config = repo_config_repo.find_by_id(repo_config_id)
+    if not repo_config:
+        return {"status": "error", "message": "Repository Config not found"}
+
+    raw_repo = raw_repo_repo.find_by_id(repo_config.raw_repo_id)
+    if not raw_repo:
+        return {"status": "error", "message": "RawRepository not found"}
+
+    statuses = [ExtractionStatus.PENDING.value]
+    if self.request.retries:
+        statuses.append(ExtractionStatus.IN_PROGRESS.value)
+    pending = {
+        str(build.id): build
+        for build in model_build_repo.find_many(
+            {
+                "_id": {"$in": [ObjectId(bid) for bid in model_build_ids]},
+                "extraction_status": {"$in": statuses},
+            }
+        )
+    }
+    run_map = {
+        str(run.id): run
+        for run in raw_build_run_repo.find_by_ids(
+            [build.raw_build_run_id for build in pending.values()]
+        )
+    }
+
+    build_ids: List[str] = []
+    raw_build_runs = []
+    for build_id in model_build_ids:
+        model_build = pending.get(build_id)
+        if not model_build:
+            continue
+        raw_build_run = run_map.get(str(model_build.raw_build_run_id))
+        if not raw_build_run:
+            model_build_repo.update_one(
+                build_id,
+                {
+                    "extraction_status": ExtractionStatus.FAILED.value,
+                    "extraction_error": "RawBuildRun not found",
+                },
             )
+            continue
+        build_ids.append(build_id)
+        raw_build_runs.append(raw_build_run)
 
-        publish_build_update(repo_config_id, build_id, updates["extraction_status"])
+    if not build_ids:
+        return {"status": "skipped", "message": "No pending builds"}
 
+    def _mark_failed(exc: Exception) -> None:
+        """Mark the chunk's unfinished builds as FAILED and update stats."""
+        for build_id in build_ids:
+            updated = model_build_repo.collection.update_one(
+                {
+                    "_id": ObjectId(build_id),
+                    "extraction_status": ExtractionStatus.IN_PROGRESS.value,
+                },
+                {
+                    "$set": {
+                        "extraction_status": ExtractionStatus.FAILED.value,
+                        "extraction_error": str(exc),
+                    }
+                },
+            )
+            if updated.modified_count:
+                repo_config_repo.increment_builds_processing_failed(
+                    ObjectId(repo_config_id)
+                )
+                publish_build_update(repo_config_id, build_id, "failed")
+
+    def _work(state: TaskState) -> Dict[str, Any]:
+        """Feature extraction work function."""
+        for build_id in build_ids:
+            model_build_repo.update_one(
+                build_id, {"extraction_status": ExtractionStatus.IN_PROGRESS.value}
+            )
+            publish_build_update(repo_config_id, build_id, ExtractionStatus.IN_PROGRESS.value)
+
+        template = DatasetTemplateRepository(self.db).find_by_name("Risk Prediction")
+        feature_names = template.feature_names if template else []
+
+        results = extract_features_for_builds(
+            db=self.db,
+            raw_repo=raw_repo,
+            feature_config=repo_config.feature_configs,
+            raw_build_runs=raw_build_runs,
+            selected_features=feature_names,
+            category=AuditLogCategory.MODEL_TRAINING,
+            model_repo_config_id=repo_config_id,
+            output_build_ids=build_ids,
+            phase=ExtractionPhase(phase),
+        )
+        statuses = [
+            _save_extraction_result(
+                model_build_repo, repo_config_repo, repo_config_id, build_id, result, False
+            )["status"]
+            for build_id, result in zip(build_ids, results, strict=True)
+        ]
         return {
-            "status": result["status"],
-            "build_id": build_id,
-            "feature_count": result.get("feature_count", 0),
-            "errors": result.get("errors", []),
+            "status": "completed",
+            "processed": len(build_ids),
+            "failed": statuses.count("failed"),
         }
 
-    return self.run_safe(
-        job_id=f"{repo_config_id}:{model_build_id}",
-        work=_work,
-        mark_failed_fn=_mark_failed,
-        cleanup_fn=None,  # No cleanup needed - DB updates are idempotent
-        fail_on_unknown=False,  # Treat unknown errors as transient for retry
+    try:
+        return self.run_safe(
+            job_id=f"{repo_config_id}:{build_ids[0]}",
+            work=_work,
+            mark_failed_fn=_mark_failed,
+            cleanup_fn=None,  # No cleanup needed - DB updates are idempotent
+            fail_on_unknown=False,  # Treat unknown errors as transient for retry
+        )
+    except Retry:
+        raise
+    except Exception as e:
+        if phase != ExtractionPhase.NON_TEMPORAL.value:
+            raise
+        # Header of the two-phase chord (retries exhausted): a raise would keep the
+        # temporal pass and finalize from running for every other build
+        logger.error(f"{corr_prefix} Extraction failed for {len(build_ids)} builds: {e}")
+        # run_safe already marked permanent errors (mark_missing_fn is not set)
+        if not isinstance(e, PermanentError) or isinstance(e, MissingResourceError):
+            _mark_failed(e)
+        return {"status": "failed", "processed": len(build_ids), "errors": [str(e)]}
+
+
+def _build_temporal_tasks(
+    repo_config_id: str,
+    model_build_ids: List[str],
+    correlation_id: str = "",
+) -> List[Any]:
+    """Ordered process_temporal_features signatures covering model_build_ids."""
+    chunk_size = settings.PROCESSING_TEMPORAL_BUILDS_PER_TASK
+    return [
+        process_temporal_features.si(
+            repo_config_id=repo_config_id,
+            model_build_ids=model_build_ids[i : i + chunk_size],
+            correlation_id=correlation_id,
+        )
+        for i in range(0, len(model_build_ids), chunk_size)
+    ]
+
+
+@celery_app.task(
+    bind=True,
+    base=PipelineTask,
+    name="app.tasks.model_processing.process_temporal_features",
+    queue="model_processing",
+    soft_time_limit=1800,
+    time_limit=1900,
+)
+def process_temporal_features(
+    self: PipelineTask,
+    repo_config_id: str,
+    model_build_ids: List[str],
+    correlation_id: str = "",
+) -> Dict[str, Any]:
+    """
+    Second pass of two-phase processing: add temporal features in build order.
+
+    Runs after process_workflow_runs(phase="non_temporal") finished for all
+    builds. Temporal features only read stored data, so a whole chunk of
+    builds is handled by one task. A failure only marks that build PARTIAL.
+    """
+    corr_prefix = f"[corr={correlation_id[:8]}]" if correlation_id else ""
+
+    model_build_repo = ModelTrainingBuildRepository(self.db)
+    repo_config_repo = ModelRepoConfigRepository(self.db)
+    raw_build_run_repo = RawBuildRunRepository(self.db)
+    raw_repo_repo = RawRepositoryRepository(self.db)
+
+    repo_config = repo_config_repo.find_by_id(repo_config_id)
+    if not repo_config:
+        return {"status": "error", "message": "Repository Config not found"}
+
+    raw_repo = raw_repo_repo.find_by_id(repo_config.raw_repo_id)
+    if not raw_repo:
+        return {"status": "error", "message": "RawRepository not found"}
+
+    template = DatasetTemplateRepository(self.db).find_by_name("Risk Prediction")
+    feature_names = template.feature_names if template else []
+
+    completed = failed = skipped = 0
+    for model_build_id in model_build_ids:
+        model_build = model_build_repo.find_by_id(model_build_id)
+        if not model_build or model_build.extraction_status not in (
+            ExtractionStatus.COMPLETED,
+            ExtractionStatus.PARTIAL,
+        ):
+            skipped += 1
+            continue
+
+        raw_build_run = raw_build_run_repo.find_by_id(model_build.raw_build_run_id)
+        if not raw_build_run:
+            skipped += 1
+            continue
+
+        result = extract_temporal_features_for_build(
+            db=self.db,
+            raw_repo=raw_repo,
+            feature_config=repo_config.feature_configs,
+            raw_build_run=raw_build_run,
+            selected_features=feature_names,
+            category=AuditLogCategory.MODEL_TRAINING,
+            model_repo_config_id=repo_config_id,
+            output_build_id=model_build_id,
+        )
+
+        if result["status"] == "completed":
+            completed += 1
+        elif result["status"] == "skipped":
+            skipped += 1
+        else:
+            failed += 1
+            model_build_repo.update_one(
+                model_build_id,
+                {
+                    "extraction_status": ExtractionStatus.PARTIAL.value,
+                    "extraction_error": "Temporal features failed: "
+                    + "; ".join(result.get("errors", [])),
+                },
+            )
+            publish_build_update(repo_config_id, model_build_id, ExtractionStatus.PARTIAL.value)
+
+    logger.info(
+        f"{corr_prefix} Temporal features for {len(model_build_ids)} builds: "
+        f"{completed} completed, {failed} failed, {skipped} skipped"
     )
 
+    return {
+        "repo_config_id": repo_config_id,
+        "completed": completed,
+        "failed": failed,
+        "skipped": skipped,
+    }
+
 
 @celery_app.task(
     bind=True,
@@ -844,6 +1168,9 @@ def retry_failed_builds(self: PipelineTask, repo_config_id: str) -> Dict[str, An
             extraction_build_ids.append(str(build.id))
         except Exception as e:
             logger.warning(f"{corr_prefix} Failed to reset build {build.id}: {e}")
+    # Stored results of a failed run may hold fallback values; re-extract them
+    invalidate_feature_results(self.db, [b.raw_build_run_id for b in extraction_failed_builds])
+    invalidate_lineage_rollups(self.db, [b.raw_repo_id for b in extraction_failed_builds])
 
     # === PROCESS GROUP 2: Reset prediction only ===
     prediction_only_ids = []
@@ -11,7 +11,7 @@ from app.tasks.pipeline.feature_dag._metadata import (
 )
 
 # Hamilton pipeline
-from app.tasks.pipeline.hamilton_runner import HamiltonPipeline
+from app.tasks.pipeline.hamilton_runner import BuildExecution, HamiltonPipeline
 
 # Input preparation
 from app.tasks.pipeline.input_preparer import (
@@ -22,6 +22,7 @@ from app.tasks.pipeline.input_preparer import (
 __all__ = [
     "OutputFormat",
     "format_features_for_storage",
+    "BuildExecution",
     "HamiltonPipeline",
     "PreparedPipelineInput",
     "prepare_pipeline_input",
@@ -1,3 +1,5 @@
+from enum import Enum
+
 from app.tasks.pipeline.feature_dag.extractors import (
     build,
     ci,
@@ -9,6 +11,20 @@ from app.tasks.pipeline.feature_dag.extractors import (
 
 DEFAULT_FEATURES = {"build_id", "repo_full_name", "build_ci_provider"}
 
+
+class ExtractionPhase(str, Enum):
+    """
+    Which part of the DAG a pipeline execution computes.
+
+    Temporal features read results stored for earlier builds (FeatureVectors),
+    so they need those builds to be extracted first. Everything else can be
+    extracted for all builds in parallel, followed by an ordered TEMPORAL pass.
+    """
+
+    ALL = "all"  # Every requested feature (single sequential pass)
+    NON_TEMPORAL = "non_temporal"  # Features not reading earlier builds' results
+    TEMPORAL = "temporal"  # Only features reading earlier builds' results
+
 HAMILTON_MODULES = [
     build,
     ci,
@@ -9,9 +9,18 @@ Usage:
     driver = Driver(..., adapters=[tracker])
     result = driver.execute(...)
     execution_info = tracker.get_results()
+
+Hooks may be called from several threads at once when nodes run on a thread
+pool (parallel_executor.py); tracker state is guarded by a lock.
+
+While a node runs, git/docker subprocesses and GitHub requests are attributed
+to it (app/core/call_accounting.py) and reported in
+NodeExecutionInfo.external_calls, along with the number of warnings/errors
+it logged (NodeExecutionInfo.logged_errors).
 """
 
 import logging
+import threading
 import time
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
@@ -20,6 +29,8 @@ from typing import Any, Dict, List, Optional
 from hamilton.graph import node
 from hamilton.lifecycle import base
 
+from app.core import call_accounting
+
 logger = logging.getLogger(__name__)
 
 
@@ -36,6 +47,10 @@ class NodeExecutionInfo:
     skipped: bool = False
     result: Any = None
     resources_used: List[str] = field(default_factory=list)
+    # "kind:command" -> {count, duration_ms, output_bytes}
+    external_calls: Dict[str, Dict[str, float]] = field(default_factory=dict)
+    # Warnings/errors logged by the node (e.g. an error it caught and turned into None)
+    logged_errors: int = 0
 
 
 @dataclass
@@ -52,6 +67,22 @@ class ExecutionResult:
     node_results: List[NodeExecutionInfo] = field(default_factory=list)
     errors: List[str] = field(default_factory=list)
 
+    @property
+    def external_calls(self) -> Dict[str, Dict[str, float]]:
+        """External calls of all nodes, keyed by "kind:command"."""
+        totals: Dict[str, Dict[str, float]] = {}
+        for node_info in self.node_results:
+            for key, stats in node_info.external_calls.items():
+                total = totals.setdefault(
+                    key, {"count": 0, "duration_ms": 0.0, "output_bytes": 0}
+                )
+                for name, value in stats.items():
+                    total[name] += value
+        return {
+            key: {**stats, "duration_ms": round(stats["duration_ms"], 2)}
+            for key, stats in sorted(totals.items())
+        }
+
 
 class ExecutionTracker(base.BasePreNodeExecute, base.BasePostNodeExecute):
     """
@@ -66,6 +97,8 @@ class ExecutionTracker(base.BasePreNodeExecute, base.BasePostNodeExecute):
 
     def __init__(self):
         """Initialize tracker with empty state."""
+        call_accounting.install_node_log_handler()
+        self._lock = threading.Lock()
         self._node_timings: Dict[str, Dict[str, Any]] = {}
         self._node_results: List[NodeExecutionInfo] = []
         self._errors: List[str] = []
@@ -74,11 +107,12 @@ class ExecutionTracker(base.BasePreNodeExecute, base.BasePostNodeExecute):
 
     def reset(self) -> None:
         """Reset tracker state for reuse."""
-        self._node_timings = {}
-        self._node_results = []
-        self._errors = []
-        self._started_at = None
-        self._completed_at = None
+        with self._lock:
+            self._node_timings = {}
+            self._node_results = []
+            self._errors = []
+            self._started_at = None
+            self._completed_at = None
 
     def pre_node_execute(
         self,
@@ -91,7 +125,8 @@ class ExecutionTracker(base.BasePreNodeExecute, base.BasePostNodeExecute):
         """
         Called before each node execution.
 
-        Records start time for the node.
+        Records start time for the node and makes it the node external
+        calls are attributed to.
 
         Args:
             run_id: Unique run identifier
@@ -100,14 +135,19 @@ class ExecutionTracker(base.BasePreNodeExecute, base.BasePostNodeExecute):
             task_id: Optional task identifier
         """
         node_name = node_.name
+        started_at = datetime.now(timezone.utc)
+        call_scope, call_token = call_accounting.enter_node(node_name)
 
-        if self._started_at is None:
-            self._started_at = datetime.now(timezone.utc)
+        with self._lock:
+            if self._started_at is None:
+                self._started_at = started_at
 
-        self._node_timings[node_name] = {
-            "start_time": time.perf_counter(),
-            "started_at": datetime.now(timezone.utc),
-        }
+            self._node_timings[node_name] = {
+                "start_time": time.perf_counter(),
+                "started_at": started_at,
+                "call_scope": call_scope,
+                "call_token": call_token,
+            }
 
     def post_node_execute(
         self,
@@ -135,10 +175,13 @@ class ExecutionTracker(base.BasePreNodeExecute, base.BasePostNodeExecute):
             task_id: Optional task identifier
         """
         node_name = node_.name
-        timing = self._node_timings.get(node_name, {})
+        with self._lock:
+            timing = self._node_timings.get(node_name, {})
         start_time = timing.get("start_time", time.perf_counter())
         started_at = timing.get("started_at", datetime.now(timezone.utc))
         completed_at = datetime.now(timezone.utc)
+        call_accounting.exit_node(timing.get("call_token"))
+        call_scope = timing.get("call_scope")
 
         duration_ms = (time.perf_counter() - start_time) * 1000
 
@@ -159,17 +202,21 @@ class ExecutionTracker(base.BasePreNodeExecute, base.BasePostNodeExecute):
             skipped=False,
             result=result if success else None,
             resources_used=resources_used,
+            external_calls=call_scope.as_dict() if call_scope else {},
+            logged_errors=call_scope.logged_errors if call_scope else 0,
         )
 
-        self._node_results.append(node_info)
+        with self._lock:
+            self._node_results.append(node_info)
+            if error:
+                self._errors.append(f"{node_name}: {error}")
+            # Nodes may finish out of order when run in parallel
+            if self._completed_at is None or completed_at > self._completed_at:
+                self._completed_at = completed_at
 
         if error:
-            error_msg = f"{node_name}: {error}"
-            self._errors.append(error_msg)
             logger.warning(f"Node {node_name} failed: {error}")
 
-        self._completed_at = completed_at
-
     def get_results(self) -> ExecutionResult:
         """
         Get execution results summary.
@@ -177,22 +224,28 @@ class ExecutionTracker(base.BasePreNodeExecute, base.BasePostNodeExecute):
         Returns:
             ExecutionResult with timing and status info for all nodes.
         """
-        nodes_succeeded = sum(1 for n in self._node_results if n.success)
-        nodes_failed = sum(1 for n in self._node_results if not n.success)
-        nodes_skipped = sum(1 for n in self._node_results if n.skipped)
+        with self._lock:
+            node_results = self._node_results.copy()
+            errors = self._errors.copy()
+            started_at = self._started_at
+            completed_at = self._completed_at
+
+        nodes_succeeded = sum(1 for n in node_results if n.success)
+        nodes_failed = sum(1 for n in node_results if not n.success)
+        nodes_skipped = sum(1 for n in node_results if n.skipped)
 
         duration_ms = 0.0
-        if self._started_at and self._completed_at:
-            duration_ms = (self._completed_at - self._started_at).total_seconds() * 1000
+        if started_at and completed_at:
+            duration_ms = (completed_at - started_at).total_seconds() * 1000
 
         return ExecutionResult(
-            started_at=self._started_at,
-            completed_at=self._completed_at,
+            started_at=started_at,
+            completed_at=completed_at,
             duration_ms=duration_ms,
-            nodes_executed=len(self._node_results),
+            nodes_executed=len(node_results),
             nodes_succeeded=nodes_succeeded,
             nodes_failed=nodes_failed,
             nodes_skipped=nodes_skipped,
-            node_results=self._node_results.copy(),
-            errors=self._errors.copy(),
+            node_results=node_results,
+            errors=errors,
         )
@@ -15,9 +15,11 @@ from typing import Any, Dict, List, Optional, TypedDict
 from bson import ObjectId
 from pymongo.collection import Collection
 
+from app.core import call_accounting
 from app.entities.raw_build_run import RawBuildRun
 from app.entities.raw_repository import RawRepository
 from app.services.github.github_client import GitHubClient
+from app.tasks.pipeline.utils.ci_logs import list_job_logs
 
 
 # MongoDB Collection Types
@@ -97,6 +99,7 @@ class FeatureVectorDocument(TypedDict, total=False):
     raw_repo_id: ObjectId
     raw_build_run_id: ObjectId
     dag_version: str
+    node_versions: Dict[str, int]
     computed_at: Optional[datetime]
     tr_prev_build: Optional[str]
     extraction_status: str
@@ -111,6 +114,63 @@ class FeatureVectorDocument(TypedDict, total=False):
 FeatureVectorsCollection = Collection[FeatureVectorDocument]
 
 
+class CommitChangeStatsDocument(TypedDict, total=False):
+    """
+    TypedDict representing a commit_change_stats MongoDB document.
+
+    Per-commit documents hold parents and per-parent file changes; range
+    documents (sha = "<base>..<head>") hold test case counts per language
+    strategy. See utils/commit_change_stats.py.
+    """
+
+    _id: ObjectId
+    raw_repo_id: ObjectId
+    sha: str
+    parser_version: int
+    parents: List[str]
+    diffs: List[List[Dict[str, Any]]]
+    base_sha: str
+    head_sha: str
+    test_cases: Dict[str, List[int]]
+    created_at: Optional[datetime]
+
+
+# Type alias for commit_change_stats collection
+CommitChangeStatsCollection = Collection[CommitChangeStatsDocument]
+
+
+class BuildHistoryRollupDocument(TypedDict, total=False):
+    """
+    TypedDict representing a build_history_rollups MongoDB document.
+
+    `repo_state` documents hold the running counters of a repo, `build`
+    documents the counters right before one build, `lineage` documents the
+    outcomes along a build's commit lineage. See
+    utils/build_history_rollups.py.
+    """
+
+    _id: ObjectId
+    raw_repo_id: ObjectId
+    kind: str
+    key: str
+    version: int
+    total_builds: int
+    author_clusters: int
+    project: Dict[str, Any]
+    author: Dict[str, Any]
+    clusters: List[Dict[str, Any]]
+    prev_conclusion: Optional[str]
+    prev_author: Optional[str]
+    prev_completed_at: Optional[datetime]
+    failed: List[bool]
+    src_churn: List[Optional[float]]
+    created_at: Optional[datetime]
+
+
+# Type alias for build_history_rollups collection
+BuildHistoryRollupsCollection = Collection[BuildHistoryRollupDocument]
+
+
 @dataclass
 class GitHistoryInput:
     """Git history access - bare repo for commit operations (no worktree)."""
@@ -300,7 +360,7 @@ class BuildRunInput:
             commit_author=build_run.commit_author,
             conclusion=conclusion_str,
             created_at=build_run.created_at,
-            completed_at=build_run.completed_at,
+            completed_at=build_run.run_completed_at,
             duration_seconds=build_run.duration_seconds,
             raw_data=build_run.raw_data or {},
             ci_provider=build_run.provider.value,
@@ -325,14 +385,14 @@ class BuildLogsInput:
     """Build job logs from CI provider."""
 
     logs_dir: Optional[Path]  # Directory containing log files
-    log_files: List[str]  # List of log file paths
+    log_files: List[str]  # List of log file paths (.log or .log.gz)
     is_available: bool  # Whether logs were downloaded successfully
 
     @classmethod
     def from_path(cls, logs_dir: Optional[Path]) -> BuildLogsInput:
         """Create from logs directory path."""
         if logs_dir and logs_dir.exists():
-            log_files = [str(f) for f in logs_dir.glob("*.log")]
+            log_files = [str(f) for f in list_job_logs(logs_dir)]
             return cls(
                 logs_dir=logs_dir,
                 log_files=log_files,
@@ -380,7 +440,8 @@ def build_hamilton_inputs(
         HamiltonInputs containing all input objects
     """
     import logging
-    import subprocess
+
+    from app.tasks.pipeline.utils.git_object_reader import object_exists
 
     logger = logging.getLogger(__name__)
 
@@ -396,15 +457,19 @@ def build_hamilton_inputs(
     else:
         # Check commit availability using effective_sha
         try:
-            subprocess.run(
-                ["git", "cat-file", "-e", effective_sha],
-                cwd=str(repo_path),
-                check=True,
-                capture_output=True,
-                timeout=10,
+            is_commit_available = object_exists(repo_path, effective_sha)
+        except Exception as e:
+            logger.debug(f"Object reader failed for {effective_sha[:8]}: {e}")
+            is_commit_available = (
+                call_accounting.run(
+                    ["git", "cat-file", "-e", effective_sha],
+                    cwd=str(repo_path),
+                    capture_output=True,
+                    timeout=10,
+                ).returncode
+                == 0
             )
-            is_commit_available = True
-        except subprocess.CalledProcessError:
+        if not is_commit_available:
             logger.warning(f"Commit {effective_sha[:8]} not found in repo {raw_repo.full_name}")
 
     # Check worktree availability - try effective_sha first, then original_sha
@@ -2,8 +2,12 @@
 Feature metadata decorators for Hamilton DAG.
 """
 
+import hashlib
+import json
+import threading
 from enum import Enum
-from typing import Any, Callable, Dict, List, Optional, Set, TypeVar
+from types import MappingProxyType
+from typing import Any, Callable, Dict, FrozenSet, List, Mapping, Optional, Set, TypeVar
 
 F = TypeVar("F", bound=Callable)
 
@@ -48,6 +52,14 @@ class OutputFormat(str, Enum):
     PIPE_SEPARATED = "pipe"  # "a|b|c"
 
 
+class NodeScope(str, Enum):
+    """How widely a node's value can be shared between builds of a batch."""
+
+    BUILD = "build"  # Depends on the build itself (default)
+    COMMIT = "commit"  # Same for every build of a repo at one commit SHA
+    REPO = "repo"  # Same for every build of a repo (given the feature config)
+
+
 # =============================================================================
 # HELPER FUNCTIONS
 # =============================================================================
@@ -86,6 +98,42 @@ def build_metadata_registry(modules: list) -> Dict[str, Dict[str, Any]]:
     return registry
 
 
+_frozen_registry: Optional[Mapping[str, Mapping[str, Any]]] = None
+_feature_resources: Optional[Mapping[str, FrozenSet[str]]] = None
+_registry_lock = threading.Lock()
+
+
+def get_metadata_registry() -> Mapping[str, Mapping[str, Any]]:
+    """
+    Read-only feature metadata registry, built once per process.
+
+    FEATURE_REGISTRY is static for the lifetime of a worker, so hot paths
+    (resource filtering, per-build setup) share one frozen copy instead of
+    calling build_metadata_registry() repeatedly.
+    """
+    global _frozen_registry, _feature_resources
+    if _frozen_registry is None:
+        with _registry_lock:
+            if _frozen_registry is None:
+                registry = build_metadata_registry([])
+                _feature_resources = MappingProxyType(
+                    {
+                        name: frozenset(meta.get("required_resources", []))
+                        for name, meta in registry.items()
+                    }
+                )
+                _frozen_registry = MappingProxyType(
+                    {name: MappingProxyType(meta) for name, meta in registry.items()}
+                )
+    return _frozen_registry
+
+
+def get_feature_resource_map() -> Mapping[str, FrozenSet[str]]:
+    """Precomputed feature name -> required resource names."""
+    get_metadata_registry()
+    return _feature_resources
+
+
 def get_required_resources_for_features(
     feature_names: Set[str],
     modules: Optional[list] = None,
@@ -98,20 +146,13 @@ def get_required_resources_for_features(
 
     Args:
         feature_names: Set of feature names to check
-        modules: Optional list of Hamilton modules. If not provided,
-                 lazy-loads HAMILTON_MODULES from constants to avoid
-                 circular imports.
+        modules: Ignored, kept for compatibility (resources come from the
+                 frozen FEATURE_REGISTRY map)
 
     Returns:
         Set of resource names required (e.g., {"git_history", "github_api"})
     """
-    # Lazy load to avoid circular import
-    if modules is None:
-        from app.tasks.pipeline.constants import HAMILTON_MODULES
-
-        modules = HAMILTON_MODULES
-
-    registry = build_metadata_registry(modules)
+    resource_map = get_feature_resource_map()
     resources: Set[str] = set()
 
     # Include default features that are always extracted
@@ -121,8 +162,8 @@ def get_required_resources_for_features(
     features = feature_names | DEFAULT_FEATURES
 
     for name in features:
-        if name in registry:
-            feature_resources = registry[name].get("required_resources", [])
+        feature_resources = resource_map.get(name)
+        if feature_resources:
             resources.update(feature_resources)
 
     return resources
@@ -361,3 +402,193 @@ def collect_config_requirements(
                         all_fields[field_name] = req.copy()
 
     return all_fields
+
+
+# =============================================================================
+# Node Scope Decorator
+# =============================================================================
+
+
+def node_scope(scope: NodeScope) -> Callable[[F], F]:
+    """
+    Decorator to mark a node whose value is shared by several builds.
+
+    HamiltonPipeline.execute_many() computes COMMIT/REPO scoped nodes once
+    per group of builds and passes them to the other builds as overrides.
+    Applies to every field of an @extract_fields function. Only mark nodes
+    whose value is fully determined by the scope (repo, SHA, feature config).
+
+    Example:
+        @tag(group="repo")
+        @node_scope(NodeScope.COMMIT)
+        def repo_total_commits(git_history: GitHistoryInput) -> Optional[int]:
+            ...
+    """
+
+    def decorator(func: F) -> F:
+        func._node_scope = scope
+        return func
+
+    return decorator
+
+
+def get_node_scopes(modules: Optional[list] = None) -> Dict[str, NodeScope]:
+    """
+    Map node names to their scope, for nodes that are not build-scoped.
+
+    Args:
+        modules: Optional list of Hamilton modules (defaults to HAMILTON_MODULES)
+
+    Returns:
+        Dict of node name -> NodeScope, including @extract_fields field names
+    """
+    if modules is None:
+        from app.tasks.pipeline.constants import HAMILTON_MODULES
+
+        modules = HAMILTON_MODULES
+
+    scopes: Dict[str, NodeScope] = {}
+    for module in modules:
+        for name in dir(module):
+            if name.startswith("_"):
+                continue
+            obj = getattr(module, name)
+            scope = getattr(obj, "_node_scope", None)
+            if not callable(obj) or scope is None or scope == NodeScope.BUILD:
+                continue
+
+            scopes[name] = scope
+            for t in getattr(obj, "transform", []):
+                if hasattr(t, "fields") and isinstance(t.fields, dict):
+                    for field_name in t.fields.keys():
+                        scopes[field_name] = scope
+
+    return scopes
+
+
+# =============================================================================
+# Node Version Decorator
+# =============================================================================
+
+# Version of every node without @node_version
+DEFAULT_NODE_VERSION = 1
+
+# Version of the code shared by many nodes (parsers, git helpers, indexes);
+# bump when a change there alters feature values. Every stored feature vector
+# and feature result is then stale and recomputed in full.
+RESULTS_VERSION = 1
+
+# dag_version of vectors extracted while every node had the default version
+DEFAULT_DAG_VERSION = f"{RESULTS_VERSION}.0"
+
+
+def node_version(version: int) -> Callable[[F], F]:
+    """
+    Decorator to version the code of a node.
+
+    Bump the version whenever a change alters the node's values (including
+    changes in helpers it calls). FeatureVectors record the versions they
+    were computed with; the refresh job (app/tasks/feature_refresh.py)
+    recomputes only changed nodes and their downstream features, and
+    feature results stored for other scopes are no longer reused.
+    Applies to every field of an @extract_fields function.
+
+    Example:
+        @extract_fields({...})
+        @tag(group="build_log")
+        @node_version(2)
+        def test_log_features(build_logs: BuildLogsInput, ...) -> Dict[str, Any]:
+            ...
+    """
+
+    def decorator(func: F) -> F:
+        func._node_version = version
+        return func
+
+    return decorator
+
+
+_node_versions: Optional[Mapping[str, int]] = None
+_node_versions_lock = threading.Lock()
+
+
+def get_node_versions(modules: Optional[list] = None) -> Mapping[str, int]:
+    """
+    Map node names to their version, for nodes not at DEFAULT_NODE_VERSION.
+
+    Args:
+        modules: Optional list of Hamilton modules (defaults to HAMILTON_MODULES,
+                 whose result is computed once per process)
+
+    Returns:
+        Read-only dict of node name -> version, including @extract_fields
+        field names
+    """
+    global _node_versions
+    if modules is None and _node_versions is not None:
+        return _node_versions
+
+    use_defaults = modules is None
+    if modules is None:
+        from app.tasks.pipeline.constants import HAMILTON_MODULES
+
+        modules = HAMILTON_MODULES
+
+    versions: Dict[str, int] = {}
+    for module in modules:
+        for name in dir(module):
+            if name.startswith("_"):
+                continue
+            obj = getattr(module, name)
+            version = getattr(obj, "_node_version", DEFAULT_NODE_VERSION)
+            if not callable(obj) or version == DEFAULT_NODE_VERSION:
+                continue
+
+            versions[name] = version
+            for t in getattr(obj, "transform", []):
+                if hasattr(t, "fields") and isinstance(t.fields, dict):
+                    for field_name in t.fields.keys():
+                        versions[field_name] = version
+
+    frozen = MappingProxyType(versions)
+    if use_defaults:
+        with _node_versions_lock:
+            _node_versions = frozen
+    return frozen
+
+
+def get_dag_version(node_versions: Optional[Mapping[str, int]] = None) -> str:
+    """
+    Fingerprint of the node versions, stored as FeatureVector.dag_version.
+
+    DEFAULT_DAG_VERSION while no node was versioned, so vectors extracted
+    before versioning was introduced stay current. The part before the
+    first "." is the RESULTS_VERSION (see get_results_version()).
+    """
+    if node_versions is None:
+        node_versions = get_node_versions()
+    if not node_versions:
+        return DEFAULT_DAG_VERSION
+    payload = json.dumps(dict(node_versions), sort_keys=True)
+    return f"{DEFAULT_DAG_VERSION}+{hashlib.sha1(payload.encode()).hexdigest()[:12]}"
+
+
+def get_results_version(dag_version: Optional[str]) -> int:
+    """RESULTS_VERSION a FeatureVector.dag_version was computed with (0 if unknown)."""
+    try:
+        return int((dag_version or "").split(".", 1)[0])
+    except ValueError:
+        return 0
+
+
+def get_changed_nodes(
+    recorded: Mapping[str, int], current: Optional[Mapping[str, int]] = None
+) -> Set[str]:
+    """Nodes whose version differs between recorded and current node versions."""
+    if current is None:
+        current = get_node_versions()
+    return {
+        name
+        for name in set(recorded) | set(current)
+        if recorded.get(name, DEFAULT_NODE_VERSION) != current.get(name, DEFAULT_NODE_VERSION)
+    }
@@ -8,6 +8,7 @@ This module provides utilities for:
 
 from .diff_analyzer import (
     _count_test_cases,
+    _count_test_cases_in_lines,
     _is_doc_file,
     _is_source_file,
     _is_test_file,
@@ -16,6 +17,7 @@ from .diff_analyzer import (
     _strip_c_comments,
     _strip_comments,
     _strip_shell_comments,
+    _test_case_strategy_key,
     analyze_diff,
 )
 
@@ -25,9 +27,11 @@ __all__ = [
     "_is_source_file",
     "_is_doc_file",
     "_count_test_cases",
+    "_count_test_cases_in_lines",
     "_matches_test_definition",
     "_matches_assertion",
     "_strip_comments",
     "_strip_shell_comments",
     "_strip_c_comments",
+    "_test_case_strategy_key",
 ]
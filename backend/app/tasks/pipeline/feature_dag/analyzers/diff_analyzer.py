@@ -2,7 +2,7 @@
 
 from __future__ import annotations
 
-from typing import Dict, List, Tuple
+from typing import Dict, Iterable, List, Tuple
 
 from app.tasks.pipeline.feature_dag.languages import LanguageRegistry
 
@@ -76,6 +76,43 @@ def _count_test_cases(patch: str | None, language: str | None) -> Tuple[int, int
     return added, deleted
 
 
+def _test_case_strategy_key(language: str | None) -> str:
+    """Cache key of the strategy used to count test cases for a language."""
+    return LanguageRegistry.get_strategy((language or "").lower()).cache_key
+
+
+def _count_test_cases_in_lines(
+    lines: Iterable[str], languages: List[str]
+) -> Dict[str, Tuple[int, int]]:
+    """
+    Count added/deleted test definitions for several languages in one pass.
+
+    Consumes the patch lazily so it never has to be held in memory.
+
+    Returns:
+        Dict mapping strategy cache key -> (added, deleted)
+    """
+    strategies = {}
+    for lang in languages:
+        strategy = LanguageRegistry.get_strategy((lang or "").lower())
+        strategies[strategy.cache_key] = strategy
+    if not strategies:
+        return {}
+    counts = {key: [0, 0] for key in strategies}
+
+    for line in lines:
+        if line.startswith("+"):
+            index = 0
+        elif line.startswith("-"):
+            index = 1
+        else:
+            continue
+        for key, strategy in strategies.items():
+            if strategy.matches_test_definition(strategy.strip_comments(line[1:])):
+                counts[key][index] += 1
+    return {key: tuple(pair) for key, pair in counts.items()}
+
+
 def _matches_test_definition(line: str, language: str) -> bool:
     strategy = LanguageRegistry.get_strategy(language)
     return strategy.matches_test_definition(line)
@@ -17,7 +17,7 @@ from app.tasks.pipeline.feature_dag._inputs import (
     GitHubClientInput,
     RepoInput,
 )
-from app.tasks.pipeline.feature_dag._metadata import requires_config
+from app.tasks.pipeline.feature_dag._metadata import NodeScope, node_scope, requires_config
 
 logger = logging.getLogger(__name__)
 
@@ -168,18 +168,21 @@ def build_hour_risk(build_hour: int) -> float:
 
 
 @tag(group="repo")
+@node_scope(NodeScope.REPO)
 def repo_full_name(repo: RepoInput) -> str:
     """Full repository name (owner/repo)."""
     return repo.full_name
 
 
 @tag(group="repo")
+@node_scope(NodeScope.REPO)
 def repo_language(repo: RepoInput) -> Optional[str]:
     """Primary programming language."""
     return repo.main_lang.lower() if repo.main_lang else None
 
 
 @tag(group="repo")
+@node_scope(NodeScope.REPO)
 @requires_config(
     source_languages={
         "type": "list",
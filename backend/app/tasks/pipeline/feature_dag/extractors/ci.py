@@ -12,17 +12,25 @@ Extracts test results and DevOps file metrics from CI build logs:
 import logging
 import re
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Set, Tuple
+from typing import Any, Dict, List, Optional, Set
 
 from hamilton.function_modifiers import extract_fields, tag
 
 from app.tasks.pipeline.feature_dag._inputs import (
     BuildLogsInput,
+    CommitChangeStatsCollection,
     FeatureConfigInput,
     GitHistoryInput,
+    RepoInput,
 )
-from app.tasks.pipeline.feature_dag._metadata import requires_config
+from app.tasks.pipeline.feature_dag._metadata import node_version, requires_config
 from app.tasks.pipeline.feature_dag.log_parsers.registry import TestLogParser
+from app.tasks.pipeline.utils.ci_logs import job_id_from_path, read_job_log
+from app.tasks.pipeline.utils.commit_change_stats import (
+    get_commit_changes,
+    get_devops_files,
+    save_devops_files,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -91,26 +99,14 @@ def test_log_features(
             if not log_path.exists():
                 continue
 
-            content = log_path.read_text(errors="replace")
-
-            # Try parsing with each language hint until we get a match
-            parsed = None
-            if language_hints:
-                for lang_hint in language_hints:
-                    parsed = parser.parse(
-                        content,
-                        language_hint=lang_hint,
-                        allowed_frameworks=allowed_frameworks or None,
-                    )
-                    if parsed.framework:
-                        break
-
-            if not parsed or not parsed.framework:
-                parsed = parser.parse(
-                    content,
-                    language_hint=None,
-                    allowed_frameworks=allowed_frameworks or None,
-                )
+            content = read_job_log(log_path)
+
+            # One pass over the log for all language hints (falls back to no hint)
+            parsed = parser.scan(
+                content,
+                language_hints=language_hints,
+                allowed_frameworks=allowed_frameworks or None,
+            )
 
             if parsed.framework:
                 frameworks.add(parsed.framework)
@@ -168,7 +164,7 @@ def log_jobs_count(build_logs: BuildLogsInput) -> int:
     """
     Get number of job log files.
 
-    Returns the count of .log files in the logs directory.
+    Returns the count of job log files in the logs directory.
     """
     if not build_logs.is_available:
         return 0
@@ -180,7 +176,7 @@ def log_job_ids(build_logs: BuildLogsInput) -> str:
     """
     Get job IDs from the build logs.
 
-    Extracts job IDs from log file names (e.g., '223085.log' -> '223085').
+    Extracts job IDs from log file names (e.g., '223085.log.gz' -> '223085').
     Each ID corresponds to a specific job in the CI build run.
     Returns comma-separated string of job IDs.
     """
@@ -190,8 +186,8 @@ def log_job_ids(build_logs: BuildLogsInput) -> str:
     job_ids = []
     for log_path_str in build_logs.log_files:
         log_path = Path(log_path_str)
-        # Extract job ID from file name (remove .log extension)
-        job_id = log_path.stem
+        # Extract job ID from file name (remove .log / .log.gz extension)
+        job_id = job_id_from_path(log_path)
         if job_id:
             job_ids.append(job_id)
 
@@ -325,6 +321,10 @@ DEVOPS_KEYWORDS = [
     ".github/workflows",
 ]
 
+# Key of the DevOps classification stored in commit_change_stats; bump the
+# version when the patterns above or below change
+DEVOPS_CLASSIFIER_KEY = "v1"
+
 # Patterns to exclude (false positives)
 EXCLUDE_PATTERNS = [
     r"recipes/.*/\.meta\.yml",
@@ -435,8 +435,11 @@ def _get_devops_tool(filepath: str) -> Optional[str]:
     }
 )
 @tag(group="devops")
+@node_version(2)
 def devops_file_features(
     git_history: GitHistoryInput,
+    repo: RepoInput,
+    commit_change_stats: CommitChangeStatsCollection,
     git_built_commits: List[str],
 ) -> Dict[str, Any]:
     """
@@ -463,71 +466,44 @@ def devops_file_features(
 
     # Determine diff range
     commits_to_analyze = git_built_commits or [git_history.effective_sha]
+    commit_changes = get_commit_changes(
+        repo_path, commits_to_analyze, repo.id, commit_change_stats
+    )
+
+    # Root and merge commits have no single-parent diff to attribute
+    records = [
+        record
+        for record in (commit_changes.get(sha) for sha in commits_to_analyze)
+        if record is not None and not record.is_root and not record.is_merge
+    ]
+    classified = get_devops_files(
+        commit_change_stats, repo.id, (r.sha for r in records), DEVOPS_CLASSIFIER_KEY
+    )
+    computed = {
+        record.sha: {
+            change.path: _get_devops_tool(change.path)
+            for change in record.files
+            if _is_devops_file(change.path)
+        }
+        for record in records
+        if record.sha not in classified
+    }
+    save_devops_files(commit_change_stats, repo.id, computed, DEVOPS_CLASSIFIER_KEY)
+    classified.update(computed)
 
-    for commit_sha in commits_to_analyze:
-        try:
-            # Get files changed in this commit with their stats
-            files_changed, change_sizes = _get_commit_file_changes(
-                repo_path, commit_sha
-            )
-
-            for filepath, change_size in zip(files_changed, change_sizes, strict=False):
-                if _is_devops_file(filepath):
-                    devops_files.add(filepath)
-                    total_change_size += change_size
-
-                    tool = _get_devops_tool(filepath)
-                    if tool:
-                        devops_tools.add(tool)
+    for record in records:
+        commit_devops_files = classified[record.sha]
+        for change in record.files:
+            if change.path in commit_devops_files:
+                devops_files.add(change.path)
+                total_change_size += change.churn
 
-        except Exception as e:
-            logger.warning(f"Failed to analyze commit {commit_sha[:8]}: {e}")
+                tool = commit_devops_files[change.path]
+                if tool:
+                    devops_tools.add(tool)
 
     return {
         "devops_files_changed": len(devops_files),
         "devops_lines_changed": total_change_size,
         "devops_tools_detected": sorted(devops_tools),
     }
-
-
-def _get_commit_file_changes(
-    repo_path: Path, commit_sha: str
-) -> Tuple[List[str], List[int]]:
-    """Get files changed in a commit with their line change counts."""
-    import subprocess
-
-    try:
-        result = subprocess.run(
-            ["git", "diff-tree", "--no-commit-id", "--numstat", "-r", commit_sha],
-            cwd=str(repo_path),
-            capture_output=True,
-            text=True,
-            check=True,
-            timeout=30,
-        )
-
-        files = []
-        sizes = []
-
-        for line in result.stdout.strip().split("\n"):
-            if not line:
-                continue
-
-            parts = line.split("\t")
-            if len(parts) >= 3:
-                added, deleted, filepath = parts[0], parts[1], parts[2]
-                files.append(filepath)
-
-                # Handle binary files (marked with '-')
-                try:
-                    change_size = int(added) + int(deleted)
-                except ValueError:
-                    change_size = 0
-
-                sizes.append(change_size)
-
-        return files, sizes
-
-    except Exception as e:
-        logger.warning(f"Failed to get commit file changes: {e}")
-        return [], []
@@ -13,25 +13,35 @@ import re
 import subprocess
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Set
+from typing import Any, Dict, List, Optional, Set, Tuple
 
 from bson.objectid import ObjectId
 from hamilton.function_modifiers import extract_fields, tag
 
+from app.core import call_accounting
 from app.tasks.pipeline.feature_dag._inputs import (
     BuildRunInput,
+    CommitChangeStatsCollection,
     FeatureConfigInput,
     GitHistoryInput,
     RawBuildRunsCollection,
     RepoInput,
 )
-from app.tasks.pipeline.feature_dag._metadata import requires_config
+from app.tasks.pipeline.feature_dag._metadata import node_version, requires_config
 from app.tasks.pipeline.feature_dag.analyzers import (
-    _count_test_cases,
+    _count_test_cases_in_lines,
     _is_doc_file,
     _is_source_file,
     _is_test_file,
+    _test_case_strategy_key,
 )
+from app.tasks.pipeline.utils.commit_change_stats import (
+    get_commit_changes,
+    get_test_case_counts,
+    save_test_case_counts,
+)
+from app.tasks.pipeline.utils.commit_changes import iter_patch_lines
+from app.tasks.pipeline.utils.file_history import get_file_history_index
 from app.tasks.pipeline.utils.git_utils import (
     get_author_name,
     get_commit_info,
@@ -39,6 +49,8 @@ from app.tasks.pipeline.utils.git_utils import (
     get_committed_date,
     get_committer_name,
     get_diff_files,
+    get_file_revision_count,
+    get_reachable_commits,
     git_log_files,
     iter_commit_history,
 )
@@ -98,35 +110,34 @@ def git_commit_info(
     # Ensure strict temporal ordering (must be older than current build)
     current_created_at = build_run.created_at
 
+    # Collect the linear section of history first (stops at the first merge),
+    # then resolve which of those commits were built with a single query.
+    candidates: List[Dict[str, Any]] = []
     first = True
     for commit_info in iter_commit_history(repo_path, effective_sha, max_count=1000):
-        hexsha = commit_info["hexsha"]
-        parents = commit_info["parents"]
-
         if first:
-            if len(parents) > 1:
+            if len(commit_info["parents"]) > 1:
                 status = "merge_found"
                 break
             first = False
             continue
 
-        last_commit_sha = hexsha
-
-        # Check if this commit has a build in DB
-        # Use effective_sha since it's always populated (equals commit_sha for non-fork, synthetic_sha for fork)
-        # Must be strictly older than current build to avoid future leaks or self-reference
-        query = {"effective_sha": hexsha, "raw_repo_id": ObjectId(repo.id)}
+        candidates.append(commit_info)
+        if len(commit_info["parents"]) > 1:
+            break
 
-        # Add temporal filter if we have a valid timestamp
-        if current_created_at:
-            query["created_at"] = {"$lt": current_created_at}
+    builds_by_sha = _find_latest_builds_by_sha(
+        raw_build_runs,
+        repo.id,
+        [c["hexsha"] for c in candidates],
+        current_created_at,
+    )
 
-        # Sort by created_at DESC to get the most recent valid build
-        existing_build = raw_build_runs.find_one(
-            query,
-            sort=[("created_at", -1)],
-        )
+    for commit_info in candidates:
+        hexsha = commit_info["hexsha"]
+        last_commit_sha = hexsha
 
+        existing_build = builds_by_sha.get(hexsha)
         if existing_build:
             status = "build_found"
             prev_build_id = existing_build.get("ci_run_id")
@@ -134,7 +145,7 @@ def git_commit_info(
 
         commits_hex.append(hexsha)
 
-        if len(parents) > 1:
+        if len(commit_info["parents"]) > 1:
             status = "merge_found"
             break
 
@@ -147,6 +158,43 @@ def git_commit_info(
     }
 
 
+def _find_latest_builds_by_sha(
+    raw_build_runs: RawBuildRunsCollection,
+    repo_id: str,
+    shas: List[str],
+    created_before: Optional[datetime],
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Find the most recent earlier build for each commit SHA in one query.
+
+    Uses effective_sha since it's always populated (equals commit_sha for
+    non-fork, synthetic_sha for fork). Builds must be strictly older than the
+    current build to avoid future leaks or self-reference.
+
+    Returns:
+        Dict mapping effective_sha -> latest matching raw_build_runs document
+    """
+    if not shas:
+        return {}
+
+    query: Dict[str, Any] = {
+        "effective_sha": {"$in": shas},
+        "raw_repo_id": ObjectId(repo_id),
+    }
+    if created_before:
+        query["created_at"] = {"$lt": created_before}
+
+    builds: Dict[str, Dict[str, Any]] = {}
+    cursor = raw_build_runs.find(
+        query,
+        {"effective_sha": 1, "ci_run_id": 1, "created_at": 1},
+    ).sort("created_at", -1)
+    for doc in cursor:
+        # Sorted newest first: keep the first (most recent) build per SHA
+        builds.setdefault(doc.get("effective_sha"), doc)
+    return builds
+
+
 @extract_fields(
     {
         "git_diff_src_churn": int,
@@ -162,8 +210,11 @@ def git_commit_info(
     }
 )
 @tag(group="git")
+@node_version(2)
 def git_diff_features(
     git_history: GitHistoryInput,
+    repo: RepoInput,
+    commit_change_stats: CommitChangeStatsCollection,
     repo_languages_all: List[str],
     git_built_commits: List[str],
     git_prev_commit_sha: Optional[str],
@@ -179,82 +230,51 @@ def git_diff_features(
 
     stats = _empty_diff_result()
 
-    # Cumulative changes across all built commits
+    # Cumulative changes across all built commits (one diff-tree for all of them)
+    commit_changes = get_commit_changes(
+        repo_path, git_built_commits, repo.id, commit_change_stats
+    )
     for sha in git_built_commits:
-        parent = _get_parent_commit(repo_path, sha)
-        if not parent:
-            continue
-
-        # File status changes
-        try:
-            name_status_out = _run_git(
-                repo_path, ["diff", "--name-status", parent, sha]
-            )
-            for line in name_status_out.splitlines():
-                parts = line.split("\t")
-                if len(parts) < 2:
-                    continue
-
-                status_code = parts[0][0]
-                path = parts[-1]
-
-                if status_code == "A":
-                    stats["git_diff_files_added"] += 1
-                elif status_code == "D":
-                    stats["git_diff_files_deleted"] += 1
-                elif status_code == "M":
-                    stats["git_diff_files_modified"] += 1
-
-                is_test = any(_is_test_file(path, lang) for lang in languages)
-
-                if _is_doc_file(path):
-                    stats["git_diff_doc_files"] += 1
-                elif _is_source_file(path) or is_test:
-                    stats["git_diff_src_files"] += 1
-                else:
-                    stats["git_diff_other_files"] += 1
-        except Exception:
+        record = commit_changes.get(sha)
+        if record is None or record.is_root:
             continue
 
-        # Line churn
-        try:
-            numstat_out = _run_git(repo_path, ["diff", "--numstat", parent, sha])
-            for line in numstat_out.splitlines():
-                parts = line.split("\t")
-                if len(parts) < 3:
-                    continue
-
-                try:
-                    added = int(parts[0]) if parts[0] != "-" else 0
-                    deleted = int(parts[1]) if parts[1] != "-" else 0
-                except ValueError:
-                    continue
-
-                path = parts[2]
-                churn = added + deleted
-
-                is_test = any(_is_test_file(path, lang) for lang in languages)
-
-                if _is_source_file(path):
-                    stats["git_diff_src_churn"] += churn
-                elif is_test:
-                    stats["git_diff_test_churn"] += churn
-        except Exception:
-            continue
+        for change in record.files:
+            if change.status == "A":
+                stats["git_diff_files_added"] += 1
+            elif change.status == "D":
+                stats["git_diff_files_deleted"] += 1
+            elif change.status == "M":
+                stats["git_diff_files_modified"] += 1
+
+            path = change.path
+            is_test = any(_is_test_file(path, lang) for lang in languages)
+            is_source = _is_source_file(path)
+
+            if _is_doc_file(path):
+                stats["git_diff_doc_files"] += 1
+            elif is_source or is_test:
+                stats["git_diff_src_files"] += 1
+            else:
+                stats["git_diff_other_files"] += 1
+
+            # Line churn
+            if is_source:
+                stats["git_diff_src_churn"] += change.churn
+            elif is_test:
+                stats["git_diff_test_churn"] += change.churn
 
     # Test case diff (prev built commit vs current)
     if git_prev_commit_sha and effective_sha:
         try:
-            patch_out = _run_git(
-                repo_path, ["diff", git_prev_commit_sha, effective_sha]
+            total_added, total_deleted = _count_range_test_cases(
+                repo_path,
+                repo.id,
+                commit_change_stats,
+                git_prev_commit_sha,
+                effective_sha,
+                languages,
             )
-            total_added = 0
-            total_deleted = 0
-            for lang in languages:
-                added, deleted = _count_test_cases(patch_out, lang)
-                total_added += added
-                total_deleted += deleted
-
             stats["git_diff_tests_added"] = total_added
             stats["git_diff_tests_deleted"] = total_deleted
         except Exception:
@@ -263,6 +283,38 @@ def git_diff_features(
     return stats
 
 
+def _count_range_test_cases(
+    repo_path: Path,
+    repo_id: str,
+    commit_change_stats: CommitChangeStatsCollection,
+    base: str,
+    head: str,
+    languages: List[str],
+) -> Tuple[int, int]:
+    """
+    Count added/deleted test cases in the patch base..head for all languages.
+
+    Counts are stored per language strategy, so the patch is only streamed
+    for strategies that have not been counted for this range before.
+    """
+    strategy_keys = [_test_case_strategy_key(lang) for lang in languages]
+    counts = get_test_case_counts(commit_change_stats, repo_id, base, head)
+
+    pending = [
+        lang for lang, key in zip(languages, strategy_keys, strict=True) if key not in counts
+    ]
+    if pending:
+        computed = _count_test_cases_in_lines(
+            iter_patch_lines(repo_path, base, head), pending
+        )
+        counts.update(computed)
+        save_test_case_counts(commit_change_stats, repo_id, base, head, computed)
+
+    total_added = sum(counts[key][0] for key in strategy_keys)
+    total_deleted = sum(counts[key][1] for key in strategy_keys)
+    return total_added, total_deleted
+
+
 def _empty_diff_result() -> Dict[str, int]:
     return {
         "git_diff_src_churn": 0,
@@ -278,26 +330,6 @@ def _empty_diff_result() -> Dict[str, int]:
     }
 
 
-def _get_parent_commit(cwd: Path, sha: str) -> Optional[str]:
-    """Get parent commit SHA."""
-    try:
-        return _run_git(cwd, ["rev-parse", f"{sha}^"])
-    except subprocess.CalledProcessError:
-        return None
-
-
-def _run_git(cwd: Path, args: list) -> str:
-    """Run git command and return output."""
-    result = subprocess.run(
-        ["git"] + args,
-        cwd=str(cwd),
-        capture_output=True,
-        text=True,
-        check=True,
-    )
-    return result.stdout.strip()
-
-
 LOOKBACK_DAYS = 90
 CHUNK_SIZE = 50
 
@@ -316,6 +348,7 @@ MAX_COMMITS_FOR_HEAVY_OPS = 50  # Skip heavy features for large builds
         "default": 90,
     }
 )
+@node_version(2)
 def git_file_commit_density(
     git_history: GitHistoryInput,
     build_run: BuildRunInput,
@@ -364,12 +397,9 @@ def git_file_commit_density(
     if not files_touched:
         return 0
 
-    # Limit files to process for performance
-    paths = list(files_touched)[:MAX_FILES_TO_PROCESS]
-    if len(files_touched) > MAX_FILES_TO_PROCESS:
-        logger.info(
-            f"Limiting file count from {len(files_touched)} to {MAX_FILES_TO_PROCESS}"
-        )
+    # Answered from the file history index when available (no file limit needed);
+    # the git fallback issues one git log per CHUNK_SIZE files
+    paths = sorted(files_touched)
 
     start_iso = start_date.isoformat()
     trigger_sha = git_built_commits[0] if git_built_commits else effective_sha
@@ -386,27 +416,32 @@ def git_file_commit_density(
 
 
 @tag(group="team")
-def team_size(
+def team_core_members(
     git_history: GitHistoryInput,
     build_run: BuildRunInput,
     raw_build_runs: RawBuildRunsCollection,
     repo: RepoInput,
-) -> int:
-    """Number of unique contributors in last 90 days."""
+) -> Set[str]:
+    """
+    Core team in the 90 days before the build: direct committers and PR mergers.
+
+    Shared by team_size and team_is_core_member so the git log and the
+    workflow run query are issued once per build.
+    """
     if not git_history.is_commit_available:
-        return 0
+        return set()
 
     repo_path = git_history.path
     effective_sha = git_history.effective_sha
 
     if not effective_sha:
-        return 0
+        return set()
 
     commit_info = get_commit_info(repo_path, effective_sha)
     committed_date = commit_info.get("committed_date")
 
     if not committed_date:
-        return 0
+        return set()
 
     ref_date = build_run.created_at
     if not ref_date:
@@ -422,20 +457,22 @@ def team_size(
     # Get PR mergers from workflow runs
     merger_logins = _get_pr_mergers(raw_build_runs, repo.id, start_date, ref_date)
 
-    core_team = committer_names | merger_logins
-    return len(core_team)
+    return committer_names | merger_logins
+
+
+@tag(group="team")
+def team_size(team_core_members: Set[str]) -> int:
+    """Number of unique contributors in last 90 days."""
+    return len(team_core_members)
 
 
 @tag(group="team")
 def team_is_core_member(
     git_history: GitHistoryInput,
-    team_size: int,
-    build_run: BuildRunInput,
-    raw_build_runs: RawBuildRunsCollection,
-    repo: RepoInput,
+    team_core_members: Set[str],
 ) -> bool:
     """Whether build author is a core team member."""
-    if not git_history.is_commit_available or team_size == 0:
+    if not git_history.is_commit_available or not team_core_members:
         return False
 
     repo_path = git_history.path
@@ -444,32 +481,13 @@ def team_is_core_member(
     if not effective_sha:
         return False
 
-    commit_info = get_commit_info(repo_path, effective_sha)
-    committed_date = commit_info.get("committed_date")
-
-    if not committed_date:
-        return False
-
-    ref_date = build_run.created_at
-    if not ref_date:
-        ref_date = datetime.fromtimestamp(committed_date, tz=timezone.utc)
-    if ref_date.tzinfo is None:
-        ref_date = ref_date.replace(tzinfo=timezone.utc)
-
-    start_date = ref_date - timedelta(days=LOOKBACK_DAYS)
-
-    # Get core team
-    committer_names = _get_direct_committers(repo_path, start_date, ref_date)
-    merger_logins = _get_pr_mergers(raw_build_runs, repo.id, start_date, ref_date)
-    core_team = committer_names | merger_logins
-
     # Check if build author is in core team
     author_name = get_author_name(repo_path, effective_sha)
     committer_name = get_committer_name(repo_path, effective_sha)
 
-    if author_name and author_name in core_team:
+    if author_name and author_name in team_core_members:
         return True
-    if committer_name and committer_name in core_team:
+    if committer_name and committer_name in team_core_members:
         return True
 
     return False
@@ -491,7 +509,7 @@ def _get_direct_committers(
             f"--until={end_date.isoformat()}",
             "--format=%H|%an|%s",
         ]
-        result = subprocess.run(
+        result = call_accounting.run(
             cmd, cwd=str(repo_path), capture_output=True, text=True, check=True
         )
         output = result.stdout.strip()
@@ -569,6 +587,7 @@ def team_distinct_authors(
 
 
 @tag(group="team")
+@node_version(2)
 def team_total_revisions(
     git_history: GitHistoryInput,
     git_built_commits: List[str],
@@ -580,7 +599,8 @@ def team_total_revisions(
     - For each file, count revisions BEFORE that specific commit
     - No deduplication: if a file appears in multiple commits, count it multiple times
 
-    Performance: Skips for large builds (>50 commits) and limits files processed.
+    Performance: Without a file history index (one git log per file), skips large
+    builds (>50 commits) and limits files processed.
     """
     if not git_history.is_commit_available:
         return 0
@@ -588,20 +608,28 @@ def team_total_revisions(
     if not git_built_commits:
         return 0
 
+    repo_path = git_history.path
+    indexed = get_file_history_index(repo_path) is not None
+
     # Skip for large builds to prevent timeout
-    if len(git_built_commits) > MAX_COMMITS_FOR_HEAVY_OPS:
+    if not indexed and len(git_built_commits) > MAX_COMMITS_FOR_HEAVY_OPS:
         logger.info(
             f"Skipping team_total_revisions for large build "
             f"({len(git_built_commits)} commits > {MAX_COMMITS_FOR_HEAVY_OPS})"
         )
         return 0
 
-    repo_path = git_history.path
     total_revisions = 0
     files_processed = 0
 
+    # Ancestors of the build; commits of the build are excluded as we go so each
+    # commit only counts revisions that precede it
+    reachable = get_reachable_commits(repo_path, git_built_commits[0]) if indexed else None
+    build_commits: Set[str] = set()
+
     # Process each commit separately (no file deduplication across commits)
     for sha in git_built_commits:
+        build_commits.add(sha)
         parents = get_commit_parents(repo_path, sha)
         if not parents:
             continue
@@ -612,7 +640,7 @@ def team_total_revisions(
         # For each file in this commit, count revisions before THIS commit
         for f in diff_files:
             # Check file limit
-            if files_processed >= MAX_FILES_TO_PROCESS:
+            if not indexed and files_processed >= MAX_FILES_TO_PROCESS:
                 logger.info(
                     f"Reached MAX_FILES_TO_PROCESS limit ({MAX_FILES_TO_PROCESS})"
                 )
@@ -621,44 +649,10 @@ def team_total_revisions(
             # Use b_path (destination path) as primary, fallback to a_path
             filepath = f.get("b_path") or f.get("a_path")
             if filepath:
-                revision_count = _count_file_revisions(repo_path, filepath, sha)
+                revision_count = get_file_revision_count(
+                    repo_path, filepath, sha, reachable=reachable, exclude=build_commits
+                )
                 total_revisions += revision_count
                 files_processed += 1
 
     return total_revisions
-
-
-def _count_file_revisions(repo_path: Path, filepath: str, before_sha: str) -> int:
-    """
-    Count how many commits modified this file before the given commit.
-
-    Args:
-        repo_path: Path to repository
-        filepath: File path to check
-        before_sha: Count revisions before this commit
-
-    Returns:
-        Number of prior commits that touched this file
-    """
-    import subprocess
-
-    try:
-        # Get commits that modified this file, excluding and before the given SHA
-        result = subprocess.run(
-            ["git", "log", "--oneline", "--follow", f"{before_sha}^", "--", filepath],
-            cwd=str(repo_path),
-            capture_output=True,
-            text=True,
-            timeout=30,
-        )
-
-        if result.returncode != 0:
-            return 0
-
-        # Count non-empty lines
-        lines = [line for line in result.stdout.strip().split("\n") if line.strip()]
-        return len(lines)
-
-    except Exception as e:
-        logger.debug(f"Failed to count revisions for {filepath}: {e}")
-        return 0
@@ -11,19 +11,41 @@ import collections
 import logging
 import math
 from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
 
 from hamilton.function_modifiers import extract_fields, tag
 
 from app.tasks.pipeline.feature_dag._inputs import (
+    BuildHistoryRollupsCollection,
     BuildRunInput,
+    CommitChangeStatsCollection,
     FeatureVectorsCollection,
     GitHistoryInput,
     RawBuildRunsCollection,
     RepoInput,
 )
+from app.tasks.pipeline.feature_dag._metadata import node_version
+from app.tasks.pipeline.utils.author_timeline import get_author_timeline
+from app.tasks.pipeline.utils.build_history_rollups import (
+    LineageRollup,
+    get_lineage_rollup,
+    save_lineage_rollup,
+)
+from app.tasks.pipeline.utils.commit_change_stats import get_commit_changes
+from app.tasks.pipeline.utils.file_history import (
+    datetime_to_ts,
+    get_file_history_index,
+    ownership_ratio,
+)
 from app.tasks.pipeline.utils.git_utils import (
+    get_author_email,
+    get_author_first_commit_ts,
+    get_author_name,
+    get_committed_date,
     get_files_in_commit,
+    get_reachable_commits,
+    is_ancestor,
     run_git,
 )
 
@@ -31,6 +53,8 @@ logger = logging.getLogger(__name__)
 
 # Performance limits
 MAX_FILES_TO_PROCESS = 100  # Limit files analyzed per feature
+MAX_LINEAGE_DEPTH = 20  # Builds followed back along the commit lineage
+MAX_ANCESTRY_CHECKS = 10  # Timeline candidates checked before falling back to git log
 
 
 def _calculate_shannon_entropy(file_changes: List[int]) -> float:
@@ -50,6 +74,102 @@ def _calculate_shannon_entropy(file_changes: List[int]) -> float:
     return entropy
 
 
+def _lineage_entry(
+    raw_build_runs: RawBuildRunsCollection,
+    feature_vectors: FeatureVectorsCollection,
+    repo_oid: Any,
+    ci_run_id: str,
+) -> Optional[Tuple[Optional[bool], Optional[float], Optional[str], bool]]:
+    """
+    Outcome of one build of the lineage.
+
+    Returns:
+        (failed, src_churn, prev_build_id, final), or None if the build is
+        unknown; failed is None when the build has no conclusion, and final
+        is whether it has a conclusion and completed features
+    """
+    build_doc = raw_build_runs.find_one(
+        {"raw_repo_id": repo_oid, "ci_run_id": ci_run_id},
+        {"_id": 1, "conclusion": 1},
+    )
+    if not build_doc:
+        return None
+
+    failed = None
+    conclusion = build_doc.get("conclusion")
+    if conclusion:
+        if hasattr(conclusion, "value"):
+            conclusion = conclusion.value
+        failed = str(conclusion).lower() == "failure"
+
+    feature_doc = feature_vectors.find_one(
+        {"raw_repo_id": repo_oid, "raw_build_run_id": build_doc.get("_id")}
+    )
+    if not feature_doc:
+        return failed, None, None, False
+
+    features = feature_doc.get("features", {})
+    # Use dedicated history_prev_build_id field (or fallback to features dict)
+    prev_build_id = feature_doc.get("history_prev_build_id") or features.get(
+        "history_prev_build_id"
+    )
+    completed = feature_doc.get("extraction_status") == "completed"
+    src_churn = features.get("git_diff_src_churn") if completed else None
+    return failed, src_churn, prev_build_id, completed and failed is not None
+
+
+def _get_lineage(
+    raw_build_runs: RawBuildRunsCollection,
+    feature_vectors: FeatureVectorsCollection,
+    build_history_rollups: BuildHistoryRollupsCollection,
+    repo_id: str,
+    ci_run_id: str,
+) -> Optional[LineageRollup]:
+    """
+    Outcomes along the commit lineage ending at ci_run_id (most recent first).
+
+    Walks back through history_prev_build_id links until a build whose
+    lineage is cached in build_history_rollups. The lineage of ci_run_id is
+    cached once every build on it is final (conclusion and completed
+    features), so a later retry of a failed build is not masked.
+    """
+    from bson import ObjectId
+
+    repo_oid = ObjectId(repo_id)
+    lineage = LineageRollup()
+    all_final = True
+    current_build_id: Optional[str] = ci_run_id
+
+    while current_build_id and len(lineage.failed) < MAX_LINEAGE_DEPTH:
+        cached = get_lineage_rollup(build_history_rollups, repo_id, current_build_id)
+        if cached:
+            if current_build_id == ci_run_id:
+                return cached
+            lineage.failed.extend(cached.failed)
+            lineage.src_churn.extend(cached.src_churn)
+            break
+
+        entry = _lineage_entry(raw_build_runs, feature_vectors, repo_oid, current_build_id)
+        if entry is None:
+            # May be ingested later
+            all_final = False
+            break
+        failed, src_churn, prev_build_id, final = entry
+        all_final = all_final and final
+        lineage.failed.append(failed)
+        lineage.src_churn.append(src_churn)
+        current_build_id = prev_build_id
+
+    if not lineage.failed:
+        return None
+
+    lineage.failed = lineage.failed[:MAX_LINEAGE_DEPTH]
+    lineage.src_churn = lineage.src_churn[:MAX_LINEAGE_DEPTH]
+    if all_final:
+        save_lineage_rollup(build_history_rollups, repo_id, ci_run_id, lineage)
+    return lineage
+
+
 @extract_fields(
     {
         "history_prev_failed": Optional[bool],
@@ -62,6 +182,7 @@ def _calculate_shannon_entropy(file_changes: List[int]) -> float:
 def prev_build_history_features(
     raw_build_runs: RawBuildRunsCollection,
     feature_vectors: FeatureVectorsCollection,
+    build_history_rollups: BuildHistoryRollupsCollection,
     repo: RepoInput,
     history_prev_build_id: Optional[str],
 ) -> Dict[str, Any]:
@@ -76,8 +197,6 @@ def prev_build_history_features(
     - history_fail_rate_10: Failure rate in last 10 builds (by commit chain)
     - history_avg_churn_5: Average git_diff_src_churn from last 5 builds (by commit chain)
     """
-    from bson import ObjectId
-
     result = {
         "history_prev_failed": None,
         "history_fail_streak": 0,
@@ -89,110 +208,35 @@ def prev_build_history_features(
         return result
 
     try:
-        # Walk backward through build chain using history_prev_build_id links
-        prev_builds = []
-        current_build_id = history_prev_build_id
-        max_lookback = 20
-
-        while current_build_id and len(prev_builds) < max_lookback:
-            build_doc = raw_build_runs.find_one(
-                {
-                    "raw_repo_id": ObjectId(repo.id),
-                    "ci_run_id": current_build_id,
-                }
-            )
-
-            if not build_doc:
-                break
-
-            prev_builds.append(build_doc)
-
-            # Get next previous build from feature_vectors (which has history_prev_build_id)
-            feature_doc = feature_vectors.find_one(
-                {
-                    "raw_repo_id": ObjectId(repo.id),
-                    "raw_build_run_id": build_doc.get("_id"),
-                }
-            )
-
-            # Use dedicated history_prev_build_id field (or fallback to features dict)
-            if feature_doc:
-                next_build_id = feature_doc.get(
-                    "history_prev_build_id"
-                ) or feature_doc.get("features", {}).get("history_prev_build_id")
-                if next_build_id:
-                    current_build_id = next_build_id
-                else:
-                    break
-            else:
-                break
-
-        if not prev_builds:
+        lineage = _get_lineage(
+            raw_build_runs,
+            feature_vectors,
+            build_history_rollups,
+            repo.id,
+            history_prev_build_id,
+        )
+        if not lineage:
             return result
 
         # 1. history_prev_failed - check last build's conclusion
-        last_build = prev_builds[0]
-        last_conclusion = last_build.get("conclusion")
-        if last_conclusion:
-            if hasattr(last_conclusion, "value"):
-                last_conclusion = last_conclusion.value
-            result["history_prev_failed"] = str(last_conclusion).lower() == "failure"
+        result["history_prev_failed"] = lineage.failed[0]
 
         # 2. history_fail_streak - count consecutive failures
         streak = 0
-        for b in prev_builds:
-            conclusion = b.get("conclusion")
-            if conclusion:
-                if hasattr(conclusion, "value"):
-                    conclusion = conclusion.value
-                if str(conclusion).lower() == "failure":
-                    streak += 1
-                else:
-                    break
-            else:
+        for failed in lineage.failed:
+            if not failed:
                 break
+            streak += 1
         result["history_fail_streak"] = streak
 
         # 3. history_fail_rate_10 - failure rate in last 10 builds
-        last_10 = prev_builds[:10]
-        if last_10:
-            fail_count = 0
-            for b in last_10:
-                conclusion = b.get("conclusion")
-                if conclusion:
-                    if hasattr(conclusion, "value"):
-                        conclusion = conclusion.value
-                    if str(conclusion).lower() == "failure":
-                        fail_count += 1
-            result["history_fail_rate_10"] = round(fail_count / len(last_10), 4)
-
-        # 4. history_avg_churn_5 - average src churn from feature_vectors
-        # Use the same chain-based approach
-        prev_feature_vectors = []
-        for build_doc in prev_builds[:5]:
-            feature_doc = feature_vectors.find_one(
-                {
-                    "raw_repo_id": ObjectId(repo.id),
-                    "raw_build_run_id": build_doc.get("_id"),
-                    "extraction_status": "completed",
-                }
-            )
-            if feature_doc:
-                prev_feature_vectors.append(feature_doc)
-
-        if prev_feature_vectors:
-            src_churns = []
-            for fv in prev_feature_vectors:
-                features = fv.get("features", {})
-                if "git_diff_src_churn" in features:
-                    churn_val = features["git_diff_src_churn"]
-                    if churn_val is not None:
-                        src_churns.append(churn_val)
-
-            if src_churns:
-                result["history_avg_churn_5"] = round(
-                    sum(src_churns) / len(src_churns), 2
-                )
+        last_10 = lineage.failed[:10]
+        result["history_fail_rate_10"] = round(sum(1 for f in last_10 if f) / len(last_10), 4)
+
+        # 4. history_avg_churn_5 - average src churn of completed feature vectors
+        src_churns = [churn for churn in lineage.src_churn[:5] if churn is not None]
+        if src_churns:
+            result["history_avg_churn_5"] = round(sum(src_churns) / len(src_churns), 2)
 
     except Exception as e:
         logger.warning(f"Failed to calculate prev build history features: {e}")
@@ -223,18 +267,22 @@ def git_churn_vs_avg(
     }
 )
 @tag(group="git")
+@node_version(2)
 def change_entropy_features(
     git_diff_files_modified: int,
     git_diff_files_added: int,
     git_diff_files_deleted: int,
     git_history: GitHistoryInput,
+    repo: RepoInput,
+    commit_change_stats: CommitChangeStatsCollection,
     git_built_commits: List[str],
 ) -> Dict[str, Any]:
     """
     Calculate entropy-based features.
 
     git_change_entropy: Shannon entropy of changes across files.
-    - Uses 'git show -m --name-only --format=' to get modified files for each commit
+    - Collects the files changed by each commit (against every parent for
+      merges, like 'git show -m --name-only')
     - Counts occurrences of each file
     - Calculates Shannon entropy on the distribution
     """
@@ -260,13 +308,16 @@ def change_entropy_features(
     file_counts = collections.Counter()
 
     try:
+        commit_changes = get_commit_changes(
+            repo_path, git_built_commits, repo.id, commit_change_stats
+        )
         for sha in git_built_commits:
-            # git show -m --name-only --format= SHA
-            output = run_git(repo_path, ["show", "-m", "--name-only", "--format=", sha])
-            if output:
-                for line in output.splitlines():
-                    if line.strip():
-                        file_counts[line.strip()] += 1
+            record = commit_changes.get(sha)
+            if record is None:
+                continue
+            for diff in record.diffs:
+                for change in diff:
+                    file_counts[change.path] += 1
 
         if file_counts:
             result["git_change_entropy"] = round(
@@ -287,6 +338,7 @@ def change_entropy_features(
     }
 )
 @tag(group="author")
+@node_version(2)
 def author_experience_features(
     git_history: GitHistoryInput,
     build_run: BuildRunInput,
@@ -328,43 +380,25 @@ def author_experience_features(
             current_date = current_date.replace(tzinfo=None)
 
         for idx, sha in enumerate(git_built_commits):
-            # Get author name AND email in one git command
-            author_info = run_git(repo_path, ["show", "--format=%an|%ae", "-s", sha])
-            if author_info:
-                parts = author_info.strip().split("|")
-                if len(parts) == 2:
-                    auth_name, auth_email = parts[0], parts[1]
-                    build_authors.add(auth_name)
-
-                    # Store trigger email (first commit's author)
-                    if idx == 0:
-                        trigger_email = auth_email
-
-                    # Check author_is_new (only if not already found)
-                    if not is_new and auth_email not in author_emails and current_date:
-                        author_emails.add(auth_email)
-                        first_commit_ts_str = run_git(
-                            repo_path,
-                            [
-                                "log",
-                                "--author=" + auth_email,
-                                "--reverse",
-                                "--format=%ct",
-                                "-n",
-                                "1",
-                            ],
-                        )
-                        if first_commit_ts_str:
-                            try:
-                                first_commit_ts = int(first_commit_ts_str.strip())
-                                first_commit_date = datetime.fromtimestamp(
-                                    first_commit_ts, tz=None
-                                )
-                                days_since = (current_date - first_commit_date).days
-                                if 0 <= days_since < 90:
-                                    is_new = True
-                            except Exception:
-                                pass
+            # Author name and email (answered from the commit index when available)
+            auth_name = get_author_name(repo_path, sha)
+            auth_email = get_author_email(repo_path, sha)
+            if auth_name is not None and auth_email is not None:
+                build_authors.add(auth_name)
+
+                # Store trigger email (first commit's author)
+                if idx == 0:
+                    trigger_email = auth_email
+
+                # Check author_is_new (only if not already found)
+                if not is_new and auth_email not in author_emails and current_date:
+                    author_emails.add(auth_email)
+                    first_commit_ts = get_author_first_commit_ts(repo_path, auth_email)
+                    if first_commit_ts is not None:
+                        first_commit_date = datetime.fromtimestamp(first_commit_ts, tz=None)
+                        days_since = (current_date - first_commit_date).days
+                        if 0 <= days_since < 90:
+                            is_new = True
 
             # Get files touched
             files = get_files_in_commit(repo_path, sha)
@@ -372,67 +406,134 @@ def author_experience_features(
 
         result["author_is_new"] = is_new
 
-        # 2. author_ownership - with file limit for performance
+        # 2. author_ownership - % of commits on touched files (90-day window) by build authors
         if touched_files and build_authors:
-            total_commits = 0
-            owned_commits = 0
-
-            since_arg = []
+            file_index = get_file_history_index(repo_path)
+            since_ts = until_ts = None
             if build_run.created_at:
-                since_date = build_run.created_at - timedelta(days=90)
-                since_arg = [
-                    f"--since={since_date.isoformat()}",
-                    f"--until={build_run.created_at.isoformat()}",
-                ]
-
-            # Limit files to prevent timeout
-            files_to_check = list(touched_files)[:MAX_FILES_TO_PROCESS]
-            if len(touched_files) > MAX_FILES_TO_PROCESS:
-                logger.info(
-                    f"Limiting author_ownership file count from {len(touched_files)} to {MAX_FILES_TO_PROCESS}"
+                until_ts = datetime_to_ts(build_run.created_at)
+                since_ts = datetime_to_ts(build_run.created_at - timedelta(days=90))
+            # The index spans every ref while the git fallback walks HEAD:
+            # only count HEAD's ancestors (walked back to the window start)
+            reachable = None
+            if file_index is not None and since_ts is not None:
+                head_sha = run_git(repo_path, ["rev-parse", "HEAD"])
+                reachable = get_reachable_commits(repo_path, head_sha, since_ts)
+            if file_index is not None and reachable is not None:
+                owned_commits, total_commits = ownership_ratio(
+                    file_index,
+                    touched_files,
+                    build_authors,
+                    since_ts,
+                    until_ts,
+                    reachable=reachable,
+                )
+            else:
+                owned_commits, total_commits = _count_file_ownership_git(
+                    repo_path, touched_files, build_authors, build_run.created_at
                 )
-
-            for filename in files_to_check:
-                if since_arg:
-                    cmd = ["log"] + since_arg + ["--format=%an", "--", filename]
-                else:
-                    cmd = ["log", "-n", "50", "--format=%an", "--", filename]
-
-                output = run_git(repo_path, cmd)
-                if output:
-                    for line in output.splitlines():
-                        total_commits += 1
-                        if line.strip() in build_authors:
-                            owned_commits += 1
 
             if total_commits > 0:
                 result["author_ownership"] = round(owned_commits / total_commits, 4)
 
         # 3. author_days_since_commit - use cached trigger_email
         if trigger_email and current_date:
-            prev_commit_output = run_git(
-                repo_path,
-                [
-                    "log",
-                    "--author=" + trigger_email,
-                    "-2",
-                    "--format=%ct",
-                    first_commit_sha,
-                ],
-            )
-
-            if prev_commit_output:
-                lines = prev_commit_output.strip().split("\n")
-                if len(lines) >= 2:
-                    try:
-                        prev_ts = int(lines[1])
-                        prev_date = datetime.fromtimestamp(prev_ts, tz=None)
-                        diff_days = (current_date - prev_date).days
-                        result["author_days_since_commit"] = max(0.0, float(diff_days))
-                    except Exception:
-                        pass
+            prev_ts = _get_previous_author_commit_ts(repo_path, trigger_email, first_commit_sha)
+            if prev_ts is not None:
+                prev_date = datetime.fromtimestamp(prev_ts, tz=None)
+                diff_days = (current_date - prev_date).days
+                result["author_days_since_commit"] = max(0.0, float(diff_days))
 
     except Exception as e:
         logger.warning(f"Failed to calculate author features: {e}")
 
     return result
+
+
+def _get_previous_author_commit_ts(
+    repo_path: Path, author_email: str, sha: str
+) -> Optional[int]:
+    """
+    Timestamp of the author's commit preceding `sha` (which is their own commit).
+
+    Uses the author timeline when indexed, otherwise `git log --author -2 <sha>`.
+    The timeline spans every ref, so its candidates are checked newest first
+    until one is an ancestor of `sha`, as `git log <sha>` would list it.
+    """
+    timeline = get_author_timeline(repo_path)
+    committed_ts = get_committed_date(repo_path, sha) if timeline is not None else None
+    if timeline is not None and committed_ts is not None:
+        candidates = timeline.commits_before(author_email, committed_ts)
+        checks = 0
+        for ts, candidate in candidates:
+            if candidate == sha:
+                continue
+            if checks == MAX_ANCESTRY_CHECKS:
+                break
+            checks += 1
+            try:
+                if is_ancestor(repo_path, candidate, sha):
+                    return ts
+            except Exception as e:
+                logger.debug(f"Ancestry check of {candidate} failed: {e}")
+                break
+        else:
+            return None
+
+    output = run_git(
+        repo_path,
+        ["log", "--author=" + author_email, "-2", "--format=%ct", sha],
+    )
+    lines = output.strip().split("\n") if output else []
+    if len(lines) >= 2:
+        try:
+            return int(lines[1])
+        except ValueError:
+            return None
+    return None
+
+
+def _count_file_ownership_git(
+    repo_path: Path,
+    touched_files: Set[str],
+    build_authors: Set[str],
+    created_at: Optional[datetime],
+) -> Tuple[int, int]:
+    """
+    Count (owned, total) commits on touched files with one git log per file.
+
+    Fallback when the repo has no commit index; limited to MAX_FILES_TO_PROCESS files.
+    """
+    total_commits = 0
+    owned_commits = 0
+
+    since_arg = []
+    if created_at:
+        since_date = created_at - timedelta(days=90)
+        since_arg = [
+            f"--since={since_date.isoformat()}",
+            f"--until={created_at.isoformat()}",
+        ]
+
+    # Limit files to prevent timeout
+    files_to_check = list(touched_files)[:MAX_FILES_TO_PROCESS]
+    if len(touched_files) > MAX_FILES_TO_PROCESS:
+        logger.info(
+            f"Limiting author_ownership file count from {len(touched_files)} "
+            f"to {MAX_FILES_TO_PROCESS}"
+        )
+
+    for filename in files_to_check:
+        if since_arg:
+            cmd = ["log"] + since_arg + ["--format=%an", "--", filename]
+        else:
+            cmd = ["log", "-n", "50", "--format=%an", "--", filename]
+
+        output = run_git(repo_path, cmd)
+        if output:
+            for line in output.splitlines():
+                total_commits += 1
+                if line.strip() in build_authors:
+                    owned_commits += 1
+
+    return owned_commits, total_commits
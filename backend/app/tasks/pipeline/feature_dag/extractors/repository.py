@@ -8,13 +8,13 @@ Features extracted from repository state and GitHub API:
 """
 
 import logging
-import subprocess
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 
 from hamilton.function_modifiers import extract_fields, tag
 
+from app.core import call_accounting
 from app.tasks.pipeline.feature_dag._inputs import (
     BuildRunInput,
     GitHistoryInput,
@@ -23,18 +23,23 @@ from app.tasks.pipeline.feature_dag._inputs import (
     RawBuildRunsCollection,
     RepoInput,
 )
+from app.tasks.pipeline.feature_dag._metadata import NodeScope, node_scope
 from app.tasks.pipeline.feature_dag._retry import with_retry
-from app.tasks.pipeline.feature_dag.languages import LanguageRegistry
+from app.tasks.pipeline.feature_dag.languages import LanguageRegistry, LanguageStrategy
+from app.tasks.pipeline.utils.blob_metrics_cache import get_blob_metrics_cache
+from app.tasks.pipeline.utils.git_object_reader import get_object_reader
 from app.utils.datetime import ensure_naive_utc
 
 logger = logging.getLogger(__name__)
 
 # Performance limits
 MAX_FILES_TO_SCAN = 5000  # Limit files scanned for SLOC metrics
+BLOB_READ_BATCH_SIZE = 500  # Blobs read per cat-file round-trip
 MAX_COMMITS_FOR_COMMENTS = 30  # Limit commits checked for GitHub API calls
 
 
 @tag(group="repo")
+@node_scope(NodeScope.COMMIT)
 def repo_age_days(git_history: GitHistoryInput) -> Optional[float]:
     """
     Repository age in days.
@@ -47,7 +52,7 @@ def repo_age_days(git_history: GitHistoryInput) -> Optional[float]:
 
     try:
         # Get timestamp of the build trigger commit
-        latest_commit_ts = subprocess.run(
+        latest_commit_ts = call_accounting.run(
             ["git", "log", "-1", "--format=%ct", sha],
             cwd=str(repo_path),
             capture_output=True,
@@ -57,7 +62,7 @@ def repo_age_days(git_history: GitHistoryInput) -> Optional[float]:
 
         # Get timestamp of the first commit in the repo (reachable from sha)
         first_commit_ts = (
-            subprocess.run(
+            call_accounting.run(
                 ["git", "log", "--reverse", "--format=%ct", sha],
                 cwd=str(repo_path),
                 capture_output=True,
@@ -84,6 +89,7 @@ def repo_age_days(git_history: GitHistoryInput) -> Optional[float]:
 
 
 @tag(group="repo")
+@node_scope(NodeScope.COMMIT)
 def repo_total_commits(git_history: GitHistoryInput) -> Optional[int]:
     """Total number of commits in repository history."""
     if not git_history.is_commit_available or not git_history.effective_sha:
@@ -93,7 +99,7 @@ def repo_total_commits(git_history: GitHistoryInput) -> Optional[int]:
     sha = git_history.effective_sha
 
     try:
-        commit_count = subprocess.run(
+        commit_count = call_accounting.run(
             ["git", "rev-list", "--count", sha],
             cwd=str(repo_path),
             capture_output=True,
@@ -116,16 +122,34 @@ def repo_total_commits(git_history: GitHistoryInput) -> Optional[int]:
     }
 )
 @tag(group="repo")
+@node_scope(NodeScope.COMMIT)
 def repo_code_metrics(
+    git_history: GitHistoryInput,
     git_worktree: GitWorktreeInput,
     repo_languages_all: List[str],
 ) -> Dict[str, Any]:
     """
     SLOC and test density metrics.
 
-    Requires a git worktree to analyze source files.
+    Reads the commit's tree straight from the bare repo, with per-blob
+    metrics memoized across builds. Falls back to scanning the worktree
+    if the tree cannot be read.
     """
-    if not git_worktree.is_ready or not git_worktree.worktree_path:
+    languages = repo_languages_all
+    counts: Optional[Tuple[int, int, int, int]] = None
+
+    if git_history.is_commit_available and git_history.effective_sha:
+        try:
+            counts = _count_code_metrics_from_tree(
+                git_history.path, git_history.effective_sha, languages
+            )
+        except Exception as e:
+            logger.warning(f"Failed to read tree for code metrics, trying worktree: {e}")
+
+    if counts is None and git_worktree.is_ready and git_worktree.worktree_path:
+        counts = _count_code_metrics(git_worktree.worktree_path, languages)
+
+    if counts is None:
         return {
             "repo_sloc": None,
             "repo_test_lines_per_kloc": None,
@@ -133,12 +157,7 @@ def repo_code_metrics(
             "repo_asserts_per_kloc": None,
         }
 
-    worktree_path = git_worktree.worktree_path
-    languages = repo_languages_all
-
-    src_lines, test_lines, test_cases, asserts = _count_code_metrics(
-        worktree_path, languages
-    )
+    src_lines, test_lines, test_cases, asserts = counts
 
     metrics = {
         "repo_sloc": src_lines,
@@ -156,6 +175,58 @@ def repo_code_metrics(
     return metrics
 
 
+def _is_skipped_path(rel_path: str) -> bool:
+    """Skip hidden and vendor directories."""
+    if any(part.startswith(".") for part in rel_path.split("/")):
+        return True
+    return any(x in rel_path for x in ["vendor/", "node_modules/", "venv/"])
+
+
+def _classify_path(
+    rel_path: str, langs_to_check: List[Optional[str]]
+) -> Tuple[Optional[LanguageStrategy], bool]:
+    """
+    Classify a file for code metrics.
+
+    Returns:
+        (strategy, is_test): strategy is None if the file is neither a test
+        nor a source file for any of the languages.
+    """
+    for lang_name in langs_to_check:
+        strategy = LanguageRegistry.get_strategy(lang_name or "")
+        if strategy.is_test_file(rel_path):
+            return strategy, True
+
+    for lang_name in langs_to_check:
+        strategy = LanguageRegistry.get_strategy(lang_name or "")
+        if strategy.is_source_file(rel_path):
+            return strategy, False
+
+    return None, False
+
+
+def _measure_content(
+    content: str, strategy: LanguageStrategy, is_test: bool
+) -> Tuple[int, int, int]:
+    """
+    Measure one file.
+
+    Returns:
+        Tuple of (line_count, test_cases, asserts); test counts are 0 for source files
+    """
+    lines = content.splitlines()
+    test_cases = 0
+    asserts = 0
+    if is_test:
+        for line in lines:
+            clean_line = strategy.strip_comments(line)
+            if strategy.matches_test_definition(clean_line):
+                test_cases += 1
+            if strategy.matches_assertion(clean_line):
+                asserts += 1
+    return len(lines), test_cases, asserts
+
+
 def _count_code_metrics(
     worktree_path: Path, languages: List[str]
 ) -> Tuple[int, int, int, int]:
@@ -184,45 +255,116 @@ def _count_code_metrics(
             break
 
         rel_path = str(path.relative_to(worktree_path))
-
-        # Skip hidden and vendor directories
-        if any(part.startswith(".") for part in rel_path.split("/")):
+        if _is_skipped_path(rel_path):
             continue
-        if any(x in rel_path for x in ["vendor/", "node_modules/", "venv/"]):
+
+        strategy, is_test = _classify_path(rel_path, langs_to_check)
+        if strategy is None:
             continue
 
         try:
             content = path.read_text(errors="ignore")
-            lines = content.splitlines()
-            line_count = len(lines)
-
-            matched_strategy = None
-            is_test = False
-
-            for lang_name in langs_to_check:
-                strategy = LanguageRegistry.get_strategy(lang_name or "")
-                if strategy.is_test_file(rel_path):
-                    is_test = True
-                    matched_strategy = strategy
-                    break
-
-            if is_test and matched_strategy:
-                test_lines += line_count
-                for line in lines:
-                    clean_line = matched_strategy.strip_comments(line)
-                    if matched_strategy.matches_test_definition(clean_line):
-                        test_cases += 1
-                    if matched_strategy.matches_assertion(clean_line):
-                        asserts += 1
-            else:
-                for lang_name in langs_to_check:
-                    strategy = LanguageRegistry.get_strategy(lang_name or "")
-                    if strategy.is_source_file(rel_path):
-                        src_lines += line_count
-                        break
         except Exception:
             continue
 
+        line_count, cases, file_asserts = _measure_content(content, strategy, is_test)
+        if is_test:
+            test_lines += line_count
+            test_cases += cases
+            asserts += file_asserts
+        else:
+            src_lines += line_count
+
+    return src_lines, test_lines, test_cases, asserts
+
+
+def _count_code_metrics_from_tree(
+    repo_path: Path, commit_sha: str, languages: List[str]
+) -> Tuple[int, int, int, int]:
+    """
+    Count code metrics from a commit's tree in the bare repo (no worktree).
+
+    Blob metrics are memoized per (blob SHA, language strategy version), so
+    only blobs not seen in earlier builds are read.
+
+    Returns:
+        Tuple of (src_lines, test_lines, test_cases, asserts)
+    """
+    output = call_accounting.run(
+        ["git", "ls-tree", "-r", "-z", commit_sha],
+        cwd=str(repo_path),
+        capture_output=True,
+        check=True,
+        timeout=120,
+    ).stdout.decode("utf-8", "surrogateescape")
+
+    langs_to_check = languages if languages else [None]
+    cache = get_blob_metrics_cache(repo_path)
+
+    # (blob_sha, strategy_key, is_test) for every file counted
+    files: List[Tuple[str, str, bool]] = []
+    strategies: Dict[Tuple[str, str], Tuple[LanguageStrategy, bool]] = {}
+    files_scanned = 0
+
+    for entry in output.split("\0"):
+        if not entry:
+            continue
+        meta, _, rel_path = entry.partition("\t")
+        mode, obj_type, blob_sha = meta.split(" ")
+        # Skip submodules and symlinks (not regular files)
+        if obj_type != "blob" or mode == "120000":
+            continue
+
+        files_scanned += 1
+        if files_scanned > MAX_FILES_TO_SCAN:
+            logger.info(f"Reached MAX_FILES_TO_SCAN limit ({MAX_FILES_TO_SCAN})")
+            break
+
+        if _is_skipped_path(rel_path):
+            continue
+
+        strategy, is_test = _classify_path(rel_path, langs_to_check)
+        if strategy is None:
+            continue
+
+        # Line counts don't depend on the strategy; test counts do
+        strategy_key = strategy.cache_key if is_test else ""
+        files.append((blob_sha, strategy_key, is_test))
+        strategies.setdefault((blob_sha, strategy_key), (strategy, is_test))
+
+    known = cache.get_many(strategies)
+    to_read = [key for key in strategies if key not in known]
+    if to_read:
+        reader = get_object_reader(repo_path)
+        for i in range(0, len(to_read), BLOB_READ_BATCH_SIZE):
+            batch = to_read[i : i + BLOB_READ_BATCH_SIZE]
+            blobs = reader.read_many(blob_sha for blob_sha, _ in batch)
+            for key, blob in zip(batch, blobs, strict=True):
+                if blob is None:
+                    continue
+                strategy, is_test = strategies[key]
+                content = blob.data.decode("utf-8", errors="ignore")
+                known[key] = _measure_content(content, strategy, is_test)
+                cache.put(key[0], key[1], known[key])
+        cache.save()
+
+    src_lines = 0
+    test_lines = 0
+    test_cases = 0
+    asserts = 0
+
+    for blob_sha, strategy_key, is_test in files:
+        measured = known.get((blob_sha, strategy_key))
+        if measured is None:
+            continue
+        line_count, cases, file_asserts = measured
+        if is_test:
+            test_lines += line_count
+            test_cases += cases
+            asserts += file_asserts
+        else:
+            src_lines += line_count
+
     return src_lines, test_lines, test_cases, asserts
 
 
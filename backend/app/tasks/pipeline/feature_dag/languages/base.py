@@ -2,6 +2,14 @@ from abc import ABC, abstractmethod
 
 
 class LanguageStrategy(ABC):
+    # Bump when matching rules change (invalidates cached per-blob metrics)
+    version: int = 1
+
+    @property
+    def cache_key(self) -> str:
+        """Identifies this strategy and rule version in cached metrics."""
+        return f"{type(self).__name__}:{self.version}"
+
     @abstractmethod
     def strip_comments(self, line: str) -> str:
         """Strip comments from a line."""
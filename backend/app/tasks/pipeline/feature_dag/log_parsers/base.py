@@ -6,7 +6,7 @@ from __future__ import annotations
 
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
-from typing import Optional
+from typing import Dict, Optional, Tuple
 
 
 @dataclass
@@ -31,6 +31,12 @@ class FrameworkParser(ABC):
     name: str  # e.g., "pytest", "junit"
     language: str  # e.g., "python", "java"
 
+    # Lowercase literals of the parser's patterns: parse() can only return a
+    # result for a log containing every keyword of at least one group.
+    # Lets ScannedLog skip the parser without running its regexes;
+    # empty means the parser is always tried.
+    REQUIRED_KEYWORDS: Tuple[Tuple[str, ...], ...] = ()
+
     @abstractmethod
     def parse(self, text: str) -> Optional[ParsedLog]:
         """
@@ -39,3 +45,42 @@ class FrameworkParser(ABC):
         Returns ParsedLog if this framework's output is detected, None otherwise.
         """
         pass
+
+
+# Characters re.IGNORECASE matches to an ASCII letter but str.lower() does not
+# map to it (dotted/dotless I, long s)
+_IGNORECASE_EXTRA = str.maketrans({"\u0130": "i", "\u0131": "i", "\u017f": "s"})
+
+
+class ScannedLog:
+    """
+    Log text case-folded once and shared by all parsers tried on it.
+
+    Keyword presence is checked on the folded text and memoized, so parsers
+    whose REQUIRED_KEYWORDS are absent are skipped at the cost of a substring
+    search instead of their (much slower) regex searches.
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+        self.lowered = text.lower()
+        self._folded = (
+            self.lowered if text.isascii() else text.translate(_IGNORECASE_EXTRA).lower()
+        )
+        self._keywords: Dict[str, bool] = {}
+
+    def contains(self, keyword: str) -> bool:
+        """Whether the (lowercase) keyword appears in the text, ignoring case."""
+        present = self._keywords.get(keyword)
+        if present is None:
+            present = self._keywords[keyword] = keyword in self._folded
+        return present
+
+    def may_match(self, parser: FrameworkParser) -> bool:
+        """False only if parser.parse() cannot return a result for this text."""
+        if not parser.REQUIRED_KEYWORDS:
+            return True
+        return any(
+            all(self.contains(keyword) for keyword in group)
+            for group in parser.REQUIRED_KEYWORDS
+        )
@@ -20,6 +20,7 @@ class GTestParser(FrameworkParser):
 
     name = "gtest"
     language = "cpp"
+    REQUIRED_KEYWORDS = (("ran.", "total)"),)
 
     # [==========] 10 tests from 3 test suites ran. (123 ms total)
     # [  PASSED  ] 8 tests.
@@ -81,6 +82,7 @@ class Catch2Parser(FrameworkParser):
 
     name = "catch2"
     language = "cpp"
+    REQUIRED_KEYWORDS = (("cases:", "passed"), ("tests", "passed", "assertion"))
 
     # ===============================================================================
     # All tests passed (42 assertions in 10 test cases)
@@ -139,6 +141,7 @@ class CTestParser(FrameworkParser):
 
     name = "ctest"
     language = "cpp"
+    REQUIRED_KEYWORDS = (("%", "passed,", "failed"),)
 
     # 100% tests passed, 0 tests failed out of 10
     # Total Test time (real) =   5.67 sec
@@ -18,6 +18,7 @@ class GoTestParser(FrameworkParser):
 
     name = "gotest"
     language = "go"
+    REQUIRED_KEYWORDS = (("---", "pass:"), ("---", "fail:"), ("---", "skip:"))
 
     # ok      github.com/user/pkg    0.123s
     # FAIL    github.com/user/pkg    0.456s
@@ -64,6 +65,7 @@ class GotestsumParser(FrameworkParser):
 
     name = "gotestsum"
     language = "go"
+    REQUIRED_KEYWORDS = (("done", "test"),)
 
     # DONE 123 tests in 4.567s
     # DONE 123 tests, 2 failures in 4.567s
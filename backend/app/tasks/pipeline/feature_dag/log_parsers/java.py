@@ -19,6 +19,7 @@ class JUnitParser(FrameworkParser):
 
     name = "junit"
     language = "java"
+    REQUIRED_KEYWORDS = (("tests run:", "failures:", "errors:"),)
 
     PATTERN = re.compile(
         r"Tests run: (?P<tests>\d+), Failures: (?P<failures>\d+), "
@@ -60,6 +61,7 @@ class TestNGParser(FrameworkParser):
 
     name = "testng"
     language = "java"
+    REQUIRED_KEYWORDS = (("total tests run:", "failures:", "skips:"),)
 
     PATTERN = re.compile(
         r"Total tests run:\s*(?P<tests>\d+), Failures: (?P<failures>\d+), "
@@ -20,6 +20,7 @@ class JestParser(FrameworkParser):
 
     name = "jest"
     language = "javascript"
+    REQUIRED_KEYWORDS = (("tests:", "total"),)
 
     # Jest summary: Tests: 5 passed, 2 failed, 7 total
     TESTS_PATTERN = re.compile(
@@ -65,6 +66,7 @@ class MochaParser(FrameworkParser):
 
     name = "mocha"
     language = "javascript"
+    REQUIRED_KEYWORDS = (("passing", "("),)
 
     # 5 passing (2s)
     # 2 failing
@@ -121,6 +123,7 @@ class JasmineParser(FrameworkParser):
 
     name = "jasmine"
     language = "javascript"
+    REQUIRED_KEYWORDS = (("spec", "failure"),)
 
     # 5 specs, 2 failures, 1 pending
     # Finished in 0.123 seconds
@@ -163,6 +166,7 @@ class VitestParser(FrameworkParser):
 
     name = "vitest"
     language = "javascript"
+    REQUIRED_KEYWORDS = (("tests", "(", ")"),)
 
     # Tests  5 passed | 2 failed | 1 skipped (8)
     # Duration  2.34s
@@ -19,6 +19,7 @@ class PytestParser(FrameworkParser):
 
     name = "pytest"
     language = "python"
+    REQUIRED_KEYWORDS = (("passed",),)
 
     PATTERN = re.compile(
         r"=+\s*(?P<passed>\d+)\s+passed"
@@ -54,6 +55,7 @@ class UnittestParser(FrameworkParser):
 
     name = "unittest"
     language = "python"
+    REQUIRED_KEYWORDS = (("ran", "tests"),)
 
     PATTERN = re.compile(
         r"Ran\s+(?P<tests>\d+)\s+tests\s+in\s+(?P<duration>[\d\.]+)s",
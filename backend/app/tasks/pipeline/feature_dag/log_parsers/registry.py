@@ -7,7 +7,7 @@ test frameworks across different languages.
 
 from __future__ import annotations
 
-from typing import Dict, List, Optional, Set
+from typing import Dict, List, Optional, Sequence, Set
 
 from . import cpp as cpp_parsers
 from . import go as go_parsers
@@ -15,7 +15,7 @@ from . import java as java_parsers
 from . import javascript as javascript_parsers
 from . import python as python_parsers
 from . import ruby as ruby_parsers
-from .base import FrameworkParser, ParsedLog
+from .base import FrameworkParser, ParsedLog, ScannedLog
 
 
 class LogParserRegistry:
@@ -26,6 +26,7 @@ class LogParserRegistry:
     - Framework-specific parsing
     - Language-hint based parsing
     - Fallback to try all parsers
+    - Single-pass scanning for a list of language hints
     """
 
     def __init__(self):
@@ -59,26 +60,8 @@ class LogParserRegistry:
         """Get list of supported languages."""
         return list(self._parsers.keys())
 
-    def parse(
-        self,
-        text: str,
-        language_hint: Optional[str] = None,
-        allowed_frameworks: Optional[Set[str]] = None,
-    ) -> ParsedLog:
-        """
-        Parse log text and extract test results.
-
-        Args:
-            text: The log text to parse
-            language_hint: Optional language hint to prioritize certain parsers
-            allowed_frameworks: Optional set of frameworks to try (filter)
-
-        Returns:
-            ParsedLog with extracted metrics, or empty result if no match
-        """
-        allowed = {f.lower() for f in allowed_frameworks} if allowed_frameworks else None
-
-        # Build ordered list of parsers to try
+    def ordered_parsers(self, language_hint: Optional[str] = None) -> List[FrameworkParser]:
+        """Parsers in the order they are tried: hinted language first, then the rest."""
         parsers_to_try: List[FrameworkParser] = []
 
         # Prioritize language-specific parsers if hint provided
@@ -93,20 +76,32 @@ class LogParserRegistry:
                 continue  # Already added
             parsers_to_try.extend(parsers)
 
-        # Try each parser
-        for parser in parsers_to_try:
+        return parsers_to_try
+
+    def _first_match(
+        self,
+        scanned: ScannedLog,
+        language_hint: Optional[str],
+        allowed: Optional[Set[str]],
+    ) -> Optional[ParsedLog]:
+        for parser in self.ordered_parsers(language_hint):
             if allowed and parser.name not in allowed:
                 continue
+            if not scanned.may_match(parser):
+                continue
 
-            result = parser.parse(text)
+            result = parser.parse(scanned.text)
             if result:
                 return result
+        return None
 
-        # Fallback: no tests detected
+    @staticmethod
+    def _no_match(scanned: ScannedLog, language_hint: Optional[str]) -> ParsedLog:
+        """Fallback result when no parser detected tests."""
         detected_language = (
             language_hint.lower()
             if language_hint
-            else ("python" if "pytest" in text.lower() else None)
+            else ("python" if "pytest" in scanned.lowered else None)
         )
         return ParsedLog(
             framework=None,
@@ -117,6 +112,59 @@ class LogParserRegistry:
             test_duration_seconds=None,
         )
 
+    def parse(
+        self,
+        text: str,
+        language_hint: Optional[str] = None,
+        allowed_frameworks: Optional[Set[str]] = None,
+    ) -> ParsedLog:
+        """
+        Parse log text and extract test results.
+
+        Args:
+            text: The log text to parse
+            language_hint: Optional language hint to prioritize certain parsers
+            allowed_frameworks: Optional set of frameworks to try (filter)
+
+        Returns:
+            ParsedLog with extracted metrics, or empty result if no match
+        """
+        allowed = {f.lower() for f in allowed_frameworks} if allowed_frameworks else None
+        scanned = ScannedLog(text)
+
+        result = self._first_match(scanned, language_hint, allowed)
+        return result or self._no_match(scanned, language_hint)
+
+    def scan(
+        self,
+        text: str,
+        language_hints: Optional[Sequence[str]] = None,
+        allowed_frameworks: Optional[Set[str]] = None,
+    ) -> ParsedLog:
+        """
+        Parse a log once for a list of language hints.
+
+        Same result as calling parse() with each hint in turn until one
+        detects a framework, then without a hint: every hint order contains
+        all parsers, so only the first hint decides which match wins, and if
+        it finds none no other hint can. The text is case-folded once and
+        parsers whose keywords are absent are skipped.
+
+        Args:
+            text: The log text to parse
+            language_hints: Repository languages, most relevant first
+            allowed_frameworks: Optional set of frameworks to try (filter)
+
+        Returns:
+            ParsedLog with extracted metrics, or empty result if no match
+        """
+        allowed = {f.lower() for f in allowed_frameworks} if allowed_frameworks else None
+        scanned = ScannedLog(text)
+
+        language_hint = language_hints[0] if language_hints else None
+        result = self._first_match(scanned, language_hint, allowed)
+        return result or self._no_match(scanned, None)
+
 
 # Global registry instance
 _registry = LogParserRegistry()
@@ -156,3 +204,26 @@ class TestLogParser:
         """
         allowed_set = set(allowed_frameworks) if allowed_frameworks else None
         return self._registry.parse(text, language_hint, allowed_set)
+
+    def scan(
+        self,
+        text: str,
+        language_hints: Optional[List[str]] = None,
+        allowed_frameworks: Optional[List[str]] = None,
+    ) -> ParsedLog:
+        """
+        Parse log text once for a list of language hints.
+
+        Equivalent to parse() with each hint until a framework is detected,
+        then without a hint.
+
+        Args:
+            text: The log text to parse
+            language_hints: Optional language hints, most relevant first
+            allowed_frameworks: Optional list of frameworks to try
+
+        Returns:
+            ParsedLog with extracted metrics
+        """
+        allowed_set = set(allowed_frameworks) if allowed_frameworks else None
+        return self._registry.scan(text, language_hints, allowed_set)
@@ -21,6 +21,7 @@ class RSpecParser(FrameworkParser):
 
     name = "rspec"
     language = "ruby"
+    REQUIRED_KEYWORDS = (("example", "failure"),)
 
     PATTERN = re.compile(
         r"(?P<examples>\d+)\s+examples?,\s+(?P<failures>\d+)\s+failures?"
@@ -59,6 +60,7 @@ class MinitestParser(FrameworkParser):
 
     name = "minitest"
     language = "ruby"
+    REQUIRED_KEYWORDS = (("run", "assertion", "failure", "error"),)
 
     PATTERN = re.compile(
         r"(?P<runs>\d+)\s+runs?,\s+(?P<assertions>\d+)\s+assertions?,\s+"
@@ -99,6 +101,7 @@ class TestUnitParser(FrameworkParser):
 
     name = "testunit"
     language = "ruby"
+    REQUIRED_KEYWORDS = (("tests,", "assertions,", "failures,", "errors"),)
 
     PATTERN = re.compile(
         r"(?P<tests>\d+)\s+tests,\s+(?P<assertions>\d+)\s+assertions,\s+"
@@ -142,6 +145,7 @@ class CucumberParser(FrameworkParser):
 
     name = "cucumber"
     language = "ruby"
+    REQUIRED_KEYWORDS = (("scenario", "(", ")"),)
 
     SCENARIO_PATTERN = re.compile(
         r"(?P<total>\d+)\s+scenarios?\s*\("
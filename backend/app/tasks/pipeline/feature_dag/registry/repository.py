@@ -75,7 +75,7 @@ REPOSITORY_FEATURES: Dict[str, FeatureDefinition] = {
         category=FeatureCategory.REPO_SNAPSHOT,
         data_type=FeatureDataType.INTEGER,
         extractor_node="repository",
-        required_resources=[FeatureResource.GIT_WORKTREE],
+        required_resources=[FeatureResource.GIT_HISTORY],
         nullable=True,
     ),
     "repo_test_lines_per_kloc": FeatureDefinition(
@@ -85,7 +85,7 @@ REPOSITORY_FEATURES: Dict[str, FeatureDefinition] = {
         category=FeatureCategory.REPO_SNAPSHOT,
         data_type=FeatureDataType.FLOAT,
         extractor_node="repository",
-        required_resources=[FeatureResource.GIT_WORKTREE],
+        required_resources=[FeatureResource.GIT_HISTORY],
         nullable=True,
     ),
     "repo_test_cases_per_kloc": FeatureDefinition(
@@ -95,7 +95,7 @@ REPOSITORY_FEATURES: Dict[str, FeatureDefinition] = {
         category=FeatureCategory.REPO_SNAPSHOT,
         data_type=FeatureDataType.FLOAT,
         extractor_node="repository",
-        required_resources=[FeatureResource.GIT_WORKTREE],
+        required_resources=[FeatureResource.GIT_HISTORY],
         nullable=True,
     ),
     "repo_asserts_per_kloc": FeatureDefinition(
@@ -105,7 +105,7 @@ REPOSITORY_FEATURES: Dict[str, FeatureDefinition] = {
         category=FeatureCategory.REPO_SNAPSHOT,
         data_type=FeatureDataType.FLOAT,
         extractor_node="repository",
-        required_resources=[FeatureResource.GIT_WORKTREE],
+        required_resources=[FeatureResource.GIT_HISTORY],
         nullable=True,
     ),
 }
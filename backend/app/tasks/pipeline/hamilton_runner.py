@@ -8,20 +8,54 @@ Key behaviors:
 - DEFAULT_FEATURES are always included when features_filter is specified
 - Hamilton automatically computes only the dependencies needed for requested features
 - Output is filtered to only return the explicitly requested features (+ defaults)
-- Caching support for intermediate values to avoid recomputation on errors
+- Caching support for intermediate values to avoid recomputation on errors,
+  bounded by size/TTL eviction with per-node hit/miss stats and selective
+  invalidation (utils/hamilton_cache.py)
+- The driver and feature registry are compiled once per worker process
+  (get_compiled_pipeline) and shared by every HamiltonPipeline instance
+- Opt-in parallel mode (HAMILTON_PARALLEL_ENABLED) runs independent nodes on a
+  thread pool with per-resource-class concurrency limits (parallel_executor.py)
+- execute_many() runs a batch of builds, computing commit/repo scoped nodes
+  (see node_scope in _metadata.py) once per commit/repo
+- execute(phase=...) splits extraction into NON_TEMPORAL features (any build
+  order) and TEMPORAL features (nodes downstream of feature_vectors)
+- Nodes carry a version (@node_version); non-temporal feature values are
+  versioned by the nodes upstream of them, so results stored by another
+  model config/scenario are reused (get_feature_result_store,
+  utils/feature_results.py) and refresh_features() recomputes only the
+  features affected by a version change (every feature when the global
+  RESULTS_VERSION changed)
 """
 
 from __future__ import annotations
 
+import hashlib
+import json
 import logging
+import threading
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Dict, Optional, Set
+from types import MappingProxyType
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    FrozenSet,
+    Hashable,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
 
 from hamilton import driver
 
 from app.config import settings
 from app.paths import HAMILTON_CACHE_DIR
-from app.tasks.pipeline.constants import DEFAULT_FEATURES, HAMILTON_MODULES
+from app.tasks.pipeline.constants import DEFAULT_FEATURES, HAMILTON_MODULES, ExtractionPhase
 from app.tasks.pipeline.execution_tracker import ExecutionResult, ExecutionTracker
 from app.tasks.pipeline.feature_dag._inputs import (
     BuildLogsInput,
@@ -32,15 +66,335 @@ from app.tasks.pipeline.feature_dag._inputs import (
     GitWorktreeInput,
     RepoInput,
 )
-from app.tasks.pipeline.feature_dag._metadata import get_required_resources_for_features
+from app.tasks.pipeline.feature_dag._metadata import (
+    DEFAULT_NODE_VERSION,
+    RESULTS_VERSION,
+    FeatureDataType,
+    NodeScope,
+    get_changed_nodes,
+    get_dag_version,
+    get_metadata_registry,
+    get_node_scopes,
+    get_node_versions,
+    get_required_resources_for_features,
+    get_results_version,
+)
 from app.tasks.pipeline.input_preparer import PreparedPipelineInput
+from app.tasks.pipeline.parallel_executor import ParallelNodeExecutor
 from app.tasks.pipeline.shared.resources import (
+    FeatureResource,
     check_resource_availability,
     get_input_resource_names,
 )
+from app.tasks.pipeline.utils.feature_results import (
+    FeatureResultStore,
+    get_feature_result_store,
+)
+from app.tasks.pipeline.utils.hamilton_cache import HamiltonCacheManager, get_cache_manager
 
 logger = logging.getLogger(__name__)
 
+# Input holding the results of earlier builds: every node downstream of it
+# is temporal and must run after those builds were extracted
+TEMPORAL_INPUT = FeatureResource.FEATURE_VECTORS.value
+
+# Input whose value differs between model configs/scenarios
+CONFIG_INPUT = "feature_config"
+
+# Inputs whose data can change after a build was extracted (backfilled builds,
+# rebuilt history rollups, edited PRs/comments): results of features
+# downstream of them are not shared across scopes
+VOLATILE_INPUTS = frozenset(
+    {
+        FeatureResource.RAW_BUILD_RUNS.value,
+        FeatureResource.BUILD_HISTORY_ROLLUPS.value,
+        "github_client",
+    }
+)
+
+# Stored feature types that round-trip unchanged through format_features_for_storage
+_OVERRIDABLE_TYPES = {
+    FeatureDataType.STRING.value,
+    FeatureDataType.INTEGER.value,
+    FeatureDataType.FLOAT.value,
+    FeatureDataType.BOOLEAN.value,
+}
+
+
+# =============================================================================
+# Process-wide compiled pipeline
+# =============================================================================
+
+
+@dataclass
+class CompiledPipeline:
+    """
+    Hamilton driver and feature metadata built once per worker process.
+
+    Shared by every HamiltonPipeline created in the process. The execution
+    tracker is bound to the driver, so executions are serialized by `lock`
+    and the tracker is reset at the start of each one.
+    """
+
+    driver: driver.Driver
+    tracker: Optional[ExecutionTracker]
+    all_features: FrozenSet[str]
+    # Nodes that may be shared across builds (execute_many)
+    node_scopes: Mapping[str, NodeScope]
+    # Nodes reading results of earlier builds (ExtractionPhase.TEMPORAL)
+    temporal_nodes: FrozenSet[str]
+    node_names: FrozenSet[str]
+    # Node versions not at DEFAULT_NODE_VERSION (@node_version)
+    node_versions: Mapping[str, int]
+    dag_version: str
+    # Reusable (non-temporal) feature -> hash of the node versions upstream of it
+    result_versions: Mapping[str, str]
+    # Reusable features downstream of feature_config
+    config_dependent: FrozenSet[str]
+    cache_enabled: bool
+    cache_path: Optional[Path]
+    cache_manager: Optional[HamiltonCacheManager] = None
+    executor: Optional[ParallelNodeExecutor] = None
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+_compiled_lock = threading.Lock()
+_compiled: Dict[Tuple[bool, bool, bool], CompiledPipeline] = {}
+
+
+def _get_cache_path(enable_cache: bool) -> Optional[Path]:
+    """
+    Get the cache directory path if caching is enabled.
+
+    Returns:
+        Path to cache directory if file-based caching enabled, None otherwise.
+    """
+    if not enable_cache:
+        return None
+
+    cache_type = settings.HAMILTON_CACHE_TYPE.lower()
+
+    if cache_type == "memory":
+        # Return None to signal in-memory cache (handled differently)
+        return None
+    else:
+        # File-based persistent cache (default)
+        cache_dir = Path(HAMILTON_CACHE_DIR)
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        return cache_dir
+
+
+def _create_parallel_executor() -> ParallelNodeExecutor:
+    """Thread-pool node executor configured from settings."""
+    return ParallelNodeExecutor(
+        max_workers=settings.HAMILTON_PARALLEL_MAX_WORKERS,
+        resource_limits={
+            "git": settings.HAMILTON_PARALLEL_GIT_CONCURRENCY,
+            "github": settings.HAMILTON_PARALLEL_GITHUB_CONCURRENCY,
+            "logs": settings.HAMILTON_PARALLEL_LOGS_CONCURRENCY,
+            "mongo": settings.HAMILTON_PARALLEL_MONGO_CONCURRENCY,
+        },
+    )
+
+
+def _feature_result_versions(
+    dr: driver.Driver,
+    features: FrozenSet[str],
+    temporal_nodes: FrozenSet[str],
+    node_versions: Mapping[str, int],
+) -> Tuple[Dict[str, str], FrozenSet[str]]:
+    """
+    Versions of the features whose results can be shared across scopes.
+
+    A feature's version hashes RESULTS_VERSION and the names and versions
+    of its node and of every node upstream of it, so bumping an extractor
+    invalidates its dependents too. Features downstream of VOLATILE_INPUTS
+    get no version and are always extracted.
+
+    Returns:
+        (feature -> version, features reading feature_config)
+    """
+    nodes = {v.name: v for v in dr.list_available_variables()}
+    upstream: Dict[str, FrozenSet[str]] = {}
+
+    def collect(name: str) -> FrozenSet[str]:
+        if name not in upstream:
+            hamilton_node = nodes.get(name)
+            names = {name}
+            if hamilton_node is not None:
+                dependencies = set(hamilton_node.required_dependencies) | set(
+                    hamilton_node.optional_dependencies
+                )
+                for dependency in dependencies:
+                    names |= collect(dependency)
+            upstream[name] = frozenset(names)
+        return upstream[name]
+
+    versions: Dict[str, str] = {}
+    config_dependent = set()
+    for name in features - temporal_nodes - get_input_resource_names():
+        if name not in nodes:
+            continue
+        names = collect(name)
+        if names & VOLATILE_INPUTS:
+            continue
+        payload = "\n".join(
+            [
+                str(RESULTS_VERSION),
+                *(f"{n}:{node_versions.get(n, DEFAULT_NODE_VERSION)}" for n in sorted(names)),
+            ]
+        )
+        versions[name] = hashlib.sha1(payload.encode()).hexdigest()[:16]
+        if CONFIG_INPUT in names:
+            config_dependent.add(name)
+    return versions, frozenset(config_dependent)
+
+
+def _compile_pipeline(
+    enable_tracking: bool, enable_cache: bool, enable_parallel: bool
+) -> CompiledPipeline:
+    """Build Hamilton driver with all feature modules and optional caching."""
+    builder = driver.Builder().with_modules(*HAMILTON_MODULES)
+    cache_path: Optional[Path] = None
+
+    # Hamilton's result cache expects node results, not the futures handed
+    # around by the parallel executor
+    if enable_parallel and enable_cache:
+        logger.warning("Hamilton cache is disabled in parallel execution mode")
+        enable_cache = False
+
+    # Add caching if enabled
+    if enable_cache:
+        cache_type = settings.HAMILTON_CACHE_TYPE.lower()
+        if cache_type == "memory":
+            # In-memory cache - use default with_cache() without path
+            logger.info("Using in-memory Hamilton cache (non-persistent)")
+            builder = builder.with_cache()
+        else:
+            # File-based persistent cache
+            cache_path = _get_cache_path(enable_cache)
+            if cache_path:
+                logger.info(f"Using file-based Hamilton cache at {cache_path}")
+                builder = builder.with_cache(path=str(cache_path))
+
+    # Add execution tracker if enabled
+    tracker = None
+    if enable_tracking:
+        tracker = ExecutionTracker()
+        builder = builder.with_adapters(tracker)
+
+    executor = None
+    if enable_parallel:
+        executor = _create_parallel_executor()
+        builder = builder.with_adapters(executor)
+
+    dr = builder.build()
+    temporal_nodes = frozenset(
+        v.name for v in dr.what_is_downstream_of(TEMPORAL_INPUT)
+    ) - get_input_resource_names()
+    all_features = frozenset(get_metadata_registry().keys())
+    node_versions = get_node_versions()
+    result_versions, config_dependent = _feature_result_versions(
+        dr, all_features, temporal_nodes, node_versions
+    )
+
+    return CompiledPipeline(
+        driver=dr,
+        tracker=tracker,
+        all_features=all_features,
+        node_scopes=get_node_scopes(HAMILTON_MODULES),
+        temporal_nodes=temporal_nodes,
+        node_names=frozenset(v.name for v in dr.list_available_variables()),
+        node_versions=node_versions,
+        dag_version=get_dag_version(node_versions),
+        result_versions=MappingProxyType(result_versions),
+        config_dependent=config_dependent,
+        cache_enabled=enable_cache,
+        cache_path=cache_path,
+        cache_manager=get_cache_manager(cache_path) if enable_cache else None,
+        executor=executor,
+    )
+
+
+def get_compiled_pipeline(
+    enable_tracking: bool = True,
+    enable_cache: Optional[bool] = None,
+    enable_parallel: Optional[bool] = None,
+) -> CompiledPipeline:
+    """Get (or build) the compiled pipeline for this process and configuration."""
+    if enable_cache is None:
+        enable_cache = settings.HAMILTON_CACHE_ENABLED
+    if enable_parallel is None:
+        enable_parallel = settings.HAMILTON_PARALLEL_ENABLED
+    key = (enable_tracking, enable_cache, enable_parallel)
+    with _compiled_lock:
+        compiled = _compiled.get(key)
+        if compiled is None:
+            compiled = _compile_pipeline(enable_tracking, enable_cache, enable_parallel)
+            _compiled[key] = compiled
+            logger.info(
+                f"Compiled Hamilton pipeline ({len(compiled.all_features)} features, "
+                f"tracking={enable_tracking}, cache={compiled.cache_enabled}, "
+                f"parallel={enable_parallel})"
+            )
+        return compiled
+
+
+def warm_up_pipeline() -> None:
+    """Compile the default pipeline ahead of the first task (worker_process_init)."""
+    get_compiled_pipeline()
+
+
+def reset_compiled_pipelines() -> None:
+    """Drop compiled pipelines so the next use rebuilds them."""
+    with _compiled_lock:
+        compiled = list(_compiled.values())
+        _compiled.clear()
+    for pipeline in compiled:
+        if pipeline.executor is not None:
+            pipeline.executor.shutdown()
+
+
+@dataclass
+class BuildExecution:
+    """Outcome of one build of HamiltonPipeline.execute_many()."""
+
+    features: Dict[str, Any] = field(default_factory=dict)
+    execution: Optional[ExecutionResult] = None
+    skipped_features: Set[str] = field(default_factory=set)
+    missing_resources: Set[str] = field(default_factory=set)
+    # Nodes whose value was reused from an earlier build of the batch
+    shared_nodes: Set[str] = field(default_factory=set)
+    error: Optional[str] = None
+
+    @property
+    def succeeded(self) -> bool:
+        return self.error is None
+
+
+def _config_fingerprint(prepared: PreparedPipelineInput) -> str:
+    feature_config = prepared.inputs.feature_config
+    if feature_config is None:
+        return ""
+    return json.dumps(
+        [feature_config.current_repo_id, feature_config.feature_configs],
+        sort_keys=True,
+        default=str,
+    )
+
+
+def _scope_key(scope: NodeScope, prepared: PreparedPipelineInput) -> Optional[Hashable]:
+    """Key of the builds that share a node of this scope (None = not shareable)."""
+    repo = prepared.inputs.repo
+    if scope == NodeScope.REPO:
+        return ("repo", repo.id, _config_fingerprint(prepared))
+    if scope == NodeScope.COMMIT:
+        git_history = prepared.inputs.git_history
+        if not git_history.is_commit_available or not git_history.effective_sha:
+            return None
+        return ("commit", repo.id, git_history.effective_sha, _config_fingerprint(prepared))
+    return None
+
 
 class HamiltonPipeline:
     """
@@ -68,87 +422,128 @@ class HamiltonPipeline:
         db: Any,
         enable_tracking: bool = True,
         enable_cache: Optional[bool] = None,
+        enable_parallel: Optional[bool] = None,
     ):
         """
         Initialize the Hamilton pipeline.
 
+        The driver and feature registry come from the process-wide compiled
+        pipeline; only per-execution state lives on the instance.
+
         Args:
             db: MongoDB database instance
             enable_tracking: Whether to enable execution tracking (default: True)
             enable_cache: Whether to enable caching (default: from settings)
+            enable_parallel: Whether to run independent nodes on a thread pool
+                (default: from settings)
         """
         self.db = db
         self._enable_tracking = enable_tracking
-        self._enable_cache = (
-            enable_cache if enable_cache is not None else settings.HAMILTON_CACHE_ENABLED
-        )
-        self._tracker: Optional[ExecutionTracker] = None
-        self._cache_path: Optional[Path] = None
-        self._driver = self._build_driver()
-        self._all_features = self._get_all_feature_names()
+        self._compiled = get_compiled_pipeline(enable_tracking, enable_cache, enable_parallel)
+        self._enable_cache = self._compiled.cache_enabled
+        self._driver = self._compiled.driver
+        self._tracker = self._compiled.tracker
+        self._cache_path = self._compiled.cache_path
+        self._all_features = set(self._compiled.all_features)
+        self._last_execution: Optional[ExecutionResult] = None
         # Track skipped features and missing resources after run()
         self._last_skipped_features: Set[str] = set()
         self._last_missing_resources: Set[str] = set()
 
-    def _get_cache_path(self) -> Optional[Path]:
-        """
-        Get the cache directory path if caching is enabled.
-
-        Returns:
-            Path to cache directory if file-based caching enabled, None otherwise.
-        """
-        if not self._enable_cache:
-            return None
+    def get_active_features(self) -> Set[str]:
+        """Get set of all active feature names."""
+        return self._all_features.copy()
 
-        cache_type = settings.HAMILTON_CACHE_TYPE.lower()
+    def get_temporal_features(self) -> Set[str]:
+        """Get features that read results stored for earlier builds."""
+        return set(self._all_features & self._compiled.temporal_nodes)
 
-        if cache_type == "memory":
-            # Return None to signal in-memory cache (handled differently)
-            return None
-        else:
-            # File-based persistent cache (default)
-            cache_dir = Path(HAMILTON_CACHE_DIR)
-            cache_dir.mkdir(parents=True, exist_ok=True)
-            return cache_dir
-
-    def _build_driver(self) -> driver.Driver:
-        """Build Hamilton driver with all feature modules and optional caching."""
-        builder = driver.Builder().with_modules(*HAMILTON_MODULES)
-
-        # Add caching if enabled
-        if self._enable_cache:
-            cache_type = settings.HAMILTON_CACHE_TYPE.lower()
-            if cache_type == "memory":
-                # In-memory cache - use default with_cache() without path
-                logger.info("Using in-memory Hamilton cache (non-persistent)")
-                builder = builder.with_cache()
-            else:
-                # File-based persistent cache
-                self._cache_path = self._get_cache_path()
-                if self._cache_path:
-                    logger.info(f"Using file-based Hamilton cache at {self._cache_path}")
-                    builder = builder.with_cache(path=str(self._cache_path))
+    @property
+    def dag_version(self) -> str:
+        """Fingerprint of the node versions (FeatureVector.dag_version)."""
+        return self._compiled.dag_version
 
-        # Add execution tracker if enabled
-        if self._enable_tracking:
-            self._tracker = ExecutionTracker()
-            builder = builder.with_adapters(self._tracker)
+    @property
+    def node_versions(self) -> Dict[str, int]:
+        """Versions of the nodes not at the default version (FeatureVector.node_versions)."""
+        return dict(self._compiled.node_versions)
 
-        return builder.build()
+    def get_dirty_features(
+        self,
+        recorded_versions: Mapping[str, int],
+        features: Set[str],
+        recorded_dag_version: Optional[str] = None,
+    ) -> Set[str]:
+        """
+        Features among `features` whose value is stale under the current node versions.
 
-    def _get_all_feature_names(self) -> Set[str]:
-        """Get all actual feature output names (excludes inputs and intermediate nodes).
+        A feature is dirty when a node it depends on changed version since
+        `recorded_versions`. Temporal features read other builds' stored
+        features, which may have been refreshed, so any change makes them
+        dirty too. Every feature is dirty when `recorded_dag_version` was
+        computed with another RESULTS_VERSION.
+        """
+        return self._dirty_nodes(recorded_versions, recorded_dag_version) & features
+
+    def _dirty_nodes(
+        self, recorded_versions: Mapping[str, int], recorded_dag_version: Optional[str] = None
+    ) -> Set[str]:
+        """Changed nodes, their downstream nodes and temporal nodes (if anything changed)."""
+        if (
+            recorded_dag_version is not None
+            and get_results_version(recorded_dag_version) != RESULTS_VERSION
+        ):
+            return set(self._compiled.node_names)
+        changed = get_changed_nodes(recorded_versions, self._compiled.node_versions)
+        changed &= self._compiled.node_names
+        if not changed:
+            return set()
+        downstream = {v.name for v in self._driver.what_is_downstream_of(*changed)}
+        return changed | downstream | self._compiled.temporal_nodes
+
+    def get_feature_result_store(self) -> Optional[FeatureResultStore]:
+        """
+        Store of feature results shared across model configs and scenarios.
 
-        Uses build_metadata_registry() to get features from FEATURE_REGISTRY.
+        Pass it to prepare_pipeline_input() to skip features already
+        extracted for the build; None when reuse is disabled.
         """
-        from app.tasks.pipeline.feature_dag._metadata import build_metadata_registry
+        if not settings.PROCESSING_REUSE_FEATURE_RESULTS:
+            return None
+        return get_feature_result_store(
+            self.db, self._compiled.result_versions, self._compiled.config_dependent
+        )
 
-        registry = build_metadata_registry(HAMILTON_MODULES)
-        return set(registry.keys())
+    def _features_for_phase(self, features: Set[str], phase: ExtractionPhase) -> Set[str]:
+        """Restrict requested features to those computed in an extraction phase."""
+        if phase == ExtractionPhase.NON_TEMPORAL:
+            return features - self._compiled.temporal_nodes
+        if phase == ExtractionPhase.TEMPORAL:
+            return features & self._compiled.temporal_nodes
+        return set(features)
 
-    def get_active_features(self) -> Set[str]:
-        """Get set of all active feature names."""
-        return self._all_features.copy()
+    def _stored_overrides(
+        self,
+        final_vars: Set[str],
+        stored_features: Dict[str, Any],
+        exclude: FrozenSet[str] = frozenset(),
+    ) -> Dict[str, Any]:
+        """
+        Non-temporal upstream values taken from the build's stored features.
+
+        Lets the temporal pass (and builds with reused results) skip the
+        (git/API) nodes already computed. Only scalar features are used, as
+        list features are stored in a joined string format.
+        """
+        registry = get_metadata_registry()
+        upstream = {v.name for v in self._driver.what_is_upstream_of(*final_vars)}
+        overrides = {}
+        candidates = upstream - self._compiled.temporal_nodes - get_input_resource_names()
+        for name in candidates - exclude:
+            meta = registry.get(name)
+            if name in stored_features and meta and meta["data_type"] in _OVERRIDABLE_TYPES:
+                overrides[name] = stored_features[name]
+        return overrides
 
     def _filter_by_resources(
         self,
@@ -175,9 +570,58 @@ class HamiltonPipeline:
 
         return valid, skipped
 
+    def _execute_driver(
+        self,
+        final_vars: list,
+        inputs: Dict[str, Any],
+        overrides: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """Run the shared driver with a freshly reset tracker and keep its results."""
+        with self._compiled.lock:
+            self.reset_tracker()
+            try:
+                return self._driver.execute(final_vars, inputs=inputs, overrides=overrides)
+            finally:
+                self._last_execution = self._tracker.get_results() if self._tracker else None
+                self._record_cache_run(inputs)
+
+    def _record_cache_run(self, inputs: Dict[str, Any]) -> None:
+        """Account for the last execution in the cache manager (stats, repo index, eviction)."""
+        if self._compiled.cache_manager is None:
+            return
+        repo = inputs.get("repo")
+        try:
+            self._compiled.cache_manager.record_run(
+                self._driver.cache, raw_repo_id=getattr(repo, "id", None)
+            )
+        except Exception as e:
+            logger.warning(f"Failed to record Hamilton cache run: {e}")
+
+    def _build_inputs(self, prepared: PreparedPipelineInput) -> Dict[str, Any]:
+        """Hamilton inputs dict for a prepared build."""
+        inputs: Dict[str, Any] = {
+            "git_history": prepared.inputs.git_history,
+            "git_worktree": prepared.inputs.git_worktree,
+            "repo": prepared.inputs.repo,
+            "build_run": prepared.inputs.build_run,
+            "feature_config": prepared.inputs.feature_config,
+            "build_logs": prepared.inputs.build_logs,
+            "raw_build_runs": self.db.get_collection("raw_build_runs"),
+            "feature_vectors": self.db.get_collection("feature_vectors"),
+            "commit_change_stats": self.db.get_collection("commit_change_stats"),
+            "build_history_rollups": self.db.get_collection("build_history_rollups"),
+        }
+
+        if prepared.github_client:
+            inputs["github_client"] = prepared.github_client
+
+        return inputs
+
     def execute(
         self,
         prepared: PreparedPipelineInput,
+        phase: ExtractionPhase = ExtractionPhase.ALL,
+        stored_features: Optional[Dict[str, Any]] = None,
     ) -> Dict[str, Any]:
         """
         Execute Hamilton pipeline with prepared inputs.
@@ -187,55 +631,242 @@ class HamiltonPipeline:
 
         Args:
             prepared: PreparedPipelineInput from input_preparer
+            phase: Part of the requested features to compute (default: all)
+            stored_features: Features stored for this build by the
+                NON_TEMPORAL phase; used as overrides in the TEMPORAL phase
 
         Returns:
-            Dictionary of feature_name -> value
+            Dictionary of feature_name -> value (reused features included)
         """
 
         # Store tracking info from prepared input
         self._last_skipped_features = prepared.skipped_features
         self._last_missing_resources = prepared.missing_resources
 
-        if not prepared.has_features:
-            logger.warning("No features to extract")
-            return {}
-
-        # Build Hamilton inputs dict
-        inputs: Dict[str, Any] = {
-            "git_history": prepared.inputs.git_history,
-            "git_worktree": prepared.inputs.git_worktree,
-            "repo": prepared.inputs.repo,
-            "build_run": prepared.inputs.build_run,
-            "feature_config": prepared.inputs.feature_config,
-            "build_logs": prepared.inputs.build_logs,
-            "raw_build_runs": self.db.get_collection("raw_build_runs"),
-            "feature_vectors": self.db.get_collection("feature_vectors"),
+        reused = {
+            name: prepared.reused_features[name]
+            for name in self._features_for_phase(set(prepared.reused_features), phase)
         }
-
-        if prepared.github_client:
-            inputs["github_client"] = prepared.github_client
-
-        final_vars = list(prepared.features_to_extract)
-        logger.info(f"Extracting {len(final_vars)} features via Hamilton")
+        if not prepared.has_features:
+            if not reused:
+                logger.warning("No features to extract")
+            return reused
+
+        requested = self._features_for_phase(prepared.features_to_extract, phase)
+        if not requested:
+            logger.debug(f"No features to extract in {phase.value} phase")
+            return reused
+
+        inputs = self._build_inputs(prepared)
+        overrides: Dict[str, Any] = {}
+        if reused:
+            overrides.update(self._stored_overrides(requested, reused))
+        if phase == ExtractionPhase.TEMPORAL and stored_features:
+            overrides.update(self._stored_overrides(requested, stored_features))
+
+        final_vars = list(requested)
+        logger.info(
+            f"Extracting {len(final_vars)} features via Hamilton ({phase.value}), "
+            f"reusing {len(reused)} stored"
+        )
         logger.debug(f"Features: {sorted(final_vars)}")
 
         try:
-            result = self._driver.execute(final_vars, inputs=inputs)
+            result = self._execute_driver(final_vars, inputs, overrides or None)
 
             # Filter output to only return requested features
             input_names = get_input_resource_names()
             filtered_result = {
                 k: v
                 for k, v in dict(result).items()
-                if k in prepared.features_to_extract and k not in input_names
+                if k in requested and k not in input_names
             }
 
-            return filtered_result
+            return {**reused, **filtered_result}
 
         except Exception as e:
             logger.error(f"Hamilton pipeline failed: {e}")
             raise
 
+    def refresh_features(
+        self,
+        prepared: PreparedPipelineInput,
+        stored_features: Dict[str, Any],
+        recorded_versions: Mapping[str, int],
+        recorded_dag_version: Optional[str] = None,
+    ) -> Tuple[Dict[str, Any], Set[str]]:
+        """
+        Recompute the stored features of a build affected by node version changes.
+
+        Stored features that are still current are passed as overrides, so
+        only the changed nodes and the nodes downstream of them run.
+
+        Args:
+            prepared: PreparedPipelineInput selecting the build's stored features
+            stored_features: Features stored in the build's FeatureVector
+            recorded_versions: Node versions the vector was computed with
+            recorded_dag_version: dag_version the vector was computed with
+
+        Returns:
+            (refreshed feature values, dirty features that could not be
+            recomputed because their resources are unavailable)
+        """
+        self._last_skipped_features = prepared.skipped_features
+        self._last_missing_resources = prepared.missing_resources
+
+        dirty_nodes = self._dirty_nodes(recorded_versions, recorded_dag_version)
+        dirty = dirty_nodes & set(stored_features)
+        if not dirty:
+            return {}, set()
+
+        # Results stored by other scopes with the current versions
+        reused = {
+            name: prepared.reused_features[name]
+            for name in dirty & prepared.reused_features.keys()
+        }
+        requested = dirty & prepared.features_to_extract
+        unavailable = dirty - requested - reused.keys()
+        if not requested:
+            return reused, unavailable
+
+        overrides = self._stored_overrides(
+            requested, stored_features, exclude=frozenset(dirty_nodes)
+        )
+        overrides.update(self._stored_overrides(requested, reused))
+        logger.info(
+            f"Refreshing {len(requested)} features via Hamilton, "
+            f"reusing {len(reused)} stored and {len(overrides)} upstream values"
+        )
+
+        result = self._execute_driver(
+            sorted(requested), self._build_inputs(prepared), overrides or None
+        )
+        input_names = get_input_resource_names()
+        refreshed = {
+            k: v for k, v in dict(result).items() if k in requested and k not in input_names
+        }
+        return {**reused, **refreshed}, unavailable
+
+    def execute_many(
+        self,
+        prepared_inputs: Sequence[PreparedPipelineInput],
+        phase: ExtractionPhase = ExtractionPhase.ALL,
+        on_executed: Optional[Callable[[PreparedPipelineInput, BuildExecution], None]] = None,
+    ) -> List[BuildExecution]:
+        """
+        Execute the pipeline for a batch of builds.
+
+        Builds run one after another, but commit/repo scoped nodes are only
+        computed for the first build of each commit/repo; later builds get
+        the stored values as overrides. Values of nodes that failed or
+        logged an error are not shared (nor is anything without execution
+        tracking). A failing build does not stop the batch: its
+        BuildExecution carries the error.
+
+        Args:
+            prepared_inputs: PreparedPipelineInput per build, e.g. all builds
+                of one repository in processing order
+            phase: Part of the requested features to compute (default: all)
+            on_executed: Called with each build's input and outcome before
+                the next build runs, e.g. to store results that temporal
+                features of later builds read
+
+        Returns:
+            One BuildExecution per input, in input order
+        """
+        shared: Dict[Hashable, Dict[str, Any]] = {}
+        scoped_by_features: Dict[FrozenSet[str], List[str]] = {}
+        executions: List[BuildExecution] = []
+
+        for prepared in prepared_inputs:
+            outcome = BuildExecution(
+                skipped_features=set(prepared.skipped_features),
+                missing_resources=set(prepared.missing_resources),
+            )
+            executions.append(outcome)
+            reused = {
+                name: prepared.reused_features[name]
+                for name in self._features_for_phase(set(prepared.reused_features), phase)
+            }
+            outcome.features = dict(reused)
+            requested = frozenset(
+                self._features_for_phase(prepared.features_to_extract, phase)
+                if prepared.has_features
+                else ()
+            )
+            if requested:
+                self._execute_shared(
+                    prepared, requested, reused, outcome, shared, scoped_by_features
+                )
+            if on_executed is not None:
+                on_executed(prepared, outcome)
+
+        if executions:
+            self._last_skipped_features = executions[-1].skipped_features
+            self._last_missing_resources = executions[-1].missing_resources
+
+        reused_count = sum(len(e.shared_nodes) for e in executions)
+        logger.info(
+            f"Executed {len(executions)} builds via Hamilton ({phase.value}), "
+            f"reused {reused_count} commit/repo scoped node values"
+        )
+        return executions
+
+    def _execute_shared(
+        self,
+        prepared: PreparedPipelineInput,
+        requested: FrozenSet[str],
+        reused: Dict[str, Any],
+        outcome: BuildExecution,
+        shared: Dict[Hashable, Dict[str, Any]],
+        scoped_by_features: Dict[FrozenSet[str], List[str]],
+    ) -> None:
+        """Execute one build of execute_many(), sharing commit/repo scoped values."""
+        node_scopes = self._compiled.node_scopes
+        scoped = scoped_by_features.get(requested)
+        if scoped is None:
+            upstream = {v.name for v in self._driver.what_is_upstream_of(*requested)}
+            scoped = sorted((upstream | requested) & node_scopes.keys())
+            scoped_by_features[requested] = scoped
+
+        overrides: Dict[str, Any] = {}
+        if reused:
+            overrides.update(self._stored_overrides(requested, reused))
+        to_share: Dict[str, Hashable] = {}
+        for name in scoped:
+            key = _scope_key(node_scopes[name], prepared)
+            if key is None:
+                continue
+            values = shared.get(key, {})
+            if name in values:
+                overrides[name] = values[name]
+            else:
+                to_share[name] = key
+
+        final_vars = sorted(requested | to_share.keys())
+        try:
+            result = dict(
+                self._execute_driver(final_vars, self._build_inputs(prepared), overrides)
+            )
+        except Exception as e:
+            build_id = prepared.inputs.build_run.ci_run_id
+            logger.error(f"Hamilton pipeline failed for build {build_id}: {e}")
+            outcome.execution = self._last_execution
+            outcome.error = str(e)
+            return
+
+        unreliable = self.get_unreliable_features(set(to_share))
+        for name, key in to_share.items():
+            if name in result and name not in unreliable:
+                shared.setdefault(key, {})[name] = result[name]
+
+        input_names = get_input_resource_names()
+        outcome.features.update(
+            {k: v for k, v in result.items() if k in requested and k not in input_names}
+        )
+        outcome.execution = self._last_execution
+        outcome.shared_nodes = set(overrides) - reused.keys()
+
     def run(
         self,
         git_history: GitHistoryInput,
@@ -262,6 +893,8 @@ class HamiltonPipeline:
             "build_run": build_run,
             "raw_build_runs": self.db.get_collection("raw_build_runs"),
             "feature_vectors": self.db.get_collection("feature_vectors"),
+            "commit_change_stats": self.db.get_collection("commit_change_stats"),
+            "build_history_rollups": self.db.get_collection("build_history_rollups"),
         }
 
         if feature_config:
@@ -309,7 +942,7 @@ class HamiltonPipeline:
         logger.debug(f"Features: {sorted(final_vars)}")
 
         try:
-            result = self._driver.execute(final_vars, inputs=inputs)
+            result = self._execute_driver(final_vars, inputs)
 
             filtered_result = {
                 k: v
@@ -330,9 +963,37 @@ class HamiltonPipeline:
         Returns:
             ExecutionResult with timing and status info, or None if tracking disabled.
         """
-        if self._tracker:
-            return self._tracker.get_results()
-        return None
+        return self._last_execution
+
+    def get_unreliable_features(
+        self, features: Set[str], execution: Optional[ExecutionResult] = None
+    ) -> Set[str]:
+        """
+        Features among `features` that may hold an error value from an execution.
+
+        A feature is unreliable when its node, or a node upstream of it,
+        failed or logged a warning/error (extractors log and return None on
+        most error paths). Without execution tracking every feature is.
+
+        Args:
+            features: Feature names to check
+            execution: Execution to check, e.g. a BuildExecution's
+                (default: the last execution)
+        """
+        if execution is None:
+            execution = self._last_execution
+        if execution is None:
+            return set(features)
+        errored = {
+            info.node_name
+            for info in execution.node_results
+            if not info.success or info.logged_errors
+        }
+        errored &= self._compiled.node_names
+        if not errored:
+            return set()
+        downstream = {v.name for v in self._driver.what_is_downstream_of(*errored)}
+        return (errored | downstream) & features
 
     def reset_tracker(self) -> None:
         """Reset tracker state for reuse with another execution."""
@@ -341,41 +1002,65 @@ class HamiltonPipeline:
 
     def clear_cache(self) -> bool:
         """
-        Clear the Hamilton cache directory.
+        Clear the Hamilton cache.
 
-        Useful when:
-        - Feature extractors have been updated
-        - Cache has become stale or corrupted
-        - Need to force recomputation of all features
+        Prefer invalidate_cache() for changes limited to some nodes or repos:
+        a full clear makes every following build recompute all nodes.
 
         Returns:
             True if cache was cleared, False if no cache to clear.
         """
-        import shutil
-
-        if not self._enable_cache:
-            logger.info("Caching is disabled, nothing to clear")
+        if not self._enable_cache or self._cache_path is None:
+            logger.info("No file-based cache to clear")
             return False
 
-        cache_type = settings.HAMILTON_CACHE_TYPE.lower()
-        if cache_type == "memory":
-            logger.info("In-memory cache clears automatically on restart")
-            return False
+        with self._compiled.lock:
+            self._compiled.cache_manager.clear()
+        logger.info(f"Cleared Hamilton cache at {self._cache_path}")
+        return True
 
-        cache_dir = Path(HAMILTON_CACHE_DIR)
-        if cache_dir.exists():
-            shutil.rmtree(cache_dir)
-            cache_dir.mkdir(parents=True, exist_ok=True)
-            logger.info(f"Cleared Hamilton cache at {cache_dir}")
-            return True
+    def invalidate_cache(
+        self,
+        node_names: Optional[Iterable[str]] = None,
+        raw_repo_id: Optional[str] = None,
+    ) -> int:
+        """
+        Invalidate cached results of some nodes and/or of one repository.
 
-        return False
+        Args:
+            node_names: Nodes to invalidate (all nodes if None)
+            raw_repo_id: Only invalidate results computed for this repo
+
+        Returns:
+            Number of invalidated cache entries
+        """
+        if self._compiled.cache_manager is None or (node_names is None and raw_repo_id is None):
+            return 0
+        with self._compiled.lock:
+            return self._compiled.cache_manager.invalidate(node_names, raw_repo_id)
+
+    def evict_cache(self) -> Dict[str, int]:
+        """Run size/TTL eviction of the cache now (it also runs periodically after executions)."""
+        if self._compiled.cache_manager is None:
+            return {}
+        return self._compiled.cache_manager.evict()
+
+    def get_cache_stats(self) -> Optional[Dict[str, Any]]:
+        """Per-node hit/miss counters of this process and cache size, or None if disabled."""
+        if self._compiled.cache_manager is None:
+            return None
+        return self._compiled.cache_manager.stats()
 
     @property
     def is_cache_enabled(self) -> bool:
         """Check if caching is enabled for this pipeline instance."""
         return self._enable_cache
 
+    @property
+    def is_parallel(self) -> bool:
+        """Check if independent nodes run on a thread pool."""
+        return self._compiled.executor is not None
+
     @property
     def cache_path(self) -> Optional[Path]:
         """Get the cache directory path if using file-based cache."""
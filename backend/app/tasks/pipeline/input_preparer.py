@@ -5,7 +5,8 @@ This module acts as the preparation layer before Hamilton execution:
 1. Build all input objects from entities
 2. Check which resources are available
 3. Filter features based on available resources
-4. Return a PreparedPipelineInput ready for execution
+4. Reuse feature results stored for the build by another scope (optional)
+5. Return a PreparedPipelineInput ready for execution
 
 Usage:
     prepared = prepare_pipeline_input(
@@ -33,13 +34,14 @@ from app.tasks.pipeline.feature_dag._inputs import (
     build_hamilton_inputs,
 )
 from app.tasks.pipeline.feature_dag._metadata import (
-    build_metadata_registry,
+    get_metadata_registry,
     get_required_resources_for_features,
 )
 from app.tasks.pipeline.shared.resources import (
     check_resource_availability,
     get_input_resource_names,
 )
+from app.tasks.pipeline.utils.feature_results import FeatureResultKeys, FeatureResultStore
 
 logger = logging.getLogger(__name__)
 
@@ -55,7 +57,7 @@ class PreparedPipelineInput:
     # Hamilton inputs
     inputs: HamiltonInputs
 
-    # Features to extract (already filtered by resources)
+    # Features to extract (already filtered by resources and reused results)
     features_to_extract: Set[str]
 
     # Tracking info
@@ -69,6 +71,11 @@ class PreparedPipelineInput:
     # Optional GitHub client (kept separate as it's not in HamiltonInputs)
     github_client: Optional[GitHubClientInput] = None
 
+    # Stored values of requested features (formatted for storage), not re-extracted
+    reused_features: Dict[str, Any] = field(default_factory=dict)
+    # Result store keys of the reusable requested features
+    feature_result_keys: FeatureResultKeys = field(default_factory=dict)
+
     @property
     def has_features(self) -> bool:
         """Check if there are any features to extract."""
@@ -76,11 +83,8 @@ class PreparedPipelineInput:
 
 
 def _get_all_feature_names() -> Set[str]:
-    """Get all available feature names from metadata registry."""
-    from app.tasks.pipeline.constants import HAMILTON_MODULES
-
-    registry = build_metadata_registry(HAMILTON_MODULES)
-    return set(registry.keys())
+    """Get all available feature names from the frozen metadata registry."""
+    return set(get_metadata_registry().keys())
 
 
 def _filter_features_by_resources(
@@ -118,6 +122,7 @@ def prepare_pipeline_input(
     raw_build_run: RawBuildRun,
     selected_features: Optional[List[str]] = None,
     github_client: Optional[GitHubClientInput] = None,
+    feature_results: Optional[FeatureResultStore] = None,
 ) -> PreparedPipelineInput:
     """
     Prepare all inputs for Hamilton pipeline execution.
@@ -126,7 +131,8 @@ def prepare_pipeline_input(
     1. Builds all input objects from entities (git, repo, build, logs)
     2. Checks which resources are available
     3. Filters requested features based on available resources
-    4. Returns a PreparedPipelineInput ready for execution
+    4. Drops features whose current result is already stored for the build
+    5. Returns a PreparedPipelineInput ready for execution
 
     Args:
         raw_repo: RawRepository entity
@@ -134,6 +140,8 @@ def prepare_pipeline_input(
         raw_build_run: RawBuildRun entity
         selected_features: Optional list of features to extract (None = all)
         github_client: Optional GitHub client for API features
+        feature_results: Optional store of feature results shared across
+            scopes (see utils/feature_results.py)
 
     Returns:
         PreparedPipelineInput with validated inputs and features
@@ -190,6 +198,19 @@ def prepare_pipeline_input(
     input_names = get_input_resource_names()
     features_to_extract = valid_features - input_names
 
+    # Reuse results extracted for the same build by another model/scenario
+    reused_features: Dict[str, Any] = {}
+    feature_result_keys: FeatureResultKeys = {}
+    if feature_results is not None and features_to_extract:
+        feature_result_keys = feature_results.keys_for(features_to_extract, inputs.feature_config)
+        reused_features = feature_results.load(raw_build_run.id, feature_result_keys)
+        features_to_extract -= reused_features.keys()
+        if reused_features:
+            logger.debug(
+                f"Reusing {len(reused_features)} stored features for build "
+                f"{raw_build_run.ci_run_id}, extracting {len(features_to_extract)}"
+            )
+
     # Log warnings
     if skipped_features:
         logger.warning(
@@ -198,7 +219,7 @@ def prepare_pipeline_input(
         )
         logger.warning(f"Missing resources: {sorted(missing_resources)}")
 
-    if not features_to_extract:
+    if not features_to_extract and not reused_features:
         logger.warning("No features to extract after resource validation")
 
     return PreparedPipelineInput(
@@ -209,4 +230,6 @@ def prepare_pipeline_input(
         available_resources=available_resources,
         is_commit_available=inputs.is_commit_available,
         github_client=github_client,
+        reused_features=reused_features,
+        feature_result_keys=feature_result_keys,
     )
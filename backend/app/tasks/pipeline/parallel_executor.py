@@ -0,0 +1,172 @@
+"""
+Thread-pool execution of independent Hamilton nodes.
+
+By default the driver walks the DAG and runs every node serially, although
+the expensive nodes of one build (git subprocesses, GitHub API calls, log
+parsing, history queries against Mongo) mostly do not depend on each other.
+ParallelNodeExecutor is a Hamilton lifecycle adapter that submits each node
+to a thread pool instead:
+
+- a node's upstream results are futures; the worker waits for them before
+  running the node, so dependencies are still respected;
+- nodes reading a resource class (git, github, logs, mongo) hold a slot of
+  that class while running, bounding e.g. concurrent GitHub calls;
+- node lifecycle hooks (ExecutionTracker) run inside the worker around the
+  node itself, so per-node timings stay accurate.
+
+Nodes are submitted in dependency order and resource slots are only taken
+once all inputs are resolved, so a bounded pool cannot deadlock.
+
+Usage:
+    executor = ParallelNodeExecutor(max_workers=8, resource_limits={"git": 4})
+    driver = Builder().with_modules(...).with_adapters(tracker, executor).build()
+"""
+
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from contextlib import ExitStack
+from typing import Any, Callable, Dict, FrozenSet, List, Mapping, Optional
+
+from hamilton.graph import node
+from hamilton.lifecycle import base
+
+from app.tasks.pipeline.shared.resources import INPUT_REGISTRY, FeatureResource
+
+logger = logging.getLogger(__name__)
+
+
+# Resource classes that get their own concurrency limit
+RESOURCE_CLASSES: Dict[str, FrozenSet[FeatureResource]] = {
+    "git": frozenset({FeatureResource.GIT_HISTORY, FeatureResource.GIT_WORKTREE}),
+    "github": frozenset({FeatureResource.GITHUB_API}),
+    "logs": frozenset({FeatureResource.BUILD_LOGS}),
+    "mongo": frozenset(
+        {
+            FeatureResource.RAW_BUILD_RUNS,
+            FeatureResource.FEATURE_VECTORS,
+            FeatureResource.COMMIT_CHANGE_STATS,
+            FeatureResource.BUILD_HISTORY_ROLLUPS,
+        }
+    ),
+}
+
+# Hamilton input name -> resource class
+_INPUT_CLASSES: Dict[str, str] = {
+    name: class_name
+    for name, spec in INPUT_REGISTRY.items()
+    for class_name, resources in RESOURCE_CLASSES.items()
+    if spec.resource in resources
+}
+
+
+def get_node_resource_classes(node_: node.Node) -> List[str]:
+    """Resource classes a node reads directly, sorted (the slot acquisition order)."""
+    return sorted({_INPUT_CLASSES[name] for name in node_.input_types if name in _INPUT_CLASSES})
+
+
+def _resolve(value: Any) -> Any:
+    return value.result() if isinstance(value, Future) else value
+
+
+class ParallelNodeExecutor(
+    base.BaseDoRemoteExecute,
+    base.BaseDoBuildResult,
+    base.BasePreGraphExecute,
+    base.BasePostGraphExecute,
+):
+    """
+    Hamilton lifecycle adapter running nodes on a shared thread pool.
+
+    One instance belongs to one compiled driver; executions of that driver
+    must not overlap (HamiltonPipeline serializes them).
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 8,
+        resource_limits: Optional[Mapping[str, int]] = None,
+    ):
+        """
+        Args:
+            max_workers: Size of the thread pool
+            resource_limits: Max concurrent nodes per resource class
+                (see RESOURCE_CLASSES); missing or non-positive means unbounded
+        """
+        self.max_workers = max_workers
+        self.resource_limits = {
+            name: limit for name, limit in (resource_limits or {}).items() if limit and limit > 0
+        }
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="hamilton-node"
+        )
+        self._semaphores = {
+            name: threading.BoundedSemaphore(limit)
+            for name, limit in self.resource_limits.items()
+        }
+        self._pending: List[Future] = []
+
+    def _run_node(
+        self,
+        resource_classes: List[str],
+        execute_lifecycle_for_node: Callable,
+        kwargs: Dict[str, Any],
+    ) -> Any:
+        resolved = {name: _resolve(value) for name, value in kwargs.items()}
+        with ExitStack() as stack:
+            for class_name in resource_classes:
+                semaphore = self._semaphores.get(class_name)
+                if semaphore is not None:
+                    stack.enter_context(semaphore)
+            return execute_lifecycle_for_node(**resolved)
+
+    def do_remote_execute(
+        self,
+        *,
+        node: node.Node,
+        execute_lifecycle_for_node: Callable,
+        **kwargs: Any,
+    ) -> Future:
+        """Submit a node; its result is a future consumed by downstream nodes."""
+        future = self._executor.submit(
+            self._run_node,
+            get_node_resource_classes(node),
+            execute_lifecycle_for_node,
+            kwargs,
+        )
+        self._pending.append(future)
+        return future
+
+    def pre_graph_execute(
+        self,
+        *,
+        run_id: str,
+        graph: Any,
+        final_vars: List[str],
+        inputs: Dict[str, Any],
+        overrides: Dict[str, Any],
+    ) -> None:
+        """Start a new execution with no pending nodes."""
+        self._pending = []
+
+    def post_graph_execute(
+        self,
+        *,
+        run_id: str,
+        graph: Any,
+        success: bool,
+        error: Optional[Exception],
+        results: Optional[Dict[str, Any]],
+    ) -> None:
+        """Wait for every submitted node, so no work outlives the execution."""
+        pending, self._pending = self._pending, []
+        if pending:
+            wait(pending)
+
+    def do_build_result(self, *, outputs: Dict[str, Any]) -> Dict[str, Any]:
+        """Resolve output futures; re-raises the error of a failed node."""
+        return {name: _resolve(value) for name, value in outputs.items()}
+
+    def shutdown(self) -> None:
+        """Stop the thread pool (pending nodes are finished first)."""
+        self._executor.shutdown(wait=True)
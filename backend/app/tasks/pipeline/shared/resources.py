@@ -27,6 +27,8 @@ class FeatureResource(str, Enum):
     # Collection access
     RAW_BUILD_RUNS = "raw_build_runs"  # raw_build_runs collection
     FEATURE_VECTORS = "feature_vectors"  # feature_vectors collection (single source of truth)
+    COMMIT_CHANGE_STATS = "commit_change_stats"  # Persisted per-commit diff stats
+    BUILD_HISTORY_ROLLUPS = "build_history_rollups"  # Running build-history counters
 
     # Git resources (require ingestion)
     GIT_HISTORY = "git_history"  # Git bare repo (clone_repo task)
@@ -97,6 +99,16 @@ INPUT_REGISTRY: Dict[str, InputSpec] = {
         resource=FeatureResource.FEATURE_VECTORS,
         is_core=True,
     ),
+    "commit_change_stats": InputSpec(
+        name="commit_change_stats",
+        resource=FeatureResource.COMMIT_CHANGE_STATS,
+        is_core=True,
+    ),
+    "build_history_rollups": InputSpec(
+        name="build_history_rollups",
+        resource=FeatureResource.BUILD_HISTORY_ROLLUPS,
+        is_core=True,
+    ),
     # Git resources - require ingestion
     "git_history": InputSpec(
         name="git_history",
@@ -139,7 +151,8 @@ def get_ingestion_only_resources(resources: set) -> set:
     Filter resources to only include those requiring ingestion.
 
     Removes core resources that are always available from DB
-    (repo, build_run, raw_build_runs, feature_vectors, feature_config).
+    (repo, build_run, raw_build_runs, feature_vectors, commit_change_stats,
+    build_history_rollups, feature_config).
 
     Args:
         resources: Set of resource names
@@ -1,5 +1,9 @@
 """Pipeline utility modules."""
 
+from app.tasks.pipeline.utils.git_object_reader import (
+    GitObjectReader,
+    get_object_reader,
+)
 from app.tasks.pipeline.utils.git_utils import (
     get_author_email,
     get_commit_info,
@@ -18,4 +22,6 @@ __all__ = [
     "get_author_email",
     "get_committer_email",
     "run_git",
+    "GitObjectReader",
+    "get_object_reader",
 ]
@@ -0,0 +1,131 @@
+"""
+Incremental author identity clustering.
+
+Commit author names are grouped into clusters of names that belong to the
+same person (a similarity above a threshold against the cluster's first
+name). Comparing every new name with every known cluster is
+O(builds x authors) Jaro-Winkler evaluations, so AuthorClusterIndex keeps:
+
+- aliases: every name already assigned (normalized) -> cluster id, so a
+  known name is resolved without any comparison;
+- blocking keys (name tokens, initials, prefix and suffix of the name
+  without spaces, also with first/last name swapped) -> cluster ids, so a
+  new name is first compared with clusters sharing a key.
+
+Blocking keys are a heuristic: similar names can share no key (e.g. names
+differing in their first and last characters only). A name that matches
+no blocked candidate is therefore compared with every other cluster before
+a new cluster is created, so it never splits a person the exhaustive scan
+would have merged. When a name matches several clusters, a blocked
+candidate wins over an older unblocked one.
+
+The index is serializable and persisted per repository with the build
+history rollups (utils/build_history_rollups.py). Cluster ids are assigned
+in the order names are added, so folding builds in the same order yields
+the same ids.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Any, Callable, Dict, List, Optional, Set
+
+# Returns True when two author names belong to the same person
+SameAuthor = Callable[[str, str], bool]
+
+_TOKEN_RE = re.compile(r"[^\w]+")
+
+
+def normalize_author(name: str) -> str:
+    """Lowercased name with collapsed whitespace (the alias key)."""
+    return " ".join(name.lower().split())
+
+
+def blocking_keys(name: str) -> Set[str]:
+    """Cheap keys shared by names that can be similar."""
+    normalized = normalize_author(name)
+    tokens = [token for token in _TOKEN_RE.split(normalized) if token]
+    compact = "".join(tokens)
+    keys = {f"t:{token}" for token in tokens if len(token) >= 2}
+    # Forward/backward Jaro-Winkler rewards a common prefix/suffix, also
+    # with first and last name swapped
+    variants = [compact]
+    if len(tokens) >= 2:
+        variants.append(tokens[1] + tokens[0])
+        keys.add("i:" + "".join(sorted(token[0] for token in tokens)))
+    for variant in variants:
+        if variant:
+            keys.add(f"p:{variant[:2]}")
+            keys.add(f"s:{variant[-2:]}")
+    return keys
+
+
+class AuthorClusterIndex:
+    """Author name -> cluster id mapping of one repository."""
+
+    def __init__(
+        self,
+        names: Optional[List[str]] = None,
+        aliases: Optional[Dict[str, int]] = None,
+    ):
+        """
+        Args:
+            names: Representative (first seen) name per cluster id
+            aliases: Normalized name -> cluster id
+        """
+        self.names: List[str] = list(names or [])
+        self.aliases: Dict[str, int] = dict(aliases or {})
+        self._blocks: Dict[str, Set[int]] = {}
+        for cluster_id, name in enumerate(self.names):
+            self._index(cluster_id, name)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def _index(self, cluster_id: int, name: str) -> None:
+        for key in blocking_keys(name):
+            self._blocks.setdefault(key, set()).add(cluster_id)
+
+    def lookup(self, author: str, same_author: SameAuthor) -> Optional[int]:
+        """Cluster id of an author name, or None if it matches no cluster."""
+        cluster_id = self.aliases.get(normalize_author(author))
+        if cluster_id is not None:
+            return cluster_id
+
+        candidates: Set[int] = set()
+        for key in blocking_keys(author):
+            candidates.update(self._blocks.get(key, ()))
+        # Lowest id first: a name joins the oldest matching cluster
+        for cluster_id in sorted(candidates):
+            if same_author(author, self.names[cluster_id]):
+                return cluster_id
+        # Blocking keys are lossy: check the remaining clusters before giving up
+        for cluster_id, name in enumerate(self.names):
+            if cluster_id not in candidates and same_author(author, name):
+                return cluster_id
+        return None
+
+    def assign(self, author: str, same_author: SameAuthor) -> int:
+        """Cluster id of an author name, creating a cluster for a new person."""
+        cluster_id = self.lookup(author, same_author)
+        if cluster_id is None:
+            cluster_id = len(self.names)
+            self.names.append(author)
+            self._index(cluster_id, author)
+        self.aliases.setdefault(normalize_author(author), cluster_id)
+        return cluster_id
+
+    def to_doc(self) -> Dict[str, Any]:
+        # Names may contain "." or "$", so aliases are stored as pairs
+        return {
+            "names": list(self.names),
+            "aliases": [[alias, cluster_id] for alias, cluster_id in self.aliases.items()],
+        }
+
+    @classmethod
+    def from_doc(cls, doc: Optional[Dict[str, Any]]) -> AuthorClusterIndex:
+        doc = doc or {}
+        return cls(
+            names=doc.get("names") or [],
+            aliases=dict(doc.get("aliases") or []),
+        )
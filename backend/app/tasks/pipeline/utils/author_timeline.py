@@ -0,0 +1,187 @@
+"""
+Per-author commit timeline derived from the commit index.
+
+For every author identity (mailmapped email, lowercased) keeps the sorted
+committer timestamps of their commits, so "first commit", "commits up to T"
+and "last commit before T" are binary searches instead of a
+`git log --all --author=...` scan per question.
+
+Authors can be looked up by email or name, raw or mailmapped; anything else
+is matched like `git log --author=<pattern>` against the known identities.
+
+The timeline is derived from the repo's CommitIndex and cached per process.
+When a fetch adds commits, only the new records are merged in.
+"""
+
+from __future__ import annotations
+
+import heapq
+import threading
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from app.tasks.pipeline.utils.commit_index import CommitIndex, CommitRecord, get_commit_index
+from app.tasks.pipeline.utils.file_history import identity_matches
+
+
+def normalize_identity(name: str, email: str) -> str:
+    """Normalized identity key: lowercased email, or name when there is no email."""
+    email = (email or "").strip().lower()
+    return email or (name or "").strip().lower()
+
+
+@dataclass
+class AuthorTimeline:
+    """Sorted commit timestamps per normalized author identity."""
+
+    timestamps: Dict[str, List[int]] = field(default_factory=dict)
+    # Commit SHAs parallel to timestamps
+    shas: Dict[str, List[str]] = field(default_factory=dict)
+    # Lowercased raw/mailmapped emails and names -> identity keys
+    aliases: Dict[str, Set[str]] = field(default_factory=dict)
+    # "Name <email>" strings seen per identity (for --author style patterns)
+    raw_identities: Dict[str, Set[str]] = field(default_factory=dict)
+    # Position in CommitIndex insertion order covered so far
+    covered: int = 0
+    last_sha: Optional[str] = None
+
+    def add(self, records: Iterable[CommitRecord]) -> None:
+        for record in records:
+            name = record.mailmap_name or record.author_name
+            email = record.mailmap_email or record.author_email
+            key = normalize_identity(name, email)
+
+            times = self.timestamps.setdefault(key, [])
+            shas = self.shas.setdefault(key, [])
+            if not times or times[-1] <= record.committer_ts:
+                times.append(record.committer_ts)
+                shas.append(record.sha)
+            else:
+                pos = bisect_right(times, record.committer_ts)
+                times.insert(pos, record.committer_ts)
+                shas.insert(pos, record.sha)
+
+            for alias in (name, email, record.author_name, record.author_email):
+                if alias:
+                    self.aliases.setdefault(alias.strip().lower(), set()).add(key)
+            self.raw_identities.setdefault(key, set()).add(
+                f"{record.author_name} <{record.author_email}>"
+            )
+            self.covered += 1
+            self.last_sha = record.sha
+
+    def resolve(self, author: str) -> List[str]:
+        """Identity keys for an author email, name or --author style pattern."""
+        keys = self.aliases.get(author.strip().lower())
+        if keys:
+            return sorted(keys)
+        return sorted(
+            key
+            for key, raws in self.raw_identities.items()
+            if any(identity_matches(author, *_split_identity(raw)) for raw in raws)
+        )
+
+    def _times(self, author: str) -> List[int]:
+        keys = self.resolve(author)
+        if len(keys) == 1:
+            return self.timestamps[keys[0]]
+        return list(heapq.merge(*(self.timestamps[k] for k in keys)))
+
+    def first_commit_ts(self, author: str) -> Optional[int]:
+        """Timestamp of the author's first commit."""
+        times = self._times(author)
+        return times[0] if times else None
+
+    def count_commits(self, author: str, until_ts: Optional[int] = None) -> int:
+        """Number of the author's commits with timestamp <= until_ts (all if None)."""
+        times = self._times(author)
+        if until_ts is None:
+            return len(times)
+        return bisect_right(times, until_ts)
+
+    def last_commit_ts(self, author: str, until_ts: int, skip: int = 0) -> Optional[int]:
+        """
+        Timestamp of the author's latest commit with timestamp <= until_ts.
+
+        Args:
+            skip: Skip this many of the latest matching commits
+        """
+        times = self._times(author)
+        pos = bisect_right(times, until_ts) - 1 - skip
+        return times[pos] if pos >= 0 else None
+
+    def commits_before(self, author: str, until_ts: int) -> Iterator[Tuple[int, str]]:
+        """
+        The author's (timestamp, sha) with timestamp <= until_ts, newest first.
+
+        The timeline spans every ref; callers that need `git log <sha>`
+        semantics check ancestry of each candidate and stop at the first hit.
+        """
+        heap = []
+        for key in self.resolve(author):
+            pos = bisect_right(self.timestamps[key], until_ts) - 1
+            if pos >= 0:
+                heap.append((-self.timestamps[key][pos], key, pos))
+        heapq.heapify(heap)
+        while heap:
+            neg_ts, key, pos = heapq.heappop(heap)
+            yield -neg_ts, self.shas[key][pos]
+            if pos > 0:
+                heapq.heappush(heap, (-self.timestamps[key][pos - 1], key, pos - 1))
+
+
+def _split_identity(raw: str) -> Tuple[str, str]:
+    name, _, rest = raw.partition(" <")
+    return name, rest[:-1] if rest.endswith(">") else rest
+
+
+def build_author_timeline(commit_index: CommitIndex) -> AuthorTimeline:
+    """Build the timeline from every record of a commit index."""
+    timeline = AuthorTimeline()
+    timeline.add(commit_index.commits.values())
+    return timeline
+
+
+# =============================================================================
+# Per-process cache
+# =============================================================================
+
+_cache_lock = threading.Lock()
+_cache: Dict[str, Tuple[CommitIndex, AuthorTimeline]] = {}
+
+
+def get_author_timeline(repo_path: Path) -> Optional[AuthorTimeline]:
+    """
+    Get the author timeline for a repo, or None if it has no commit index.
+
+    When the commit index changed, records added since the cached timeline was
+    built are merged in; a rebuilt index triggers a full rebuild.
+    """
+    commit_index = get_commit_index(repo_path)
+    if commit_index is None:
+        return None
+
+    key = str(repo_path)
+    with _cache_lock:
+        cached = _cache.get(key)
+        if cached and cached[0] is commit_index and cached[1].covered == len(commit_index):
+            return cached[1]
+
+        timeline = cached[1] if cached else None
+        new_records = (
+            commit_index.records_after(timeline.covered, timeline.last_sha) if timeline else None
+        )
+        if new_records is None:
+            timeline = build_author_timeline(commit_index)
+        else:
+            timeline.add(new_records)
+        _cache[key] = (commit_index, timeline)
+        return timeline
+
+
+def clear_author_timeline_cache() -> None:
+    """Drop all author timelines cached in this process."""
+    with _cache_lock:
+        _cache.clear()
@@ -0,0 +1,231 @@
+"""
+Per-repository blob metrics cache.
+
+Memoizes per-file code metrics (line count, test cases, assertions) by blob
+SHA, so SLOC / test density for a commit only has to read the blobs that
+changed since previously analyzed commits.
+
+Entries are keyed by (blob_sha, strategy_key). The strategy key identifies
+the language strategy (and its version) used to count test cases and
+assertions; plain line counts use an empty key. Bumping a strategy's
+`version` therefore invalidates only that strategy's entries.
+
+Entries are persisted in an SQLite database next to the bare repo, so
+workers processing different builds of the same repo share results. Saves
+only insert new rows: SQLite's write lock serializes concurrent writers and
+no worker overwrites entries saved by another. Lookups go through a bounded
+per-process LRU, then the database:
+
+    LRU (MAX_CACHED_ENTRIES per repo) -> SQLite -> caller reads the blob
+"""
+
+from __future__ import annotations
+
+import logging
+import sqlite3
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Bump when the cached value layout changes (drops all entries)
+CACHE_VERSION = 1
+
+# Stored inside the bare repo so it shares the repo's lifecycle
+CACHE_FILENAME = "buildguard-blob-metrics.db"
+
+# Pickled cache written by earlier versions; removed when found
+LEGACY_CACHE_FILENAME = "buildguard-blob-metrics.pkl"
+
+# Persisted entries kept per repo; the oldest ones are dropped beyond this
+MAX_CACHE_ENTRIES = 1_000_000
+
+# Entries kept in memory per repo, and repos kept per process
+MAX_CACHED_ENTRIES = 100_000
+MAX_CACHED_REPOS = 8
+
+# Seconds a writer waits for another worker's write to finish
+LOCK_TIMEOUT_SECONDS = 30
+
+# SQLite limits the number of bound parameters per statement
+_SQL_BATCH_SIZE = 400
+
+# (line_count, test_cases, asserts)
+BlobMetrics = Tuple[int, int, int]
+BlobKey = Tuple[str, str]
+
+
+def get_cache_path(repo_path: Path) -> Path:
+    """Path of the persisted blob metrics cache for a bare repo."""
+    return Path(repo_path) / CACHE_FILENAME
+
+
+class BlobMetricsCache:
+    """Blob metrics for one repository."""
+
+    def __init__(self, repo_path: Path, max_entries: int = MAX_CACHED_ENTRIES):
+        self.repo_path = Path(repo_path)
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[BlobKey, BlobMetrics]" = OrderedDict()
+        self._new: Dict[BlobKey, BlobMetrics] = {}
+        self._lock = threading.Lock()
+        self._initialized = False
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def get(self, blob_sha: str, strategy_key: str = "") -> Optional[BlobMetrics]:
+        return self.get_many([(blob_sha, strategy_key)]).get((blob_sha, strategy_key))
+
+    def get_many(self, keys: Iterable[BlobKey]) -> Dict[BlobKey, BlobMetrics]:
+        """Cached metrics of the keys that have an entry."""
+        found: Dict[BlobKey, BlobMetrics] = {}
+        missing: List[BlobKey] = []
+        with self._lock:
+            for key in dict.fromkeys(keys):
+                value = self.entries.get(key)
+                if value is None:
+                    value = self._new.get(key)
+                if value is None:
+                    missing.append(key)
+                else:
+                    self.entries[key] = value
+                    self.entries.move_to_end(key)
+                    found[key] = value
+        if missing:
+            stored = self._load(missing)
+            found.update(stored)
+            with self._lock:
+                self._remember(stored)
+        return found
+
+    def put(self, blob_sha: str, strategy_key: str, metrics: BlobMetrics) -> None:
+        key = (blob_sha, strategy_key)
+        with self._lock:
+            self._new[key] = metrics
+            self._remember({key: metrics})
+
+    def _remember(self, values: Dict[BlobKey, BlobMetrics]) -> None:
+        """Add values to the LRU (caller holds _lock)."""
+        for key, value in values.items():
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    # --- Persistence ---------------------------------------------------------
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Connection committed on success and always closed."""
+        conn = sqlite3.connect(str(get_cache_path(self.repo_path)), timeout=LOCK_TIMEOUT_SECONDS)
+        try:
+            if not self._initialized:
+                self._initialize(conn)
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _initialize(self, conn: sqlite3.Connection) -> None:
+        """Create (or reset, on a CACHE_VERSION change) the entries table."""
+        conn.execute("PRAGMA journal_mode=WAL")
+        with conn:
+            if conn.execute("PRAGMA user_version").fetchone()[0] != CACHE_VERSION:
+                conn.execute("DROP TABLE IF EXISTS blob_metrics")
+                conn.execute(f"PRAGMA user_version = {CACHE_VERSION}")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS blob_metrics (
+                    blob_sha TEXT NOT NULL,
+                    strategy_key TEXT NOT NULL,
+                    line_count INTEGER NOT NULL,
+                    test_cases INTEGER NOT NULL,
+                    asserts INTEGER NOT NULL,
+                    UNIQUE (blob_sha, strategy_key)
+                )
+                """
+            )
+        legacy_path = self.repo_path / LEGACY_CACHE_FILENAME
+        try:
+            legacy_path.unlink(missing_ok=True)
+        except OSError:
+            pass
+        self._initialized = True
+
+    def _load(self, keys: List[BlobKey]) -> Dict[BlobKey, BlobMetrics]:
+        if not get_cache_path(self.repo_path).exists():
+            return {}
+        stored: Dict[BlobKey, BlobMetrics] = {}
+        try:
+            with self._connect() as conn:
+                for i in range(0, len(keys), _SQL_BATCH_SIZE):
+                    batch = keys[i : i + _SQL_BATCH_SIZE]
+                    condition = " OR ".join(["(blob_sha = ? AND strategy_key = ?)"] * len(batch))
+                    rows = conn.execute(
+                        "SELECT blob_sha, strategy_key, line_count, test_cases, asserts "
+                        f"FROM blob_metrics WHERE {condition}",
+                        [value for key in batch for value in key],
+                    )
+                    for blob_sha, strategy_key, line_count, cases, asserts in rows:
+                        stored[(blob_sha, strategy_key)] = (line_count, cases, asserts)
+        except sqlite3.Error as e:
+            logger.warning(f"Failed to load blob metrics cache for {self.repo_path}: {e}")
+        return stored
+
+    def save(self) -> None:
+        """Insert new entries into the persisted cache."""
+        with self._lock:
+            if not self._new:
+                return
+            new_entries, self._new = self._new, {}
+
+        try:
+            with self._connect() as conn:
+                conn.executemany(
+                    "INSERT OR IGNORE INTO blob_metrics "
+                    "(blob_sha, strategy_key, line_count, test_cases, asserts) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    [(*key, *metrics) for key, metrics in new_entries.items()],
+                )
+                pruned = conn.execute(
+                    "DELETE FROM blob_metrics "
+                    "WHERE rowid <= (SELECT MAX(rowid) FROM blob_metrics) - ?",
+                    (MAX_CACHE_ENTRIES,),
+                ).rowcount
+            if pruned > 0:
+                logger.info(f"Pruned {pruned} blob metrics cache entries for {self.repo_path}")
+        except sqlite3.Error as e:
+            logger.warning(f"Failed to save blob metrics cache for {self.repo_path}: {e}")
+
+
+# =============================================================================
+# Per-process cache
+# =============================================================================
+
+_cache_lock = threading.Lock()
+_caches: "OrderedDict[str, BlobMetricsCache]" = OrderedDict()
+
+
+def get_blob_metrics_cache(repo_path: Path) -> BlobMetricsCache:
+    """Get the blob metrics cache for a repo (the least recently used repo is dropped)."""
+    key = str(repo_path)
+    with _cache_lock:
+        cache = _caches.get(key)
+        if cache is None:
+            cache = BlobMetricsCache(Path(repo_path))
+            _caches[key] = cache
+            while len(_caches) > MAX_CACHED_REPOS:
+                _caches.popitem(last=False)
+        else:
+            _caches.move_to_end(key)
+        return cache
+
+
+def clear_blob_metrics_cache() -> None:
+    """Drop all blob metrics caches held in this process."""
+    with _cache_lock:
+        _caches.clear()
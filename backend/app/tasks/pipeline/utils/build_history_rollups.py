@@ -0,0 +1,544 @@
+"""
+Materialized build-history rollups.
+
+The history features (previous build, project/author fail rates, committer
+experience) used to re-query up to 500 previous raw_build_runs per build and
+recount them in Python, silently ignoring anything older. This module keeps
+running counters in the `build_history_rollups` collection instead:
+
+- one `repo_state` document per repo: a cursor into raw_build_runs
+  (created_at, _id) plus running totals, a ring buffer of recent outcomes
+  and the same counters per author cluster, along with the repo's author
+  clustering (utils/author_clusters.py);
+- one `build` document per build: the counters as they were right before
+  that build (BuildHistoryRollup), written while the state advances.
+
+get_build_rollup() answers from the build document when it exists (one
+read). Otherwise it folds the builds between the cursor and the requested
+build, oldest first, and saves their snapshots and the advanced state.
+Before folding, the builds up to the cursor are counted: if that differs
+from the folded total, builds were backfilled behind the cursor and the
+repo's rollups are rebuilt.
+Snapshots are deterministic, so concurrent workers folding the same range
+write identical documents; the state is saved with a compare-and-swap on
+its revision and a lost race is simply dropped.
+
+`lineage` documents cache the outcome/churn history along the commit
+lineage used by prev_build_history_features (see get_lineage_rollup). A
+lineage is only cached once every build on it has its conclusion and
+completed features; rebuilding the rollups or retrying failed builds drops
+the repo's lineages (invalidate_lineage_rollups).
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from bson import ObjectId
+from pymongo import ASCENDING, IndexModel, UpdateOne
+from pymongo.collection import Collection
+from pymongo.errors import DuplicateKeyError
+
+from app.tasks.pipeline.utils.author_clusters import AuthorClusterIndex, SameAuthor
+
+logger = logging.getLogger(__name__)
+
+COLLECTION_NAME = "build_history_rollups"
+
+# Bump when the folding logic changes; older documents are ignored
+ROLLUP_VERSION = 4
+
+# Outcomes kept in each ring buffer (most recent first)
+RING_SIZE = 20
+
+# raw_build_runs read per query while advancing the state
+ADVANCE_BATCH_SIZE = 1_000
+
+KIND_STATE = "repo_state"
+KIND_BUILD = "build"
+KIND_LINEAGE = "lineage"
+
+_RAW_PROJECTION = {
+    "_id": 1,
+    "ci_run_id": 1,
+    "conclusion": 1,
+    "commit_author": 1,
+    "created_at": 1,
+    "completed_at": 1,
+}
+
+
+# =============================================================================
+# Rollup values
+# =============================================================================
+
+
+@dataclass
+class OutcomeCounters:
+    """Build counts with a ring buffer of recent failure flags (most recent first)."""
+
+    total: int = 0
+    failed: int = 0
+    recent: List[bool] = field(default_factory=list)
+
+    def add(self, failed: bool) -> None:
+        self.total += 1
+        self.failed += int(failed)
+        self.recent = [failed, *self.recent[: RING_SIZE - 1]]
+
+    def fail_rate(self) -> Optional[float]:
+        return round(self.failed / self.total, 2) if self.total else None
+
+    def recent_fail_rate(self, window: int) -> Optional[float]:
+        recent = self.recent[:window]
+        return round(sum(recent) / len(recent), 2) if recent else None
+
+
+@dataclass
+class BuildHistoryRollup:
+    """History of a repository right before one build."""
+
+    total_builds: int = 0
+    author_clusters: int = 0
+    # Builds concluded with success/failure
+    project: OutcomeCounters = field(default_factory=OutcomeCounters)
+    # All previous builds of this build's author cluster
+    author: OutcomeCounters = field(default_factory=OutcomeCounters)
+    author_cluster_id: Optional[int] = None
+    prev_conclusion: Optional[str] = None
+    prev_author: Optional[str] = None
+    prev_author_cluster_id: Optional[int] = None
+    prev_completed_at: Optional[datetime] = None
+
+
+@dataclass
+class _RepoState:
+    cursor_created_at: Optional[datetime] = None
+    cursor_id: Optional[ObjectId] = None
+    total_builds: int = 0
+    project: OutcomeCounters = field(default_factory=OutcomeCounters)
+    authors: AuthorClusterIndex = field(default_factory=AuthorClusterIndex)
+    # Indexed by author cluster id
+    cluster_outcomes: List[OutcomeCounters] = field(default_factory=list)
+    prev_conclusion: Optional[str] = None
+    prev_author: Optional[str] = None
+    prev_author_cluster_id: Optional[int] = None
+    prev_completed_at: Optional[datetime] = None
+    revision: int = 0
+
+
+def _conclusion(doc: Dict[str, Any]) -> Optional[str]:
+    conclusion = doc.get("conclusion")
+    if hasattr(conclusion, "value"):
+        conclusion = conclusion.value
+    return str(conclusion) if conclusion else None
+
+
+def _is_failed(conclusion: Optional[str]) -> bool:
+    return bool(conclusion) and conclusion.lower() in ("failure", "failed")
+
+
+def _copy_counters(counters: OutcomeCounters) -> OutcomeCounters:
+    return OutcomeCounters(counters.total, counters.failed, list(counters.recent))
+
+
+def _snapshot(
+    state: _RepoState, author: Optional[str], same_author: SameAuthor
+) -> BuildHistoryRollup:
+    cluster_id = state.authors.lookup(author, same_author) if author else None
+    return BuildHistoryRollup(
+        total_builds=state.total_builds,
+        author_clusters=len(state.authors),
+        project=_copy_counters(state.project),
+        author=(
+            _copy_counters(state.cluster_outcomes[cluster_id])
+            if cluster_id is not None
+            else OutcomeCounters()
+        ),
+        author_cluster_id=cluster_id,
+        prev_conclusion=state.prev_conclusion,
+        prev_author=state.prev_author,
+        prev_author_cluster_id=state.prev_author_cluster_id,
+        prev_completed_at=state.prev_completed_at,
+    )
+
+
+def _fold(state: _RepoState, doc: Dict[str, Any], same_author: SameAuthor) -> None:
+    conclusion = _conclusion(doc)
+    failed = _is_failed(conclusion)
+    author = doc.get("commit_author")
+
+    state.total_builds += 1
+    if conclusion in ("success", "failure"):
+        state.project.add(failed)
+    cluster_id = None
+    if author:
+        cluster_id = state.authors.assign(author, same_author)
+        if cluster_id == len(state.cluster_outcomes):
+            state.cluster_outcomes.append(OutcomeCounters())
+        state.cluster_outcomes[cluster_id].add(failed)
+
+    state.prev_conclusion = conclusion
+    state.prev_author = author
+    state.prev_author_cluster_id = cluster_id
+    state.prev_completed_at = doc.get("completed_at") or doc.get("created_at")
+    state.cursor_created_at = doc["created_at"]
+    state.cursor_id = doc["_id"]
+
+
+# =============================================================================
+# Documents
+# =============================================================================
+
+
+def _counters_from_doc(doc: Optional[Dict[str, Any]]) -> OutcomeCounters:
+    doc = doc or {}
+    return OutcomeCounters(
+        total=doc.get("total", 0),
+        failed=doc.get("failed", 0),
+        recent=list(doc.get("recent") or []),
+    )
+
+
+def _rollup_from_doc(doc: Dict[str, Any]) -> BuildHistoryRollup:
+    return BuildHistoryRollup(
+        total_builds=doc.get("total_builds", 0),
+        author_clusters=doc.get("author_clusters", 0),
+        project=_counters_from_doc(doc.get("project")),
+        author=_counters_from_doc(doc.get("author")),
+        author_cluster_id=doc.get("author_cluster_id"),
+        prev_conclusion=doc.get("prev_conclusion"),
+        prev_author=doc.get("prev_author"),
+        prev_author_cluster_id=doc.get("prev_author_cluster_id"),
+        prev_completed_at=doc.get("prev_completed_at"),
+    )
+
+
+def _state_from_doc(doc: Dict[str, Any]) -> _RepoState:
+    return _RepoState(
+        cursor_created_at=doc.get("cursor_created_at"),
+        cursor_id=doc.get("cursor_id"),
+        total_builds=doc.get("total_builds", 0),
+        project=_counters_from_doc(doc.get("project")),
+        authors=AuthorClusterIndex.from_doc(doc.get("authors")),
+        cluster_outcomes=[_counters_from_doc(item) for item in doc.get("cluster_outcomes") or []],
+        prev_conclusion=doc.get("prev_conclusion"),
+        prev_author=doc.get("prev_author"),
+        prev_author_cluster_id=doc.get("prev_author_cluster_id"),
+        prev_completed_at=doc.get("prev_completed_at"),
+        revision=doc.get("revision", 0),
+    )
+
+
+def _state_to_doc(raw_repo_id: ObjectId, state: _RepoState) -> Dict[str, Any]:
+    return {
+        "raw_repo_id": raw_repo_id,
+        "kind": KIND_STATE,
+        "key": KIND_STATE,
+        "version": ROLLUP_VERSION,
+        "cursor_created_at": state.cursor_created_at,
+        "cursor_id": state.cursor_id,
+        "total_builds": state.total_builds,
+        "project": asdict(state.project),
+        "authors": state.authors.to_doc(),
+        "cluster_outcomes": [asdict(counters) for counters in state.cluster_outcomes],
+        "prev_conclusion": state.prev_conclusion,
+        "prev_author": state.prev_author,
+        "prev_author_cluster_id": state.prev_author_cluster_id,
+        "prev_completed_at": state.prev_completed_at,
+        "revision": state.revision,
+        "updated_at": datetime.now(timezone.utc),
+    }
+
+
+def _key_filter(raw_repo_id: ObjectId, kind: str, key: str) -> Dict[str, Any]:
+    return {"raw_repo_id": raw_repo_id, "kind": kind, "key": key, "version": ROLLUP_VERSION}
+
+
+# =============================================================================
+# Collection
+# =============================================================================
+
+_indexed_lock = threading.Lock()
+_indexed: set = set()
+
+
+def ensure_indexes(collection: Collection) -> None:
+    """Create the unique lookup index once per collection and process."""
+    key = (collection.database.name, collection.name)
+    with _indexed_lock:
+        if key in _indexed:
+            return
+        _indexed.add(key)
+    try:
+        collection.create_indexes(
+            [
+                IndexModel(
+                    [
+                        ("raw_repo_id", ASCENDING),
+                        ("kind", ASCENDING),
+                        ("key", ASCENDING),
+                        ("version", ASCENDING),
+                    ],
+                    unique=True,
+                    name="unique_build_history_rollup",
+                ),
+            ]
+        )
+    except Exception:
+        # Indexes may already exist with different options
+        pass
+
+
+def _save_state(
+    collection: Collection, raw_repo_id: ObjectId, state: _RepoState, revision: int
+) -> None:
+    """Compare-and-swap the repo state; a concurrent writer wins silently."""
+    doc = _state_to_doc(raw_repo_id, state)
+    doc["revision"] = revision + 1
+    try:
+        if revision == 0:
+            collection.insert_one(doc)
+        else:
+            collection.replace_one(
+                {**_key_filter(raw_repo_id, KIND_STATE, KIND_STATE), "revision": revision},
+                doc,
+            )
+    except DuplicateKeyError:
+        pass
+
+
+def _save_snapshots(
+    collection: Collection, raw_repo_id: ObjectId, snapshots: Dict[str, BuildHistoryRollup]
+) -> None:
+    if not snapshots:
+        return
+    now = datetime.now(timezone.utc)
+    collection.bulk_write(
+        [
+            UpdateOne(
+                _key_filter(raw_repo_id, KIND_BUILD, ci_run_id),
+                {"$setOnInsert": {**asdict(rollup), "created_at": now}},
+                upsert=True,
+            )
+            for ci_run_id, rollup in snapshots.items()
+        ],
+        ordered=False,
+    )
+
+
+def reset_build_history_rollups(collection: Collection, raw_repo_id: ObjectId) -> None:
+    """Drop the repo state, build snapshots and lineages; they are refolded on the next read."""
+    collection.delete_many(
+        {"raw_repo_id": raw_repo_id, "kind": {"$in": [KIND_STATE, KIND_BUILD, KIND_LINEAGE]}}
+    )
+
+
+# =============================================================================
+# Public API
+# =============================================================================
+
+
+def _utc_naive(value: datetime) -> datetime:
+    """Naive UTC datetime, as stored by Mongo, for comparisons."""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _is_backfilled(raw_build_runs: Collection, raw_repo_id: ObjectId, state: _RepoState) -> bool:
+    """Whether builds were added behind the cursor since they were folded."""
+    if state.cursor_created_at is None:
+        return False
+    folded = raw_build_runs.count_documents(
+        {
+            "raw_repo_id": raw_repo_id,
+            "$or": [
+                {"created_at": {"$lt": state.cursor_created_at}},
+                {"created_at": state.cursor_created_at, "_id": {"$lte": state.cursor_id}},
+            ],
+        }
+    )
+    return folded != state.total_builds
+
+
+def _advance_to(
+    collection: Collection,
+    raw_build_runs: Collection,
+    raw_repo_id: ObjectId,
+    ci_run_id: str,
+    created_at: datetime,
+    same_author: SameAuthor,
+) -> Tuple[Optional[BuildHistoryRollup], bool]:
+    """
+    Fold builds after the state cursor up to the requested build.
+
+    Returns:
+        (rollup, stale); rollup is None when the build was not reached,
+        stale tells whether builds were backfilled behind the cursor (nothing
+        is folded then)
+    """
+    state_doc = collection.find_one(_key_filter(raw_repo_id, KIND_STATE, KIND_STATE))
+    state = _state_from_doc(state_doc) if state_doc else _RepoState()
+    if _is_backfilled(raw_build_runs, raw_repo_id, state):
+        return None, True
+    revision = state.revision
+    created_at = _utc_naive(created_at)
+
+    target: Optional[BuildHistoryRollup] = None
+    snapshots: Dict[str, BuildHistoryRollup] = {}
+    while target is None:
+        if state.cursor_created_at is None:
+            query: Dict[str, Any] = {"raw_repo_id": raw_repo_id, "created_at": {"$ne": None}}
+        else:
+            if created_at < _utc_naive(state.cursor_created_at):
+                break
+            query = {
+                "raw_repo_id": raw_repo_id,
+                "$or": [
+                    {"created_at": {"$gt": state.cursor_created_at}},
+                    {"created_at": state.cursor_created_at, "_id": {"$gt": state.cursor_id}},
+                ],
+            }
+        batch = list(
+            raw_build_runs.find(query, _RAW_PROJECTION)
+            .sort([("created_at", ASCENDING), ("_id", ASCENDING)])
+            .limit(ADVANCE_BATCH_SIZE)
+        )
+        for doc in batch:
+            if _utc_naive(doc["created_at"]) > created_at:
+                break
+            rollup = _snapshot(state, doc.get("commit_author"), same_author)
+            snapshots[doc["ci_run_id"]] = rollup
+            _fold(state, doc, same_author)
+            if doc["ci_run_id"] == ci_run_id:
+                target = rollup
+                break
+        else:
+            if len(batch) == ADVANCE_BATCH_SIZE:
+                continue
+        break
+
+    _save_snapshots(collection, raw_repo_id, snapshots)
+    if snapshots:
+        _save_state(collection, raw_repo_id, state, revision)
+    return target, False
+
+
+def get_build_rollup(
+    collection: Optional[Collection],
+    raw_build_runs: Collection,
+    raw_repo_id: str,
+    ci_run_id: str,
+    created_at: Optional[datetime],
+    same_author: SameAuthor,
+) -> Optional[BuildHistoryRollup]:
+    """
+    History of a repository right before a build.
+
+    Args:
+        collection: build_history_rollups collection
+        raw_build_runs: raw_build_runs collection (source of the history)
+        raw_repo_id: RawRepository id
+        ci_run_id: CI run id of the build
+        created_at: created_at of the build in raw_build_runs
+        same_author: Author matcher used to cluster commit authors
+
+    Returns:
+        BuildHistoryRollup, or None if the build is not in raw_build_runs
+    """
+    if collection is None or not created_at:
+        return None
+    try:
+        object_id = ObjectId(raw_repo_id)
+    except Exception:
+        return None
+
+    ensure_indexes(collection)
+    doc = collection.find_one(_key_filter(object_id, KIND_BUILD, ci_run_id))
+    if doc:
+        return _rollup_from_doc(doc)
+
+    args = (collection, raw_build_runs, object_id, ci_run_id, created_at, same_author)
+    rollup, stale = _advance_to(*args)
+    if stale:
+        # Builds were ingested behind the cursor: every later snapshot is stale
+        logger.info(f"Rebuilding build history rollups of repo {raw_repo_id}")
+        reset_build_history_rollups(collection, object_id)
+        rollup, _ = _advance_to(*args)
+    return rollup
+
+
+# =============================================================================
+# Commit lineage
+# =============================================================================
+
+
+@dataclass
+class LineageRollup:
+    """Outcomes along the commit lineage ending at a build (most recent first)."""
+
+    failed: List[bool] = field(default_factory=list)
+    src_churn: List[Optional[float]] = field(default_factory=list)
+
+
+def get_lineage_rollup(
+    collection: Optional[Collection], raw_repo_id: str, ci_run_id: str
+) -> Optional[LineageRollup]:
+    """Cached lineage of a build, or None."""
+    if collection is None:
+        return None
+    try:
+        object_id = ObjectId(raw_repo_id)
+    except Exception:
+        return None
+    ensure_indexes(collection)
+    doc = collection.find_one(_key_filter(object_id, KIND_LINEAGE, ci_run_id))
+    if not doc:
+        return None
+    return LineageRollup(
+        failed=list(doc.get("failed") or []),
+        src_churn=list(doc.get("src_churn") or []),
+    )
+
+
+def save_lineage_rollup(
+    collection: Optional[Collection], raw_repo_id: str, ci_run_id: str, lineage: LineageRollup
+) -> None:
+    """Cache the lineage of a build; every entry of it must be final."""
+    if collection is None:
+        return
+    try:
+        object_id = ObjectId(raw_repo_id)
+        collection.update_one(
+            _key_filter(object_id, KIND_LINEAGE, ci_run_id),
+            {
+                "$setOnInsert": {
+                    "failed": lineage.failed[:RING_SIZE],
+                    "src_churn": lineage.src_churn[:RING_SIZE],
+                    "created_at": datetime.now(timezone.utc),
+                }
+            },
+            upsert=True,
+        )
+    except Exception as e:
+        logger.warning(f"Failed to save lineage rollup for {ci_run_id}: {e}")
+
+
+def invalidate_lineage_rollups(db: Any, raw_repo_ids: Iterable[Any]) -> int:
+    """Drop the cached lineages of repos, e.g. before their failed builds are retried."""
+    repo_ids = list({ObjectId(repo_id) for repo_id in raw_repo_ids})
+    if not repo_ids:
+        return 0
+    try:
+        result = db.get_collection(COLLECTION_NAME).delete_many(
+            {"raw_repo_id": {"$in": repo_ids}, "kind": KIND_LINEAGE}
+        )
+        return result.deleted_count
+    except Exception as e:
+        logger.warning(f"Failed to invalidate lineage rollups of {len(repo_ids)} repos: {e}")
+        return 0
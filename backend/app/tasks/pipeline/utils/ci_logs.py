@@ -0,0 +1,195 @@
+"""
+On-disk storage of downloaded CI job logs.
+
+Each job log is stored as `<logs_dir>/<job_id>.log.gz` (gzip, written by
+ingestion) or, for directories downloaded before compression was enabled
+or with CI_LOG_COMPRESSION="none", as a plain `<job_id>.log`. All log
+consumers go through this module, so both layouts can coexist:
+
+- write_job_log(): write a log in the configured format (atomically)
+- list_job_logs() / has_job_logs(): the job logs of a build directory
+- job_id_from_path(): job ID from a log file name
+- open_job_log() / read_job_log(): transparent text reading, decompressing
+  gzip logs as a stream
+- compress_logs_dir(): migrate plain logs of a directory tree in place
+
+CI logs compress about 10-20x with gzip, which makes them a small fraction
+of the worker disk usage instead of the largest one.
+"""
+
+from __future__ import annotations
+
+import gzip
+import logging
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, TextIO
+
+logger = logging.getLogger(__name__)
+
+PLAIN_SUFFIX = ".log"
+GZIP_SUFFIX = ".log.gz"
+
+COMPRESSION_NONE = "none"
+COMPRESSION_GZIP = "gzip"
+
+DEFAULT_COMPRESSION_LEVEL = 6
+
+
+def job_id_from_path(path: Path) -> str:
+    """Job ID of a log file ('223085.log.gz' / '223085.log' -> '223085')."""
+    name = path.name
+    for suffix in (GZIP_SUFFIX, PLAIN_SUFFIX):
+        if name.endswith(suffix):
+            return name[: -len(suffix)]
+    return path.stem
+
+
+def list_job_logs(logs_dir: Path) -> List[Path]:
+    """
+    Job log files of a build logs directory, one per job, sorted by name.
+
+    If a job has both a plain and a compressed log (a migration was
+    interrupted after compressing), the compressed one is returned.
+    """
+    by_job: Dict[str, Path] = {}
+    for path in logs_dir.glob(f"*{PLAIN_SUFFIX}"):
+        by_job[job_id_from_path(path)] = path
+    for path in logs_dir.glob(f"*{GZIP_SUFFIX}"):
+        by_job[job_id_from_path(path)] = path
+    return sorted(by_job.values())
+
+
+def has_job_logs(logs_dir: Path) -> bool:
+    """Whether a build logs directory exists and contains at least one job log."""
+    if not logs_dir.exists():
+        return False
+    return any(logs_dir.glob(f"*{GZIP_SUFFIX}")) or any(logs_dir.glob(f"*{PLAIN_SUFFIX}"))
+
+
+def open_job_log(path: Path) -> TextIO:
+    """
+    Open a job log for reading text, whichever format it is stored in.
+
+    Logs are decoded as UTF-8 (not the locale encoding) and undecodable
+    bytes are replaced. Gzip logs are decompressed incrementally while
+    reading.
+    """
+    if path.name.endswith(GZIP_SUFFIX):
+        return gzip.open(path, "rt", encoding="utf-8", errors="replace")
+    return open(path, encoding="utf-8", errors="replace")
+
+
+def read_job_log(path: Path) -> str:
+    """Full text of a job log (streamed through the decompressor)."""
+    with open_job_log(path) as f:
+        return f.read()
+
+
+def _write_atomic(path: Path, content: str, compression: str, level: int) -> None:
+    """Write via a temporary file so readers never see a partial log."""
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    try:
+        if compression == COMPRESSION_GZIP:
+            # mtime=0 keeps the output deterministic for identical content
+            with open(tmp_path, "wb") as raw, gzip.GzipFile(
+                fileobj=raw, mode="wb", compresslevel=level, mtime=0
+            ) as f:
+                f.write(content.encode("utf-8", errors="surrogateescape"))
+        else:
+            tmp_path.write_text(content, encoding="utf-8", errors="surrogateescape")
+        os.replace(tmp_path, path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+
+def write_job_log(
+    logs_dir: Path,
+    job_id: str,
+    content: str,
+    compression: str = COMPRESSION_GZIP,
+    level: int = DEFAULT_COMPRESSION_LEVEL,
+) -> Path:
+    """
+    Store a job log, replacing a log of the same job in the other format.
+
+    Args:
+        logs_dir: Build logs directory (must exist)
+        job_id: CI job ID, used as file name
+        content: Log text
+        compression: "gzip" or "none"
+        level: Gzip compression level (1-9)
+
+    Returns:
+        Path of the written log file
+    """
+    compression = compression.lower()
+    if compression not in (COMPRESSION_GZIP, COMPRESSION_NONE):
+        raise ValueError(f"Unsupported CI log compression: {compression}")
+
+    compressed = compression == COMPRESSION_GZIP
+    path = logs_dir / f"{job_id}{GZIP_SUFFIX if compressed else PLAIN_SUFFIX}"
+    stale = logs_dir / f"{job_id}{PLAIN_SUFFIX if compressed else GZIP_SUFFIX}"
+
+    _write_atomic(path, content, compression, level)
+    stale.unlink(missing_ok=True)
+    return path
+
+
+@dataclass
+class CompressionStats:
+    """Result of compress_logs_dir()."""
+
+    files: int = 0
+    bytes_before: int = 0
+    bytes_after: int = 0
+    errors: int = 0
+
+    @property
+    def ratio(self) -> Optional[float]:
+        return self.bytes_before / self.bytes_after if self.bytes_after else None
+
+
+def compress_logs_dir(
+    root: Path,
+    level: int = DEFAULT_COMPRESSION_LEVEL,
+    dry_run: bool = False,
+) -> CompressionStats:
+    """
+    Gzip every plain job log below `root` in place (migration).
+
+    Each `<job_id>.log` is replaced by `<job_id>.log.gz`; the plain file is
+    only removed once the compressed one is complete, so the migration can
+    be interrupted and rerun. Logs are compressed as byte streams, their
+    content is kept as is.
+    """
+    stats = CompressionStats()
+    if not root.exists():
+        return stats
+
+    for path in sorted(root.rglob(f"*{PLAIN_SUFFIX}")):
+        if not path.is_file():
+            continue
+        target = path.with_name(f"{job_id_from_path(path)}{GZIP_SUFFIX}")
+        tmp_path = target.with_name(f".{target.name}.tmp")
+        try:
+            size = path.stat().st_size
+            if not dry_run:
+                with open(path, "rb") as src, open(tmp_path, "wb") as raw, gzip.GzipFile(
+                    fileobj=raw, mode="wb", compresslevel=level, mtime=0
+                ) as dst:
+                    while chunk := src.read(1024 * 1024):
+                        dst.write(chunk)
+                os.replace(tmp_path, target)
+                path.unlink()
+                stats.bytes_after += target.stat().st_size
+            stats.files += 1
+            stats.bytes_before += size
+        except OSError as e:
+            stats.errors += 1
+            logger.warning(f"Failed to compress log {path}: {e}")
+        finally:
+            tmp_path.unlink(missing_ok=True)
+
+    return stats
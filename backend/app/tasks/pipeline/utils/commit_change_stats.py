@@ -0,0 +1,376 @@
+"""
+Persisted per-commit change stats.
+
+Change records of a commit never change, but the same SHAs are diffed again
+for every model repo config and training scenario that contains the build.
+This module stores them in the `commit_change_stats` collection, keyed by
+(raw_repo_id, sha, parser_version), with an in-process LRU in front:
+
+    LRU -> commit_change_stats -> one `git diff-tree --stdin` for the rest
+
+Besides per-commit records (parents, per-parent file lists with status and
+numstat), commit documents hold the DevOps classification of their files,
+per classifier version, and range documents (`sha` = "<base>..<head>") hold
+the test case counts of the patch between two built commits, per language
+strategy.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from bson import ObjectId
+from pymongo import ASCENDING, IndexModel, UpdateOne
+from pymongo.collection import Collection
+
+from app.tasks.pipeline.utils.commit_changes import (
+    PARSER_VERSION,
+    ChangedFile,
+    CommitChanges,
+    read_commit_changes,
+)
+
+logger = logging.getLogger(__name__)
+
+COLLECTION_NAME = "commit_change_stats"
+
+# Upper bound of records kept in the per-process LRU
+MAX_CACHED_COMMITS = 5_000
+
+# Commits touching more files than this are only cached in memory
+# (keeps documents well below the 16MB BSON limit)
+MAX_PERSISTED_FILES = 20_000
+
+# (added, deleted) test definitions per language strategy cache key
+TestCaseCounts = Dict[str, Tuple[int, int]]
+
+# DevOps file path -> tool (None when no specific tool matched) of a commit
+DevOpsFiles = Dict[str, Optional[str]]
+
+
+# =============================================================================
+# Documents
+# =============================================================================
+
+
+def _to_document(raw_repo_id: ObjectId, record: CommitChanges) -> Dict[str, Any]:
+    return {
+        "raw_repo_id": raw_repo_id,
+        "sha": record.sha,
+        "parser_version": PARSER_VERSION,
+        "parents": record.parents,
+        "diffs": [
+            [
+                {
+                    "path": change.path,
+                    "status": change.status,
+                    "added": change.added,
+                    "deleted": change.deleted,
+                    **({"old_path": change.old_path} if change.old_path else {}),
+                }
+                for change in diff
+            ]
+            for diff in record.diffs
+        ],
+        "created_at": datetime.now(timezone.utc),
+    }
+
+
+def _from_document(doc: Dict[str, Any]) -> CommitChanges:
+    return CommitChanges(
+        sha=doc["sha"],
+        parents=list(doc.get("parents") or []),
+        diffs=[
+            [
+                ChangedFile(
+                    path=item["path"],
+                    status=item["status"],
+                    added=item.get("added", 0),
+                    deleted=item.get("deleted", 0),
+                    old_path=item.get("old_path"),
+                )
+                for item in diff
+            ]
+            for diff in doc.get("diffs") or []
+        ],
+    )
+
+
+def _range_key(base: str, head: str) -> str:
+    return f"{base}..{head}"
+
+
+def _as_object_id(raw_repo_id: str) -> Optional[ObjectId]:
+    try:
+        return ObjectId(raw_repo_id)
+    except Exception:
+        return None
+
+
+# =============================================================================
+# Collection
+# =============================================================================
+
+_indexed_lock = threading.Lock()
+_indexed: set = set()
+
+
+def ensure_indexes(collection: Collection) -> None:
+    """Create the unique lookup index once per collection and process."""
+    key = (collection.database.name, collection.name)
+    with _indexed_lock:
+        if key in _indexed:
+            return
+        _indexed.add(key)
+    try:
+        collection.create_indexes(
+            [
+                IndexModel(
+                    [
+                        ("raw_repo_id", ASCENDING),
+                        ("sha", ASCENDING),
+                        ("parser_version", ASCENDING),
+                    ],
+                    unique=True,
+                    name="unique_commit_change_stats",
+                ),
+            ]
+        )
+    except Exception:
+        # Indexes may already exist with different options
+        pass
+
+
+def _find_documents(
+    collection: Collection, raw_repo_id: ObjectId, keys: List[str]
+) -> List[Dict[str, Any]]:
+    ensure_indexes(collection)
+    return list(
+        collection.find(
+            {
+                "raw_repo_id": raw_repo_id,
+                "sha": {"$in": keys},
+                "parser_version": PARSER_VERSION,
+            }
+        )
+    )
+
+
+def _save_records(
+    collection: Collection, raw_repo_id: ObjectId, records: Iterable[CommitChanges]
+) -> None:
+    operations = [
+        UpdateOne(
+            {"raw_repo_id": raw_repo_id, "sha": record.sha, "parser_version": PARSER_VERSION},
+            {"$setOnInsert": _to_document(raw_repo_id, record)},
+            upsert=True,
+        )
+        for record in records
+        if sum(len(diff) for diff in record.diffs) <= MAX_PERSISTED_FILES
+    ]
+    if not operations:
+        return
+    try:
+        collection.bulk_write(operations, ordered=False)
+    except Exception as e:
+        logger.warning(f"Failed to persist commit change stats for repo {raw_repo_id}: {e}")
+
+
+# =============================================================================
+# Per-process LRU
+# =============================================================================
+
+_cache_lock = threading.Lock()
+_cache: "OrderedDict[Tuple[str, str, int], CommitChanges]" = OrderedDict()
+
+
+def _cache_get(repo_key: str, sha: str) -> Optional[CommitChanges]:
+    key = (repo_key, sha, PARSER_VERSION)
+    with _cache_lock:
+        record = _cache.get(key)
+        if record is not None:
+            _cache.move_to_end(key)
+        return record
+
+
+def _cache_put(repo_key: str, records: Iterable[CommitChanges]) -> None:
+    with _cache_lock:
+        for record in records:
+            key = (repo_key, record.sha, PARSER_VERSION)
+            _cache[key] = record
+            _cache.move_to_end(key)
+        while len(_cache) > MAX_CACHED_COMMITS:
+            _cache.popitem(last=False)
+
+
+def clear_commit_change_stats_cache() -> None:
+    """Drop all change records cached in this process."""
+    with _cache_lock:
+        _cache.clear()
+
+
+# =============================================================================
+# Public API
+# =============================================================================
+
+
+def get_commit_changes(
+    repo_path: Path,
+    shas: Iterable[str],
+    raw_repo_id: Optional[str] = None,
+    collection: Optional[Collection] = None,
+) -> Dict[str, CommitChanges]:
+    """
+    Get change records for commits, keyed by sha.
+
+    Lookups go LRU -> collection -> git; records read from git are written
+    back to the collection. Without raw_repo_id/collection only the LRU
+    (keyed by repo path) and git are used. Commits missing from the repo
+    are left out.
+    """
+    object_id = _as_object_id(raw_repo_id) if raw_repo_id else None
+    if object_id is None:
+        collection = None
+    repo_key = str(object_id) if object_id is not None else str(repo_path)
+
+    result: Dict[str, CommitChanges] = {}
+    missing: List[str] = []
+    for sha in dict.fromkeys(shas):
+        record = _cache_get(repo_key, sha)
+        if record is None:
+            missing.append(sha)
+        else:
+            result[sha] = record
+
+    if missing and collection is not None:
+        try:
+            stored = [
+                _from_document(doc)
+                for doc in _find_documents(collection, object_id, missing)
+            ]
+        except Exception as e:
+            logger.warning(f"Failed to load commit change stats for repo {raw_repo_id}: {e}")
+            stored = []
+        _cache_put(repo_key, stored)
+        for record in stored:
+            result[record.sha] = record
+        missing = [sha for sha in missing if sha not in result]
+
+    if not missing:
+        return result
+
+    try:
+        parsed = list(read_commit_changes(Path(repo_path), missing))
+    except Exception as e:
+        logger.warning(f"Failed to read commit changes for {repo_path}: {e}")
+        return result
+
+    _cache_put(repo_key, parsed)
+    for record in parsed:
+        result[record.sha] = record
+    if collection is not None:
+        _save_records(collection, object_id, parsed)
+    return result
+
+
+def get_test_case_counts(
+    collection: Optional[Collection], raw_repo_id: Optional[str], base: str, head: str
+) -> TestCaseCounts:
+    """Stored per-strategy test case counts of the patch base..head (empty if none)."""
+    object_id = _as_object_id(raw_repo_id) if raw_repo_id else None
+    if collection is None or object_id is None:
+        return {}
+    try:
+        docs = _find_documents(collection, object_id, [_range_key(base, head)])
+    except Exception as e:
+        logger.warning(f"Failed to load test case counts for repo {raw_repo_id}: {e}")
+        return {}
+    if not docs:
+        return {}
+    return {key: tuple(value) for key, value in (docs[0].get("test_cases") or {}).items()}
+
+
+def save_test_case_counts(
+    collection: Optional[Collection],
+    raw_repo_id: Optional[str],
+    base: str,
+    head: str,
+    counts: TestCaseCounts,
+) -> None:
+    """Merge per-strategy test case counts of the patch base..head into the store."""
+    object_id = _as_object_id(raw_repo_id) if raw_repo_id else None
+    if collection is None or object_id is None or not counts:
+        return
+    key = _range_key(base, head)
+    try:
+        ensure_indexes(collection)
+        collection.update_one(
+            {"raw_repo_id": object_id, "sha": key, "parser_version": PARSER_VERSION},
+            {
+                "$set": {
+                    f"test_cases.{strategy_key}": list(value)
+                    for strategy_key, value in counts.items()
+                },
+                "$setOnInsert": {
+                    "base_sha": base,
+                    "head_sha": head,
+                    "created_at": datetime.now(timezone.utc),
+                },
+            },
+            upsert=True,
+        )
+    except Exception as e:
+        logger.warning(f"Failed to persist test case counts for repo {raw_repo_id}: {e}")
+
+
+def get_devops_files(
+    collection: Optional[Collection],
+    raw_repo_id: Optional[str],
+    shas: Iterable[str],
+    classifier_key: str,
+) -> Dict[str, DevOpsFiles]:
+    """Stored DevOps files of commits (by a classifier version), keyed by sha."""
+    object_id = _as_object_id(raw_repo_id) if raw_repo_id else None
+    keys = list(dict.fromkeys(shas))
+    if collection is None or object_id is None or not keys:
+        return {}
+    try:
+        docs = _find_documents(collection, object_id, keys)
+    except Exception as e:
+        logger.warning(f"Failed to load DevOps files for repo {raw_repo_id}: {e}")
+        return {}
+    result: Dict[str, DevOpsFiles] = {}
+    for doc in docs:
+        files = (doc.get("devops") or {}).get(classifier_key)
+        if files is not None:
+            result[doc["sha"]] = dict(files)
+    return result
+
+
+def save_devops_files(
+    collection: Optional[Collection],
+    raw_repo_id: Optional[str],
+    files_by_sha: Dict[str, DevOpsFiles],
+    classifier_key: str,
+) -> None:
+    """Store the DevOps files of commits whose change records are persisted."""
+    object_id = _as_object_id(raw_repo_id) if raw_repo_id else None
+    if collection is None or object_id is None or not files_by_sha:
+        return
+    # Paths may contain dots, so they are stored as [path, tool] pairs
+    operations = [
+        UpdateOne(
+            {"raw_repo_id": object_id, "sha": sha, "parser_version": PARSER_VERSION},
+            {"$set": {f"devops.{classifier_key}": [[path, tool] for path, tool in files.items()]}},
+        )
+        for sha, files in files_by_sha.items()
+    ]
+    try:
+        collection.bulk_write(operations, ordered=False)
+    except Exception as e:
+        logger.warning(f"Failed to persist DevOps files for repo {raw_repo_id}: {e}")
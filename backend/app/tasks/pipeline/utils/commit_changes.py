@@ -0,0 +1,250 @@
+"""
+Per-commit change records.
+
+Parses a single streamed `git diff-tree --stdin` invocation covering every
+requested commit into CommitChanges records (changed paths with status and
+added/deleted line counts, one diff per parent). The diff-based features of
+a build share these records instead of running `diff --name-status`,
+`diff --numstat` and `git show` for every commit.
+
+Records are cached and persisted by utils/commit_change_stats.py. Patches are
+never held in memory: the only patch consumer (test case counting) reads
+`git diff` output line by line via iter_patch_lines().
+"""
+
+from __future__ import annotations
+
+import subprocess
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from app.core import call_accounting
+
+# Bump when the parsing rules change (invalidates cached and persisted records)
+PARSER_VERSION = 1
+
+_READ_CHUNK_SIZE = 64 * 1024
+
+# Marks the start of each commit header in the -z stream
+_HEADER_MARK = "\x01"
+
+_DIFF_TREE_ARGS = [
+    "diff-tree",
+    "--stdin",
+    "-r",
+    "-m",
+    "--root",
+    "-M",
+    "--raw",
+    "--numstat",
+    "-z",
+    "--always",
+    "--format=%x01%H %P",
+]
+
+
+@dataclass(frozen=True, slots=True)
+class ChangedFile:
+    """One changed path of a diff."""
+
+    path: str
+    # First letter of the raw status: A, D, M, R, C, T or U
+    status: str
+    # Line counts are 0 for binary files
+    added: int
+    deleted: int
+    # Source path for renames / copies
+    old_path: Optional[str] = None
+
+    @property
+    def churn(self) -> int:
+        return self.added + self.deleted
+
+
+@dataclass(slots=True)
+class CommitChanges:
+    """Changes introduced by one commit."""
+
+    sha: str
+    parents: List[str]
+    # One diff per parent, in parent order. A root commit has a single diff
+    # against the empty tree.
+    diffs: List[List[ChangedFile]] = field(default_factory=list)
+
+    @property
+    def is_root(self) -> bool:
+        return not self.parents
+
+    @property
+    def is_merge(self) -> bool:
+        return len(self.parents) > 1
+
+    @property
+    def files(self) -> List[ChangedFile]:
+        """Changes against the first parent (or the empty tree for root commits)."""
+        return self.diffs[0] if self.diffs else []
+
+
+# =============================================================================
+# Parsing
+# =============================================================================
+
+
+def _iter_tokens(stream, call=None) -> Iterator[str]:
+    """Split a binary stream on NUL bytes without reading it all at once."""
+    pending = b""
+    while True:
+        chunk = stream.read(_READ_CHUNK_SIZE)
+        if not chunk:
+            break
+        if call is not None:
+            call.add_output(len(chunk))
+        parts = (pending + chunk).split(b"\0")
+        pending = parts.pop()
+        for part in parts:
+            yield part.decode("utf-8", "replace")
+    if pending:
+        yield pending.decode("utf-8", "replace")
+
+
+def _parse_count(value: str) -> int:
+    # Binary files are reported as "-"
+    try:
+        return int(value)
+    except ValueError:
+        return 0
+
+
+def _build_diff(
+    raw: List[Tuple[str, str, Optional[str]]], numstat: List[Tuple[int, int]]
+) -> List[ChangedFile]:
+    # Raw and numstat entries are emitted in the same order for the same diff
+    if len(numstat) != len(raw):
+        numstat = numstat[: len(raw)] + [(0, 0)] * (len(raw) - len(numstat))
+    return [
+        ChangedFile(path=path, status=status, added=added, deleted=deleted, old_path=old_path)
+        for (status, path, old_path), (added, deleted) in zip(raw, numstat, strict=True)
+    ]
+
+
+def parse_diff_tree_output(tokens: Iterable[str]) -> Iterator[CommitChanges]:
+    """
+    Parse NUL-separated `git diff-tree -z --raw --numstat --always -m` output.
+
+    Each diff starts with a `\\x01<sha> <parents>` header; merges produce one
+    header per parent. Records are yielded as soon as the next commit starts.
+    """
+    tokens = iter(tokens)
+    current: Optional[CommitChanges] = None
+    raw: List[Tuple[str, str, Optional[str]]] = []
+    numstat: List[Tuple[int, int]] = []
+
+    def _flush() -> None:
+        if current is not None:
+            current.diffs.append(_build_diff(raw, numstat))
+        raw.clear()
+        numstat.clear()
+
+    for token in tokens:
+        token = token.lstrip("\n")
+        if token.startswith(_HEADER_MARK):
+            if current is not None:
+                _flush()
+            sha, *parents = token[1:].split()
+            if current is not None and current.sha != sha:
+                yield current
+                current = None
+            if current is None:
+                current = CommitChanges(sha=sha, parents=parents)
+        elif token.startswith(":"):
+            # :<old mode> <new mode> <old sha> <new sha> <status>, then path(s)
+            status = token.rsplit(" ", 1)[-1][:1]
+            src = next(tokens, "")
+            if status in ("R", "C"):
+                raw.append((status, next(tokens, ""), src))
+            else:
+                raw.append((status, src, None))
+        elif "\t" in token:
+            # <added>\t<deleted>\t<path>, or an empty path followed by old/new paths
+            added, deleted, path = token.split("\t", 2)
+            if not path:
+                next(tokens, "")
+                next(tokens, "")
+            numstat.append((_parse_count(added), _parse_count(deleted)))
+
+    if current is not None:
+        _flush()
+        yield current
+
+
+def read_commit_changes(repo_path: Path, shas: List[str]) -> Iterator[CommitChanges]:
+    """
+    Stream change records for shas from one diff-tree process.
+
+    Commits missing from the repo are skipped.
+    """
+    proc = subprocess.Popen(
+        ["git", *_DIFF_TREE_ARGS],
+        cwd=str(repo_path),
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+    )
+
+    def _write() -> None:
+        try:
+            proc.stdin.write("".join(f"{sha}\n" for sha in shas).encode("utf-8"))
+        except OSError:
+            pass
+        finally:
+            try:
+                proc.stdin.close()
+            except OSError:
+                pass
+
+    # Written from a helper thread so a large request cannot deadlock on stdout
+    writer = threading.Thread(target=_write, daemon=True)
+    writer.start()
+    with call_accounting.track_call("git", "diff-tree") as call:
+        try:
+            yield from parse_diff_tree_output(_iter_tokens(proc.stdout, call))
+        finally:
+            proc.stdout.close()
+            if proc.poll() is None:
+                proc.kill()
+            proc.wait()
+            writer.join()
+
+
+# =============================================================================
+# Patches
+# =============================================================================
+
+
+def iter_patch_lines(repo_path: Path, base: str, head: str) -> Iterator[str]:
+    """
+    Stream the lines of `git diff base head` without buffering the patch.
+
+    Raises:
+        subprocess.CalledProcessError: If git exits with an error
+    """
+    proc = subprocess.Popen(
+        ["git", "diff", "--no-color", base, head],
+        cwd=str(repo_path),
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+    )
+    with call_accounting.track_call("git", "diff") as call:
+        try:
+            for line in proc.stdout:
+                call.add_output(len(line))
+                yield line.decode("utf-8", "replace").rstrip("\r\n")
+        finally:
+            proc.stdout.close()
+            if proc.poll() is None:
+                proc.kill()
+            returncode = proc.wait()
+    if returncode != 0:
+        raise subprocess.CalledProcessError(returncode, ["git", "diff", base, head])
@@ -0,0 +1,625 @@
+"""
+Per-repository commit index.
+
+Builds a compact sha -> commit metadata map (parents, author/committer
+identity, timestamps, per-file numstat) from a single streamed
+`git log --all --numstat` over the bare repository, so that feature
+extractors can answer per-commit questions without spawning a git
+process for every field of every commit.
+
+Lifecycle:
+- refresh_commit_index() is called after clone/fetch (clone_repo task).
+  The first call walks the full history; later calls only walk commits
+  reachable from the new ref tips and not from the previously indexed ones.
+- get_commit_index() returns the index cached in this worker process,
+  reloading it from disk when the file changes.
+- lookup_commit() resolves one commit, filling misses (e.g. replayed fork
+  commits that are not reachable from any ref) with a single git call.
+"""
+
+from __future__ import annotations
+
+import heapq
+import logging
+import os
+import pickle
+import subprocess
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from app.core import call_accounting
+
+logger = logging.getLogger(__name__)
+
+# Bump when the record layout or parsing rules change (forces a full rebuild)
+INDEX_VERSION = 2
+
+# Stored inside the bare repo so it shares the repo's lifecycle
+INDEX_FILENAME = "buildguard-commit-index.pkl"
+
+# Header fields for each commit, separated by \x1f and prefixed by \x1e
+_LOG_FORMAT = "%x1e" + "%x1f".join(
+    ["%H", "%P", "%an", "%ae", "%at", "%cn", "%ce", "%ct", "%aN", "%aE", "%s"]
+)
+_RECORD_START = "\x1e"
+_FIELD_SEP = "\x1f"
+
+_GIT_LOG_TIMEOUT = 1800
+
+
+class IndexOutdatedError(Exception):
+    """The persisted index can't be updated incrementally and must be rebuilt."""
+
+
+@dataclass(frozen=True, slots=True)
+class FileChange:
+    """One numstat entry of a commit (diff against its first parent)."""
+
+    path: str
+    added: int
+    deleted: int
+    old_path: Optional[str] = None  # Set for renames/copies
+
+
+@dataclass(slots=True)
+class CommitRecord:
+    """Indexed metadata for a single commit."""
+
+    sha: str
+    parents: Tuple[str, ...]
+    author_name: str
+    author_email: str
+    author_ts: int
+    committer_name: str
+    committer_email: str
+    committer_ts: int
+    subject: str
+    # Author identity after .mailmap (HEAD:.mailmap in bare repos)
+    mailmap_name: str = ""
+    mailmap_email: str = ""
+    files: Tuple[FileChange, ...] = ()
+
+    @property
+    def is_merge(self) -> bool:
+        return len(self.parents) > 1
+
+
+@dataclass
+class CommitIndex:
+    """Commit metadata for every commit reachable from the indexed ref tips."""
+
+    commits: Dict[str, CommitRecord] = field(default_factory=dict)
+    tips: List[str] = field(default_factory=list)
+    version: int = INDEX_VERSION
+    # Blob id of HEAD:.mailmap when the index was built (None if absent)
+    mailmap_blob: Optional[str] = None
+
+    def __len__(self) -> int:
+        return len(self.commits)
+
+    def __contains__(self, sha: str) -> bool:
+        return sha in self.commits
+
+    def get(self, sha: str) -> Optional[CommitRecord]:
+        return self.commits.get(sha)
+
+    def records_after(self, count: int, last_sha: Optional[str]) -> Optional[List[CommitRecord]]:
+        """
+        Records added after the first `count` ones (insertion order).
+
+        Used by derived indexes to catch up incrementally. Returns None if
+        the first `count` records are not the ones the caller saw (last_sha
+        is the sha at position count - 1), e.g. after a full rebuild.
+        """
+        if count > len(self.commits):
+            return None
+        if count:
+            shas = iter(self.commits)
+            for _ in range(count - 1):
+                next(shas)
+            if next(shas) != last_sha:
+                return None
+        records = iter(self.commits.values())
+        for _ in range(count):
+            next(records)
+        return list(records)
+
+    def add(self, records: Iterable[CommitRecord]) -> int:
+        """Add records to the index, returning how many were new."""
+        added = 0
+        for record in records:
+            if record.sha not in self.commits:
+                added += 1
+            self.commits[record.sha] = record
+        return added
+
+    def walk(
+        self,
+        start_sha: str,
+        max_count: int = 1000,
+        resolve: Optional[Callable[[str], Optional[CommitRecord]]] = None,
+    ) -> Optional[List[CommitRecord]]:
+        """
+        Walk history from start_sha in `git log` order (newest committer date first).
+
+        Args:
+            start_sha: Commit to start from (included)
+            max_count: Maximum commits to return
+            resolve: Optional callback for commits missing from the index
+
+        Returns:
+            List of commit records, or None if part of the history is not indexed
+        """
+        resolve = resolve or self.get
+        start = resolve(start_sha)
+        if start is None:
+            return None
+
+        # Same tie-breaking as git's date-ordered queue: FIFO for equal dates
+        counter = 0
+        queue: List[Tuple[int, int, CommitRecord]] = [(-start.committer_ts, counter, start)]
+        seen = {start.sha}
+        result: List[CommitRecord] = []
+
+        while queue and len(result) < max_count:
+            _, _, record = heapq.heappop(queue)
+            result.append(record)
+            for parent_sha in record.parents:
+                if parent_sha in seen:
+                    continue
+                parent = resolve(parent_sha)
+                if parent is None:
+                    return None
+                seen.add(parent_sha)
+                counter += 1
+                heapq.heappush(queue, (-parent.committer_ts, counter, parent))
+
+        return result
+
+
+    def ancestors_since(
+        self,
+        start_sha: str,
+        since_ts: int,
+        resolve: Optional[Callable[[str], Optional[CommitRecord]]] = None,
+    ) -> Optional[Set[str]]:
+        """
+        SHAs reachable from start_sha (included) with committer_ts >= since_ts.
+
+        Like `git log <start> --since=...`, the walk does not continue past
+        commits older than since_ts.
+
+        Returns:
+            Set of SHAs, or None if part of the history is not indexed
+        """
+        resolve = resolve or self.get
+        start = resolve(start_sha)
+        if start is None:
+            return None
+
+        result: Set[str] = set()
+        seen = {start.sha}
+        stack = [start]
+        while stack:
+            record = stack.pop()
+            if record.committer_ts < since_ts:
+                continue
+            result.add(record.sha)
+            for parent_sha in record.parents:
+                if parent_sha in seen:
+                    continue
+                parent = resolve(parent_sha)
+                if parent is None:
+                    return None
+                seen.add(parent_sha)
+                stack.append(parent)
+        return result
+
+
+# =============================================================================
+# Parsing
+# =============================================================================
+
+
+def _unquote_path(raw: str) -> str:
+    """Undo git's C-style quoting for paths containing special characters."""
+    if len(raw) >= 2 and raw.startswith('"') and raw.endswith('"'):
+        return raw[1:-1].encode("utf-8").decode("unicode_escape").encode("latin-1").decode("utf-8")
+    return raw
+
+
+def _parse_numstat_path(raw: str) -> Tuple[str, Optional[str]]:
+    """
+    Parse the path column of a numstat line.
+
+    Renames are reported either as "old => new" or "prefix/{old => new}/suffix".
+
+    Returns:
+        Tuple of (new_path, old_path or None)
+    """
+    if " => " not in raw:
+        return _unquote_path(raw), None
+
+    brace_start = raw.find("{")
+    brace_end = raw.find("}", brace_start + 1)
+    if brace_start != -1 and brace_end != -1 and " => " in raw[brace_start:brace_end]:
+        prefix = raw[:brace_start]
+        suffix = raw[brace_end + 1 :]
+        old_part, new_part = raw[brace_start + 1 : brace_end].split(" => ", 1)
+        old_path = (prefix + old_part + suffix).replace("//", "/")
+        new_path = (prefix + new_part + suffix).replace("//", "/")
+        return _unquote_path(new_path), _unquote_path(old_path)
+
+    old_path, new_path = raw.split(" => ", 1)
+    return _unquote_path(new_path), _unquote_path(old_path)
+
+
+def _parse_header(line: str) -> Optional[CommitRecord]:
+    parts = line[len(_RECORD_START) :].split(_FIELD_SEP)
+    if len(parts) < 11:
+        return None
+    try:
+        return CommitRecord(
+            sha=parts[0],
+            parents=tuple(parts[1].split()),
+            author_name=parts[2],
+            author_email=parts[3],
+            author_ts=int(parts[4]) if parts[4] else 0,
+            committer_name=parts[5],
+            committer_email=parts[6],
+            committer_ts=int(parts[7]) if parts[7] else 0,
+            mailmap_name=parts[8],
+            mailmap_email=parts[9],
+            subject=_FIELD_SEP.join(parts[10:]),
+        )
+    except ValueError:
+        return None
+
+
+def _parse_numstat_line(line: str) -> Optional[FileChange]:
+    parts = line.split("\t", 2)
+    if len(parts) < 3:
+        return None
+    # Binary files are reported as "-\t-\tpath"
+    added = int(parts[0]) if parts[0].isdigit() else 0
+    deleted = int(parts[1]) if parts[1].isdigit() else 0
+    path, old_path = _parse_numstat_path(parts[2])
+    return FileChange(path=path, added=added, deleted=deleted, old_path=old_path)
+
+
+def parse_log_stream(lines: Iterable[str]) -> Iterator[CommitRecord]:
+    """Parse `git log --numstat --format=_LOG_FORMAT` output line by line."""
+    current: Optional[CommitRecord] = None
+    files: List[FileChange] = []
+
+    for raw_line in lines:
+        line = raw_line.rstrip("\n")
+        if line.startswith(_RECORD_START):
+            if current is not None:
+                current.files = tuple(files)
+                yield current
+            current = _parse_header(line)
+            files = []
+        elif line and current is not None:
+            change = _parse_numstat_line(line)
+            if change is not None:
+                files.append(change)
+
+    if current is not None:
+        current.files = tuple(files)
+        yield current
+
+
+def _git_log_command(extra_args: List[str]) -> List[str]:
+    return [
+        "git",
+        "-c",
+        "core.quotePath=false",
+        "log",
+        "--numstat",
+        "-M",
+        f"--format={_LOG_FORMAT}",
+        *extra_args,
+    ]
+
+
+def _stream_log(
+    repo_path: Path, extra_args: List[str], stdin_revs: List[str]
+) -> List[CommitRecord]:
+    """Run one streamed git log and parse it without buffering the whole output."""
+    proc = subprocess.Popen(
+        _git_log_command(extra_args),
+        cwd=str(repo_path),
+        stdin=subprocess.PIPE if stdin_revs else subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        encoding="utf-8",
+        errors="replace",
+    )
+
+    # Feed revisions from a thread so a large rev list cannot deadlock on the pipe
+    writer = None
+    if stdin_revs and proc.stdin:
+
+        def _feed() -> None:
+            try:
+                proc.stdin.write("\n".join(stdin_revs) + "\n")
+                proc.stdin.close()
+            except (BrokenPipeError, OSError):
+                pass
+
+        writer = threading.Thread(target=_feed, daemon=True)
+        writer.start()
+
+    # Drain stderr alongside stdout so a chatty git cannot block on a full pipe
+    stderr_chunks: List[str] = []
+    reader = None
+    if proc.stderr:
+
+        def _drain() -> None:
+            stderr_chunks.append(proc.stderr.read())
+
+        reader = threading.Thread(target=_drain, daemon=True)
+        reader.start()
+
+    try:
+        with call_accounting.track_call("git", "log"):
+            records = list(parse_log_stream(proc.stdout)) if proc.stdout else []
+            returncode = proc.wait(timeout=_GIT_LOG_TIMEOUT)
+    except Exception:
+        proc.kill()
+        proc.wait()
+        raise
+    finally:
+        if writer:
+            writer.join(timeout=5)
+        if reader:
+            reader.join(timeout=5)
+
+    if returncode != 0:
+        raise subprocess.CalledProcessError(returncode, proc.args, None, "".join(stderr_chunks))
+    return records
+
+
+def _list_ref_tips(repo_path: Path) -> List[str]:
+    result = call_accounting.run(
+        ["git", "rev-parse", "--all"],
+        cwd=str(repo_path),
+        capture_output=True,
+        text=True,
+        check=True,
+        timeout=60,
+    )
+    return sorted({line.strip() for line in result.stdout.splitlines() if line.strip()})
+
+
+# =============================================================================
+# Build / update / persistence
+# =============================================================================
+
+
+def get_index_path(repo_path: Path) -> Path:
+    """Location of the persisted index for a bare repository."""
+    return Path(repo_path) / INDEX_FILENAME
+
+
+def _get_mailmap_blob(repo_path: Path) -> Optional[str]:
+    result = call_accounting.run(
+        ["git", "rev-parse", "--verify", "--quiet", "HEAD:.mailmap"],
+        cwd=str(repo_path),
+        capture_output=True,
+        text=True,
+        timeout=60,
+    )
+    return result.stdout.strip() or None
+
+
+def build_commit_index(repo_path: Path) -> CommitIndex:
+    """Build the index from scratch with a single streamed git log."""
+    tips = _list_ref_tips(repo_path)
+    index = CommitIndex(tips=tips, mailmap_blob=_get_mailmap_blob(repo_path))
+    if tips:
+        # --stdin: tips are read from stdin, so huge ref lists never hit ARG_MAX
+        index.add(_stream_log(repo_path, ["--stdin"], tips))
+    return index
+
+
+def update_commit_index(repo_path: Path, index: CommitIndex) -> int:
+    """
+    Incrementally add commits reachable from new ref tips.
+
+    Raises:
+        IndexOutdatedError: .mailmap changed, so existing records need remapping
+
+    Returns:
+        Number of commits added
+    """
+    if _get_mailmap_blob(repo_path) != index.mailmap_blob:
+        raise IndexOutdatedError(".mailmap changed")
+
+    tips = _list_ref_tips(repo_path)
+    known_tips = set(index.tips)
+    new_tips = [sha for sha in tips if sha not in known_tips]
+    if not new_tips:
+        index.tips = tips
+        return 0
+
+    stdin_revs = new_tips + [f"^{sha}" for sha in index.tips]
+    added = index.add(_stream_log(repo_path, ["--stdin"], stdin_revs))
+    index.tips = tips
+    return added
+
+
+def save_commit_index(repo_path: Path, index: CommitIndex) -> None:
+    """Atomically persist the index next to the bare repo."""
+    path = get_index_path(repo_path)
+    tmp_path = path.with_suffix(f".tmp.{os.getpid()}")
+    with open(tmp_path, "wb") as f:
+        pickle.dump(index, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+
+def load_commit_index(repo_path: Path) -> Optional[CommitIndex]:
+    """Load the persisted index, or None if missing, unreadable or outdated."""
+    path = get_index_path(repo_path)
+    if not path.exists():
+        return None
+    try:
+        with open(path, "rb") as f:
+            index = pickle.load(f)
+    except Exception as e:
+        logger.warning(f"Failed to load commit index at {path}: {e}")
+        return None
+    if not isinstance(index, CommitIndex) or index.version != INDEX_VERSION:
+        return None
+    return index
+
+
+def refresh_commit_index(repo_path: Path) -> Optional[CommitIndex]:
+    """
+    Build or incrementally update the index after a clone/fetch.
+
+    Callers should hold the repo's clone lock. Failures are logged and
+    swallowed: extractors fall back to per-commit git calls without an index.
+    """
+    repo_path = Path(repo_path)
+    try:
+        index = load_commit_index(repo_path)
+        if index is None:
+            index = build_commit_index(repo_path)
+            logger.info(f"Built commit index for {repo_path} ({len(index)} commits)")
+        else:
+            try:
+                added = update_commit_index(repo_path, index)
+            except subprocess.CalledProcessError as e:
+                # Old tips may have been garbage collected after a force push
+                logger.info(f"Incremental commit index update failed ({e.stderr}), rebuilding")
+                index = build_commit_index(repo_path)
+                added = len(index)
+            except IndexOutdatedError as e:
+                logger.info(f"Commit index outdated ({e}), rebuilding")
+                index = build_commit_index(repo_path)
+                added = len(index)
+            logger.info(f"Updated commit index for {repo_path} (+{added} commits)")
+
+        save_commit_index(repo_path, index)
+        _cache_put(repo_path, index)
+        return index
+    except Exception as e:
+        logger.warning(f"Failed to refresh commit index for {repo_path}: {e}")
+        return None
+
+
+# =============================================================================
+# Per-process cache
+# =============================================================================
+
+_cache_lock = threading.Lock()
+_cache: Dict[str, Tuple[float, CommitIndex]] = {}
+# SHAs git could not resolve, per repo, valid until the index file changes
+_misses: Dict[str, Tuple[float, Set[str]]] = {}
+
+
+def _index_mtime(repo_path: Path) -> Optional[float]:
+    try:
+        return get_index_path(repo_path).stat().st_mtime
+    except OSError:
+        return None
+
+
+def _cache_put(repo_path: Path, index: CommitIndex) -> None:
+    mtime = _index_mtime(repo_path)
+    if mtime is None:
+        return
+    with _cache_lock:
+        _cache[str(repo_path)] = (mtime, index)
+
+
+def get_commit_index(repo_path: Path) -> Optional[CommitIndex]:
+    """Get the index for a repo, reloading it when the file on disk changed."""
+    key = str(repo_path)
+    mtime = _index_mtime(Path(repo_path))
+    if mtime is None:
+        return None
+
+    with _cache_lock:
+        cached = _cache.get(key)
+        if cached and cached[0] == mtime:
+            return cached[1]
+
+    index = load_commit_index(Path(repo_path))
+    if index is None:
+        return None
+    with _cache_lock:
+        _cache[key] = (mtime, index)
+    return index
+
+
+def clear_commit_index_cache() -> None:
+    """Drop all indexes cached in this process."""
+    with _cache_lock:
+        _cache.clear()
+        _misses.clear()
+
+
+def _is_full_sha(sha: Optional[str]) -> bool:
+    if not sha or len(sha) != 40:
+        return False
+    try:
+        int(sha, 16)
+    except ValueError:
+        return False
+    return True
+
+
+def _fetch_single_commit(repo_path: Path, sha: str) -> Optional[CommitRecord]:
+    try:
+        records = _stream_log(repo_path, ["--no-walk", sha], [])
+    except (subprocess.CalledProcessError, OSError):
+        return None
+    return records[0] if records else None
+
+
+def lookup_commit(repo_path: Path, sha: str) -> Optional[CommitRecord]:
+    """
+    Look up a commit in the repo's index.
+
+    Misses (commits not reachable from any indexed ref, such as replayed fork
+    commits) are resolved with one git call and memoized in memory. SHAs git
+    doesn't know are memoized too, until the index is refreshed.
+
+    Returns:
+        CommitRecord, or None if the repo has no index or the commit is unknown
+    """
+    if not _is_full_sha(sha):
+        return None
+    index = get_commit_index(repo_path)
+    if index is None:
+        return None
+
+    record = index.get(sha)
+    if record is not None:
+        return record
+
+    key = str(repo_path)
+    mtime = _index_mtime(Path(repo_path))
+    with _cache_lock:
+        missing = _misses.get(key)
+        if missing and missing[0] == mtime and sha in missing[1]:
+            return None
+
+    record = _fetch_single_commit(Path(repo_path), sha)
+    if record is not None and record.sha == sha:
+        index.add([record])
+        return record
+
+    with _cache_lock:
+        missing = _misses.get(key)
+        if not missing or missing[0] != mtime:
+            missing = (mtime, set())
+            _misses[key] = missing
+        missing[1].add(sha)
+    return None
@@ -0,0 +1,229 @@
+"""
+Persisted per-build feature results shared across pipeline scopes.
+
+FeatureVectors are stored per (raw_build_run, scope, config), so a build
+that belongs to a model repo config and to several training scenarios was
+extracted from scratch for each of them. This module stores every reusable
+feature value once in the `feature_results` collection, keyed by:
+
+- raw_build_run_id
+- feature name
+- version: hash of the versions (@node_version) of the feature's node and
+  everything upstream of it, and of RESULTS_VERSION (computed by
+  HamiltonPipeline), so bumping an extractor makes its results and those of
+  its dependents stale
+- config_hash: hash of the feature config as seen by the build's repo, or
+  "" for features that do not read feature_config
+
+prepare_pipeline_input() loads the results matching the current keys and
+only extracts the missing ones. Never stored are:
+
+- temporal features (reading the feature vectors of earlier builds), which
+  depend on the scope
+- features reading the build history or the GitHub API, whose data can
+  change after extraction (hamilton_runner.VOLATILE_INPUTS)
+- features of a node that failed or logged an error in the run
+  (HamiltonPipeline.get_unreliable_features), so a swallowed transient
+  error is not shared as a result
+
+Results expire FEATURE_RESULTS_TTL_DAYS after they were stored (TTL index
+on created_at), and invalidate_feature_results() drops those of given
+builds, e.g. when failed builds are retried.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, FrozenSet, Iterable, Mapping, Optional, Set, Tuple
+
+from bson import ObjectId
+from pymongo import ASCENDING, IndexModel, UpdateOne
+from pymongo.collection import Collection
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+COLLECTION_NAME = "feature_results"
+
+# feature name -> (version, config_hash)
+FeatureResultKeys = Dict[str, Tuple[str, str]]
+
+
+def feature_config_hash(feature_config: Any) -> str:
+    """
+    Hash of the feature config values visible to the current repo.
+
+    Global values and the current repo's overrides are hashed; the
+    overrides of other repos in a multi-repo config are not.
+    """
+    if feature_config is None:
+        return hashlib.sha1(b"null").hexdigest()[:16]
+    configs = feature_config.feature_configs or {}
+    visible = {key: value for key, value in configs.items() if key != "repos"}
+    repo_configs = (configs.get("repos") or {}).get(str(feature_config.current_repo_id))
+    payload = json.dumps([visible, repo_configs or {}], sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode()).hexdigest()[:16]
+
+
+class FeatureResultStore:
+    """Loads and saves reusable feature values of builds."""
+
+    def __init__(
+        self,
+        collection: Collection,
+        versions: Mapping[str, str],
+        config_dependent: FrozenSet[str],
+    ):
+        """
+        Args:
+            collection: feature_results collection
+            versions: Reusable feature name -> version of its extractors
+            config_dependent: Features whose value depends on feature_config
+        """
+        self.collection = collection
+        self.versions = versions
+        self.config_dependent = config_dependent
+
+    def keys_for(self, features: Set[str], feature_config: Any) -> FeatureResultKeys:
+        """Current keys of the reusable features among `features`."""
+        config_hash = feature_config_hash(feature_config)
+        return {
+            name: (self.versions[name], config_hash if name in self.config_dependent else "")
+            for name in features
+            if name in self.versions
+        }
+
+    def load(self, raw_build_run_id: Any, keys: FeatureResultKeys) -> Dict[str, Any]:
+        """
+        Stored values matching the current keys; results of an older
+        extractor version are deleted.
+        """
+        if not keys:
+            return {}
+        try:
+            ensure_indexes(self.collection)
+            build_id = ObjectId(raw_build_run_id)
+            docs = self.collection.find(
+                {"raw_build_run_id": build_id, "feature": {"$in": list(keys)}},
+                {"feature": 1, "version": 1, "config_hash": 1, "value": 1},
+            )
+            found: Dict[str, Any] = {}
+            stale = []
+            for doc in docs:
+                version, config_hash = keys[doc["feature"]]
+                if doc.get("version") != version:
+                    stale.append(doc["_id"])
+                elif doc.get("config_hash") == config_hash:
+                    found[doc["feature"]] = doc.get("value")
+            if stale:
+                self.collection.delete_many({"_id": {"$in": stale}})
+            return found
+        except Exception as e:
+            logger.warning(f"Failed to load feature results for build {raw_build_run_id}: {e}")
+            return {}
+
+    def save(
+        self, raw_build_run_id: Any, features: Dict[str, Any], keys: FeatureResultKeys
+    ) -> None:
+        """Store formatted feature values; existing results are left unchanged."""
+        operations = []
+        now = datetime.now(timezone.utc)
+        try:
+            build_id = ObjectId(raw_build_run_id)
+            for name, value in features.items():
+                if name not in keys:
+                    continue
+                version, config_hash = keys[name]
+                operations.append(
+                    UpdateOne(
+                        {
+                            "raw_build_run_id": build_id,
+                            "feature": name,
+                            "version": version,
+                            "config_hash": config_hash,
+                        },
+                        {"$setOnInsert": {"value": value, "created_at": now}},
+                        upsert=True,
+                    )
+                )
+            if operations:
+                ensure_indexes(self.collection)
+                self.collection.bulk_write(operations, ordered=False)
+        except Exception as e:
+            logger.warning(f"Failed to save feature results for build {raw_build_run_id}: {e}")
+
+    def invalidate(self, raw_build_run_ids: Iterable[Any]) -> int:
+        """Delete the stored results of builds; returns how many were deleted."""
+        build_ids = [ObjectId(build_id) for build_id in raw_build_run_ids]
+        if not build_ids:
+            return 0
+        try:
+            result = self.collection.delete_many({"raw_build_run_id": {"$in": build_ids}})
+            return result.deleted_count
+        except Exception as e:
+            logger.warning(f"Failed to invalidate feature results of {len(build_ids)} builds: {e}")
+            return 0
+
+
+# =============================================================================
+# Collection
+# =============================================================================
+
+_indexed_lock = threading.Lock()
+_indexed: set = set()
+
+
+def ensure_indexes(collection: Collection) -> None:
+    """Create the unique lookup and expiry (TTL) indexes once per collection and process."""
+    key = (collection.database.name, collection.name)
+    with _indexed_lock:
+        if key in _indexed:
+            return
+        _indexed.add(key)
+    indexes = [
+        IndexModel(
+            [
+                ("raw_build_run_id", ASCENDING),
+                ("feature", ASCENDING),
+                ("version", ASCENDING),
+                ("config_hash", ASCENDING),
+            ],
+            unique=True,
+            name="unique_feature_result",
+        ),
+    ]
+    if settings.FEATURE_RESULTS_TTL_DAYS > 0:
+        indexes.append(
+            IndexModel(
+                [("created_at", ASCENDING)],
+                expireAfterSeconds=settings.FEATURE_RESULTS_TTL_DAYS * 86400,
+                name="feature_result_expiry",
+            )
+        )
+    try:
+        collection.create_indexes(indexes)
+    except Exception:
+        # Indexes may already exist with different options
+        pass
+
+
+def get_feature_result_store(
+    db: Any,
+    versions: Mapping[str, str],
+    config_dependent: FrozenSet[str],
+) -> Optional[FeatureResultStore]:
+    """FeatureResultStore on the database, or None if there is nothing to reuse."""
+    if db is None or not versions:
+        return None
+    return FeatureResultStore(db.get_collection(COLLECTION_NAME), versions, config_dependent)
+
+
+def invalidate_feature_results(db: Any, raw_build_run_ids: Iterable[Any]) -> int:
+    """Drop the stored results of builds so their next extraction recomputes them."""
+    store = FeatureResultStore(db.get_collection(COLLECTION_NAME), {}, frozenset())
+    return store.invalidate(raw_build_run_ids)
@@ -0,0 +1,250 @@
+"""
+Per-path commit history derived from the commit index.
+
+For every path touched in the indexed history, keeps the commits that changed
+it sorted by committer timestamp (the date `git log --since/--until` filters
+on), together with their authors. Questions like "which commits touched P
+in this window" or "how many of P's commits are by these authors" become
+bisect lookups instead of one `git log -- P` per file.
+
+The index is derived in memory from the repo's CommitIndex (one pass over
+its numstat records) and cached per process; it is rebuilt whenever a new
+CommitIndex is loaded after a fetch.
+"""
+
+from __future__ import annotations
+
+import re
+import threading
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from app.tasks.pipeline.utils.commit_index import CommitIndex, get_commit_index
+
+
+@dataclass(slots=True)
+class PathHistory:
+    """Commits that touched one path, ascending by committer timestamp."""
+
+    timestamps: List[int] = field(default_factory=list)
+    shas: List[str] = field(default_factory=list)
+    author_names: List[str] = field(default_factory=list)
+    author_emails: List[str] = field(default_factory=list)
+    # (timestamp, old_path, sha) for commits that renamed old_path to this path
+    renamed_from: List[Tuple[int, str, str]] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.shas)
+
+    def window(self, since_ts: Optional[int] = None, until_ts: Optional[int] = None) -> range:
+        """Positions of commits with since_ts <= timestamp <= until_ts."""
+        lo = bisect_left(self.timestamps, since_ts) if since_ts is not None else 0
+        hi = bisect_right(self.timestamps, until_ts) if until_ts is not None else len(self.shas)
+        return range(lo, max(lo, hi))
+
+
+class FileHistoryIndex:
+    """path -> PathHistory for every path in the indexed history."""
+
+    def __init__(self, commit_index: CommitIndex):
+        self.paths: Dict[str, PathHistory] = {}
+
+        entries: Dict[str, List[Tuple[int, str, str, str]]] = {}
+        renames: Dict[str, List[Tuple[int, str, str]]] = {}
+        for record in commit_index.commits.values():
+            ts = record.committer_ts
+            row = (ts, record.sha, record.author_name, record.author_email)
+            for change in record.files:
+                entries.setdefault(change.path, []).append(row)
+                if change.old_path and change.old_path != change.path:
+                    # `git log -- old_path` also lists the commit that moved it
+                    entries.setdefault(change.old_path, []).append(row)
+                    renames.setdefault(change.path, []).append((ts, change.old_path, record.sha))
+
+        for path, rows in entries.items():
+            rows.sort(key=lambda r: r[0])
+            history = PathHistory(
+                timestamps=[r[0] for r in rows],
+                shas=[r[1] for r in rows],
+                author_names=[r[2] for r in rows],
+                author_emails=[r[3] for r in rows],
+            )
+            history.renamed_from = sorted(renames.get(path, []))
+            self.paths[path] = history
+
+    def __len__(self) -> int:
+        return len(self.paths)
+
+    def get(self, path: str) -> Optional[PathHistory]:
+        return self.paths.get(path)
+
+    def count_commits(
+        self,
+        path: str,
+        since_ts: Optional[int] = None,
+        until_ts: Optional[int] = None,
+    ) -> int:
+        """Number of commits that touched path within [since_ts, until_ts]."""
+        history = self.paths.get(path)
+        if history is None:
+            return 0
+        return len(history.window(since_ts, until_ts))
+
+    def commits_between(
+        self,
+        path: str,
+        since_ts: Optional[int] = None,
+        until_ts: Optional[int] = None,
+    ) -> List[str]:
+        """SHAs of commits that touched path within [since_ts, until_ts], oldest first."""
+        history = self.paths.get(path)
+        if history is None:
+            return []
+        window = history.window(since_ts, until_ts)
+        return history.shas[window.start : window.stop]
+
+    def authors_between(
+        self,
+        path: str,
+        since_ts: Optional[int] = None,
+        until_ts: Optional[int] = None,
+        last_n: Optional[int] = None,
+        reachable: Optional[Set[str]] = None,
+    ) -> List[str]:
+        """
+        Author names of commits that touched path within the window, oldest first.
+
+        Args:
+            last_n: Only keep the newest N commits of the window
+            reachable: Only count these commits (e.g. ancestors of a build)
+        """
+        history = self.paths.get(path)
+        if history is None:
+            return []
+        window = history.window(since_ts, until_ts)
+        if reachable is not None:
+            names = [history.author_names[i] for i in window if history.shas[i] in reachable]
+            return names[max(0, len(names) - last_n) :] if last_n is not None else names
+        start = window.start
+        if last_n is not None:
+            start = max(start, window.stop - last_n)
+        return history.author_names[start : window.stop]
+
+    def follow(self, path: str, until_ts: Optional[int] = None) -> List[Tuple[str, str, str]]:
+        """
+        History of a path across renames, like `git log --follow`.
+
+        Args:
+            until_ts: Only commits with timestamp <= until_ts
+
+        Returns:
+            List of (sha, author_name, author_email), newest first
+        """
+        result: List[Tuple[str, str, str]] = []
+        seen_paths: Set[str] = set()
+        current: Optional[str] = path
+        rename_sha: Optional[str] = None
+
+        while current and current not in seen_paths:
+            seen_paths.add(current)
+            history = self.paths.get(current)
+            if history is None:
+                break
+            window = history.window(None, until_ts)
+            for i in reversed(window):
+                # The rename commit itself was already counted under the new path
+                if history.shas[i] == rename_sha:
+                    continue
+                result.append(
+                    (history.shas[i], history.author_names[i], history.author_emails[i])
+                )
+
+            # Continue with the path this one was renamed from (latest rename in window)
+            renames = [r for r in history.renamed_from if until_ts is None or r[0] <= until_ts]
+            if not renames:
+                break
+            until_ts, current, rename_sha = renames[-1]
+
+        return result
+
+
+def datetime_to_ts(value: datetime) -> int:
+    """Convert a datetime to a unix timestamp (naive values are treated as UTC)."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp())
+
+
+def identity_matches(pattern: str, name: str, email: str) -> bool:
+    """Match an author the way `git log --author=<pattern>` does."""
+    try:
+        return re.search(pattern, f"{name} <{email}>") is not None
+    except re.error:
+        return pattern in f"{name} <{email}>"
+
+
+# =============================================================================
+# Per-process cache
+# =============================================================================
+
+_cache_lock = threading.Lock()
+_cache: Dict[str, Tuple[CommitIndex, FileHistoryIndex]] = {}
+
+
+def get_file_history_index(repo_path: Path) -> Optional[FileHistoryIndex]:
+    """
+    Get the file history index for a repo, or None if it has no commit index.
+
+    Rebuilt when the underlying CommitIndex object changes (new fetch).
+    """
+    commit_index = get_commit_index(repo_path)
+    if commit_index is None:
+        return None
+
+    key = str(repo_path)
+    with _cache_lock:
+        cached = _cache.get(key)
+        if cached and cached[0] is commit_index:
+            return cached[1]
+
+    file_index = FileHistoryIndex(commit_index)
+    with _cache_lock:
+        _cache[key] = (commit_index, file_index)
+    return file_index
+
+
+def clear_file_history_cache() -> None:
+    """Drop all file history indexes cached in this process."""
+    with _cache_lock:
+        _cache.clear()
+
+
+def ownership_ratio(
+    file_index: FileHistoryIndex,
+    paths: Iterable[str],
+    authors: Set[str],
+    since_ts: Optional[int] = None,
+    until_ts: Optional[int] = None,
+    last_n: Optional[int] = None,
+    reachable: Optional[Set[str]] = None,
+) -> Tuple[int, int]:
+    """
+    Count commits on paths and how many of them are by the given author names.
+
+    Args:
+        reachable: Only count these commits; the index spans every ref, while
+            `git log` only walks the given revision
+
+    Returns:
+        Tuple of (owned_commits, total_commits)
+    """
+    owned = 0
+    total = 0
+    for path in paths:
+        names = file_index.authors_between(path, since_ts, until_ts, last_n, reachable)
+        total += len(names)
+        owned += sum(1 for name in names if name in authors)
+    return owned, total
@@ -0,0 +1,398 @@
+"""
+Persistent git object reader.
+
+Keeps one long-lived `git cat-file --batch` (and `--batch-check`) process per
+bare repository in each worker process, so extractors can read commit headers,
+trees and blobs without forking a new git process for every lookup.
+
+Lifecycle:
+- get_object_reader() returns the reader for a repo, starting it lazily.
+- Readers idle for longer than GIT_OBJECT_READER_IDLE_SECONDS are closed the
+  next time the pool is accessed.
+- If a cat-file child dies (killed, repo repacked underneath, etc.) the request
+  is retried once on a freshly started process.
+- close_all_object_readers() shuts the pool down (worker shutdown / tests).
+"""
+
+from __future__ import annotations
+
+import atexit
+import logging
+import subprocess
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from app.config import settings
+from app.core import call_accounting
+
+logger = logging.getLogger(__name__)
+
+# Object types returned by cat-file
+OBJECT_COMMIT = "commit"
+OBJECT_TREE = "tree"
+OBJECT_BLOB = "blob"
+OBJECT_TAG = "tag"
+
+# Tree entry mode for submodules (gitlinks) - these have no object in the repo
+GITLINK_MODE = "160000"
+TREE_MODE = "40000"
+
+
+@dataclass(frozen=True, slots=True)
+class GitObject:
+    """A single object read via cat-file --batch."""
+
+    sha: str
+    type: str
+    size: int
+    data: bytes
+
+
+@dataclass(frozen=True, slots=True)
+class TreeEntry:
+    """One entry of a tree object."""
+
+    mode: str
+    name: str
+    sha: str
+
+    @property
+    def is_tree(self) -> bool:
+        return self.mode == TREE_MODE
+
+    @property
+    def is_gitlink(self) -> bool:
+        return self.mode == GITLINK_MODE
+
+
+class GitObjectReaderError(Exception):
+    """Raised when the cat-file process cannot serve a request."""
+
+
+# =============================================================================
+# cat-file process
+# =============================================================================
+
+
+class _CatFileProcess:
+    """A single `git cat-file --batch[-check]` child process."""
+
+    def __init__(self, repo_path: Path, batch_option: str):
+        self.repo_path = repo_path
+        self.batch_option = batch_option
+        self._proc: Optional[subprocess.Popen] = None
+
+    @property
+    def alive(self) -> bool:
+        return self._proc is not None and self._proc.poll() is None
+
+    def _start(self) -> subprocess.Popen:
+        self._proc = subprocess.Popen(
+            ["git", "cat-file", self.batch_option],
+            cwd=str(self.repo_path),
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+        return self._proc
+
+    def _ensure_started(self) -> subprocess.Popen:
+        if not self.alive:
+            if self._proc is not None:
+                logger.info(
+                    f"Restarting git cat-file {self.batch_option} for {self.repo_path} "
+                    f"(exit code {self._proc.returncode})"
+                )
+                self.close()
+            return self._start()
+        return self._proc
+
+    def close(self) -> None:
+        proc, self._proc = self._proc, None
+        if proc is None:
+            return
+        try:
+            if proc.stdin:
+                proc.stdin.close()
+            proc.wait(timeout=5)
+        except Exception:
+            proc.kill()
+            proc.wait()
+        finally:
+            if proc.stdout:
+                proc.stdout.close()
+
+    def _read_one(self, proc: subprocess.Popen, spec: str) -> Optional[GitObject]:
+        header = proc.stdout.readline()
+        if not header:
+            raise GitObjectReaderError(f"cat-file exited while reading {spec}")
+
+        line = header.decode("utf-8", "replace").rstrip("\n")
+        # "<spec> missing": the spec itself may contain spaces (e.g. "HEAD:a b.py")
+        if line.rsplit(" ", 1)[-1] in ("missing", "ambiguous"):
+            return None
+        parts = line.split(" ")
+        if len(parts) != 3:
+            raise GitObjectReaderError(f"Unexpected cat-file header: {header!r}")
+
+        sha, obj_type, size_str = parts
+        size = int(size_str)
+        data = b""
+        if self.batch_option == "--batch":
+            data = proc.stdout.read(size)
+            # Each object's content is followed by a single newline
+            if len(data) != size or proc.stdout.read(1) != b"\n":
+                raise GitObjectReaderError(f"Truncated cat-file output for {spec}")
+        return GitObject(sha=sha, type=obj_type, size=size, data=data)
+
+    def request(self, specs: List[str]) -> List[Optional[GitObject]]:
+        """
+        Send specs to cat-file and read one response per spec.
+
+        Specs are written from a helper thread so that large batches cannot
+        deadlock on a full stdout pipe.
+        """
+        proc = self._ensure_started()
+        payload = "".join(f"{spec}\n" for spec in specs).encode("utf-8")
+        write_error: List[BaseException] = []
+
+        def _write() -> None:
+            try:
+                proc.stdin.write(payload)
+                proc.stdin.flush()
+            except BaseException as e:  # BrokenPipe when the child died
+                write_error.append(e)
+
+        if len(specs) == 1:
+            _write()
+            writer = None
+        else:
+            writer = threading.Thread(target=_write, daemon=True)
+            writer.start()
+
+        # One accounted call per batch; the persistent process is not re-counted
+        with call_accounting.track_call("git", "cat-file") as call:
+            try:
+                results = [self._read_one(proc, spec) for spec in specs]
+                call.add_output(sum(len(obj.data) for obj in results if obj is not None))
+            finally:
+                if writer:
+                    writer.join()
+
+        if write_error:
+            raise GitObjectReaderError(f"Failed to write to cat-file: {write_error[0]}")
+        return results
+
+
+# =============================================================================
+# Reader
+# =============================================================================
+
+
+class GitObjectReader:
+    """
+    Reads objects from a single repository through persistent cat-file processes.
+
+    Thread-safe: requests are serialized per reader.
+    """
+
+    def __init__(self, repo_path: Path):
+        self.repo_path = Path(repo_path)
+        self._lock = threading.Lock()
+        self._batch = _CatFileProcess(self.repo_path, "--batch")
+        self._check = _CatFileProcess(self.repo_path, "--batch-check")
+        self.last_used = time.monotonic()
+
+    def _request(self, process: _CatFileProcess, specs: List[str]) -> List[Optional[GitObject]]:
+        for spec in specs:
+            if not spec or "\n" in spec:
+                raise ValueError(f"Invalid object spec: {spec!r}")
+
+        with self._lock:
+            self.last_used = time.monotonic()
+            try:
+                return process.request(specs)
+            except (GitObjectReaderError, OSError) as e:
+                # The child died or its stream got out of sync - restart and retry once
+                logger.warning(f"git cat-file failed for {self.repo_path}, retrying: {e}")
+                process.close()
+                return process.request(specs)
+
+    # --- Object access -------------------------------------------------------
+
+    def read(self, spec: str) -> Optional[GitObject]:
+        """Read one object (sha, or any rev like `sha:path`). None if missing."""
+        return self._request(self._batch, [spec])[0]
+
+    def read_many(self, specs: Iterable[str]) -> List[Optional[GitObject]]:
+        """Read several objects in one round-trip; results are in spec order."""
+        specs = list(specs)
+        if not specs:
+            return []
+        return self._request(self._batch, specs)
+
+    def info(self, spec: str) -> Optional[Tuple[str, str, int]]:
+        """Return (sha, type, size) for an object without reading its content."""
+        obj = self._request(self._check, [spec])[0]
+        return (obj.sha, obj.type, obj.size) if obj else None
+
+    def exists(self, spec: str) -> bool:
+        """Check whether an object exists (equivalent to `git cat-file -e`)."""
+        return self.info(spec) is not None
+
+    def read_blob(self, spec: str) -> Optional[bytes]:
+        """Read blob content, or None if missing / not a blob."""
+        obj = self.read(spec)
+        if not obj or obj.type != OBJECT_BLOB:
+            return None
+        return obj.data
+
+    # --- Commits -------------------------------------------------------------
+
+    def read_commit_header(self, sha: str) -> Optional[Dict[str, object]]:
+        """
+        Parse a commit object header.
+
+        Returns dict with: sha, tree, parents, author, committer, message
+        (author/committer are raw `Name <email> timestamp tz` strings).
+        """
+        obj = self.read(sha)
+        if not obj or obj.type != OBJECT_COMMIT:
+            return None
+
+        text = obj.data.decode("utf-8", "replace")
+        header, _, message = text.partition("\n\n")
+        commit: Dict[str, object] = {
+            "sha": obj.sha,
+            "tree": None,
+            "parents": [],
+            "author": None,
+            "committer": None,
+            "message": message,
+        }
+        for line in header.split("\n"):
+            key, _, value = line.partition(" ")
+            if key == "tree":
+                commit["tree"] = value
+            elif key == "parent":
+                commit["parents"].append(value)
+            elif key in ("author", "committer"):
+                commit[key] = value
+        return commit
+
+    # --- Trees ---------------------------------------------------------------
+
+    @staticmethod
+    def parse_tree(data: bytes) -> List[TreeEntry]:
+        """Parse raw tree object content into entries."""
+        entries: List[TreeEntry] = []
+        pos = 0
+        end = len(data)
+        while pos < end:
+            space = data.index(b" ", pos)
+            nul = data.index(b"\0", space)
+            mode = data[pos:space].decode("ascii")
+            name = data[space + 1 : nul].decode("utf-8", "surrogateescape")
+            sha = data[nul + 1 : nul + 21].hex()
+            entries.append(TreeEntry(mode=mode, name=name, sha=sha))
+            pos = nul + 21
+        return entries
+
+    def read_tree(self, spec: str) -> Optional[List[TreeEntry]]:
+        """Read a tree (or the root tree of a commit via `<sha>^{tree}`)."""
+        obj = self.read(spec)
+        if not obj or obj.type != OBJECT_TREE:
+            return None
+        return self.parse_tree(obj.data)
+
+    def iter_tree_files(self, commit_sha: str) -> Iterator[Tuple[str, TreeEntry]]:
+        """
+        Recursively list the files of a commit, like `git ls-tree -r`.
+
+        Yields (path, entry) for blobs and gitlinks. Subtrees of one level are
+        fetched in a single batch.
+        """
+        root = self.read_tree(f"{commit_sha}^{{tree}}")
+        if root is None:
+            return
+
+        pending: List[Tuple[str, List[TreeEntry]]] = [("", root)]
+        while pending:
+            subtrees: List[Tuple[str, TreeEntry]] = []
+            for prefix, entries in pending:
+                for entry in entries:
+                    path = f"{prefix}{entry.name}"
+                    if entry.is_tree:
+                        subtrees.append((f"{path}/", entry))
+                    else:
+                        yield path, entry
+
+            objects = self.read_many(entry.sha for _, entry in subtrees)
+            pending = [
+                (prefix, self.parse_tree(obj.data))
+                for (prefix, _), obj in zip(subtrees, objects, strict=True)
+                if obj and obj.type == OBJECT_TREE
+            ]
+
+    def close(self) -> None:
+        with self._lock:
+            self._batch.close()
+            self._check.close()
+
+
+# =============================================================================
+# Per-process pool
+# =============================================================================
+
+_pool_lock = threading.Lock()
+_pool: Dict[str, GitObjectReader] = {}
+
+
+def _evict_idle_locked(now: float) -> None:
+    idle_limit = settings.GIT_OBJECT_READER_IDLE_SECONDS
+    for key, reader in list(_pool.items()):
+        if now - reader.last_used > idle_limit:
+            del _pool[key]
+            reader.close()
+            logger.debug(f"Closed idle git object reader for {key}")
+
+
+def get_object_reader(repo_path: Path) -> GitObjectReader:
+    """Get (or start) the object reader for a repository in this process."""
+    key = str(repo_path)
+    with _pool_lock:
+        _evict_idle_locked(time.monotonic())
+        reader = _pool.get(key)
+        if reader is None:
+            reader = GitObjectReader(Path(repo_path))
+            _pool[key] = reader
+        reader.last_used = time.monotonic()
+        return reader
+
+
+def close_object_reader(repo_path: Path) -> None:
+    """Close the reader for one repository (e.g. before deleting it)."""
+    with _pool_lock:
+        reader = _pool.pop(str(repo_path), None)
+    if reader:
+        reader.close()
+
+
+def close_all_object_readers() -> None:
+    """Close every reader in this process."""
+    with _pool_lock:
+        readers = list(_pool.values())
+        _pool.clear()
+    for reader in readers:
+        reader.close()
+
+
+def object_exists(repo_path: Path, spec: str) -> bool:
+    """Check object existence through the pooled reader."""
+    return get_object_reader(repo_path).exists(spec)
+
+
+atexit.register(close_all_object_readers)
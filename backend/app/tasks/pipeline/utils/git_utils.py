@@ -3,12 +3,27 @@ Git Utilities using subprocess.
 
 Provides git operations using subprocess commands for reliable behavior
 across different repository configurations including submodules and complex histories.
+
+Per-commit lookups are answered from the repository's commit index
+(see commit_index.py) when one exists, and per-file / per-author history
+lookups from the indexes derived from it (file_history.py,
+author_timeline.py), falling back to git subprocesses.
 """
 
 import logging
 import subprocess
+from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, Generator, List, Optional
+from typing import Any, Dict, Generator, List, Optional, Set
+
+from app.core import call_accounting
+from app.tasks.pipeline.utils.author_timeline import AuthorTimeline, get_author_timeline
+from app.tasks.pipeline.utils.commit_index import CommitRecord, get_commit_index, lookup_commit
+from app.tasks.pipeline.utils.file_history import (
+    FileHistoryIndex,
+    datetime_to_ts,
+    get_file_history_index,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -19,7 +34,7 @@ def run_git(
     timeout: int = 60,
 ) -> str:
     """Run a git command and return stdout."""
-    result = subprocess.run(
+    result = call_accounting.run(
         ["git"] + args,
         cwd=str(repo_path),
         capture_output=True,
@@ -33,12 +48,47 @@ def run_git(
     return result.stdout.strip()
 
 
+def _indexed_commit(repo_path: Path, sha: str) -> Optional[CommitRecord]:
+    """Look up a commit in the repo's commit index (None if not indexed)."""
+    try:
+        return lookup_commit(repo_path, sha)
+    except Exception as e:
+        logger.debug(f"Commit index lookup failed for {sha}: {e}")
+        return None
+
+
+def _file_history(repo_path: Path) -> Optional[FileHistoryIndex]:
+    """Get the repo's per-path history index (None if not indexed)."""
+    try:
+        return get_file_history_index(repo_path)
+    except Exception as e:
+        logger.debug(f"File history index unavailable for {repo_path}: {e}")
+        return None
+
+
+def _author_timeline(repo_path: Path) -> Optional[AuthorTimeline]:
+    """Get the repo's author timeline (None if not indexed)."""
+    try:
+        return get_author_timeline(repo_path)
+    except Exception as e:
+        logger.debug(f"Author timeline unavailable for {repo_path}: {e}")
+        return None
+
+
 def get_commit_info(repo_path: Path, sha: str) -> Dict[str, Any]:
     """
     Get commit info using subprocess.
 
     Returns dict with: hexsha, parents (list of parent shas), committed_date
     """
+    record = _indexed_commit(repo_path, sha)
+    if record:
+        return {
+            "hexsha": record.sha,
+            "parents": list(record.parents),
+            "committed_date": record.committer_ts,
+        }
+
     try:
         # Format: sha|parent1 parent2|timestamp
         output = run_git(
@@ -61,6 +111,10 @@ def get_commit_info(repo_path: Path, sha: str) -> Dict[str, Any]:
 
 def get_commit_parents(repo_path: Path, sha: str) -> List[str]:
     """Get parent commit SHAs using subprocess."""
+    record = _indexed_commit(repo_path, sha)
+    if record:
+        return list(record.parents)
+
     try:
         output = run_git(repo_path, ["log", "-1", "--format=%P", sha])
         return output.split() if output else []
@@ -124,6 +178,25 @@ def iter_commit_history(
 
     Yields dicts with: hexsha, parents (list)
     """
+    start = _indexed_commit(repo_path, start_sha)
+    if start:
+        from app.tasks.pipeline.utils.commit_index import get_commit_index
+
+        index = get_commit_index(repo_path)
+        records = (
+            index.walk(
+                start.sha,
+                max_count=max_count,
+                resolve=lambda s: _indexed_commit(repo_path, s),
+            )
+            if index
+            else None
+        )
+        if records is not None:
+            for record in records:
+                yield {"hexsha": record.sha, "parents": list(record.parents)}
+            return
+
     try:
         # Format: sha|parent1 parent2
         output = run_git(
@@ -146,6 +219,10 @@ def iter_commit_history(
 
 def get_author_email(repo_path: Path, sha: str) -> Optional[str]:
     """Get author email for a commit."""
+    record = _indexed_commit(repo_path, sha)
+    if record:
+        return record.author_email
+
     try:
         return run_git(repo_path, ["log", "-1", "--format=%ae", sha])
     except Exception:
@@ -154,6 +231,10 @@ def get_author_email(repo_path: Path, sha: str) -> Optional[str]:
 
 def get_committer_email(repo_path: Path, sha: str) -> Optional[str]:
     """Get committer email for a commit."""
+    record = _indexed_commit(repo_path, sha)
+    if record:
+        return record.committer_email
+
     try:
         return run_git(repo_path, ["log", "-1", "--format=%ce", sha])
     except Exception:
@@ -162,6 +243,10 @@ def get_committer_email(repo_path: Path, sha: str) -> Optional[str]:
 
 def get_committed_date(repo_path: Path, sha: str) -> Optional[int]:
     """Get committed date (unix timestamp) for a commit."""
+    record = _indexed_commit(repo_path, sha)
+    if record:
+        return record.committer_ts or None
+
     try:
         ts = run_git(repo_path, ["log", "-1", "--format=%ct", sha])
         return int(ts) if ts else None
@@ -171,6 +256,10 @@ def get_committed_date(repo_path: Path, sha: str) -> Optional[int]:
 
 def get_author_name(repo_path: Path, sha: str) -> Optional[str]:
     """Get author name for a commit."""
+    record = _indexed_commit(repo_path, sha)
+    if record:
+        return record.author_name
+
     try:
         return run_git(repo_path, ["log", "-1", "--format=%an", sha])
     except Exception:
@@ -179,6 +268,10 @@ def get_author_name(repo_path: Path, sha: str) -> Optional[str]:
 
 def get_committer_name(repo_path: Path, sha: str) -> Optional[str]:
     """Get committer name for a commit."""
+    record = _indexed_commit(repo_path, sha)
+    if record:
+        return record.committer_name
+
     try:
         return run_git(repo_path, ["log", "-1", "--format=%cn", sha])
     except Exception:
@@ -205,6 +298,10 @@ def git_log_files(
     Returns:
         Set of commit SHAs that modified the given files
     """
+    indexed = _indexed_path_commits(repo_path, sha, since_iso, file_paths)
+    if indexed is not None:
+        return {commit for commits in indexed for commit in commits}
+
     all_shas: set = set()
 
     for i in range(0, len(file_paths), chunk_size):
@@ -222,30 +319,74 @@ def git_log_files(
     return all_shas
 
 
+def _parse_since(since_iso: str) -> Optional[int]:
+    """Unix timestamp of an ISO date (naive dates are UTC), None if unparseable."""
+    try:
+        return datetime_to_ts(datetime.fromisoformat(since_iso))
+    except (TypeError, ValueError):
+        return None
+
+
+def _indexed_path_commits(
+    repo_path: Path, sha: str, since_iso: str, file_paths: List[str]
+) -> Optional[List[List[str]]]:
+    """
+    Per path, the commits reachable from sha since a date that touched it.
+
+    Equivalent to `git log <sha> --since=<date> -- <path>` for each path, answered
+    from the commit and file history indexes. None if the repo is not indexed.
+    """
+    file_index = _file_history(repo_path)
+    commit_index = get_commit_index(repo_path) if file_index is not None else None
+    since_ts = _parse_since(since_iso)
+    if commit_index is None or since_ts is None:
+        return None
+
+    reachable = commit_index.ancestors_since(
+        sha, since_ts, resolve=lambda s: _indexed_commit(repo_path, s)
+    )
+    if reachable is None:
+        return None
+
+    return [
+        [s for s in file_index.commits_between(path, since_ts) if s in reachable]
+        for path in file_paths
+    ]
+
+
 def get_author_first_commit_ts(repo_path: Path, author: str) -> Optional[int]:
     """
     Get the timestamp of author's first commit in the repository.
 
-    Uses git log --all --author --reverse to find the oldest commit.
+    Uses the repo's author timeline when indexed, otherwise
+    git log --all --author --reverse to find the oldest commit.
     Matches risk_features_enrichment.py::check_is_new_contributor logic.
 
     Returns:
         Unix timestamp of first commit, or None if not found
     """
+    timeline = _author_timeline(repo_path)
+    if timeline is not None:
+        return timeline.first_commit_ts(author)
+
     try:
         # Use Popen to read only first line (more efficient for large repos)
-        proc = subprocess.Popen(
-            ["git", "log", "--all", "--author", author, "--reverse", "--format=%ct"],
-            cwd=str(repo_path),
-            stdout=subprocess.PIPE,
-            stderr=subprocess.DEVNULL,
-            text=True,
-        )
-        if proc.stdout:
-            first_line = proc.stdout.readline().strip()
-            proc.terminate()
-            if first_line:
-                return int(first_line)
+        with call_accounting.track_call("git", "log") as call:
+            proc = subprocess.Popen(
+                ["git", "log", "--all", "--author", author, "--reverse", "--format=%ct"],
+                cwd=str(repo_path),
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                text=True,
+            )
+            first_line = ""
+            if proc.stdout:
+                first_line = proc.stdout.readline()
+                call.add_output(len(first_line))
+                first_line = first_line.strip()
+                proc.terminate()
+        if first_line:
+            return int(first_line)
     except Exception as e:
         logger.warning(f"Failed to get first commit for author {author}: {e}")
     return None
@@ -253,6 +394,13 @@ def get_author_first_commit_ts(repo_path: Path, author: str) -> Optional[int]:
 
 def get_files_in_commit(repo_path: Path, sha: str) -> List[str]:
     """Get list of files changed in a commit."""
+    record = _indexed_commit(repo_path, sha)
+    if record and len(record.parents) == 1:
+        return [f.path for f in record.files]
+    if record and not record.parents:
+        # Root commit: `sha^` does not resolve
+        return []
+
     try:
         output = run_git(repo_path, ["diff", "--name-only", f"{sha}^", sha])
         return [f.strip() for f in output.splitlines() if f.strip()]
@@ -328,6 +476,10 @@ def check_is_merge_commit(repo_path: Path, sha: str) -> bool:
 
 def get_author_total_commits(repo_path: Path, author: str) -> int:
     """Count total commits by author in the repository."""
+    timeline = _author_timeline(repo_path)
+    if timeline is not None:
+        return timeline.count_commits(author)
+
     try:
         output = run_git(
             repo_path,
@@ -375,6 +527,10 @@ def get_file_change_stats(repo_path: Path, sha: str) -> List[int]:
     Get lines changed per file for entropy calculation.
     Returns list of integers (added + deleted lines per file).
     """
+    record = _indexed_commit(repo_path, sha)
+    if record and not record.is_merge:
+        return [f.added + f.deleted for f in record.files]
+
     try:
         # --numstat returns: added\tdeleted\tfilepath
         output = run_git(
@@ -414,6 +570,15 @@ def get_file_modification_count(repo_path: Path, files: List[str], since_iso: st
     if not files:
         return 0.0
 
+    # Indexed path covers every file; the git fallback checks the first 20
+    try:
+        head_sha = run_git(repo_path, ["rev-parse", "HEAD"])
+        indexed = _indexed_path_commits(repo_path, head_sha, since_iso, files)
+        if indexed is not None:
+            return round(sum(len(commits) for commits in indexed) / len(indexed), 2)
+    except Exception as e:
+        logger.debug(f"Indexed file mod count unavailable: {e}")
+
     try:
         if len(files) > 20:
             check_files = files[:20]
@@ -438,3 +603,98 @@ def get_file_modification_count(repo_path: Path, files: List[str], since_iso: st
     except Exception as e:
         logger.warning(f"Failed to calc file mod count: {e}")
         return 0.0
+
+
+def get_reachable_commits(repo_path: Path, sha: str, since_ts: int = 0) -> Optional[Set[str]]:
+    """
+    SHAs reachable from sha (included) committed at or after since_ts.
+
+    Answered from the commit index; None if the history is not indexed.
+    """
+    commit_index = get_commit_index(repo_path)
+    if commit_index is None:
+        return None
+    return commit_index.ancestors_since(
+        sha, since_ts, resolve=lambda s: _indexed_commit(repo_path, s)
+    )
+
+
+def is_ancestor(repo_path: Path, ancestor_sha: str, sha: str) -> bool:
+    """Whether ancestor_sha is reachable from sha (`git merge-base --is-ancestor`)."""
+    args = ["merge-base", "--is-ancestor", ancestor_sha, sha]
+    result = call_accounting.run(
+        ["git"] + args, cwd=str(repo_path), capture_output=True, text=True, timeout=30
+    )
+    # Exit code 1 means "not an ancestor"; anything else is an error
+    if result.returncode not in (0, 1):
+        raise subprocess.CalledProcessError(
+            result.returncode, ["git"] + args, result.stdout, result.stderr
+        )
+    return result.returncode == 0
+
+
+def get_file_revision_count(
+    repo_path: Path,
+    filepath: str,
+    before_sha: str,
+    reachable: Optional[Set[str]] = None,
+    exclude: Optional[Set[str]] = None,
+) -> int:
+    """
+    Count how many commits modified this file before the given commit.
+
+    Follows renames like `git log --follow <sha>^ -- <file>`. With the file
+    history index, prior commits are those committed no later than the
+    commit's first parent; pass `reachable` (ancestors of the build, see
+    get_reachable_commits) and `exclude` (commits at or after before_sha) to
+    restrict the count to actual ancestors.
+
+    Args:
+        repo_path: Path to repository
+        filepath: File path to check
+        before_sha: Count revisions before this commit
+        reachable: Optional set of SHAs that may be counted
+        exclude: Optional set of SHAs that must not be counted
+
+    Returns:
+        Number of prior commits that touched this file
+    """
+    file_index = _file_history(repo_path)
+    record = _indexed_commit(repo_path, before_sha) if file_index is not None else None
+    if record is not None:
+        if not record.parents:
+            # `<sha>^` does not exist for a root commit
+            return 0
+        if any(c.path == filepath and c.old_path for c in record.files):
+            # Renamed by this commit: the path does not exist yet at `<sha>^`
+            return 0
+        parent = _indexed_commit(repo_path, record.parents[0])
+        if parent is not None:
+            return sum(
+                1
+                for sha, _, _ in file_index.follow(filepath, until_ts=parent.committer_ts)
+                if sha != before_sha
+                and (reachable is None or sha in reachable)
+                and (exclude is None or sha not in exclude)
+            )
+
+    try:
+        # Get commits that modified this file, excluding and before the given SHA
+        result = call_accounting.run(
+            ["git", "log", "--oneline", "--follow", f"{before_sha}^", "--", filepath],
+            cwd=str(repo_path),
+            capture_output=True,
+            text=True,
+            timeout=30,
+        )
+
+        if result.returncode != 0:
+            return 0
+
+        # Count non-empty lines
+        lines = [line for line in result.stdout.strip().split("\n") if line.strip()]
+        return len(lines)
+
+    except Exception as e:
+        logger.debug(f"Failed to count revisions for {filepath}: {e}")
+        return 0
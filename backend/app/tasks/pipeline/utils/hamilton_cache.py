@@ -0,0 +1,483 @@
+"""
+Bounded, observable Hamilton result cache.
+
+Hamilton's file cache (driver.Builder().with_cache(path=...)) stores one file
+per node result in the cache directory, named by the result's data_version,
+and keeps cache_key -> data_version rows in `metadata_store.db`. Nothing is
+ever removed. HamiltonCacheManager adds on top of it:
+
+- Eviction: results idle for longer than HAMILTON_CACHE_TTL_SECONDS are
+  removed, then the least recently used ones until the directory fits in
+  HAMILTON_CACHE_MAX_BYTES. Cache hits refresh the mtime of the result file,
+  which is used as its last access time.
+- Statistics: per-node hit/miss counters, exported via
+  app/utils/prometheus_metrics.py and available from stats().
+- Selective invalidation by node name or repository. The cache keys computed
+  for a repo are indexed in the `repo_cache_keys` table of the metadata store.
+
+Removing a cache_metadata row makes Hamilton recompute the node; a result
+file is only deleted once no remaining row refers to its data_version (equal
+values of different nodes share one file). A result file deleted underneath
+a row is also safe: Hamilton treats it as a miss and recomputes.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Set
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Written by Hamilton's SQLiteMetadataStore in the cache directory
+METADATA_DB_NAME = "metadata_store.db"
+
+# Files of the cache directory that are not node results
+_NON_RESULT_PREFIXES = ("metadata_store.", "cache_logs.")
+
+# SQLite limits the number of bound parameters per statement
+_SQL_BATCH_SIZE = 500
+
+# Per-run state of the cache adapter, released once a run was recorded
+_ADAPTER_RUN_STATE = (
+    "_fn_graphs",
+    "_data_savers",
+    "_data_loaders",
+    "behaviors",
+    "data_versions",
+    "code_versions",
+    "cache_keys",
+    "_logs",
+)
+# Private attributes of the adapter (sf-hamilton 1.89); missing ones are logged once
+_missing_run_state: Set[str] = set()
+
+
+@dataclass(frozen=True, slots=True)
+class _ResultFile:
+    """A node result file of the cache directory."""
+
+    path: Path
+    size: int
+    last_access: float
+
+
+def _batched(values: Sequence[str]) -> Iterator[Sequence[str]]:
+    for i in range(0, len(values), _SQL_BATCH_SIZE):
+        yield values[i : i + _SQL_BATCH_SIZE]
+
+
+class HamiltonCacheManager:
+    """Eviction, statistics and invalidation for one Hamilton cache directory."""
+
+    def __init__(
+        self,
+        path: Optional[Path],
+        max_bytes: int = 0,
+        ttl_seconds: int = 0,
+        evict_interval_seconds: int = 300,
+    ):
+        """
+        Args:
+            path: Cache directory, or None for the in-memory cache (statistics only)
+            max_bytes: Size budget of the result files (0 = unbounded)
+            ttl_seconds: Remove results not accessed for this long (0 = no expiry)
+            evict_interval_seconds: Minimum delay between automatic evictions
+        """
+        self.path = Path(path) if path else None
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.evict_interval_seconds = evict_interval_seconds
+        self._hits: Counter = Counter()
+        self._misses: Counter = Counter()
+        self._evicted: Counter = Counter()
+        self._last_eviction = 0.0
+        self._lock = threading.Lock()
+        if self.path is not None:
+            self._ensure_index()
+
+    # -------------------------------------------------------------------------
+    # Metadata store
+    # -------------------------------------------------------------------------
+
+    @property
+    def _db_path(self) -> Path:
+        return self.path / METADATA_DB_NAME
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Connection committed on success and always closed."""
+        conn = sqlite3.connect(str(self._db_path), timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _ensure_index(self) -> None:
+        """Create the cache key -> repo index next to Hamilton's tables."""
+        self.path.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS repo_cache_keys (
+                    cache_key TEXT NOT NULL,
+                    raw_repo_id TEXT NOT NULL,
+                    PRIMARY KEY (cache_key, raw_repo_id)
+                )
+                """
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS repo_cache_keys_repo "
+                "ON repo_cache_keys (raw_repo_id)"
+            )
+
+    @staticmethod
+    def _has_hamilton_tables(conn: sqlite3.Connection) -> bool:
+        row = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'cache_metadata'"
+        ).fetchone()
+        return row is not None
+
+    def _prune_metadata(self, conn: sqlite3.Connection) -> None:
+        """Drop history and repo index rows of cache keys no longer in cache_metadata."""
+        conn.execute(
+            "DELETE FROM history WHERE cache_key NOT IN (SELECT cache_key FROM cache_metadata)"
+        )
+        conn.execute(
+            "DELETE FROM repo_cache_keys "
+            "WHERE cache_key NOT IN (SELECT cache_key FROM cache_metadata)"
+        )
+        if self.ttl_seconds:
+            conn.execute(
+                "DELETE FROM run_ids WHERE created_at < datetime('now', ?)",
+                (f"-{self.ttl_seconds} seconds",),
+            )
+
+    # -------------------------------------------------------------------------
+    # Recording runs
+    # -------------------------------------------------------------------------
+
+    def record_run(self, cache_adapter: Any, raw_repo_id: Optional[str] = None) -> None:
+        """
+        Account for the last run of a driver's cache adapter.
+
+        Counts hits/misses per node, refreshes the access time of the results
+        read from the cache, indexes the run's cache keys under raw_repo_id and
+        releases the adapter's per-run state (the shared driver would otherwise
+        keep the logs, graphs and versions of every run in memory). May run an
+        eviction if the last one is older than evict_interval_seconds.
+        """
+        from hamilton.caching.adapter import CachingEventType
+
+        if not cache_adapter.run_ids:
+            return
+        run_id = cache_adapter.last_run_id
+
+        hits: Set[str] = set()
+        misses: Set[str] = set()
+        read_versions: Set[str] = set()
+        for event in cache_adapter._logs.get(run_id, []):
+            if event.event_type == CachingEventType.GET_RESULT:
+                hits.add(event.node_name)
+                if isinstance(event.value, str):
+                    read_versions.add(event.value)
+            elif event.event_type == CachingEventType.EXECUTE_NODE:
+                misses.add(event.node_name)
+        cache_keys = [
+            key for key in cache_adapter.cache_keys.get(run_id, {}).values() if isinstance(key, str)
+        ]
+
+        self._release_run_state(cache_adapter, run_id)
+        self._record_stats(hits, misses)
+
+        if self.path is None:
+            return
+
+        now = time.time()
+        for data_version in read_versions:
+            try:
+                os.utime(self.path / data_version, (now, now))
+            except OSError:
+                pass
+
+        if raw_repo_id and cache_keys:
+            try:
+                with self._connect() as conn:
+                    conn.executemany(
+                        "INSERT OR IGNORE INTO repo_cache_keys (cache_key, raw_repo_id) "
+                        "VALUES (?, ?)",
+                        [(key, raw_repo_id) for key in cache_keys],
+                    )
+            except sqlite3.Error as e:
+                logger.warning(f"Failed to index Hamilton cache keys: {e}")
+
+        if (self.max_bytes or self.ttl_seconds) and (
+            now - self._last_eviction >= self.evict_interval_seconds
+        ):
+            self.evict()
+
+    @staticmethod
+    def _release_run_state(cache_adapter: Any, run_id: str) -> None:
+        for attr in (*_ADAPTER_RUN_STATE, "run_ids"):
+            if not hasattr(cache_adapter, attr) and attr not in _missing_run_state:
+                _missing_run_state.add(attr)
+                logger.warning(
+                    f"Hamilton cache adapter has no '{attr}' attribute; its per-run "
+                    "state is not released (sf-hamilton version changed?)"
+                )
+        for attr in _ADAPTER_RUN_STATE:
+            state = getattr(cache_adapter, attr, None)
+            if isinstance(state, dict):
+                state.pop(run_id, None)
+        # Keep last_run_id working
+        run_ids = getattr(cache_adapter, "run_ids", None)
+        if isinstance(run_ids, list):
+            del run_ids[:-1]
+
+    def _record_stats(self, hits: Set[str], misses: Set[str]) -> None:
+        from app.utils.prometheus_metrics import record_hamilton_cache_request
+
+        with self._lock:
+            self._hits.update(hits)
+            self._misses.update(misses)
+        for node_name in hits:
+            record_hamilton_cache_request(node_name, "hit")
+        for node_name in misses:
+            record_hamilton_cache_request(node_name, "miss")
+
+    # -------------------------------------------------------------------------
+    # Eviction
+    # -------------------------------------------------------------------------
+
+    def _result_files(self) -> List[_ResultFile]:
+        files = []
+        for entry in os.scandir(self.path):
+            if not entry.is_file() or entry.name.startswith(_NON_RESULT_PREFIXES):
+                continue
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            files.append(_ResultFile(Path(entry.path), stat.st_size, stat.st_mtime))
+        return files
+
+    def size_bytes(self) -> int:
+        """Total size of the cached results."""
+        if self.path is None or not self.path.exists():
+            return 0
+        return sum(f.size for f in self._result_files())
+
+    def evict(self) -> Dict[str, int]:
+        """
+        Remove expired results, then least recently used ones over the size budget.
+
+        Returns:
+            Number of results removed per reason ("ttl", "size") and the
+            remaining size in bytes ("size_bytes")
+        """
+        from app.utils.prometheus_metrics import (
+            record_hamilton_cache_eviction,
+            update_hamilton_cache_size,
+        )
+
+        if self.path is None:
+            return {"ttl": 0, "size": 0, "size_bytes": 0}
+
+        with self._lock:
+            self._last_eviction = time.time()
+            files = sorted(self._result_files(), key=lambda f: f.last_access)
+
+            expired: List[_ResultFile] = []
+            if self.ttl_seconds:
+                cutoff = self._last_eviction - self.ttl_seconds
+                expired = [f for f in files if f.last_access < cutoff]
+                files = files[len(expired) :]
+
+            over_budget: List[_ResultFile] = []
+            total = sum(f.size for f in files)
+            if self.max_bytes:
+                for f in files:
+                    if total <= self.max_bytes:
+                        break
+                    over_budget.append(f)
+                    total -= f.size
+
+            self._delete_results(expired + over_budget)
+            self._evicted["ttl"] += len(expired)
+            self._evicted["size"] += len(over_budget)
+
+        if expired:
+            record_hamilton_cache_eviction("ttl", len(expired))
+        if over_budget:
+            record_hamilton_cache_eviction("size", len(over_budget))
+        update_hamilton_cache_size(total)
+        if expired or over_budget:
+            logger.info(
+                f"Evicted {len(expired)} expired and {len(over_budget)} least recently "
+                f"used Hamilton cache results ({total} bytes left)"
+            )
+        return {"ttl": len(expired), "size": len(over_budget), "size_bytes": total}
+
+    def _delete_results(self, files: Iterable[_ResultFile]) -> None:
+        """Delete result files and the metadata rows pointing at them."""
+        data_versions = []
+        for f in files:
+            f.path.unlink(missing_ok=True)
+            data_versions.append(f.path.name)
+
+        try:
+            with self._connect() as conn:
+                if not self._has_hamilton_tables(conn):
+                    return
+                for batch in _batched(data_versions):
+                    conn.execute(
+                        "DELETE FROM cache_metadata WHERE data_version IN "
+                        f"({','.join('?' * len(batch))})",
+                        batch,
+                    )
+                self._prune_metadata(conn)
+        except sqlite3.Error as e:
+            logger.warning(f"Failed to prune Hamilton cache metadata: {e}")
+
+    # -------------------------------------------------------------------------
+    # Invalidation
+    # -------------------------------------------------------------------------
+
+    def invalidate(
+        self,
+        node_names: Optional[Iterable[str]] = None,
+        raw_repo_id: Optional[str] = None,
+    ) -> int:
+        """
+        Invalidate cached results of the given nodes and/or repository.
+
+        With both arguments, only the results of those nodes computed for
+        that repository are invalidated. Without arguments, the whole cache
+        is cleared.
+
+        Returns:
+            Number of invalidated cache entries
+        """
+        from app.utils.prometheus_metrics import record_hamilton_cache_eviction
+
+        if self.path is None:
+            return 0
+
+        where = []
+        params: List[str] = []
+        names: Optional[List[str]] = None
+        if node_names is not None:
+            names = list(node_names)
+            if not names:
+                return 0
+            where.append(f"node_name IN ({','.join('?' * len(names))})")
+            params.extend(names)
+        if raw_repo_id is not None:
+            where.append(
+                "cache_key IN (SELECT cache_key FROM repo_cache_keys WHERE raw_repo_id = ?)"
+            )
+            params.append(raw_repo_id)
+
+        with self._lock:
+            with self._connect() as conn:
+                if not self._has_hamilton_tables(conn):
+                    return 0
+                clause = f" WHERE {' AND '.join(where)}" if where else ""
+                data_versions = {
+                    row[0]
+                    for row in conn.execute(
+                        f"SELECT DISTINCT data_version FROM cache_metadata{clause}", params
+                    )
+                }
+                invalidated = conn.execute(
+                    f"DELETE FROM cache_metadata{clause}", params
+                ).rowcount
+                # Files still referenced by other nodes' entries are kept
+                for batch in _batched(sorted(data_versions)):
+                    placeholders = ",".join("?" * len(batch))
+                    data_versions -= {
+                        row[0]
+                        for row in conn.execute(
+                            "SELECT data_version FROM cache_metadata "
+                            f"WHERE data_version IN ({placeholders})",
+                            batch,
+                        )
+                    }
+                self._prune_metadata(conn)
+
+            for data_version in data_versions:
+                (self.path / data_version).unlink(missing_ok=True)
+            self._evicted["invalidated"] += invalidated
+
+        if invalidated:
+            record_hamilton_cache_eviction("invalidated", invalidated)
+        logger.info(
+            f"Invalidated {invalidated} Hamilton cache entries "
+            f"(nodes={'all' if names is None else len(names)}, "
+            f"repo={raw_repo_id or 'all'})"
+        )
+        return invalidated
+
+    def clear(self) -> int:
+        """Invalidate every cached result (keeps the metadata store usable)."""
+        invalidated = self.invalidate()
+        if self.path is not None:
+            self._delete_results(self._result_files())
+        return invalidated
+
+    # -------------------------------------------------------------------------
+    # Statistics
+    # -------------------------------------------------------------------------
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters of this process and current cache size."""
+        with self._lock:
+            hits = dict(self._hits)
+            misses = dict(self._misses)
+            evicted = dict(self._evicted)
+        total_hits = sum(hits.values())
+        total = total_hits + sum(misses.values())
+        return {
+            "path": str(self.path) if self.path else None,
+            "size_bytes": self.size_bytes(),
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": total_hits,
+            "misses": total - total_hits,
+            "hit_rate": round(total_hits / total, 4) if total else None,
+            "evicted": evicted,
+            "nodes": {
+                name: {"hits": hits.get(name, 0), "misses": misses.get(name, 0)}
+                for name in sorted(hits.keys() | misses.keys())
+            },
+        }
+
+
+_managers: Dict[Optional[Path], HamiltonCacheManager] = {}
+_managers_lock = threading.Lock()
+
+
+def get_cache_manager(path: Optional[Path]) -> HamiltonCacheManager:
+    """Cache manager of a cache directory (None for the in-memory cache), from settings."""
+    key = Path(path) if path else None
+    with _managers_lock:
+        manager = _managers.get(key)
+        if manager is None:
+            manager = HamiltonCacheManager(
+                key,
+                max_bytes=settings.HAMILTON_CACHE_MAX_BYTES,
+                ttl_seconds=settings.HAMILTON_CACHE_TTL_SECONDS,
+                evict_interval_seconds=settings.HAMILTON_CACHE_EVICT_INTERVAL_SECONDS,
+            )
+            _managers[key] = manager
+        return manager
@@ -0,0 +1,197 @@
+"""
+Post-fetch maintenance for bare repositories.
+
+A plain `git clone --bare` / `git fetch` leaves the repo without a
+commit-graph, multi-pack-index or reachability bitmaps, so every history
+walk (`git log -- <path>`, `rev-list --count`, `--author` filters) parses
+each commit object, and path-limited walks diff every commit's trees.
+
+run_repo_maintenance() is called after each clone/fetch (under the repo's
+clone lock) and:
+- writes an incremental commit-graph layer with changed-path Bloom filters,
+  which lets path-limited walks skip commits that cannot touch the path;
+- packs loose objects and writes a multi-pack-index with a reachability
+  bitmap, fully repacking once fetches have left more than `max_packs` packs;
+- records what was done in `buildguard-maintenance.json` inside the repo.
+
+Failures are logged and swallowed: git falls back to reading objects.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import subprocess
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import List, Optional
+
+from app.core import call_accounting
+
+logger = logging.getLogger(__name__)
+
+# Bump to force maintenance on repos maintained by an older version
+MAINTENANCE_VERSION = 1
+
+# Stored inside the bare repo so it shares the repo's lifecycle
+STATE_FILENAME = "buildguard-maintenance.json"
+
+DEFAULT_MAX_PACKS = 20
+DEFAULT_TIMEOUT_SECONDS = 300
+
+
+@dataclass
+class MaintenanceState:
+    """What the last maintenance run did for a repository."""
+
+    version: int = MAINTENANCE_VERSION
+    last_run_at: Optional[str] = None
+    commit_graph: bool = False
+    changed_paths: bool = False
+    multi_pack_index: bool = False
+    bitmaps: bool = False
+    last_repack_at: Optional[str] = None
+    pack_count: int = 0
+    duration_seconds: float = 0.0
+    runs: int = 0
+    errors: List[str] = field(default_factory=list)
+
+
+def get_state_path(repo_path: Path) -> Path:
+    """Path of the persisted maintenance state for a bare repo."""
+    return Path(repo_path) / STATE_FILENAME
+
+
+def load_maintenance_state(repo_path: Path) -> Optional[MaintenanceState]:
+    """Load the recorded maintenance state, or None if the repo was never maintained."""
+    path = get_state_path(repo_path)
+    if not path.exists():
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        known = MaintenanceState.__dataclass_fields__
+        return MaintenanceState(**{k: v for k, v in data.items() if k in known})
+    except Exception as e:
+        logger.warning(f"Failed to load maintenance state at {path}: {e}")
+        return None
+
+
+def save_maintenance_state(repo_path: Path, state: MaintenanceState) -> None:
+    """Atomically persist the maintenance state next to the bare repo."""
+    path = get_state_path(repo_path)
+    tmp_path = path.with_suffix(f".tmp.{os.getpid()}")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(asdict(state), f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def count_packs(repo_path: Path) -> int:
+    """Number of packfiles in the repository."""
+    pack_dir = Path(repo_path) / "objects" / "pack"
+    if not pack_dir.is_dir():
+        return 0
+    return sum(1 for _ in pack_dir.glob("*.pack"))
+
+
+def _git(repo_path: Path, args: List[str], timeout: int) -> None:
+    call_accounting.run(
+        ["git", *args],
+        cwd=str(repo_path),
+        check=True,
+        capture_output=True,
+        timeout=timeout,
+    )
+
+
+def _describe_error(step: str, error: Exception) -> str:
+    if isinstance(error, subprocess.CalledProcessError) and error.stderr:
+        stderr = error.stderr
+        if isinstance(stderr, bytes):
+            stderr = stderr.decode("utf-8", "replace")
+        return f"{step}: {stderr.strip()}"
+    return f"{step}: {error}"
+
+
+def run_repo_maintenance(
+    repo_path: Path,
+    max_packs: int = DEFAULT_MAX_PACKS,
+    timeout: int = DEFAULT_TIMEOUT_SECONDS,
+) -> Optional[MaintenanceState]:
+    """
+    Write commit-graph/Bloom filters and pack indexes after a clone/fetch.
+
+    Args:
+        repo_path: Path to the bare repository
+        max_packs: Fully repack when the repo has more packs than this
+        timeout: Timeout in seconds for each git step
+
+    Returns:
+        The recorded MaintenanceState, or None if the repo does not exist
+    """
+    repo_path = Path(repo_path)
+    if not repo_path.exists():
+        return None
+
+    previous = load_maintenance_state(repo_path)
+    state = MaintenanceState(
+        last_repack_at=previous.last_repack_at if previous else None,
+        runs=(previous.runs if previous else 0) + 1,
+    )
+    started = time.monotonic()
+
+    # Incremental commit-graph layer for new commits; layers are merged by
+    # git as they grow. Bloom filters of existing layers are kept.
+    try:
+        _git(
+            repo_path,
+            ["commit-graph", "write", "--reachable", "--changed-paths", "--split"],
+            timeout,
+        )
+        state.commit_graph = True
+        state.changed_paths = True
+    except Exception as e:
+        state.errors.append(_describe_error("commit-graph", e))
+
+    # Pack loose objects from the fetch and index all packs with a
+    # multi-pack-index bitmap; consolidate into one pack once packs pile up
+    full_repack = count_packs(repo_path) > max_packs
+    try:
+        _git(
+            repo_path,
+            [
+                "repack",
+                "-d",
+                *(["-a"] if full_repack else []),
+                "--write-midx",
+                "--write-bitmap-index",
+            ],
+            timeout,
+        )
+        state.multi_pack_index = True
+        state.bitmaps = True
+        if full_repack:
+            state.last_repack_at = datetime.now(timezone.utc).isoformat()
+    except Exception as e:
+        state.errors.append(_describe_error("repack", e))
+
+    state.pack_count = count_packs(repo_path)
+    state.duration_seconds = round(time.monotonic() - started, 3)
+    state.last_run_at = datetime.now(timezone.utc).isoformat()
+
+    if state.errors:
+        logger.warning(f"Maintenance of {repo_path} partially failed: {state.errors}")
+    else:
+        logger.info(
+            f"Maintained {repo_path} in {state.duration_seconds}s "
+            f"({state.pack_count} packs)"
+        )
+
+    try:
+        save_maintenance_state(repo_path, state)
+    except Exception as e:
+        logger.warning(f"Failed to save maintenance state for {repo_path}: {e}")
+    return state
@@ -13,10 +13,14 @@ from app.tasks.shared.ingestion_tasks import (
 )
 from app.tasks.shared.processing_helpers import (
     extract_features_for_build,
+    extract_features_for_builds,
+    extract_temporal_features_for_build,
+    refresh_features_for_build,
 )
 from app.tasks.shared.protocols import PipelineContext
 from app.tasks.shared.workflow_builder import (
     build_ingestion_workflow,
+    build_processing_workflow,
     build_workflow_with_context,
 )
 
@@ -34,7 +38,11 @@ __all__ = [
     "aggregate_logs_results",
     # Processing helpers
     "extract_features_for_build",
+    "extract_features_for_builds",
+    "extract_temporal_features_for_build",
+    "refresh_features_for_build",
     # Workflow builder
     "build_ingestion_workflow",
+    "build_processing_workflow",
     "build_workflow_with_context",
 ]
@@ -8,8 +8,9 @@ Features are stored in FeatureVector (single source of truth).
 """
 
 import logging
+from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from bson import ObjectId
 
@@ -20,12 +21,20 @@ from app.entities.feature_audit_log import (
     NodeExecutionResult,
     NodeExecutionStatus,
 )
+from app.entities.feature_vector import FeatureVector
 from app.entities.raw_build_run import RawBuildRun
 from app.entities.raw_repository import RawRepository
 from app.repositories.feature_audit_log import FeatureAuditLogRepository
 from app.repositories.feature_vector import FeatureVectorRepository
-from app.tasks.pipeline.feature_dag._metadata import format_features_for_storage
-from app.tasks.pipeline.hamilton_runner import HamiltonPipeline
+from app.repositories.node_latency_stats import NodeLatencyStatsRepository
+from app.tasks.pipeline.constants import ExtractionPhase
+from app.tasks.pipeline.execution_tracker import ExecutionResult
+from app.tasks.pipeline.feature_dag._metadata import (
+    format_features_for_storage,
+    get_dag_version,
+    get_node_versions,
+)
+from app.tasks.pipeline.hamilton_runner import BuildExecution, HamiltonPipeline
 
 logger = logging.getLogger(__name__)
 
@@ -34,7 +43,7 @@ def _save_audit_log(
     db,
     raw_repo: RawRepository,
     raw_build_run: RawBuildRun,
-    pipeline: HamiltonPipeline,
+    execution_result: Optional[ExecutionResult],
     features: List[str],
     errors: List[str],
     category: AuditLogCategory,
@@ -50,7 +59,7 @@ def _save_audit_log(
         db: Database session
         raw_repo: RawRepository entity
         raw_build_run: RawBuildRun entity
-        pipeline: HamiltonPipeline instance (with execution results)
+        execution_result: Tracked execution of the pipeline run, if any
         features: List of extracted feature names
         errors: List of error messages
         category: Pipeline category (model_training or training_scenario)
@@ -66,8 +75,6 @@ def _save_audit_log(
 
             correlation_id = TracingContext.get_correlation_id()
 
-        execution_result = pipeline.get_execution_results()
-
         # Create FeatureAuditLog entity
         audit_log = FeatureAuditLog(
             correlation_id=correlation_id if correlation_id else None,
@@ -101,6 +108,7 @@ def _save_audit_log(
             audit_log.nodes_failed = execution_result.nodes_failed
             audit_log.nodes_skipped = execution_result.nodes_skipped
             audit_log.errors.extend(execution_result.errors)
+            audit_log.external_calls = execution_result.external_calls
 
             # Add node-level results
             for node_info in execution_result.node_results:
@@ -116,6 +124,7 @@ def _save_audit_log(
                     duration_ms=node_info.duration_ms,
                     error=node_info.error,
                     resources_used=node_info.resources_used,
+                    external_calls=node_info.external_calls,
                 )
 
                 # Populate feature values if this node corresponds to a requested feature
@@ -145,6 +154,45 @@ def _save_audit_log(
     except Exception as e:
         logger.warning(f"Failed to save audit log: {e}")
 
+    if execution_result and execution_result.node_results:
+        _record_node_latency(db, raw_repo, execution_result)
+
+
+def _record_node_latency(db, raw_repo: RawRepository, execution_result: ExecutionResult) -> None:
+    """Add the node timings of a pipeline run to the per-node latency histograms."""
+    try:
+        NodeLatencyStatsRepository(db).record(
+            raw_repo.id,
+            (
+                (node_info.node_name, node_info.duration_ms, node_info.success)
+                for node_info in execution_result.node_results
+            ),
+            executed_at=execution_result.completed_at,
+        )
+    except Exception as e:
+        logger.warning(f"Failed to record node latency: {e}")
+
+
+def _resolve_vector_scope(
+    category: AuditLogCategory,
+    scenario_id: Optional[str],
+    model_repo_config_id: Optional[str],
+) -> Tuple[str, Optional[ObjectId]]:
+    """FeatureVector scope and config_id for a pipeline category."""
+    scope = FeatureVectorScope.MODEL.value
+    config_id = None
+
+    if category == AuditLogCategory.TRAINING_SCENARIO:
+        scope = FeatureVectorScope.DATASET.value
+        if scenario_id:
+            config_id = ObjectId(scenario_id)
+    elif category == AuditLogCategory.MODEL_TRAINING:
+        scope = FeatureVectorScope.MODEL.value
+        if model_repo_config_id:
+            config_id = ObjectId(model_repo_config_id)
+
+    return scope, config_id
+
 
 def extract_features_for_build(
     db,
@@ -157,6 +205,7 @@ def extract_features_for_build(
     output_build_id: Optional[str] = None,
     scenario_id: Optional[str] = None,
     model_repo_config_id: Optional[str] = None,
+    phase: ExtractionPhase = ExtractionPhase.ALL,
 ) -> Dict[str, Any]:
     """
     Extract features for a single build using HamiltonPipeline.
@@ -184,6 +233,9 @@ def extract_features_for_build(
         output_build_id: ID of the output entity
         scenario_id: TrainingScenario ID (for TRAINING_SCENARIO category)
         model_repo_config_id: ModelRepoConfig ID (for MODEL_TRAINING category)
+        phase: ExtractionPhase.NON_TEMPORAL for the first pass of two-phase
+            processing (temporal features are added later by
+            extract_temporal_features_for_build)
 
     Returns:
         Dictionary with status, features, feature_vector_id, errors, warnings, etc.
@@ -191,48 +243,228 @@ def extract_features_for_build(
     from app.tasks.pipeline.input_preparer import prepare_pipeline_input
 
     pipeline = None
-    feature_vector_repo = FeatureVectorRepository(db)
-
-    # Determine scope and config_id based on category (defined before try for exception handler)
-    scope = FeatureVectorScope.MODEL.value
-    config_id = None
-
-    if category == AuditLogCategory.TRAINING_SCENARIO:
-        scope = FeatureVectorScope.DATASET.value
-        if scenario_id:
-            config_id = ObjectId(scenario_id)
-    elif category == AuditLogCategory.MODEL_TRAINING:
-        scope = FeatureVectorScope.MODEL.value
-        if model_repo_config_id:
-            config_id = ObjectId(model_repo_config_id)
+    target = _ExtractionTarget(
+        db=db,
+        raw_repo=raw_repo,
+        save_run=save_run,
+        category=category,
+        scenario_id=scenario_id,
+        model_repo_config_id=model_repo_config_id,
+        phase=phase,
+    )
 
     try:
-        from app.services.github.github_client import get_public_github_client
-        from app.tasks.pipeline.feature_dag._inputs import GitHubClientInput
+        github_client_input = _get_github_client_input(raw_repo)
 
-        client = get_public_github_client()
-        github_client_input = GitHubClientInput(
-            client=client, full_name=raw_repo.full_name
-        )
+        pipeline = HamiltonPipeline(db=db, enable_tracking=True)
+        feature_results = pipeline.get_feature_result_store()
 
-        # Prepare all inputs and filter features by available resources
+        # Prepare all inputs, filter features by available resources and
+        # reuse results stored for this build by other configs/scenarios
         prepared = prepare_pipeline_input(
             raw_repo=raw_repo,
             feature_config=feature_config,
             raw_build_run=raw_build_run,
             selected_features=selected_features if selected_features else None,
             github_client=github_client_input,
+            feature_results=feature_results,
         )
 
         # Execute Hamilton pipeline
+        features = pipeline.execute(prepared, phase=phase)
+
+        return target.save(
+            pipeline,
+            raw_build_run,
+            prepared,
+            features,
+            pipeline.get_execution_results(),
+            feature_results,
+            output_build_id,
+        )
+
+    except Exception as e:
+        logger.error(
+            f"Pipeline failed for build {raw_build_run.ci_run_id}: {e}",
+            exc_info=True,
+        )
+        return target.save_failed(
+            raw_build_run,
+            str(e),
+            pipeline.get_execution_results() if pipeline else None,
+            output_build_id,
+            audit=pipeline is not None,
+        )
+
+
+def extract_features_for_builds(
+    db,
+    raw_repo: RawRepository,
+    feature_config: Dict[str, Any],
+    raw_build_runs: List[RawBuildRun],
+    selected_features: List[str],
+    save_run: bool = True,
+    category: AuditLogCategory = AuditLogCategory.MODEL_TRAINING,
+    output_build_ids: Optional[List[str]] = None,
+    scenario_id: Optional[str] = None,
+    model_repo_config_id: Optional[str] = None,
+    phase: ExtractionPhase = ExtractionPhase.ALL,
+) -> List[Dict[str, Any]]:
+    """
+    Extract features for a batch of builds of one repository.
+
+    Like extract_features_for_build for each build, but with one pipeline
+    and one GitHub client for the batch; HamiltonPipeline.execute_many()
+    computes commit/repo scoped nodes once. Builds run in the given order
+    and each build's FeatureVector is saved before the next build runs, so
+    temporal features see the earlier builds of the batch.
+
+    Args:
+        raw_build_runs: Builds of raw_repo, in processing order
+        output_build_ids: ID of the output entity per build
+        (others as in extract_features_for_build)
+
+    Returns:
+        One result dict per build, in input order, as returned by
+        extract_features_for_build
+    """
+    from app.tasks.pipeline.input_preparer import prepare_pipeline_input
+
+    if output_build_ids is None:
+        output_build_ids = [None] * len(raw_build_runs)
+    target = _ExtractionTarget(
+        db=db,
+        raw_repo=raw_repo,
+        save_run=save_run,
+        category=category,
+        scenario_id=scenario_id,
+        model_repo_config_id=model_repo_config_id,
+        phase=phase,
+    )
+
+    results: Dict[int, Dict[str, Any]] = {}
+    try:
+        github_client_input = _get_github_client_input(raw_repo)
         pipeline = HamiltonPipeline(db=db, enable_tracking=True)
-        features = pipeline.execute(prepared)
+        feature_results = pipeline.get_feature_result_store()
+    except Exception as e:
+        logger.error(f"Pipeline setup failed for {raw_repo.full_name}: {e}", exc_info=True)
+        return [
+            target.save_failed(run, str(e), None, build_id, audit=False)
+            for run, build_id in zip(raw_build_runs, output_build_ids, strict=True)
+        ]
+
+    prepared_inputs = []
+    positions: Dict[int, int] = {}
+    for index, raw_build_run in enumerate(raw_build_runs):
+        try:
+            prepared = prepare_pipeline_input(
+                raw_repo=raw_repo,
+                feature_config=feature_config,
+                raw_build_run=raw_build_run,
+                selected_features=selected_features if selected_features else None,
+                github_client=github_client_input,
+                feature_results=feature_results,
+            )
+        except Exception as e:
+            logger.error(
+                f"Pipeline failed for build {raw_build_run.ci_run_id}: {e}",
+                exc_info=True,
+            )
+            results[index] = target.save_failed(
+                raw_build_run, str(e), None, output_build_ids[index], audit=False
+            )
+            continue
+        positions[id(prepared)] = index
+        prepared_inputs.append(prepared)
+
+    def _save(prepared, outcome: BuildExecution) -> None:
+        index = positions[id(prepared)]
+        raw_build_run = raw_build_runs[index]
+        output_build_id = output_build_ids[index]
+        if outcome.succeeded:
+            try:
+                results[index] = target.save(
+                    pipeline,
+                    raw_build_run,
+                    prepared,
+                    outcome.features,
+                    outcome.execution,
+                    feature_results,
+                    output_build_id,
+                )
+                return
+            except Exception as e:
+                logger.error(
+                    f"Pipeline failed for build {raw_build_run.ci_run_id}: {e}",
+                    exc_info=True,
+                )
+                error = str(e)
+        else:
+            error = outcome.error
+        results[index] = target.save_failed(
+            raw_build_run, error, outcome.execution, output_build_id
+        )
+
+    pipeline.execute_many(prepared_inputs, phase=phase, on_executed=_save)
+
+    return [results[index] for index in range(len(raw_build_runs))]
+
 
+def _get_github_client_input(raw_repo: RawRepository):
+    """GitHubClientInput for a repository, using the public GitHub client."""
+    from app.services.github.github_client import get_public_github_client
+    from app.tasks.pipeline.feature_dag._inputs import GitHubClientInput
+
+    return GitHubClientInput(client=get_public_github_client(), full_name=raw_repo.full_name)
+
+
+@dataclass
+class _ExtractionTarget:
+    """Where and how the extraction results of a repository's builds are saved."""
+
+    db: Any
+    raw_repo: RawRepository
+    save_run: bool
+    category: AuditLogCategory
+    scenario_id: Optional[str]
+    model_repo_config_id: Optional[str]
+    phase: ExtractionPhase
+
+    def save(
+        self,
+        pipeline: HamiltonPipeline,
+        raw_build_run: RawBuildRun,
+        prepared,
+        features: Dict[str, Any],
+        execution_result: Optional[ExecutionResult],
+        feature_results,
+        output_build_id: Optional[str],
+    ) -> Dict[str, Any]:
+        """Save the features extracted for a build; returns the result dict."""
+        scope, config_id = _resolve_vector_scope(
+            self.category, self.scenario_id, self.model_repo_config_id
+        )
         formatted_features = format_features_for_storage(features)
+        # Builds with a missing commit may get full results once it is fetched
+        if feature_results is not None and prepared.is_commit_available:
+            # Values of failed or error-logging nodes may be transient fallbacks
+            unreliable = pipeline.get_unreliable_features(
+                set(formatted_features), execution_result
+            )
+            feature_results.save(
+                raw_build_run.id,
+                {
+                    name: value
+                    for name, value in formatted_features.items()
+                    if name not in prepared.reused_features and name not in unreliable
+                },
+                prepared.feature_result_keys,
+            )
 
-        # Get skipped features and missing resources from pipeline
-        skipped_features = list(pipeline.skipped_features) if pipeline else []
-        missing_resources = list(pipeline.missing_resources) if pipeline else []
+        # Skipped features and missing resources of the build
+        skipped_features = list(prepared.skipped_features)
+        missing_resources = list(prepared.missing_resources)
 
         # Validate required model features are present
         try:
@@ -242,6 +474,9 @@ def extract_features_for_build(
             )
 
             required_features = set(TEMPORAL_FEATURES + STATIC_FEATURES)
+            if self.phase == ExtractionPhase.NON_TEMPORAL:
+                # Added by the temporal pass
+                required_features -= pipeline.get_temporal_features()
             extracted_features = set(formatted_features.keys())
             missing_model_features = required_features - extracted_features
 
@@ -268,14 +503,15 @@ def extract_features_for_build(
         )
 
         # Save to FeatureVector (single source of truth)
-        feature_vector = feature_vector_repo.upsert_features(
-            raw_repo_id=raw_repo.id,
+        feature_vector = FeatureVectorRepository(self.db).upsert_features(
+            raw_repo_id=self.raw_repo.id,
             raw_build_run_id=raw_build_run.id,
             features=formatted_features,
             scope=scope,
             config_id=config_id,
             extraction_status=extraction_status,
-            dag_version="1.0",
+            dag_version=pipeline.dag_version,
+            node_versions=pipeline.node_versions,
             tr_prev_build=tr_prev_build,
             is_missing_commit=not prepared.is_commit_available,
             missing_resources=missing_resources,
@@ -313,39 +549,45 @@ def extract_features_for_build(
             )
 
         # Save audit log to database
-        if save_run and pipeline:
+        if self.save_run:
             _save_audit_log(
-                db=db,
-                raw_repo=raw_repo,
+                db=self.db,
+                raw_repo=self.raw_repo,
                 raw_build_run=raw_build_run,
-                pipeline=pipeline,
+                execution_result=execution_result,
                 features=list(formatted_features.keys()),
                 errors=[],
-                category=category,
+                category=self.category,
                 output_build_id=output_build_id,
-                scenario_id=scenario_id,
-                model_repo_config_id=model_repo_config_id,
+                scenario_id=self.scenario_id,
+                model_repo_config_id=self.model_repo_config_id,
             )
 
         return result
 
-    except Exception as e:
-        logger.error(
-            f"Pipeline failed for build {raw_build_run.ci_run_id}: {e}",
-            exc_info=True,
+    def save_failed(
+        self,
+        raw_build_run: RawBuildRun,
+        error: str,
+        execution_result: Optional[ExecutionResult],
+        output_build_id: Optional[str],
+        audit: bool = True,
+    ) -> Dict[str, Any]:
+        """Save a failed FeatureVector for a build; returns the result dict."""
+        scope, config_id = _resolve_vector_scope(
+            self.category, self.scenario_id, self.model_repo_config_id
         )
-
-        # Save failed FeatureVector
         try:
-            feature_vector = feature_vector_repo.upsert_features(
-                raw_repo_id=raw_repo.id,
+            feature_vector = FeatureVectorRepository(self.db).upsert_features(
+                raw_repo_id=self.raw_repo.id,
                 raw_build_run_id=raw_build_run.id,
                 features={},
                 scope=scope,
                 config_id=config_id,
                 extraction_status=ExtractionStatus.FAILED,
-                extraction_error=str(e),
-                dag_version="1.0",
+                extraction_error=error,
+                dag_version=get_dag_version(),
+                node_versions=dict(get_node_versions()),
             )
             feature_vector_id = feature_vector.id
         except Exception as save_error:
@@ -353,12 +595,139 @@ def extract_features_for_build(
             feature_vector_id = None
 
         # Save failed audit log
+        if self.save_run and audit:
+            _save_audit_log(
+                db=self.db,
+                raw_repo=self.raw_repo,
+                raw_build_run=raw_build_run,
+                execution_result=execution_result,
+                features=[],
+                errors=[error],
+                category=self.category,
+                output_build_id=output_build_id,
+                scenario_id=self.scenario_id,
+                model_repo_config_id=self.model_repo_config_id,
+            )
+
+        return {
+            "status": "failed",
+            "features": {},
+            "feature_count": 0,
+            "feature_vector_id": feature_vector_id,
+            "errors": [error],
+            "warnings": [],
+            "is_missing_commit": False,
+        }
+
+
+def extract_temporal_features_for_build(
+    db,
+    raw_repo: RawRepository,
+    feature_config: Dict[str, Any],
+    raw_build_run: RawBuildRun,
+    selected_features: List[str],
+    save_run: bool = True,
+    category: AuditLogCategory = AuditLogCategory.MODEL_TRAINING,
+    output_build_id: Optional[str] = None,
+    scenario_id: Optional[str] = None,
+    model_repo_config_id: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Second pass of two-phase processing: add temporal features to a build.
+
+    Must run after the NON_TEMPORAL pass stored this build's FeatureVector and
+    after every earlier build of the repo went through this pass. Only
+    features reading earlier builds' results are computed; their other
+    inputs are taken from the stored features, so no git or GitHub work is
+    repeated.
+
+    Returns:
+        Dictionary with status ("completed", "skipped" or "failed"),
+        features, feature_count, feature_vector_id and errors
+    """
+    from app.tasks.pipeline.input_preparer import prepare_pipeline_input
+
+    pipeline = None
+    feature_vector_repo = FeatureVectorRepository(db)
+    scope, config_id = _resolve_vector_scope(category, scenario_id, model_repo_config_id)
+
+    feature_vector = feature_vector_repo.find_by_repo_and_build(
+        raw_repo.id, raw_build_run.id, scope=scope, config_id=config_id
+    )
+    if not feature_vector or feature_vector.extraction_status == ExtractionStatus.FAILED:
+        return {
+            "status": "skipped",
+            "features": {},
+            "feature_count": 0,
+            "feature_vector_id": feature_vector.id if feature_vector else None,
+            "errors": [],
+        }
+
+    try:
+        # Temporal features only need DB inputs; no GitHub client
+        prepared = prepare_pipeline_input(
+            raw_repo=raw_repo,
+            feature_config=feature_config,
+            raw_build_run=raw_build_run,
+            selected_features=selected_features if selected_features else None,
+        )
+
+        pipeline = HamiltonPipeline(db=db, enable_tracking=True)
+        features = pipeline.execute(
+            prepared,
+            phase=ExtractionPhase.TEMPORAL,
+            stored_features=feature_vector.features,
+        )
+        formatted_features = format_features_for_storage(features)
+
+        if formatted_features:
+            feature_vector_repo.merge_features(feature_vector.id, formatted_features)
+
+        if save_run and formatted_features:
+            _save_audit_log(
+                db=db,
+                raw_repo=raw_repo,
+                raw_build_run=raw_build_run,
+                execution_result=pipeline.get_execution_results(),
+                features=list(formatted_features.keys()),
+                errors=[],
+                category=category,
+                output_build_id=output_build_id,
+                scenario_id=scenario_id,
+                model_repo_config_id=model_repo_config_id,
+            )
+
+        return {
+            "status": "completed",
+            "features": formatted_features,
+            "feature_count": len(formatted_features),
+            "feature_vector_id": feature_vector.id,
+            "errors": [],
+        }
+
+    except Exception as e:
+        logger.error(
+            f"Temporal pass failed for build {raw_build_run.ci_run_id}: {e}",
+            exc_info=True,
+        )
+
+        # Keep the first pass features, but flag the vector as incomplete
+        try:
+            feature_vector_repo.merge_features(
+                feature_vector.id,
+                {},
+                extraction_status=ExtractionStatus.PARTIAL,
+                extraction_error=f"Temporal features failed: {e}",
+            )
+        except Exception as save_error:
+            logger.warning(f"Failed to flag FeatureVector: {save_error}")
+
         if save_run and pipeline:
             _save_audit_log(
                 db=db,
                 raw_repo=raw_repo,
                 raw_build_run=raw_build_run,
-                pipeline=pipeline,
+                execution_result=pipeline.get_execution_results(),
                 features=[],
                 errors=[str(e)],
                 category=category,
@@ -371,8 +740,121 @@ def extract_features_for_build(
             "status": "failed",
             "features": {},
             "feature_count": 0,
-            "feature_vector_id": feature_vector_id,
+            "feature_vector_id": feature_vector.id,
             "errors": [str(e)],
-            "warnings": [],
-            "is_missing_commit": False,
         }
+
+
+def refresh_features_for_build(
+    db,
+    raw_repo: RawRepository,
+    feature_config: Dict[str, Any],
+    raw_build_run: RawBuildRun,
+    feature_vector: FeatureVector,
+) -> Dict[str, Any]:
+    """
+    Recompute the features of a stored FeatureVector affected by node version changes.
+
+    Only the nodes whose @node_version changed since the vector was computed
+    and the nodes downstream of them run; the other stored features are
+    reused. Builds of a repo must be refreshed oldest first, as temporal
+    features read the (refreshed) features of earlier builds.
+
+    The vector's dag_version/node_versions are only updated once every
+    affected feature was recomputed; features whose resources are no longer
+    available (e.g. pruned worktrees) keep their value and the vector stays
+    stale for a later refresh.
+
+    Returns:
+        Dictionary with status ("refreshed", "partial", "current" or "failed"),
+        features (refreshed values), stale_features and errors
+    """
+    from app.services.github.github_client import get_public_github_client
+    from app.tasks.pipeline.feature_dag._inputs import GitHubClientInput
+    from app.tasks.pipeline.input_preparer import prepare_pipeline_input
+
+    feature_vector_repo = FeatureVectorRepository(db)
+    pipeline = HamiltonPipeline(db=db, enable_tracking=True)
+    result: Dict[str, Any] = {
+        "status": "current",
+        "features": {},
+        "stale_features": [],
+        "feature_vector_id": feature_vector.id,
+        "errors": [],
+    }
+
+    dirty = pipeline.get_dirty_features(
+        feature_vector.node_versions, set(feature_vector.features), feature_vector.dag_version
+    )
+    if not dirty:
+        if feature_vector.dag_version != pipeline.dag_version:
+            feature_vector_repo.merge_features(
+                feature_vector.id,
+                {},
+                dag_version=pipeline.dag_version,
+                node_versions=pipeline.node_versions,
+            )
+        return result
+
+    try:
+        feature_results = pipeline.get_feature_result_store()
+        prepared = prepare_pipeline_input(
+            raw_repo=raw_repo,
+            feature_config=feature_config,
+            raw_build_run=raw_build_run,
+            selected_features=sorted(dirty),
+            github_client=GitHubClientInput(
+                client=get_public_github_client(), full_name=raw_repo.full_name
+            ),
+            feature_results=feature_results,
+        )
+        features, unavailable = pipeline.refresh_features(
+            prepared,
+            feature_vector.features,
+            feature_vector.node_versions,
+            feature_vector.dag_version,
+        )
+        formatted_features = format_features_for_storage(features)
+
+        if feature_results is not None and prepared.is_commit_available:
+            # Values of failed or error-logging nodes may be transient fallbacks
+            unreliable = pipeline.get_unreliable_features(set(formatted_features))
+            feature_results.save(
+                raw_build_run.id,
+                {
+                    name: value
+                    for name, value in formatted_features.items()
+                    if name not in prepared.reused_features and name not in unreliable
+                },
+                prepared.feature_result_keys,
+            )
+
+        if unavailable:
+            logger.warning(
+                f"Build {raw_build_run.ci_run_id}: {len(unavailable)} stale features "
+                f"could not be refreshed (missing resources: {sorted(prepared.missing_resources)})"
+            )
+            feature_vector_repo.merge_features(feature_vector.id, formatted_features)
+        else:
+            feature_vector_repo.merge_features(
+                feature_vector.id,
+                formatted_features,
+                dag_version=pipeline.dag_version,
+                node_versions=pipeline.node_versions,
+            )
+
+        result.update(
+            status="partial" if unavailable else "refreshed",
+            features=formatted_features,
+            stale_features=sorted(unavailable),
+        )
+        return result
+
+    except Exception as e:
+        logger.error(
+            f"Feature refresh failed for build {raw_build_run.ci_run_id}: {e}",
+            exc_info=True,
+        )
+        result.update(status="failed", errors=[str(e)])
+        return result
+
@@ -317,3 +317,92 @@ def _build_logs_chord(
     )
 
     return chord(group(chunk_tasks), callback).set(chord_unlock_on_error=True)
+
+
+def pack_ordered_lanes(
+    sequences: List[List[Signature]],
+    max_lanes: int,
+) -> List[List[Signature]]:
+    """
+    Pack independent ordered task sequences into at most max_lanes lanes.
+
+    Each sequence (e.g. the builds of one repository, oldest first) stays in
+    order inside a single lane; lanes run concurrently. Longest sequences
+    are placed first, each on the currently shortest lane.
+
+    Args:
+        sequences: Ordered task sequences that may run concurrently
+        max_lanes: Max concurrent lanes (non-positive means one per sequence)
+
+    Returns:
+        List of lanes, each a flat list of signatures
+    """
+    sequences = [seq for seq in sequences if seq]
+    lane_count = min(len(sequences), max_lanes) if max_lanes > 0 else len(sequences)
+    lanes: List[List[Signature]] = [[] for _ in range(lane_count)]
+    for seq in sorted(sequences, key=len, reverse=True):
+        min(lanes, key=len).extend(seq)
+    return lanes
+
+
+def _join_lanes(lanes: List[List[Signature]], finalize_task: Signature) -> Signature:
+    """Run lanes concurrently (one chain each), then finalize_task."""
+    if len(lanes) == 1:
+        return chain(*lanes[0], finalize_task)
+    return chord(group([chain(*lane) for lane in lanes]), finalize_task)
+
+
+def build_processing_workflow(
+    extraction_sequences: List[List[Signature]],
+    temporal_sequences: Optional[List[List[Signature]]],
+    finalize_task: Signature,
+    max_parallel_sequences: int = 0,
+) -> Signature:
+    """
+    Build the feature extraction workflow of a processing phase.
+
+    Sequences are the builds of one repository, oldest first; temporal
+    ordering only matters within a repository, so sequences run
+    concurrently in at most max_parallel_sequences lanes.
+
+    Without temporal sequences, builds are extracted one by one per
+    repository so temporal features can read the previous builds' results:
+
+        [R1: B1 → B2 → ... | R2: B1 → ...] → finalize
+
+    With temporal sequences (two-phase processing), extraction tasks only
+    compute non-temporal features and all run in parallel; the temporal
+    tasks then add the temporal features in build order per repository:
+
+        [B1 | B2 | ...] → [R1: T(B1..Bk) → ... | R2: T(...)] → finalize
+
+    Failure semantics: in a sequence, a task that raises stops the rest of
+    its lane and finalize (the caller's error callback handles it), as in a
+    chain. Packed lanes also hold other repositories' sequences, so pass
+    max_parallel_sequences=0 when extraction tasks may raise. The
+    extraction chord must not raise: a failed header task would fail the
+    chord and skip the temporal pass and finalize for every build.
+    Extraction tasks of the non-temporal phase therefore mark their build
+    FAILED and return an error result; the temporal pass skips such builds.
+
+    Args:
+        extraction_sequences: Immutable extraction signatures per repository, in build order
+        temporal_sequences: Immutable temporal pass signatures per repository, or None
+        finalize_task: Immutable signature run after all builds
+        max_parallel_sequences: Max concurrent repository lanes (0 = unbounded)
+
+    Returns:
+        Celery workflow signature
+    """
+    if temporal_sequences is None:
+        return _join_lanes(
+            pack_ordered_lanes(extraction_sequences, max_parallel_sequences), finalize_task
+        )
+
+    extraction_tasks = [task for seq in extraction_sequences for task in seq]
+    return chord(
+        group(extraction_tasks),
+        _join_lanes(
+            pack_ordered_lanes(temporal_sequences, max_parallel_sequences), finalize_task
+        ),
+    )
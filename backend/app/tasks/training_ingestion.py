@@ -154,7 +154,7 @@ def start_scenario_ingestion(
             }
 
         # Step 2: Build ingestion chains
-        required_resources = ["git_history", "git_worktree", "build_logs"]
+        required_resources = _get_scenario_ingestion_resources(scenario)
         tasks_by_level = get_ingestion_tasks_by_level(required_resources)
 
         ingestion_chains = []
@@ -276,6 +276,36 @@ def start_scenario_ingestion(
         raise
 
 
+def _get_scenario_ingestion_resources(scenario: TrainingScenario) -> List[str]:
+    """
+    Resources to ingest for a scenario.
+
+    Clone and logs are always ingested; worktrees are only created when a
+    selected DAG feature still needs a checked-out worktree, or when SonarQube
+    or Trivy scans are enabled (scans run against the commit's worktree).
+    """
+    from app.tasks.pipeline.feature_dag._metadata import get_required_resources_for_features
+    from app.tasks.training_processing import _expand_feature_patterns
+
+    feature_config = scenario.feature_config
+    if isinstance(feature_config, dict):
+        dag_features = feature_config.get("dag_features", [])
+        scan_metrics_config = feature_config.get("scan_metrics", {}) or {}
+    else:
+        dag_features = getattr(feature_config, "dag_features", []) or []
+        scan_metrics_config = getattr(feature_config, "scan_metrics", {}) or {}
+
+    has_scans = bool(scan_metrics_config.get("sonarqube")) or bool(
+        scan_metrics_config.get("trivy")
+    )
+
+    required_resources = ["git_history", "build_logs"]
+    selected_features = set(_expand_feature_patterns(dag_features))
+    if has_scans or "git_worktree" in get_required_resources_for_features(selected_features):
+        required_resources.insert(1, "git_worktree")
+    return required_resources
+
+
 def _filter_builds_for_scenario(
     db,
     scenario: TrainingScenario,
@@ -406,7 +436,7 @@ def _filter_builds_for_scenario(
     repo_cache = {str(r.id): r for r in repos}
     builds_by_repo: Dict[str, List[Dict[str, Any]]] = {}
     ingestion_build_ids = []
-    required_resources = ["git_history", "git_worktree", "build_logs"]
+    required_resources = _get_scenario_ingestion_resources(scenario)
 
     for build in builds:
         repo = repo_cache.get(str(build.raw_repo_id))
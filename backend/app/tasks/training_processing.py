@@ -4,8 +4,9 @@ Training Pipeline - Processing Tasks (Phase 2)
 This module handles the processing phase of training scenario (user-triggered):
 1. start_scenario_processing - Entry point: User triggers after reviewing ingestion
 2. dispatch_scans_and_processing - Dispatch scans (async) + feature extraction
-3. dispatch_enrichment_batches - Create EnrichmentBuild + dispatch sequential chain
-4. process_single_enrichment - Process single build for feature extraction
+3. dispatch_enrichment_batches - Create EnrichmentBuild + dispatch extraction workflow
+4. process_enrichment_batch - Process a chunk of a repo's builds for feature extraction
+   (process_temporal_enrichment adds temporal features in two-phase mode)
 5. finalize_scenario_processing - Finalize after all builds processed
 6. reprocess_failed_builds - Retry FAILED enrichment builds
 7. split_scenario_dataset - Apply splitting strategy and export files
@@ -26,6 +27,7 @@ from celery import chain
 
 from app import paths
 from app.celery_app import celery_app
+from app.config import settings
 from app.entities.enums import ExtractionStatus
 from app.entities.training_enrichment_build import TrainingEnrichmentBuild
 from app.entities.training_ingestion_build import (
@@ -40,7 +42,11 @@ from app.repositories.training_enrichment_build import TrainingEnrichmentBuildRe
 from app.repositories.training_ingestion_build import TrainingIngestionBuildRepository
 from app.repositories.training_scenario import TrainingScenarioRepository
 from app.tasks.base import PipelineTask, SafeTask, TaskState
+from app.tasks.pipeline.constants import ExtractionPhase
+from app.tasks.pipeline.utils.build_history_rollups import invalidate_lineage_rollups
+from app.tasks.pipeline.utils.feature_results import invalidate_feature_results
 from app.tasks.shared.events import publish_scenario_update
+from app.tasks.shared.workflow_builder import build_processing_workflow
 
 logger = logging.getLogger(__name__)
 
@@ -195,7 +201,8 @@ def dispatch_enrichment_batches(
     Flow:
     1. Get INGESTED IngestionBuild records
     2. Create EnrichmentBuild for each (if not exists)
-    3. Dispatch sequential chain for temporal feature support
+    3. Dispatch sequential chain for temporal feature support, or (two-phase)
+       parallel extraction followed by an ordered temporal pass
     """
     corr_prefix = f"[corr={correlation_id[:8]}]" if correlation_id else ""
     logger.info(
@@ -253,8 +260,9 @@ def dispatch_enrichment_batches(
             or datetime.utcnow()
         )
 
-        # Create EnrichmentBuild records
+        # Create EnrichmentBuild records (per repo, oldest first)
         enrichment_build_ids = []
+        builds_by_repo: Dict[str, List[str]] = {}
         for build in all_builds:
             raw_run = raw_build_runs.get(str(build.raw_build_run_id))
 
@@ -276,6 +284,7 @@ def dispatch_enrichment_batches(
                 build_started_at=raw_run.run_started_at if raw_run else None,
             )
             enrichment_build_ids.append(str(eb.id))
+            builds_by_repo.setdefault(str(build.raw_repo_id), []).append(str(eb.id))
 
         logger.info(
             f"{corr_prefix} Created {len(enrichment_build_ids)} enrichment builds"
@@ -295,25 +304,14 @@ def dispatch_enrichment_batches(
             f"{corr_prefix} Feature patterns: {dag_features}, expanded to {len(selected_features)} features"
         )
 
-        # Build sequential processing chain
-        processing_tasks = [
-            process_single_enrichment.si(
-                scenario_id=scenario_id,
-                enrichment_build_id=build_id,
-                selected_features=selected_features,
-                correlation_id=correlation_id,
-            )
-            for build_id in enrichment_build_ids
-        ]
-
-        # Chain: B1 → B2 → ... → finalize
-        workflow = chain(
-            *processing_tasks,
-            finalize_scenario_processing.si(
-                scenario_id=scenario_id,
-                created_count=len(enrichment_build_ids),
-                correlation_id=correlation_id,
-            ),
+        # Builds of a repo run in order; repos run concurrently
+        workflow = _build_enrichment_workflow(
+            scenario_id=scenario_id,
+            builds_by_repo=builds_by_repo,
+            selected_features=selected_features,
+            correlation_id=correlation_id,
+            created_count=len(enrichment_build_ids),
+            two_phase=settings.PROCESSING_TWO_PHASE_ENABLED,
         )
 
         # Error callback for chain failure
@@ -325,20 +323,21 @@ def dispatch_enrichment_batches(
         workflow.apply_async()
 
         logger.info(
-            f"{corr_prefix} Dispatched {len(processing_tasks)} builds for processing"
+            f"{corr_prefix} Dispatched {len(enrichment_build_ids)} builds "
+            f"from {len(builds_by_repo)} repos for processing"
         )
 
         publish_scenario_update(
             scenario_id=scenario_id,
             status=ScenarioStatus.PROCESSING.value,
             builds_total=scenario.builds_total,
-            current_phase=f"Extracting features from {len(processing_tasks)} builds",
+            current_phase=f"Extracting features from {len(enrichment_build_ids)} builds",
         )
 
         return {
             "status": "dispatched",
             "enrichment_builds_created": len(enrichment_build_ids),
-            "total_builds": len(processing_tasks),
+            "total_builds": len(enrichment_build_ids),
         }
 
     except Exception as e:
@@ -365,6 +364,73 @@ def dispatch_enrichment_batches(
         raise
 
 
+def _build_enrichment_workflow(
+    scenario_id: str,
+    builds_by_repo: Dict[str, List[str]],
+    selected_features: List[str],
+    correlation_id: str,
+    created_count: int,
+    two_phase: bool,
+):
+    """
+    Build the extraction workflow of a scenario.
+
+    Temporal ordering only matters within a repository, so each repo's
+    builds (oldest first) form one ordered sequence of
+    process_enrichment_batch tasks (PROCESSING_BUILDS_PER_BATCH builds
+    each) and repos run concurrently. finalize_scenario_processing runs
+    once every repo is done.
+
+    With two_phase, the temporal sequences run at most
+    PROCESSING_MAX_PARALLEL_REPOS at a time. Without it, each repo gets its
+    own chain: extraction tasks of this path raise once their retries are
+    exhausted, which stops the rest of the chain, so a shared lane would
+    also stop unrelated repos.
+    """
+    extraction_phase = ExtractionPhase.NON_TEMPORAL if two_phase else ExtractionPhase.ALL
+    batch_size = settings.PROCESSING_BUILDS_PER_BATCH
+    chunk_size = settings.PROCESSING_TEMPORAL_BUILDS_PER_TASK
+
+    extraction_sequences = [
+        [
+            process_enrichment_batch.si(
+                scenario_id=scenario_id,
+                enrichment_build_ids=build_ids[i : i + batch_size],
+                selected_features=selected_features,
+                correlation_id=correlation_id,
+                phase=extraction_phase.value,
+            )
+            for i in range(0, len(build_ids), batch_size)
+        ]
+        for build_ids in builds_by_repo.values()
+    ]
+    temporal_sequences = None
+    if two_phase:
+        temporal_sequences = [
+            [
+                process_temporal_enrichment.si(
+                    scenario_id=scenario_id,
+                    enrichment_build_ids=build_ids[i : i + chunk_size],
+                    selected_features=selected_features,
+                    correlation_id=correlation_id,
+                )
+                for i in range(0, len(build_ids), chunk_size)
+            ]
+            for build_ids in builds_by_repo.values()
+        ]
+
+    return build_processing_workflow(
+        extraction_sequences,
+        temporal_sequences,
+        finalize_scenario_processing.si(
+            scenario_id=scenario_id,
+            created_count=created_count,
+            correlation_id=correlation_id,
+        ),
+        max_parallel_sequences=settings.PROCESSING_MAX_PARALLEL_REPOS if two_phase else 0,
+    )
+
+
 @celery_app.task(
     bind=True,
     base=PipelineTask,
@@ -469,26 +535,30 @@ def handle_processing_chain_error(
 @celery_app.task(
     bind=True,
     base=SafeTask,
-    name="app.tasks.training_processing.process_single_enrichment",
+    name="app.tasks.training_processing.process_enrichment_batch",
     queue="scenario_processing",
-    soft_time_limit=300,
-    time_limit=600,
+    soft_time_limit=1800,
+    time_limit=1900,
     max_retries=2,
 )
-def process_single_enrichment(
+def process_enrichment_batch(
     self: SafeTask,
     scenario_id: str,
-    enrichment_build_id: str,
+    enrichment_build_ids: List[str],
     selected_features: List[str],
     correlation_id: str = "",
+    phase: str = ExtractionPhase.ALL.value,
 ) -> Dict[str, Any]:
     """
-    Process a single enrichment build for feature extraction.
+    Process a chunk of one repository's enrichment builds (oldest first).
 
-    Uses extract_features_for_build helper with Hamilton DAG.
+    Uses extract_features_for_builds helper with Hamilton DAG: the chunk
+    shares one pipeline and GitHub client, and commit/repo scoped features
+    are computed once. With phase="non_temporal" temporal features are
+    left to process_temporal_enrichment.
     """
     from app.entities.feature_audit_log import AuditLogCategory
-    from app.tasks.shared import extract_features_for_build
+    from app.tasks.shared import extract_features_for_builds
 
     corr_prefix = f"[corr={correlation_id[:8]}]" if correlation_id else ""
 
@@ -497,104 +567,227 @@ def process_single_enrichment(
     raw_build_run_repo = RawBuildRunRepository(self.db)
     raw_repo_repo = RawRepositoryRepository(self.db)
 
-    # Load enrichment build
-    enrichment_build = enrichment_build_repo.find_by_id(enrichment_build_id)
-    if not enrichment_build:
-        logger.error(f"{corr_prefix} EnrichmentBuild {enrichment_build_id} not found")
-        return {"status": "error", "error": "EnrichmentBuild not found"}
-
-    if enrichment_build.extraction_status == ExtractionStatus.COMPLETED.value:
-        return {"status": "skipped", "reason": "already_processed"}
+    scenario = scenario_repo.find_by_id(scenario_id)
+    if not scenario:
+        return {"status": "error", "error": "Scenario not found"}
 
-    # Load dependencies
-    raw_build_run = raw_build_run_repo.find_by_id(enrichment_build.raw_build_run_id)
-    if not raw_build_run:
-        enrichment_build_repo.update_extraction_status(
-            enrichment_build_id,
-            ExtractionStatus.FAILED,
-            error_message="RawBuildRun not found",
+    # Load enrichment builds and their runs
+    build_map = {
+        str(build.id): build for build in enrichment_build_repo.find_by_ids(enrichment_build_ids)
+    }
+    run_map = {
+        str(run.id): run
+        for run in raw_build_run_repo.find_by_ids(
+            [build.raw_build_run_id for build in build_map.values()]
         )
-        return {"status": "failed", "error": "RawBuildRun not found"}
+    }
+
+    build_ids: List[str] = []
+    raw_build_runs = []
+    for enrichment_build_id in enrichment_build_ids:
+        enrichment_build = build_map.get(enrichment_build_id)
+        if not enrichment_build:
+            logger.error(f"{corr_prefix} EnrichmentBuild {enrichment_build_id} not found")
+            continue
+        if enrichment_build.extraction_status == ExtractionStatus.COMPLETED.value:
+            continue
+        raw_build_run = run_map.get(str(enrichment_build.raw_build_run_id))
+        if not raw_build_run:
+            enrichment_build_repo.update_extraction_status(
+                enrichment_build_id,
+                ExtractionStatus.FAILED,
+                error_message="RawBuildRun not found",
+            )
+            continue
+        build_ids.append(enrichment_build_id)
+        raw_build_runs.append(raw_build_run)
 
-    raw_repo = raw_repo_repo.find_by_id(raw_build_run.raw_repo_id)
+    if not build_ids:
+        return {"status": "skipped", "reason": "already_processed"}
+
+    raw_repo = raw_repo_repo.find_by_id(raw_build_runs[0].raw_repo_id)
     if not raw_repo:
-        enrichment_build_repo.update_extraction_status(
-            enrichment_build_id,
-            ExtractionStatus.FAILED,
-            error_message="RawRepository not found",
-        )
+        for enrichment_build_id in build_ids:
+            enrichment_build_repo.update_extraction_status(
+                enrichment_build_id,
+                ExtractionStatus.FAILED,
+                error_message="RawRepository not found",
+            )
         return {"status": "failed", "error": "RawRepository not found"}
 
-    scenario = scenario_repo.find_by_id(scenario_id)
-    if not scenario:
-        return {"status": "error", "error": "Scenario not found"}
-
+    finished: List[str] = []
     try:
         # Mark as in progress
-        enrichment_build_repo.update_extraction_status(
-            enrichment_build_id,
-            ExtractionStatus.IN_PROGRESS,
-        )
+        for enrichment_build_id in build_ids:
+            enrichment_build_repo.update_extraction_status(
+                enrichment_build_id,
+                ExtractionStatus.IN_PROGRESS,
+            )
 
         # Extract features using Hamilton DAG
-        result = extract_features_for_build(
+        results = extract_features_for_builds(
             db=self.db,
             raw_repo=raw_repo,
             feature_config={},
-            raw_build_run=raw_build_run,
+            raw_build_runs=raw_build_runs,
             selected_features=selected_features,
-            output_build_id=enrichment_build_id,
+            output_build_ids=build_ids,
             category=AuditLogCategory.TRAINING_SCENARIO,
             scenario_id=scenario_id,
+            phase=ExtractionPhase(phase),
         )
 
-        # Update enrichment build with result
-        if result["status"] == "completed":
-            enrichment_build_repo.update_extraction_status(
-                enrichment_build_id,
-                ExtractionStatus.COMPLETED,
-                feature_vector_id=result.get("feature_vector_id"),
-            )
-        elif result["status"] == "partial":
-            enrichment_build_repo.update_extraction_status(
-                enrichment_build_id,
-                ExtractionStatus.PARTIAL,
-                feature_vector_id=result.get("feature_vector_id"),
-                error_message="; ".join(result.get("errors", [])),
-            )
-        else:
-            enrichment_build_repo.update_extraction_status(
-                enrichment_build_id,
-                ExtractionStatus.FAILED,
-                error_message="; ".join(result.get("errors", [])),
-            )
+        # Update enrichment builds with their result
+        for enrichment_build_id, result in zip(build_ids, results, strict=True):
+            if result["status"] == "completed":
+                enrichment_build_repo.update_extraction_status(
+                    enrichment_build_id,
+                    ExtractionStatus.COMPLETED,
+                    feature_vector_id=result.get("feature_vector_id"),
+                )
+            elif result["status"] == "partial":
+                enrichment_build_repo.update_extraction_status(
+                    enrichment_build_id,
+                    ExtractionStatus.PARTIAL,
+                    feature_vector_id=result.get("feature_vector_id"),
+                    error_message="; ".join(result.get("errors", [])),
+                )
+            else:
+                enrichment_build_repo.update_extraction_status(
+                    enrichment_build_id,
+                    ExtractionStatus.FAILED,
+                    error_message="; ".join(result.get("errors", [])),
+                )
+            finished.append(enrichment_build_id)
 
-        # Increment processed count
-        scenario_repo.increment_counter(scenario_id, "builds_features_extracted")
+            # Increment processed count
+            scenario_repo.increment_counter(scenario_id, "builds_features_extracted")
 
+        failed = sum(1 for result in results if result["status"] == "failed")
         logger.info(
-            f"{corr_prefix} [process_single] {enrichment_build_id}: "
-            f"status={result['status']}, features={result.get('feature_count', 0)}"
+            f"{corr_prefix} [process_batch] {len(build_ids)} builds of "
+            f"{raw_repo.full_name}: {failed} failed"
         )
 
         return {
-            "status": result["status"],
-            "build_id": enrichment_build_id,
-            "feature_count": result.get("feature_count", 0),
+            "status": "completed",
+            "processed": len(build_ids),
+            "failed": failed,
         }
 
     except Exception as e:
         error_msg = str(e)
-        logger.error(f"{corr_prefix} Error for {enrichment_build_id}: {error_msg}")
-        enrichment_build_repo.update_extraction_status(
-            enrichment_build_id,
-            ExtractionStatus.FAILED,
-            error_message=error_msg,
+        unfinished = [bid for bid in build_ids if bid not in finished]
+        logger.error(
+            f"{corr_prefix} Error for {len(unfinished)} builds of "
+            f"{raw_repo.full_name}: {error_msg}"
         )
-        scenario_repo.increment_counter(scenario_id, "builds_failed")
+        for enrichment_build_id in unfinished:
+            enrichment_build_repo.update_extraction_status(
+                enrichment_build_id,
+                ExtractionStatus.FAILED,
+                error_message=error_msg,
+            )
+            scenario_repo.increment_counter(scenario_id, "builds_failed")
+        if phase == ExtractionPhase.NON_TEMPORAL.value:
+            # Header of the two-phase chord: a raise would keep the temporal pass
+            # and finalize from running for every other build
+            return {"status": "failed", "processed": len(build_ids), "error": error_msg}
         raise
 
 
+@celery_app.task(
+    bind=True,
+    base=PipelineTask,
+    name="app.tasks.training_processing.process_temporal_enrichment",
+    queue="scenario_processing",
+    soft_time_limit=1800,
+    time_limit=1900,
+)
+def process_temporal_enrichment(
+    self: PipelineTask,
+    scenario_id: str,
+    enrichment_build_ids: List[str],
+    selected_features: List[str],
+    correlation_id: str = "",
+) -> Dict[str, Any]:
+    """
+    Second pass of two-phase processing: add temporal features in build order.
+
+    Runs after process_enrichment_batch(phase="non_temporal") finished for
+    all builds. A failure only marks that build PARTIAL.
+    """
+    from app.entities.feature_audit_log import AuditLogCategory
+    from app.tasks.shared import extract_temporal_features_for_build
+
+    corr_prefix = f"[corr={correlation_id[:8]}]" if correlation_id else ""
+
+    enrichment_build_repo = TrainingEnrichmentBuildRepository(self.db)
+    raw_build_run_repo = RawBuildRunRepository(self.db)
+    raw_repo_repo = RawRepositoryRepository(self.db)
+    raw_repos: Dict[str, Any] = {}
+
+    completed = failed = skipped = 0
+    for enrichment_build_id in enrichment_build_ids:
+        enrichment_build = enrichment_build_repo.find_by_id(enrichment_build_id)
+        if not enrichment_build or enrichment_build.extraction_status not in (
+            ExtractionStatus.COMPLETED,
+            ExtractionStatus.PARTIAL,
+        ):
+            skipped += 1
+            continue
+
+        raw_build_run = raw_build_run_repo.find_by_id(enrichment_build.raw_build_run_id)
+        if not raw_build_run:
+            skipped += 1
+            continue
+
+        repo_key = str(raw_build_run.raw_repo_id)
+        if repo_key not in raw_repos:
+            raw_repos[repo_key] = raw_repo_repo.find_by_id(raw_build_run.raw_repo_id)
+        raw_repo = raw_repos[repo_key]
+        if not raw_repo:
+            skipped += 1
+            continue
+
+        result = extract_temporal_features_for_build(
+            db=self.db,
+            raw_repo=raw_repo,
+            feature_config={},
+            raw_build_run=raw_build_run,
+            selected_features=selected_features,
+            output_build_id=enrichment_build_id,
+            category=AuditLogCategory.TRAINING_SCENARIO,
+            scenario_id=scenario_id,
+        )
+
+        if result["status"] == "completed":
+            completed += 1
+        elif result["status"] == "skipped":
+            skipped += 1
+        else:
+            failed += 1
+            enrichment_build_repo.update_extraction_status(
+                enrichment_build_id,
+                ExtractionStatus.PARTIAL,
+                feature_vector_id=result.get("feature_vector_id"),
+                error_message="Temporal features failed: "
+                + "; ".join(result.get("errors", [])),
+            )
+
+    logger.info(
+        f"{corr_prefix} [process_temporal] {len(enrichment_build_ids)} builds: "
+        f"{completed} completed, {failed} failed, {skipped} skipped"
+    )
+
+    return {
+        "status": "completed",
+        "completed": completed,
+        "failed": failed,
+        "skipped": skipped,
+    }
+
+
 @celery_app.task(
     bind=True,
     base=PipelineTask,
@@ -687,7 +880,9 @@ def reprocess_failed_builds(
     """
     Reprocess only FAILED enrichment builds for a scenario.
 
-    Uses sequential chain to ensure temporal features work correctly.
+    Uses a sequential chain per repository to ensure temporal features work
+    correctly; a build that keeps failing only stops its own repository's
+    chain.
     """
     import uuid
 
@@ -720,6 +915,9 @@ def reprocess_failed_builds(
             },
         )
         reset_count += 1
+    # Stored results of a failed run may hold fallback values; re-extract them
+    invalidate_feature_results(self.db, [b.raw_build_run_id for b in failed_builds])
+    invalidate_lineage_rollups(self.db, [b.raw_repo_id for b in failed_builds])
 
     # Get selected features from scenario
     feature_config = scenario.feature_config
@@ -729,24 +927,17 @@ def reprocess_failed_builds(
         dag_features = getattr(feature_config, "dag_features", []) or []
     selected_features = _expand_feature_patterns(dag_features)
 
-    # Build reprocessing chain
-    processing_tasks = [
-        process_single_enrichment.si(
-            scenario_id=scenario_id,
-            enrichment_build_id=str(build.id),
-            selected_features=selected_features,
-            correlation_id=correlation_id,
-        )
-        for build in failed_builds
-    ]
+    builds_by_repo: Dict[str, List[str]] = {}
+    for build in failed_builds:
+        builds_by_repo.setdefault(str(build.raw_repo_id), []).append(str(build.id))
 
-    workflow = chain(
-        *processing_tasks,
-        finalize_scenario_processing.si(
-            scenario_id=scenario_id,
-            created_count=0,
-            correlation_id=correlation_id,
-        ),
+    workflow = _build_enrichment_workflow(
+        scenario_id=scenario_id,
+        builds_by_repo=builds_by_repo,
+        selected_features=selected_features,
+        correlation_id=correlation_id,
+        created_count=0,
+        two_phase=False,
     )
     workflow.apply_async()
 
@@ -7,6 +7,7 @@ from pathlib import Path
 from typing import Callable, List, Optional
 
 from app.config import settings
+from app.core import call_accounting
 from app.paths import get_repo_path, get_worktree_path
 from app.services.github.github_client import GitHubClient
 
@@ -185,7 +186,7 @@ def apply_replay_plan(repo_path: Path, plan: ReplayPlan, target_sha: str) -> str
                 shutil.rmtree(replay_worktree, ignore_errors=True)
 
         # Prune stale worktree references
-        subprocess.run(
+        call_accounting.run(
             ["git", "worktree", "prune"],
             cwd=str(repo_path),
             capture_output=True,
@@ -205,7 +206,7 @@ def apply_replay_plan(repo_path: Path, plan: ReplayPlan, target_sha: str) -> str
 
             # Apply patch in worktree
             try:
-                subprocess.run(
+                call_accounting.run(
                     ["git", "apply", "--index", "--whitespace=nowarn"],
                     cwd=str(replay_worktree),
                     input=commit.patch,
@@ -232,7 +233,7 @@ def apply_replay_plan(repo_path: Path, plan: ReplayPlan, target_sha: str) -> str
             )
 
             try:
-                subprocess.run(
+                call_accounting.run(
                     ["git", "commit", "-m", commit.message],
                     cwd=str(replay_worktree),
                     env=env,
@@ -244,7 +245,7 @@ def apply_replay_plan(repo_path: Path, plan: ReplayPlan, target_sha: str) -> str
                 raise RuntimeError(f"Timeout committing {commit.sha}")
             except subprocess.CalledProcessError:
                 # Try with --allow-empty if no changes
-                subprocess.run(
+                call_accounting.run(
                     ["git", "commit", "-m", commit.message, "--allow-empty"],
                     cwd=str(replay_worktree),
                     env=env,
@@ -270,7 +271,7 @@ def apply_replay_plan(repo_path: Path, plan: ReplayPlan, target_sha: str) -> str
 
 
 def _run_git(cwd: Path, args: List[str], timeout: int = 120) -> str:
-    result = subprocess.run(
+    result = call_accounting.run(
         ["git"] + args,
         cwd=str(cwd),
         capture_output=True,
@@ -282,8 +283,15 @@ def _run_git(cwd: Path, args: List[str], timeout: int = 120) -> str:
 
 
 def _commit_exists(cwd: Path, sha: str) -> bool:
+    from app.tasks.pipeline.utils.git_object_reader import object_exists
+
     try:
-        subprocess.run(
+        return object_exists(cwd, sha)
+    except Exception as e:
+        logger.debug(f"Object reader failed for {sha}, falling back to cat-file -e: {e}")
+
+    try:
+        call_accounting.run(
             ["git", "cat-file", "-e", sha],
             cwd=str(cwd),
             check=True,
@@ -356,7 +364,7 @@ def ensure_worktree(github_repo_id: int, commit_sha: str, full_name: str) -> Opt
         # Create worktree
         try:
             worktree_path.parent.mkdir(parents=True, exist_ok=True)
-            subprocess.run(
+            call_accounting.run(
                 ["git", "worktree", "add", "--detach", str(worktree_path), target_sha],
                 cwd=str(repo_path),
                 check=True,
@@ -415,12 +423,27 @@ def clone_bare_repo(github_repo_id: int, full_name: str) -> bool:
         try:
             logger.info(f"Cloning {full_name} to {repo_path}")
             repo_path.parent.mkdir(parents=True, exist_ok=True)
-            subprocess.run(
+            call_accounting.run(
                 ["git", "clone", "--bare", clone_url, str(repo_path)],
                 check=True,
                 capture_output=True,
                 timeout=600,
             )
+
+            if settings.GIT_MAINTENANCE_ENABLED:
+                from app.tasks.pipeline.utils.repo_maintenance import (
+                    run_repo_maintenance,
+                )
+
+                run_repo_maintenance(
+                    repo_path,
+                    max_packs=settings.GIT_MAINTENANCE_MAX_PACKS,
+                    timeout=settings.GIT_MAINTENANCE_TIMEOUT_SECONDS,
+                )
+
+            from app.tasks.pipeline.utils.commit_index import refresh_commit_index
+
+            refresh_commit_index(repo_path)
             return True
         except subprocess.CalledProcessError as e:
             logger.error(f"Failed to clone {full_name}: {e.stderr}")
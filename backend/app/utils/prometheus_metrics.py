@@ -50,6 +50,41 @@ ACTIVE_DATASETS = Gauge(
     ["status"],
 )
 
+HAMILTON_CACHE_REQUESTS = Counter(
+    "hamilton_cache_requests_total",
+    "Hamilton DAG result cache lookups per node",
+    ["node", "result"],  # result: hit/miss
+)
+
+HAMILTON_CACHE_EVICTIONS = Counter(
+    "hamilton_cache_evictions_total",
+    "Hamilton DAG cache entries removed",
+    ["reason"],  # ttl, size, invalidated
+)
+
+HAMILTON_CACHE_SIZE = Gauge(
+    "hamilton_cache_size_bytes",
+    "Size of the Hamilton DAG result cache after the last eviction",
+)
+
+EXTERNAL_CALLS = Counter(
+    "external_calls_total",
+    "Subprocess and API calls made during feature extraction",
+    ["kind", "command", "node"],  # kind: git/docker/github, node: active DAG node
+)
+
+EXTERNAL_CALL_DURATION = Counter(
+    "external_call_duration_seconds_total",
+    "Wall time spent in subprocess and API calls",
+    ["kind", "command", "node"],
+)
+
+EXTERNAL_CALL_OUTPUT = Counter(
+    "external_call_output_bytes_total",
+    "Output read from subprocess and API calls",
+    ["kind", "command", "node"],
+)
+
 
 def setup_prometheus(app):
     """
@@ -159,3 +194,28 @@ def update_repo_count(status: str, count: int):
 def update_dataset_count(status: str, count: int):
     """Update active dataset count by status."""
     ACTIVE_DATASETS.labels(status=status).set(count)
+
+
+def record_hamilton_cache_request(node: str, result: str):
+    """Record a Hamilton cache hit or miss for a node."""
+    HAMILTON_CACHE_REQUESTS.labels(node=node, result=result).inc()
+
+
+def record_hamilton_cache_eviction(reason: str, count: int = 1):
+    """Record Hamilton cache entries removed for a reason."""
+    HAMILTON_CACHE_EVICTIONS.labels(reason=reason).inc(count)
+
+
+def update_hamilton_cache_size(size_bytes: int):
+    """Update the Hamilton cache size metric."""
+    HAMILTON_CACHE_SIZE.set(size_bytes)
+
+
+def record_external_call(
+    kind: str, command: str, node: str, duration_seconds: float, output_bytes: int
+):
+    """Record a subprocess/API call attributed to a DAG node."""
+    labels = {"kind": kind, "command": command, "node": node}
+    EXTERNAL_CALLS.labels(**labels).inc()
+    EXTERNAL_CALL_DURATION.labels(**labels).inc(duration_seconds)
+    EXTERNAL_CALL_OUTPUT.labels(**labels).inc(output_bytes)
@@ -0,0 +1,7 @@
+"""
+Feature DAG benchmarks over synthetic repositories.
+
+Generates git repositories of configurable shape locally, seeds a benchmark
+Mongo database with matching raw_build_runs and times HamiltonPipeline.execute
+per feature set. See benchmarks/README.md.
+"""
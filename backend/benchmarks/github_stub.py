@@ -0,0 +1,99 @@
+"""
+Offline stand-in for GitHubClient in the feature DAG benchmarks.
+
+Serves the endpoints used by the GitHub API features (pull request details
+and commit/issue/review comments) with deterministic synthetic payloads, so
+the discussion and PR features run without network access. Requests are
+recorded through call_accounting like the real client's transport, and can
+be given an artificial round-trip latency.
+"""
+
+from __future__ import annotations
+
+import random
+import time
+import zlib
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List
+
+from app.core import call_accounting
+from app.tasks.pipeline.feature_dag._inputs import GitHubClientInput
+
+_EPOCH = datetime(2020, 9, 1, tzinfo=timezone.utc)
+
+
+class StubGitHubClient:
+    """Deterministic GitHubClient replacement (same method signatures)."""
+
+    def __init__(self, seed: int = 42, latency_ms: float = 0.0):
+        self.seed = seed
+        self.latency_ms = latency_ms
+        self.requests = 0
+
+    def _rng(self, *key: Any) -> random.Random:
+        return random.Random(zlib.crc32(repr((self.seed, *key)).encode()))
+
+    def _request(self) -> None:
+        self.requests += 1
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+
+    def _comments(self, rng: random.Random, max_count: int) -> List[Dict[str, Any]]:
+        created = _EPOCH + timedelta(days=rng.randint(0, 900))
+        comments = []
+        for i in range(rng.randint(0, max_count)):
+            created += timedelta(minutes=rng.randint(5, 600))
+            comments.append(
+                {
+                    "id": rng.randint(1, 10**9),
+                    "user": {"login": f"dev{rng.randint(0, 24)}"},
+                    "body": f"Comment {i}",
+                    "created_at": created.strftime("%Y-%m-%dT%H:%M:%SZ"),
+                }
+            )
+        return comments
+
+    def get_pull_request(
+        self, full_name: str, pr_number: int, use_cache: bool = True
+    ) -> Dict[str, Any]:
+        with call_accounting.track_call("github", "GET"):
+            self._request()
+            rng = self._rng("pull", full_name, pr_number)
+            created = _EPOCH + timedelta(days=rng.randint(0, 900))
+            return {
+                "number": pr_number,
+                "title": f"Feature {pr_number}",
+                "body": f"Fixes #{rng.randint(1, 500)}" if rng.random() < 0.5 else "",
+                "created_at": created.strftime("%Y-%m-%dT%H:%M:%SZ"),
+                "user": {"login": f"dev{rng.randint(0, 24)}"},
+            }
+
+    def list_commit_comments(
+        self, full_name: str, sha: str, use_cache: bool = True
+    ) -> List[Dict[str, Any]]:
+        with call_accounting.track_call("github", "GET"):
+            self._request()
+            return self._comments(self._rng("commit", full_name, sha), max_count=2)
+
+    def list_issue_comments(
+        self, full_name: str, issue_number: int, use_cache: bool = True
+    ) -> List[Dict[str, Any]]:
+        with call_accounting.track_call("github", "GET"):
+            self._request()
+            return self._comments(self._rng("issue", full_name, issue_number), max_count=8)
+
+    def list_review_comments(
+        self, full_name: str, pr_number: int, use_cache: bool = True
+    ) -> List[Dict[str, Any]]:
+        with call_accounting.track_call("github", "GET"):
+            self._request()
+            return self._comments(self._rng("review", full_name, pr_number), max_count=6)
+
+
+def stub_github_client_input(
+    full_name: str, seed: int = 42, latency_ms: float = 0.0
+) -> GitHubClientInput:
+    """GitHubClientInput backed by a StubGitHubClient."""
+    return GitHubClientInput(
+        client=StubGitHubClient(seed=seed, latency_ms=latency_ms), full_name=full_name
+    )
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Check that TestLogParser.scan() returns the same results as the per-hint
+parse loop test_log_features used before, and compare their speed.
+
+The golden corpus is built from one summary sample per supported framework,
+combined with filler output, several frameworks in one log, summaries
+wrapped across lines and non-ASCII case variants, and checked for a set of
+language hint lists and framework filters. Real CI logs can be added with
+--logs-dir (every job log below it, plain or gzip).
+
+Usage:
+    uv run python -m benchmarks.log_scanner_equivalence
+    uv run python -m benchmarks.log_scanner_equivalence --logs-dir ../repo-data/ci_logs
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from app.tasks.pipeline.feature_dag.log_parsers.base import ParsedLog
+from app.tasks.pipeline.feature_dag.log_parsers.registry import LogParserRegistry
+from app.tasks.pipeline.utils.ci_logs import GZIP_SUFFIX, PLAIN_SUFFIX, read_job_log
+
+# Summary output of every supported framework
+FRAMEWORK_SAMPLES: Dict[str, str] = {
+    "pytest": "======= 120 passed, 3 failed, 4 skipped, 1 xfailed in 12.34s =======",
+    "unittest": "Ran 42 tests in 1.234s\n\nFAILED (failures=2, errors=1, skipped=3)",
+    "rspec": "Finished in 2.5 seconds (files took 1.1 seconds to load)\n"
+    "57 examples, 2 failures, 3 pending",
+    "minitest": "Finished in 0.456s\n15 runs, 40 assertions, 1 failures, 0 errors, 2 skips",
+    "testunit": "Finished in 3.2 seconds.\n"
+    "30 tests, 90 assertions, 1 failures, 2 errors, 3 pendings, 1 omissions, 0 notifications",
+    "cucumber": "12 scenarios (2 failed, 1 undefined, 9 passed)\n48 steps (48 passed)\n1m2.345s",
+    "junit": "Tests run: 88, Failures: 2, Errors: 1, Skipped: 4, Time elapsed: 3.21 sec",
+    "testng": "===============================================\n"
+    "Total tests run: 25, Failures: 3, Skips: 2\n"
+    "===============================================",
+    "jest": "Tests:       2 failed, 1 skipped, 40 passed, 43 total\nTime:        5.2 s",
+    "mocha": "  25 passing (340ms)\n  2 failing\n  1 pending",
+    "jasmine": "Finished in 1.5 seconds\n14 specs, 1 failure, 2 pending",
+    "vitest": " Tests  10 passed | 1 failed | 2 skipped (13)\n Duration  2.34s",
+    "gotest": "--- PASS: TestFoo (0.00s)\n--- FAIL: TestBar (0.01s)\n"
+    "--- SKIP: TestBaz (0.00s)\nFAIL\tgithub.com/acme/pkg\t0.123s\n"
+    "ok  \tgithub.com/acme/other\t0.456s",
+    "gotestsum": "DONE 123 tests, 2 failures, 4 skipped in 4.567s",
+    "gtest": "[==========] 20 tests from 4 test suites ran. (15 ms total)\n"
+    "[  PASSED  ] 18 tests.\n[  FAILED  ] 2 tests, listed below:\n[ SKIPPED ] 1 test",
+    "catch2": "test cases: 10 | 8 passed | 2 failed\nassertions: 42 | 38 passed | 4 failed",
+    "catch2_all_passed": "All tests passed (42 assertions in 10 test cases)",
+    "ctest": "90% tests passed, 1 tests failed out of 10\n\nTotal Test time (real) =   5.67 sec",
+}
+
+# Output that shares words with the summaries without being one
+NEAR_MISSES = [
+    "collected 50 items; tests passed earlier, see ran.log",
+    "Tests run: n/a (skipped job)",
+    "DONE preparing test environment",
+    "1 example of failure handling",
+    "Scenario outline (draft)",
+    "warning: 3 tests in progress (pending)",
+    "--- PASSED:TestNothing",
+    "pytest-cov report written",
+]
+
+FILLER = [
+    "##[group]Run actions/checkout@v4",
+    "Syncing repository: acme/project",
+    "Downloading dependency 1/42 (3.2 MB)",
+    "npm WARN deprecated package@1.0.0",
+    "[INFO] Building module core",
+    "Compiling src/main.rs (release)",
+    "##[endgroup]",
+]
+
+HINT_LISTS: List[Optional[List[str]]] = [
+    None,
+    [],
+    ["python"],
+    ["ruby"],
+    ["java", "kotlin"],
+    ["typescript", "javascript"],
+    ["go"],
+    ["cpp", "python"],
+    ["shell", "python"],
+    ["Python", "Ruby"],
+]
+
+FRAMEWORK_FILTERS: List[Optional[List[str]]] = [
+    None,
+    ["pytest"],
+    ["JUnit", "gtest"],
+    ["mocha", "jest", "rspec"],
+    ["unknown"],
+]
+
+
+def legacy_parse(
+    registry: LogParserRegistry,
+    text: str,
+    language_hints: Optional[Sequence[str]],
+    allowed_frameworks: Optional[List[str]],
+) -> ParsedLog:
+    """The per-hint loop of test_log_features, every parser run on the full text."""
+
+    def parse(language_hint: Optional[str]) -> ParsedLog:
+        allowed = {f.lower() for f in allowed_frameworks} if allowed_frameworks else None
+        for parser in registry.ordered_parsers(language_hint):
+            if allowed and parser.name not in allowed:
+                continue
+            result = parser.parse(text)
+            if result:
+                return result
+        return ParsedLog(
+            framework=None,
+            language=(
+                language_hint.lower()
+                if language_hint
+                else ("python" if "pytest" in text.lower() else None)
+            ),
+            tests_run=0,
+            tests_failed=0,
+            tests_skipped=0,
+            test_duration_seconds=None,
+        )
+
+    parsed = None
+    if language_hints:
+        for language_hint in language_hints:
+            parsed = parse(language_hint)
+            if parsed.framework:
+                break
+    if not parsed or not parsed.framework:
+        parsed = parse(None)
+    return parsed
+
+
+def _filler(rng: random.Random, lines: int) -> str:
+    return "\n".join(rng.choice(FILLER + NEAR_MISSES[:2]) for _ in range(lines))
+
+
+def synthetic_corpus(seed: int, large_lines: int) -> Iterator[Tuple[str, str]]:
+    """(name, log text) pairs of the golden corpus."""
+    rng = random.Random(seed)
+    names = sorted(FRAMEWORK_SAMPLES)
+
+    yield "empty", ""
+    yield "filler", _filler(rng, 200)
+    yield "near_misses", "\n".join(NEAR_MISSES)
+    yield "pytest_mentioned_only", "pytest -q --maxfail=1\n" + _filler(rng, 20)
+
+    for name in names:
+        sample = FRAMEWORK_SAMPLES[name]
+        yield name, sample
+        yield f"{name}/in_filler", f"{_filler(rng, 50)}\n{sample}\n{_filler(rng, 10)}"
+        yield f"{name}/upper", sample.upper()
+        # Whitespace patterns (\s) may match across line breaks
+        yield f"{name}/wrapped", sample.replace(" ", "\n", 3)
+        # Characters re.IGNORECASE folds to ASCII letters, unlike str.lower()
+        yield f"{name}/unicode", sample.replace("s", "ſ").replace("i", "ı")
+        yield f"{name}/dotted_i", sample.replace("i", "İ")
+
+    # Several frameworks in one log: priority order decides
+    for first, second in itertools.combinations(names, 2):
+        yield (
+            f"{first}+{second}",
+            f"{FRAMEWORK_SAMPLES[second]}\n{_filler(rng, 5)}\n{FRAMEWORK_SAMPLES[first]}",
+        )
+
+    for name in ("pytest", "junit", "gotest", "mocha"):
+        text = _filler(rng, large_lines)
+        yield f"{name}/large", f"{text}\n{FRAMEWORK_SAMPLES[name]}\n{text}"
+    yield "no_match/large", _filler(rng, large_lines)
+
+
+def directory_corpus(logs_dir: Path) -> Iterator[Tuple[str, str]]:
+    for path in sorted(logs_dir.rglob("*.log*")):
+        if path.name.endswith((PLAIN_SUFFIX, GZIP_SUFFIX)):
+            yield str(path.relative_to(logs_dir)), read_job_log(path)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--logs-dir", type=Path, help="Also check every job log below this directory"
+    )
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument(
+        "--large-lines", type=int, default=50_000, help="Filler lines of the large logs"
+    )
+    args = parser.parse_args(argv)
+
+    registry = LogParserRegistry()
+    corpus = list(synthetic_corpus(args.seed, args.large_lines))
+    if args.logs_dir:
+        corpus += list(directory_corpus(args.logs_dir))
+
+    checks = 0
+    mismatches: List[str] = []
+    legacy_s = scan_s = 0.0
+    for (name, text), hints, frameworks in itertools.product(
+        corpus, HINT_LISTS, FRAMEWORK_FILTERS
+    ):
+        start = time.perf_counter()
+        expected = legacy_parse(registry, text, hints, frameworks)
+        legacy_s += time.perf_counter() - start
+
+        start = time.perf_counter()
+        actual = registry.scan(text, hints, set(frameworks) if frameworks else None)
+        scan_s += time.perf_counter() - start
+
+        checks += 1
+        if actual != expected:
+            mismatches.append(
+                f"{name} hints={hints} frameworks={frameworks}: "
+                f"expected {expected}, got {actual}"
+            )
+
+    print(f"logs: {len(corpus)}, checks: {checks}, mismatches: {len(mismatches)}")
+    print(f"legacy: {legacy_s:.2f}s, scan: {scan_s:.2f}s")
+    for line in mismatches:
+        print(f"MISMATCH {line}")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
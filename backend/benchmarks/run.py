@@ -0,0 +1,395 @@
+#!/usr/bin/env python3
+"""
+Benchmark HamiltonPipeline.execute over a synthetic repository.
+
+Generates a repository (benchmarks/synthetic_repo.py), prepares it like
+ingestion does (bare clone, git maintenance, commit index), seeds a local
+Mongo database with matching raw_build_runs (benchmarks/seed.py) and runs
+the pipeline for every build, once per feature set. GitHub API features are
+served by benchmarks/github_stub.py, so the run is fully offline.
+
+Each feature set runs in a fresh process (no warm caches shared between
+sets, meaningful peak RSS) and reports per-node latency, external calls
+(git subprocesses, GitHub requests) and peak RSS. The report is JSON.
+
+Usage:
+    uv run python -m benchmarks.run
+    uv run python -m benchmarks.run --commits 20000 --files 3000 --builds 200
+    uv run python -m benchmarks.run --feature-set git_history --feature-set all \\
+        --repeat 3 --output bench.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import resource
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict
+from datetime import datetime, timezone
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .seed import BuildSpec
+from .synthetic_repo import RepoSpec
+
+REPORT_VERSION = 1
+GITHUB_REPO_ID = 900_000_001
+FULL_NAME = "benchmark/synthetic"
+
+# Feature sets by FeatureCategory value (None = every registered feature)
+FEATURE_SETS: Dict[str, Optional[List[str]]] = {
+    "git_history": ["git_history"],
+    "git_diff": ["git_diff"],
+    "repo_snapshot": ["repo_snapshot", "devops"],
+    "team": ["team", "committer", "cooperation"],
+    "build_history": ["build_history", "metadata", "workflow"],
+    "github": ["pr_info", "discussion"],
+    "build_log": ["build_log"],
+    "all": None,
+}
+
+
+def _configure_environment(
+    data_dir: Path, mongo_uri: str, db_name: str, cache: bool, parallel: bool
+) -> None:
+    """Point the app settings at the benchmark data directory and database."""
+    os.environ["DATA_DIR"] = str(data_dir)
+    os.environ["MONGODB_URI"] = mongo_uri
+    os.environ["MONGODB_DB_NAME"] = db_name
+    os.environ["HAMILTON_CACHE_ENABLED"] = "true" if cache else "false"
+    os.environ["HAMILTON_PARALLEL_ENABLED"] = "true" if parallel else "false"
+
+
+def _percentile(values: List[float], percentile: float) -> float:
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(percentile / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def _summary(values: List[float]) -> Dict[str, float]:
+    if not values:
+        return {"count": 0}
+    return {
+        "count": len(values),
+        "total_ms": round(sum(values), 2),
+        "mean_ms": round(statistics.fmean(values), 3),
+        "p50_ms": round(_percentile(values, 50), 3),
+        "p95_ms": round(_percentile(values, 95), 3),
+        "max_ms": round(max(values), 3),
+    }
+
+
+def _add_calls(totals: Dict[str, Dict[str, float]], calls: Dict[str, Dict[str, float]]) -> None:
+    for key, stats in calls.items():
+        total = totals.setdefault(key, {"count": 0, "duration_ms": 0.0, "output_bytes": 0})
+        for field, value in stats.items():
+            total[field] += value
+
+
+def _process_external_calls() -> Dict[str, Dict[str, float]]:
+    """External calls of this process by kind:command, from the Prometheus counters."""
+    from app.utils.prometheus_metrics import (
+        EXTERNAL_CALL_DURATION,
+        EXTERNAL_CALL_OUTPUT,
+        EXTERNAL_CALLS,
+    )
+
+    totals: Dict[str, Dict[str, float]] = {}
+    for metric, field, scale in (
+        (EXTERNAL_CALLS, "count", 1),
+        (EXTERNAL_CALL_DURATION, "duration_ms", 1000),
+        (EXTERNAL_CALL_OUTPUT, "output_bytes", 1),
+    ):
+        for family in metric.collect():
+            for sample in family.samples:
+                if not sample.name.endswith("_total"):
+                    continue
+                key = f"{sample.labels['kind']}:{sample.labels['command']}"
+                total = totals.setdefault(key, {"count": 0, "duration_ms": 0.0, "output_bytes": 0})
+                total[field] += sample.value * scale
+    return {
+        key: {**stats, "count": int(stats["count"]), "duration_ms": round(stats["duration_ms"], 2)}
+        for key, stats in sorted(totals.items())
+    }
+
+
+def _peak_rss_mb(who: int) -> float:
+    peak = resource.getrusage(who).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux, bytes on macOS
+    return round(peak / (1024**2 if sys.platform == "darwin" else 1024), 1)
+
+
+def resolve_feature_set(name: str) -> List[str]:
+    """Registered feature names of a feature set."""
+    from app.tasks.pipeline.feature_dag._metadata import get_metadata_registry
+
+    registry = get_metadata_registry()
+    categories = FEATURE_SETS[name]
+    if categories is None:
+        return sorted(registry)
+    return sorted(name for name, meta in registry.items() if meta["category"] in categories)
+
+
+def run_feature_set(name: str, options: Dict[str, Any]) -> Dict[str, Any]:
+    """Execute the pipeline for every seeded build with one feature set (worker process)."""
+    from app.database.mongo import get_database
+    from app.repositories.raw_build_run import RawBuildRunRepository
+    from app.repositories.raw_repository import RawRepositoryRepository
+    from app.tasks.pipeline.hamilton_runner import HamiltonPipeline
+    from app.tasks.pipeline.input_preparer import prepare_pipeline_input
+
+    from .github_stub import stub_github_client_input
+
+    db = get_database()
+    raw_repo = RawRepositoryRepository(db).find_one({"full_name": FULL_NAME})
+    build_runs = sorted(
+        RawBuildRunRepository(db).find_many({"raw_repo_id": raw_repo.id}),
+        key=lambda build: build.created_at,
+    )
+    features = resolve_feature_set(name)
+    github_client = stub_github_client_input(
+        FULL_NAME, seed=options["seed"], latency_ms=options["github_latency_ms"]
+    )
+    pipeline = HamiltonPipeline(db=db, enable_tracking=True)
+
+    build_ms: List[float] = []
+    prepare_ms: List[float] = []
+    node_ms: Dict[str, List[float]] = {}
+    node_failures: Dict[str, int] = {}
+    node_calls: Dict[str, Dict[str, Dict[str, float]]] = {}
+    skipped: set = set()
+    errors: List[str] = []
+
+    started = time.perf_counter()
+    for _ in range(options["repeat"]):
+        for build_run in build_runs:
+            t0 = time.perf_counter()
+            prepared = prepare_pipeline_input(
+                raw_repo=raw_repo,
+                feature_config={},
+                raw_build_run=build_run,
+                selected_features=features,
+                github_client=github_client,
+            )
+            t1 = time.perf_counter()
+            try:
+                pipeline.execute(prepared)
+            except Exception as e:
+                errors.append(f"{build_run.ci_run_id}: {type(e).__name__}: {e}")
+            t2 = time.perf_counter()
+            prepare_ms.append((t1 - t0) * 1000)
+            build_ms.append((t2 - t1) * 1000)
+            skipped |= prepared.skipped_features
+
+            execution = pipeline.get_execution_results()
+            for node_info in execution.node_results if execution else []:
+                node_ms.setdefault(node_info.node_name, []).append(node_info.duration_ms)
+                if not node_info.success:
+                    node_failures[node_info.node_name] = (
+                        node_failures.get(node_info.node_name, 0) + 1
+                    )
+                _add_calls(node_calls.setdefault(node_info.node_name, {}), node_info.external_calls)
+    elapsed = time.perf_counter() - started
+
+    external_calls = _process_external_calls()
+    return {
+        "name": name,
+        "features": len(features),
+        "features_skipped": sorted(skipped),
+        "builds": len(build_runs),
+        "repeat": options["repeat"],
+        "elapsed_s": round(elapsed, 3),
+        "prepare": _summary(prepare_ms),
+        "execute": _summary(build_ms),
+        "nodes": {
+            node: {
+                **_summary(durations),
+                "failures": node_failures.get(node, 0),
+                "external_calls": node_calls.get(node, {}),
+            }
+            for node, durations in sorted(node_ms.items())
+        },
+        "external_calls": external_calls,
+        "subprocess_count": sum(
+            stats["count"] for key, stats in external_calls.items() if not key.startswith("github:")
+        ),
+        "github_requests": github_client.client.requests,
+        "peak_rss_mb": _peak_rss_mb(resource.RUSAGE_SELF),
+        "children_peak_rss_mb": _peak_rss_mb(resource.RUSAGE_CHILDREN),
+        "errors": errors[:20],
+        "error_count": len(errors),
+    }
+
+
+def prepare_workspace(repo_spec: RepoSpec, build_spec: BuildSpec) -> Dict[str, Any]:
+    """Generate, clone and index the repository and seed the database (parent process)."""
+    from app.config import settings
+    from app.database.mongo import get_database
+    from app.paths import LOGS_DIR, get_repo_path, get_worktrees_path
+    from app.tasks.pipeline.utils.commit_index import refresh_commit_index
+    from app.tasks.pipeline.utils.repo_maintenance import run_repo_maintenance
+
+    from .seed import seed_repository
+    from .synthetic_repo import clone_bare, generate_repo
+
+    timings: Dict[str, float] = {}
+
+    def timed(step: str, fn, *fn_args, **fn_kwargs):
+        t0 = time.perf_counter()
+        result = fn(*fn_args, **fn_kwargs)
+        timings[step] = round(time.perf_counter() - t0, 3)
+        return result
+
+    repo_path = get_repo_path(GITHUB_REPO_ID)
+    source = repo_path.parent.parent / "synthetic-source"
+    commits = timed("generate_s", generate_repo, source, repo_spec)
+    timed("clone_s", clone_bare, source, repo_path)
+    shutil.rmtree(source)
+    timed("maintenance_s", run_repo_maintenance, repo_path)
+    timed("commit_index_s", refresh_commit_index, repo_path)
+    _, build_runs = timed(
+        "seed_s",
+        seed_repository,
+        get_database(),
+        commits,
+        build_spec,
+        github_repo_id=GITHUB_REPO_ID,
+        full_name=FULL_NAME,
+        repo_path=repo_path,
+        worktrees_dir=get_worktrees_path(GITHUB_REPO_ID),
+        logs_dir=LOGS_DIR / str(GITHUB_REPO_ID),
+        log_compression=settings.CI_LOG_COMPRESSION,
+    )
+    return {
+        "commits": len(commits),
+        "merges": sum(commit.is_merge for commit in commits),
+        "builds": len(build_runs),
+        **timings,
+    }
+
+
+def _environment() -> Dict[str, Any]:
+    git_version = subprocess.run(["git", "--version"], capture_output=True, text=True).stdout
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "git": git_version.strip(),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    repo = parser.add_argument_group("synthetic repository")
+    repo.add_argument("--commits", type=int, default=RepoSpec.commits)
+    repo.add_argument("--files", type=int, default=RepoSpec.files)
+    repo.add_argument("--authors", type=int, default=RepoSpec.authors)
+    repo.add_argument("--merge-every", type=int, default=RepoSpec.merge_every)
+    repo.add_argument("--churn", type=float, default=RepoSpec.churn)
+    builds = parser.add_argument_group("builds")
+    builds.add_argument("--builds", type=int, default=BuildSpec.builds)
+    builds.add_argument("--failure-rate", type=float, default=BuildSpec.failure_rate)
+    builds.add_argument("--pr-rate", type=float, default=BuildSpec.pr_rate)
+    builds.add_argument(
+        "--no-worktrees", action="store_true", help="Skip checkouts (repo snapshot features)"
+    )
+    run = parser.add_argument_group("run")
+    run.add_argument(
+        "--feature-set",
+        action="append",
+        choices=sorted(FEATURE_SETS),
+        help="Feature set to run (repeatable, default: all sets)",
+    )
+    run.add_argument("--repeat", type=int, default=1, help="Passes over the builds per set")
+    run.add_argument("--cache", action="store_true", help="Enable the Hamilton result cache")
+    run.add_argument("--parallel", action="store_true", help="Run independent nodes in threads")
+    run.add_argument("--github-latency-ms", type=float, default=0.0)
+    run.add_argument("--seed", type=int, default=42)
+    run.add_argument(
+        "--mongo-uri", default=os.environ.get("MONGODB_URI", "mongodb://localhost:27017")
+    )
+    run.add_argument("--db-name", default="buildguard_benchmark")
+    run.add_argument("--work-dir", type=Path, help="Keep repositories and logs here")
+    run.add_argument("--output", type=Path, help="Write the JSON report here (default: stdout)")
+    args = parser.parse_args()
+
+    if not args.db_name.endswith("_benchmark"):
+        parser.error("--db-name must end with '_benchmark' (its collections are dropped)")
+
+    repo_spec = RepoSpec(
+        commits=args.commits,
+        files=args.files,
+        authors=args.authors,
+        merge_every=args.merge_every,
+        churn=args.churn,
+        seed=args.seed,
+    )
+    build_spec = BuildSpec(
+        builds=args.builds,
+        failure_rate=args.failure_rate,
+        pr_rate=args.pr_rate,
+        worktrees=not args.no_worktrees,
+        seed=args.seed,
+    )
+
+    work_dir = args.work_dir or Path(tempfile.mkdtemp(prefix="feature-dag-bench-"))
+    data_dir = work_dir / "data"
+    if data_dir.exists():
+        shutil.rmtree(data_dir)
+    _configure_environment(data_dir, args.mongo_uri, args.db_name, args.cache, args.parallel)
+
+    try:
+        from app.paths import ensure_data_dirs
+
+        ensure_data_dirs()
+        print(f"Preparing synthetic repository in {work_dir}...", file=sys.stderr)
+        setup = prepare_workspace(repo_spec, build_spec)
+
+        # One fresh process per feature set; the environment is inherited
+        options = {
+            "repeat": args.repeat,
+            "seed": args.seed,
+            "github_latency_ms": args.github_latency_ms,
+        }
+        results = []
+        for name in args.feature_set or list(FEATURE_SETS):
+            print(f"Running feature set {name}...", file=sys.stderr)
+            with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+                results.append(pool.submit(run_feature_set, name, options).result())
+    finally:
+        if not args.work_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    report = {
+        "benchmark": "feature_dag",
+        "version": REPORT_VERSION,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "environment": _environment(),
+        "options": {"repeat": args.repeat, "cache": args.cache, "parallel": args.parallel},
+        "repo_spec": asdict(repo_spec),
+        "build_spec": asdict(build_spec),
+        "setup": setup,
+        "feature_sets": results,
+    }
+    output = json.dumps(report, indent=2, default=str)
+    if args.output:
+        args.output.write_text(output + "\n")
+        print(f"Report written to {args.output}", file=sys.stderr)
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,226 @@
+"""
+Seed the benchmark database and data directory for a synthetic repository.
+
+Mirrors what ingestion leaves behind for a real repository: one
+RawRepository, a RawBuildRun per built commit (push builds on main, pull
+request builds on feature branch tips), a worktree per built commit and one
+test log per build job.
+"""
+
+from __future__ import annotations
+
+import random
+import subprocess
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+from .synthetic_repo import SyntheticCommit
+
+if TYPE_CHECKING:
+    from app.entities.raw_build_run import RawBuildRun
+    from app.entities.raw_repository import RawRepository
+
+# Collections the pipeline reads from or writes to, dropped before seeding
+BENCHMARK_COLLECTIONS = (
+    "raw_repositories",
+    "raw_build_runs",
+    "feature_vectors",
+    "feature_results",
+    "commit_change_stats",
+    "build_history_rollups",
+)
+
+JOBS_PER_BUILD = 2
+
+
+@dataclass(frozen=True)
+class BuildSpec:
+    """Which commits are built and how the builds end."""
+
+    builds: int = 50
+    failure_rate: float = 0.2  # Probability that a build after a success fails
+    pr_rate: float = 0.3  # Share of builds made for feature branch tips (PR builds)
+    worktrees: bool = True  # Check out every built commit (repo snapshot features)
+    seed: int = 42
+
+
+def _utc(timestamp: int) -> datetime:
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc)
+
+
+def select_build_commits(
+    commits: List[SyntheticCommit], spec: BuildSpec
+) -> List[Tuple[SyntheticCommit, Optional[int]]]:
+    """
+    Evenly spaced built commits, oldest first.
+
+    Returns:
+        (commit, pull request number or None) pairs
+    """
+    main = [c for c in commits[1:] if c.branch == "main"]
+    # Last commit of each feature branch, numbered like its pull request
+    tips: Dict[str, SyntheticCommit] = {}
+    for commit in commits:
+        if commit.branch.startswith("feature/"):
+            tips[commit.branch] = commit
+
+    pr_builds = min(len(tips), round(spec.builds * spec.pr_rate))
+    push_builds = min(len(main), spec.builds - pr_builds)
+
+    def spaced(items: List[Any], count: int) -> List[Any]:
+        if count <= 0:
+            return []
+        step = len(items) / count
+        return [items[int(i * step)] for i in range(count)]
+
+    selected: List[Tuple[SyntheticCommit, Optional[int]]] = [
+        (commit, None) for commit in spaced(main, push_builds)
+    ]
+    tip_list = sorted(tips.items(), key=lambda item: item[1].mark)
+    selected += [
+        (commit, int(branch.split("/", 1)[1]))
+        for branch, commit in spaced(tip_list, pr_builds)
+    ]
+    return sorted(selected, key=lambda item: item[0].mark)
+
+
+def _test_log(rng: random.Random, failed: bool) -> str:
+    passed = rng.randint(50, 400)
+    failures = rng.randint(1, 5) if failed else 0
+    skipped = rng.randint(0, 10)
+    duration = rng.uniform(5, 120)
+    lines = [
+        "##[group]Run pytest",
+        "============================= test session starts ==============================",
+        f"collected {passed + failures + skipped} items",
+        "",
+    ]
+    lines += [f"tests/test_module_{i}.py .......... [{(i + 1) * 10:3d}%]" for i in range(10)]
+    lines.append(
+        f"===== {passed} passed, {failures} failed, {skipped} skipped in {duration:.2f}s ====="
+    )
+    lines.append("##[endgroup]")
+    return "\n".join(lines) + "\n"
+
+
+def _create_worktree(repo_path: Path, worktrees_dir: Path, sha: str) -> None:
+    """Same layout as ingestion's _create_worktree (worktrees_dir/<sha[:12]>)."""
+    worktree_path = worktrees_dir / sha[:12]
+    if worktree_path.exists():
+        return
+    subprocess.run(
+        ["git", "worktree", "add", "--detach", str(worktree_path), sha],
+        cwd=str(repo_path),
+        check=True,
+        capture_output=True,
+    )
+
+
+def seed_repository(
+    db: Any,
+    commits: List[SyntheticCommit],
+    spec: BuildSpec,
+    github_repo_id: int,
+    full_name: str,
+    repo_path: Path,
+    worktrees_dir: Path,
+    logs_dir: Path,
+    log_compression: str = "gzip",
+) -> Tuple[RawRepository, List[RawBuildRun]]:
+    """
+    Insert the repository and its builds; create their worktrees and logs.
+
+    Returns:
+        The RawRepository and its RawBuildRuns, oldest first
+    """
+    # Imported here: app settings must only load once benchmarks/run.py
+    # pointed DATA_DIR and the database at the benchmark workspace
+    from app.ci_providers.models import BuildConclusion, BuildStatus, CIProvider
+    from app.entities.raw_build_run import RawBuildRun
+    from app.entities.raw_repository import RawRepository
+    from app.repositories.raw_build_run import RawBuildRunRepository
+    from app.repositories.raw_repository import RawRepositoryRepository
+    from app.tasks.pipeline.utils.ci_logs import write_job_log
+
+    for name in BENCHMARK_COLLECTIONS:
+        db.drop_collection(name)
+
+    raw_repo = RawRepositoryRepository(db).insert_one(
+        RawRepository(
+            full_name=full_name,
+            github_repo_id=github_repo_id,
+            default_branch="main",
+            main_lang="python",
+        )
+    )
+
+    rng = random.Random(spec.seed)
+    build_runs: List[RawBuildRun] = []
+    previous_failed = False
+    for number, (commit, pr_number) in enumerate(select_build_commits(commits, spec), start=1):
+        # Failures come in streaks, as in real CI histories
+        failed = rng.random() < (0.6 if previous_failed else spec.failure_rate)
+        previous_failed = failed
+
+        ci_run_id = str(github_repo_id * 100_000 + number)
+        started = _utc(commit.timestamp) + timedelta(seconds=rng.randint(30, 300))
+        duration = rng.uniform(60, 1800)
+
+        build_logs = logs_dir / ci_run_id
+        build_logs.mkdir(parents=True, exist_ok=True)
+        for job in range(JOBS_PER_BUILD):
+            # Stored like ingestion stores downloaded logs (gzip by default)
+            write_job_log(
+                build_logs,
+                f"job_{job}",
+                _test_log(rng, failed and job == 0),
+                compression=log_compression,
+            )
+
+        if spec.worktrees:
+            _create_worktree(repo_path, worktrees_dir, commit.sha)
+
+        raw_data: Dict[str, Any] = {
+            "id": int(ci_run_id),
+            "event": "pull_request" if pr_number else "push",
+            "head_sha": commit.sha,
+            "head_branch": commit.branch,
+            "repository": {"id": github_repo_id, "full_name": full_name},
+            "pull_requests": [],
+        }
+        if pr_number:
+            raw_data["pull_requests"] = [
+                {"number": pr_number, "base": {"repo": {"id": github_repo_id, "name": full_name}}}
+            ]
+
+        build_runs.append(
+            RawBuildRun(
+                raw_repo_id=raw_repo.id,
+                ci_run_id=ci_run_id,
+                build_number=number,
+                repo_name=full_name,
+                branch=commit.branch,
+                commit_sha=commit.sha,
+                effective_sha=commit.sha,
+                commit_message=commit.message,
+                commit_author=commit.author_name,
+                status=BuildStatus.COMPLETED,
+                conclusion=BuildConclusion.FAILURE if failed else BuildConclusion.SUCCESS,
+                run_created_at=started,
+                run_started_at=started,
+                run_completed_at=started + timedelta(seconds=duration),
+                duration_seconds=duration,
+                logs_available=True,
+                logs_path=str(build_logs),
+                provider=CIProvider.GITHUB_ACTIONS,
+                raw_data=raw_data,
+                is_bot_commit=False,
+                # History queries order builds by the document creation time
+                created_at=started,
+            )
+        )
+
+    build_runs = RawBuildRunRepository(db).insert_many(build_runs)
+    return raw_repo, build_runs
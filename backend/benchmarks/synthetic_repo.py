@@ -0,0 +1,298 @@
+"""
+Synthetic git repositories for the feature DAG benchmarks.
+
+A repository is generated from a RepoSpec with git fast-import, so its shape
+(history length, tree size, number of authors, merge frequency, per-commit
+churn) and its content are fully determined by the spec and its seed.
+
+History layout:
+- main receives the regular commits
+- every `merge_every` main commits a feature branch is forked, gets 1-4
+  commits while main moves on, and is merged back with a merge commit
+- a share of the commits is made under an alias of its author (other email
+  or name spelling), as seen in real repositories
+"""
+
+from __future__ import annotations
+
+import random
+import subprocess
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+START_TIMESTAMP = 1_600_000_000
+
+# Files present from the first commit on, besides the generated sources/tests
+STATIC_FILES = {
+    ".github/workflows/ci.yml": (
+        "name: CI\n"
+        "on: [push, pull_request]\n"
+        "jobs:\n"
+        "  test:\n"
+        "    runs-on: ubuntu-latest\n"
+        "    steps:\n"
+        "      - uses: actions/checkout@v4\n"
+        "      - run: pip install -r requirements.txt\n"
+        "      - run: pytest\n"
+    ),
+    "Dockerfile": "FROM python:3.11-slim\nCOPY . /app\nRUN pip install -r /app/requirements.txt\n",
+    "requirements.txt": "requests==2.31.0\npytest==8.0.0\n",
+    "README.md": "# Synthetic benchmark repository\n",
+}
+
+
+@dataclass(frozen=True)
+class RepoSpec:
+    """Shape of a synthetic repository."""
+
+    commits: int = 2000  # Total commits, merge and feature branch commits included
+    files: int = 500  # Source and test files in the first commit
+    authors: int = 25
+    merge_every: int = 20  # Main commits between feature branch merges (0 = linear)
+    churn: float = 3.0  # Mean number of files modified per commit
+    add_rate: float = 0.05  # Probability that a commit adds a file
+    delete_rate: float = 0.02  # Probability that a commit deletes a file
+    alias_rate: float = 0.1  # Share of commits made under an author alias
+    seed: int = 42
+
+
+@dataclass
+class SyntheticCommit:
+    """A generated commit (sha is set once the repository was imported)."""
+
+    mark: int
+    branch: str
+    author_name: str
+    author_email: str
+    timestamp: int
+    message: str
+    parents: List[int] = field(default_factory=list)  # Parent marks
+    sha: str = ""
+
+    @property
+    def is_merge(self) -> bool:
+        return len(self.parents) > 1
+
+
+def _source_line(rng: random.Random, n: int) -> str:
+    return rng.choice(
+        [
+            f"def func_{n}(value):",
+            f"    return value * {rng.randint(1, 99)}",
+            f"CONSTANT_{n} = {rng.randint(0, 10_000)}",
+            f"    if value > {rng.randint(0, 50)}:",
+            f"        value -= {rng.randint(1, 9)}",
+            f"# note {n}",
+        ]
+    )
+
+
+def _test_line(rng: random.Random, n: int) -> str:
+    return rng.choice(
+        [
+            f"def test_case_{n}():",
+            f"    assert func_{n}({rng.randint(0, 9)}) is not None",
+            f"    assert {rng.randint(0, 9)} == {rng.randint(0, 9)} or True",
+        ]
+    )
+
+
+class _Generator:
+    def __init__(self, spec: RepoSpec):
+        self.spec = spec
+        self.rng = random.Random(spec.seed)
+        self.lines: List[str] = []
+        self.commits: List[SyntheticCommit] = []
+        self.timestamp = START_TIMESTAMP
+        self.next_file = 0
+        self.authors = [(f"Developer {i}", f"dev{i}@example.com") for i in range(spec.authors)]
+        # Zipf-like activity: a few authors make most of the commits
+        self.author_weights = [1.0 / (i + 1) for i in range(spec.authors)]
+
+    # -- content -------------------------------------------------------------
+
+    def _new_path(self) -> str:
+        n = self.next_file
+        self.next_file += 1
+        if n % 4 == 3:
+            return f"tests/pkg{n % 20}/test_module_{n}.py"
+        return f"src/pkg{n % 20}/module_{n}.py"
+
+    def _new_content(self, path: str) -> List[str]:
+        make_line = _test_line if "/test_" in path else _source_line
+        return [make_line(self.rng, i) for i in range(self.rng.randint(10, 80))]
+
+    def _modify(self, content: List[str], path: str) -> List[str]:
+        make_line = _test_line if "/test_" in path else _source_line
+        content = list(content)
+        for _ in range(self.rng.randint(1, 8)):
+            action = self.rng.random()
+            position = self.rng.randint(0, len(content))
+            if action < 0.5 or not content:
+                content.insert(position, make_line(self.rng, position))
+            elif action < 0.8:
+                content[min(position, len(content) - 1)] = make_line(self.rng, position)
+            else:
+                del content[min(position, len(content) - 1)]
+        return content
+
+    # -- fast-import stream --------------------------------------------------
+
+    def _author(self) -> Tuple[str, str]:
+        name, email = self.rng.choices(self.authors, weights=self.author_weights)[0]
+        if self.rng.random() < self.spec.alias_rate:
+            # Same person, other identity: work email or lowercase login name
+            if self.rng.random() < 0.5:
+                email = email.replace("@example.com", "@corp.example.org")
+            else:
+                name = name.lower().replace(" ", "")
+        return name, email
+
+    def _emit_data(self, text: str) -> None:
+        self.lines.append(f"data {len(text.encode())}")
+        self.lines.append(text)
+
+    def _commit(
+        self,
+        branch: str,
+        state: Dict[str, List[str]],
+        changes: Dict[str, Optional[List[str]]],
+        message: str,
+        parents: List[int],
+    ) -> SyntheticCommit:
+        """Write one commit applying `changes` (path -> content, None = delete) to `state`."""
+        self.timestamp += self.rng.randint(300, 4 * 3600)
+        name, email = self._author()
+        commit = SyntheticCommit(
+            mark=len(self.commits) + 1,
+            branch=branch,
+            author_name=name,
+            author_email=email,
+            timestamp=self.timestamp,
+            message=message,
+            parents=parents,
+        )
+        self.commits.append(commit)
+
+        self.lines.append(f"commit refs/heads/{branch}")
+        self.lines.append(f"mark :{commit.mark}")
+        self.lines.append(f"author {name} <{email}> {self.timestamp} +0000")
+        self.lines.append(f"committer {name} <{email}> {self.timestamp} +0000")
+        self._emit_data(message)
+        if parents:
+            self.lines.append(f"from :{parents[0]}")
+        for parent in parents[1:]:
+            self.lines.append(f"merge :{parent}")
+        for path, content in sorted(changes.items()):
+            if content is None:
+                state.pop(path, None)
+                self.lines.append(f"D {path}")
+            else:
+                state[path] = content
+                self.lines.append(f"M 100644 inline {path}")
+                self._emit_data("\n".join(content) + "\n")
+        return commit
+
+    def _changes(
+        self, state: Dict[str, List[str]], exclude: Set[str]
+    ) -> Dict[str, Optional[List[str]]]:
+        """Random file changes of one commit, leaving the `exclude` paths alone."""
+        candidates = [p for p in state if p.endswith(".py") and p not in exclude]
+        count = min(len(candidates), max(1, round(self.rng.expovariate(1 / self.spec.churn))))
+        changes: Dict[str, Optional[List[str]]] = {
+            path: self._modify(state[path], path) for path in self.rng.sample(candidates, count)
+        }
+        if self.rng.random() < self.spec.add_rate:
+            path = self._new_path()
+            changes[path] = self._new_content(path)
+        if self.rng.random() < self.spec.delete_rate and len(candidates) > count + 1:
+            remaining = [p for p in candidates if p not in changes]
+            changes[self.rng.choice(remaining)] = None
+        return changes
+
+    def generate(self) -> List[SyntheticCommit]:
+        spec = self.spec
+        main: Dict[str, List[str]] = {}
+        initial: Dict[str, Optional[List[str]]] = {
+            path: content.rstrip("\n").split("\n") for path, content in STATIC_FILES.items()
+        }
+        for _ in range(spec.files):
+            path = self._new_path()
+            initial[path] = self._new_content(path)
+        tip = self._commit("main", main, initial, "Initial commit", []).mark
+
+        main_commits = 0
+        feature = 0
+        while len(self.commits) < spec.commits:
+            if spec.merge_every and main_commits and main_commits % spec.merge_every == 0:
+                feature += 1
+                tip = self._feature_branch(main, tip, feature)
+            changes = self._changes(main, exclude=set())
+            tip = self._commit("main", main, changes, f"Change {len(self.commits)}", [tip]).mark
+            main_commits += 1
+        return self.commits
+
+    def _feature_branch(self, main: Dict[str, List[str]], main_tip: int, number: int) -> int:
+        """Fork, commit on both sides and merge back; returns the merge commit mark."""
+        branch = f"feature/{number}"
+        state = dict(main)
+        touched: Dict[str, Optional[List[str]]] = {}
+        tip = main_tip
+        for i in range(self.rng.randint(1, 4)):
+            changes = self._changes(state, exclude=set())
+            tip = self._commit(branch, state, changes, f"Feature {number} step {i + 1}", [tip]).mark
+            touched.update(changes)
+
+        # Main moves on meanwhile, on other files so the merge is conflict-free
+        for _ in range(self.rng.randint(0, 2)):
+            changes = self._changes(main, exclude=set(touched))
+            main_tip = self._commit(
+                "main", main, changes, f"Change {len(self.commits)}", [main_tip]
+            ).mark
+
+        return self._commit(
+            "main", main, touched, f"Merge branch '{branch}'", [main_tip, tip]
+        ).mark
+
+
+def _read_marks(marks_file: Path) -> Dict[int, str]:
+    marks: Dict[int, str] = {}
+    for line in marks_file.read_text().splitlines():
+        mark, sha = line.split()
+        marks[int(mark.lstrip(":"))] = sha
+    return marks
+
+
+def generate_repo(path: Path, spec: RepoSpec) -> List[SyntheticCommit]:
+    """
+    Create a non-bare repository at `path` following `spec`.
+
+    Returns:
+        Generated commits in creation order (parents before children), with shas
+    """
+    generator = _Generator(spec)
+    commits = generator.generate()
+    payload = ("\n".join(generator.lines) + "\n").encode()
+
+    path.mkdir(parents=True, exist_ok=True)
+    subprocess.run(["git", "init", "-q", "-b", "main", str(path)], check=True)
+    marks_file = path / ".git" / "benchmark-marks"
+    subprocess.run(
+        ["git", "fast-import", "--quiet", f"--export-marks={marks_file}"],
+        cwd=str(path),
+        input=payload,
+        check=True,
+    )
+    marks = _read_marks(marks_file)
+    for commit in commits:
+        commit.sha = marks[commit.mark]
+    return commits
+
+
+def clone_bare(source: Path, target: Path) -> None:
+    """Bare clone like the clone_repo ingestion task (feature branches included)."""
+    target.parent.mkdir(parents=True, exist_ok=True)
+    subprocess.run(
+        ["git", "clone", "-q", "--bare", "--no-local", str(source), str(target)], check=True
+    )
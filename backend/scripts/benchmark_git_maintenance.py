@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Benchmark git history queries before and after post-fetch maintenance.
+
+Builds a synthetic repository (via git fast-import), clones it bare like the
+clone_repo task does, and times the history walks behind the git features
+on the plain clone and again after run_repo_maintenance() wrote the
+commit-graph with changed-path Bloom filters and bitmaps.
+
+Usage:
+    uv run python scripts/benchmark_git_maintenance.py
+    uv run python scripts/benchmark_git_maintenance.py --commits 50000 --files 5000
+"""
+
+import argparse
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+# Add parent directory to path for imports
+sys.path.insert(0, ".")
+
+from app.tasks.pipeline.utils.repo_maintenance import run_repo_maintenance
+
+AUTHORS = [(f"Dev {i}", f"dev{i}@example.com") for i in range(12)]
+
+
+def git(repo: Path, *args: str) -> str:
+    result = subprocess.run(
+        ["git", *args], cwd=str(repo), check=True, capture_output=True, text=True
+    )
+    return result.stdout
+
+
+def build_synthetic_repo(path: Path, commits: int, files: int, seed: int) -> List[str]:
+    """Create a repo with `commits` linear commits each touching 1-4 of `files` paths."""
+    rng = random.Random(seed)
+    paths = [f"pkg{i % 50}/module_{i}.py" for i in range(files)]
+    subprocess.run(["git", "init", "-q", "-b", "main", str(path)], check=True)
+
+    lines: List[str] = []
+    start_ts = 1_500_000_000
+    for n in range(commits):
+        name, email = rng.choice(AUTHORS)
+        ts = start_ts + n * 600
+        message = f"commit {n}"
+        lines.append("commit refs/heads/main")
+        lines.append(f"author {name} <{email}> {ts} +0000")
+        lines.append(f"committer {name} <{email}> {ts} +0000")
+        lines.append(f"data {len(message)}")
+        lines.append(message)
+        touched = paths[: min(files, 20)] if n == 0 else rng.sample(paths, rng.randint(1, 4))
+        for file_path in touched:
+            content = f"# {file_path} revision {n}\n" + "x = 1\n" * rng.randint(1, 20)
+            lines.append(f"M 100644 inline {file_path}")
+            lines.append(f"data {len(content.encode())}")
+            lines.append(content)
+    payload = ("\n".join(lines) + "\n").encode()
+    subprocess.run(["git", "fast-import", "--quiet"], cwd=str(path), input=payload, check=True)
+    return paths
+
+
+def time_query(fn: Callable[[], object], repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples)
+
+
+def build_queries(repo: Path, paths: List[str], seed: int) -> Dict[str, Callable[[], object]]:
+    """History walks used by the git feature extractors (fallback paths)."""
+    rng = random.Random(seed + 1)
+    sample_paths = rng.sample(paths, min(10, len(paths)))
+    head = git(repo, "rev-parse", "HEAD").strip()
+    author_email = AUTHORS[0][1]
+
+    return {
+        # git_file_commit_density / team_total_revisions
+        "file history (log -- <path>)": lambda: [
+            git(repo, "log", "--format=%H", head, "--", p) for p in sample_paths
+        ],
+        # git_num_all_touched / author ownership windows
+        "file window (log --since -- <path>)": lambda: [
+            git(repo, "log", "--format=%H", "--since=2017-09-01", head, "--", p)
+            for p in sample_paths
+        ],
+        # author_is_new / author_days_since_commit
+        "author history (log --author)": lambda: git(
+            repo, "log", "--all", f"--author={author_email}", "--format=%ct"
+        ),
+        # git_built_commits_count / history counters
+        "commit count (rev-list --count)": lambda: git(repo, "rev-list", "--count", head),
+    }
+
+
+def run_benchmark(
+    commits: int, files: int, repeat: int, seed: int
+) -> List[Tuple[str, float, float]]:
+    with tempfile.TemporaryDirectory(prefix="git-maintenance-bench-") as tmp:
+        source = Path(tmp) / "source"
+        bare = Path(tmp) / "repo.git"
+
+        print(f"Building synthetic repo: {commits} commits, {files} files...")
+        paths = build_synthetic_repo(source, commits, files, seed)
+        subprocess.run(
+            ["git", "clone", "-q", "--bare", "--no-local", str(source), str(bare)], check=True
+        )
+
+        queries = build_queries(bare, paths, seed)
+        before = {name: time_query(fn, repeat) for name, fn in queries.items()}
+
+        state = run_repo_maintenance(bare)
+        print(f"Maintenance took {state.duration_seconds}s (errors: {state.errors or 'none'})")
+
+        after = {name: time_query(fn, repeat) for name, fn in queries.items()}
+        return [(name, before[name], after[name]) for name in queries]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--commits", type=int, default=20000)
+    parser.add_argument("--files", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    results = run_benchmark(args.commits, args.files, args.repeat, args.seed)
+
+    print()
+    print(f"{'query':40} {'before (s)':>12} {'after (s)':>12} {'speedup':>9}")
+    for name, before, after in results:
+        speedup = before / after if after else float("inf")
+        print(f"{name:40} {before:12.3f} {after:12.3f} {speedup:8.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
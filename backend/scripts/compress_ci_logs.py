@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Compress CI job logs downloaded before log compression was enabled.
+
+Replaces every plain `<job_id>.log` below the logs directory (default:
+DATA_DIR/logs) with `<job_id>.log.gz`. Safe to run while workers are up and
+to rerun after an interruption: readers accept both formats and a plain log
+is only removed once its compressed copy is complete.
+
+Usage:
+    uv run python scripts/compress_ci_logs.py
+    uv run python scripts/compress_ci_logs.py --dry-run
+    uv run python scripts/compress_ci_logs.py --logs-dir /data/logs/123456 --level 9
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, ".")
+
+from app.config import settings
+from app.paths import LOGS_DIR
+from app.tasks.pipeline.utils.ci_logs import compress_logs_dir
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Gzip plain CI job logs in place")
+    parser.add_argument(
+        "--logs-dir", type=Path, default=LOGS_DIR, help=f"Logs root (default: {LOGS_DIR})"
+    )
+    parser.add_argument(
+        "--level",
+        type=int,
+        default=settings.CI_LOG_COMPRESSION_LEVEL,
+        help="Gzip compression level (1-9)",
+    )
+    parser.add_argument(
+        "--dry-run", action="store_true", help="Only count the logs that would be compressed"
+    )
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    stats = compress_logs_dir(args.logs_dir, level=args.level, dry_run=args.dry_run)
+    elapsed = time.perf_counter() - start
+
+    mb = 1024 * 1024
+    if args.dry_run:
+        print(f"{stats.files} plain logs ({stats.bytes_before / mb:.1f} MB) under {args.logs_dir}")
+    else:
+        ratio = f", {stats.ratio:.1f}x" if stats.ratio else ""
+        print(
+            f"Compressed {stats.files} logs under {args.logs_dir} in {elapsed:.1f}s: "
+            f"{stats.bytes_before / mb:.1f} MB -> {stats.bytes_after / mb:.1f} MB{ratio}"
+        )
+    if stats.errors:
+        print(f"{stats.errors} logs failed, see warnings above", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())